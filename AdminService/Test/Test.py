@@ -1,7 +1,12 @@
-import requests
 import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Test"))
+from service_client import ServiceClient
 
 BASE_URL = "http://localhost:10013"
+http = ServiceClient(BASE_URL)  # keep-alive pool shared by every test
 ADMIN_TOKEN = "your-valid-admin-token"  # Replace with actual token
 
 def test_view_system_stats():
@@ -11,7 +16,7 @@ def test_view_system_stats():
         "adminToken": ADMIN_TOKEN
     }
     
-    response = requests.post(f"{BASE_URL}/api/ViewSystemStats", json=payload)
+    response = http.post(f"{BASE_URL}/api/ViewSystemStats", json=payload)
     print(f"ViewSystemStats: {response.status_code}")
     print(f"Response: {response.json()}")
     return response
@@ -25,7 +30,7 @@ def test_ban_user():
         "banDays": 3
     }
     
-    response = requests.post(f"{BASE_URL}/api/BanUser", json=payload)
+    response = http.post(f"{BASE_URL}/api/BanUser", json=payload)
     print(f"BanUser: {response.status_code}")
     print(f"Response: {response.text}")
     return response
@@ -38,7 +43,7 @@ def test_unban_user():
         "userID": "test-user-123"
     }
     
-    response = requests.post(f"{BASE_URL}/api/UnbanUser", json=payload)
+    response = http.post(f"{BASE_URL}/api/UnbanUser", json=payload)
     print(f"UnbanUser: {response.status_code}")
     print(f"Response: {response.text}")
     return response
@@ -52,7 +57,7 @@ def test_manage_report():
         "resolutionStatus": "resolved"
     }
     
-    response = requests.post(f"{BASE_URL}/api/ManageReport", json=payload)
+    response = http.post(f"{BASE_URL}/api/ManageReport", json=payload)
     print(f"ManageReport: {response.status_code}")
     print(f"Response: {response.text}")
     return response
@@ -0,0 +1,64 @@
+package APIs.AdminService
+
+import Common.API.API
+import Global.ServiceCenter.AdminServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+
+
+/**
+ * ReloadBattleObjectsMessage
+ * desc: 管理员修改战斗对象表后，让对战服务重新载入战斗对象注册表。
+ * @param adminToken: String (管理员身份Token，用于标识和验证管理员权限)
+ * @return result: String (对战服务返回的注册表概况)
+ */
+
+case class ReloadBattleObjectsMessage(
+  adminToken: String
+) extends API[String](AdminServiceCode)
+
+
+
+case object ReloadBattleObjectsMessage{
+    
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[ReloadBattleObjectsMessage] = deriveEncoder
+  private val circeDecoder: Decoder[ReloadBattleObjectsMessage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[ReloadBattleObjectsMessage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[ReloadBattleObjectsMessage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[ReloadBattleObjectsMessage]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given reloadBattleObjectsMessageEncoder: Encoder[ReloadBattleObjectsMessage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given reloadBattleObjectsMessageDecoder: Decoder[ReloadBattleObjectsMessage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
@@ -0,0 +1,63 @@
+package APIs.AdminService
+
+import Common.API.API
+import Global.ServiceCenter.AdminServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+
+/**
+ * ValidateAdminTokenMessage
+ * desc: 验证管理员Token，供其他服务的管理员接口鉴权；Token 无效时返回错误。
+ * @param adminToken: String (管理员的身份令牌)
+ * @return adminID: String (Token 对应的管理员ID)
+ */
+
+case class ValidateAdminTokenMessage(
+  adminToken: String
+) extends API[String](AdminServiceCode)
+
+
+
+case object ValidateAdminTokenMessage{
+    
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[ValidateAdminTokenMessage] = deriveEncoder
+  private val circeDecoder: Decoder[ValidateAdminTokenMessage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[ValidateAdminTokenMessage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[ValidateAdminTokenMessage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[ValidateAdminTokenMessage]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given validateAdminTokenMessageEncoder: Encoder[ValidateAdminTokenMessage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given validateAdminTokenMessageDecoder: Decoder[ValidateAdminTokenMessage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
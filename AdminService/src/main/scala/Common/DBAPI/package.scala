@@ -1,10 +1,11 @@
 package Common
 
-import Common.API.{PlanContext, TraceID}
-import Global.DBConfig
-import Common.Object.{ParameterList, SqlParameter}
-import DBAPI.{EndTransactionMessage, InitSchemaMessage, ReadDBRowsMessage, ReadDBValueMessage, StartTransactionMessage, WriteDBListMessage, WriteDBMessage}
+import Common.API.{DeadlineExceededException, Metrics, PlanContext, TraceID, Tracer, UnexpectedStatusException}
+import Global.{DBConfig, GlobalVariables}
+import Common.Object.{BatchStatement, ParameterList, SqlParameter}
+import DBAPI.{BatchDBMessage, EndTransactionMessage, InitSchemaMessage, ReadDBRowsMessage, ReadDBValueMessage, StartTransactionMessage, WriteDBListMessage, WriteDBMessage}
 import cats.effect.*
+import cats.syntax.traverse.*
 import io.circe.{Decoder, Encoder, HCursor, Json}
 import io.circe.generic.auto.*
 import org.joda.time.DateTime
@@ -20,70 +21,117 @@ package object DBAPI {
 
     // Define the start transaction action
     val startTransactionAction = if (ctx.transactionLevel == 0) {
-      StartTransactionMessage().send
+      traced("BEGIN", "BEGIN")(StartTransactionMessage().send)
     } else {
       IO.unit // No action needed, already inside a transaction
     }
 
+    /** 请求超出时限或被取消时由第一层回滚，避免 DB-Manager 中留下没有结束的事务 */
+    val rollbackOnDeadline = if (ctx.transactionLevel == 0) {
+      traced("ROLLBACK", "ROLLBACK")(EndTransactionMessage(false).send).void.handleError(_ => ())
+    } else {
+      IO.unit
+    }
+
     def commitOrRollbackAction(result: Either[Throwable, A]): IO[A] =
       result match {
         case Left(exception:DidRollbackException) =>
           IO.raiseError(exception)   /** 如果问题已经处理过了，我们不需要额外处理了 */
+        case Left(exception:DeadlineExceededException) =>
+          rollbackOnDeadline >> IO.raiseError(exception)   /** 保留原异常，Routes 按超时响应 */
         case Left(exception)=>
-          EndTransactionMessage(false).send >> IO.raiseError(DidRollbackException(exception.getMessage)) // 出现了问题，回滚
+          traced("ROLLBACK", "ROLLBACK")(EndTransactionMessage(false).send) >> IO.raiseError(DidRollbackException(exception.getMessage)) // 出现了问题，回滚
         case Right(value) =>
           if (ctx.transactionLevel == 0)
             /** 除非是第一层，否则是不把事务结束的 */
-            EndTransactionMessage(true).send.as(value)
+            traced("COMMIT", "COMMIT")(EndTransactionMessage(true).send).as(value)
           else IO.pure(value)
       }
 
-    for {
-      _ <- startTransactionAction // Start the transaction if this is the first level
-      result <- block(using newContext).attempt // Execute the block with the new (incremented) transaction context
-      _ <- IO.println("Step result")
+    /** 只有 block 可以被取消；BEGIN / COMMIT / ROLLBACK 一旦开始就会发完，不会因为取消留下没有结束的事务 */
+    IO.uncancelable { poll =>
+      for {
+        _ <- startTransactionAction // Start the transaction if this is the first level
+        result <- poll(block(using newContext)).onCancel(rollbackOnDeadline).attempt // Execute the block with the new (incremented) transaction context
 
-      _ <- result match
-        case Left(value) => IO.pure(value.printStackTrace())
-        case Right(value) => IO.println(s"result = ${result}")
+        _ <- result match
+          case Left(value) => IO(value.printStackTrace())
+          case Right(_) => IO.unit
 
-      finalResult <- commitOrRollbackAction(result)
-    } yield finalResult
+        finalResult <- commitOrRollbackAction(result)
+      } yield finalResult
+    }
   }
 
   def rollback(): IO[Unit] = IO.raiseError(RollbackException("Rollback"))
 
-  def initSchema(schemaName: String)(using planContext:PlanContext): IO[String] = InitSchemaMessage(schemaName).send
+  /** 数据库调用的 span（SQL 记为 db.statement）和按操作统计的指标 */
+  private def traced[A](operation: String, sqlQuery: String)(call: PlanContext ?=> IO[A])(using PlanContext): IO[A] =
+    Metrics.timeDB(operation) {
+      Tracer.span(s"DB ${operation}", Tracer.SpanKindClient, Map("db.statement" -> sqlQuery))(context => call(using context))
+    }
+
+  def initSchema(schemaName: String)(using planContext:PlanContext): IO[String] =
+    traced("initSchema", schemaName)(InitSchemaMessage(schemaName).send)
 
   def readDBRows(sqlQuery: String, parameters: List[SqlParameter])(using PlanContext): IO[List[Json]] =
-    ReadDBRowsMessage(sqlQuery, parameters).send
+    traced("readDBRows", sqlQuery)(ReadDBRowsMessage(sqlQuery, parameters).send)
     
   def readDBJson(sqlQuery: String, parameters: List[SqlParameter])(using PlanContext): IO[Json] =
-    ReadDBRowsMessage(sqlQuery, parameters).send.map(_.head)
+    readDBRows(sqlQuery, parameters).map(_.head)
 
   def readDBJsonOptional(sqlQuery: String, parameters: List[SqlParameter])(using PlanContext): IO[Option[Json]] =
-    ReadDBRowsMessage(sqlQuery, parameters).send.map(_.headOption)
+    readDBRows(sqlQuery, parameters).map(_.headOption)
 
   def readDBInt(sqlQuery: String, parameters: List[SqlParameter])(using context: PlanContext): IO[Int] =
     for {
-      resultParam: String<- ReadDBValueMessage(sqlQuery, parameters).send
+      resultParam: String<- traced("readDBValue", sqlQuery)(ReadDBValueMessage(sqlQuery, parameters).send)
       convertedResult = resultParam.toInt
     } yield convertedResult
 
   def readDBString(sqlQuery: String, parameters: List[SqlParameter])(using context: PlanContext): IO[String] =
     for {
-      resultParam: String<- ReadDBValueMessage(sqlQuery, parameters).send
+      resultParam: String<- traced("readDBValue", sqlQuery)(ReadDBValueMessage(sqlQuery, parameters).send)
     } yield resultParam
 
   def readDBBoolean(sqlQuery: String, parameters: List[SqlParameter])(using context: PlanContext): IO[Boolean] =
     for {
-      resultParam: String<- ReadDBValueMessage(sqlQuery, parameters).send
+      resultParam: String<- traced("readDBValue", sqlQuery)(ReadDBValueMessage(sqlQuery, parameters).send)
       convertedResult = resultParam.startsWith("t")
     } yield convertedResult
 
-  def writeDB(sqlQuery: String, parameters: List[SqlParameter])(using PlanContext): IO[String] = WriteDBMessage(sqlQuery, parameters).send
+  def writeDB(sqlQuery: String, parameters: List[SqlParameter])(using PlanContext): IO[String] =
+    traced("writeDB", sqlQuery)(WriteDBMessage(sqlQuery, parameters).send)
+
+  def writeDBList(sqlQuery: String, parameters: List[ParameterList])(using PlanContext): IO[String] =
+    traced("writeDBList", sqlQuery)(WriteDBListMessage(sqlQuery, parameters).send)
+
+  /**
+   * 把多条读写语句合并成一次 DB-Manager 往返，返回值与 statements 按顺序对应（读语句为行数组，写语句为 "OK"）
+   * DB-Manager 支持时（见 probeBatchDB）发 BatchDBMessage；否则在当前事务内（没有时新开一个）逐条 readDBRows / writeDB，结果相同
+   */
+  def batchDB(statements: List[BatchStatement])(using PlanContext): IO[List[Json]] =
+    if (GlobalVariables.enableBatchDB)
+      traced("batchDB", statements.map(_.sqlQuery).mkString(";\n"))(BatchDBMessage(statements).send)
+    else
+      startTransaction {
+        statements.traverse { statement =>
+          if (statement.kind == "read") readDBRows(statement.sqlQuery, statement.parameters).map(Json.fromValues)
+          else writeDB(statement.sqlQuery, statement.parameters).map(Json.fromString)
+        }
+      }
+
+  /**
+   * 启动时发一个空的 BatchDBMessage，确认 DB-Manager 能处理批量语句
+   * DB-Manager 返回错误状态（如不认识这个消息）时返回 false，此后 batchDB 逐条执行；连接失败等错误照常抛出
+   */
+  def probeBatchDB(using PlanContext): IO[Boolean] =
+    BatchDBMessage(Nil).send.as(true).recover {
+      case UnexpectedStatusException(_, _) => false
+    }
 
-  def writeDBList(sqlQuery: String, parameters: List[ParameterList])(using PlanContext): IO[String] = WriteDBListMessage(sqlQuery, parameters).send
+  /** 取出 batchDB 结果中一条读语句的行 */
+  def batchRows(result: Json): List[Json] = result.asArray.map(_.toList).getOrElse(Nil)
 
   def decodeField[T: Decoder](json:Json, field:String):T={
     json.hcursor.downField(snakeToCamel(field)).as[T].fold(throw _, value=>value)
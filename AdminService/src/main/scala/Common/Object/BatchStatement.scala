@@ -0,0 +1,10 @@
+package Common.Object
+
+/** BatchDBMessage 中的一条语句，kind 为 "read"（返回行数组）或 "write"（返回 "OK"） */
+case class BatchStatement(kind: String, sqlQuery: String, parameters: List[SqlParameter])
+
+object BatchStatement {
+  def read(sqlQuery: String, parameters: List[SqlParameter]): BatchStatement = BatchStatement("read", sqlQuery, parameters)
+
+  def write(sqlStatement: String, parameters: List[SqlParameter]): BatchStatement = BatchStatement("write", sqlStatement, parameters)
+}
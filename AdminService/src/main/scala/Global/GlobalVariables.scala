@@ -7,5 +7,6 @@ object GlobalVariables {
   lazy val serviceCode : String = AdminServiceCode
   val projectIDLength:Int=20
   var isTest:Boolean=false
+  var enableBatchDB:Boolean=false
 
 }
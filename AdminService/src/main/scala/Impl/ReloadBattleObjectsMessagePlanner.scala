@@ -0,0 +1,29 @@
+package Impl
+
+import APIs.BattleService.ReloadGameObjectsMessage
+import Utils.AdminTokenValidationProcess
+import Common.API.{PlanContext, Planner}
+import cats.effect.IO
+import org.slf4j.LoggerFactory
+
+case class ReloadBattleObjectsMessagePlanner(
+                                              adminToken: String,
+                                              override val planContext: PlanContext
+                                            ) extends Planner[String] {
+
+  private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+
+  override def plan(using planContext: PlanContext): IO[String] = {
+    for {
+      _ <- IO(logger.info(s"[ReloadBattleObjectsMessage] 开始重新载入战斗对象"))
+
+      // Step 1: 验证管理员Token - 使用Utils
+      admin <- AdminTokenValidationProcess.validateAdminToken(adminToken)
+
+      // Step 2: 通知对战服务重新载入战斗对象注册表
+      _ <- IO(logger.info(s"[ReloadBattleObjectsMessage] 管理员 ${admin.accountName} 触发战斗对象重新载入"))
+      summary <- ReloadGameObjectsMessage().send
+      _ <- IO(logger.info(s"[ReloadBattleObjectsMessage] 对战服务返回: ${summary}"))
+    } yield summary
+  }
+}
@@ -0,0 +1,30 @@
+package Impl
+
+import Common.API.{PlanContext, Planner}
+import Utils.AdminTokenValidationProcess
+import cats.effect.IO
+import io.circe.Encoder
+import org.slf4j.LoggerFactory
+
+/**
+ * 验证管理员Token并返回管理员ID，供 CardService、BattleService 的管理员接口鉴权
+ * @param adminToken 管理员Token
+ */
+case class ValidateAdminTokenMessagePlanner(
+  adminToken: String,
+  override val planContext: PlanContext
+) extends Planner[String] {
+
+  private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+
+  // 只读且大多命中 AdminTokenValidationProcess 的缓存，不需要开事务
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[String]): IO[String] = boundedPlan
+
+  override def plan(using PlanContext): IO[String] = {
+    for {
+      _ <- IO(logger.info("[ValidateAdminTokenMessagePlanner] 开始验证管理员Token"))
+      adminAccount <- AdminTokenValidationProcess.validateAdminToken(adminToken)
+      _ <- IO(logger.info(s"[ValidateAdminTokenMessagePlanner] 验证成功，管理员: ${adminAccount.accountName}"))
+    } yield adminAccount.adminID
+  }
+}
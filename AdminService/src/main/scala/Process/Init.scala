@@ -18,8 +18,11 @@ object Init {
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- API.init(config.maximumClientConnection, config.targetGuards)
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
+      batchSupported <- if (config.enableBatchDB) Common.DBAPI.probeBatchDB else IO.pure(false)
+      _ <- IO(GlobalVariables.enableBatchDB=batchSupported)
+      _ <- IO.whenA(config.enableBatchDB && !batchSupported)(IO(println("DB-Manager 不支持 BatchDBMessage，batchDB 改为在事务内逐条执行")))
       _ <- initSchema(schemaName)
             /** 管理员账号表，包含管理员的基本信息
        * admin_id: 管理员的唯一ID，主键，自动递增
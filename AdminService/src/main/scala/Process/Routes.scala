@@ -1,7 +1,11 @@
 package Process
 
 import Common.API.PlanContext
+import Common.API.Tracer
+import Common.API.Metrics
+import Common.API.{Deadline, DeadlineExceededException}
 import Common.DBAPI.DidRollbackException
+import Utils.AdminTokenValidationProcess
 import cats.effect.*
 import fs2.concurrent.Topic
 import io.circe.*
@@ -22,6 +26,8 @@ import Impl.UnbanUserMessagePlanner
 import Impl.ViewSystemStatsMessagePlanner
 import Impl.CreateReportUserMessagePlanner
 import Impl.ViewAllReportsMessagePlanner
+import Impl.ReloadBattleObjectsMessagePlanner
+import Impl.ValidateAdminTokenMessagePlanner
 import APIs.AdminService.CreateReportMessage
 import Common.API.TraceID
 import org.joda.time.DateTime
@@ -32,80 +38,94 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 object Routes:
   val projects: TrieMap[String, Topic[IO, String]] = TrieMap.empty
 
-  private def executePlan(messageType: String, str: String): IO[String] =
+  private def executePlan(messageType: String, body: Json): IO[Json] =
     messageType match {
       case "BanUserMessage" =>
         IO(
-          decode[BanUserMessagePlanner](str) match
+          body.as[BanUserMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for BanUserMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "ManageReportMessage" =>
         IO(
-          decode[ManageReportMessagePlanner](str) match
+          body.as[ManageReportMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ManageReportMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "UnbanUserMessage" =>
         IO(
-          decode[UnbanUserMessagePlanner](str) match
+          body.as[UnbanUserMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UnbanUserMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "ViewSystemStatsMessage" =>
         IO(
-          decode[ViewSystemStatsMessagePlanner](str) match
+          body.as[ViewSystemStatsMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ViewSystemStatsMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
 
+      case "ValidateAdminTokenMessage" =>
+        IO(
+          body.as[ValidateAdminTokenMessagePlanner] match
+            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ValidateAdminTokenMessage[${err.getMessage}]")
+            case Right(value) => value.fullPlan.map(_.asJson)
+        ).flatten
+
       case "LoginAdminMessage" =>
         IO(
-          decode[LoginAdminMessagePlanner](str) match
+          body.as[LoginAdminMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for LoginAdminMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "CreateAdminMessage" =>
         IO(
-          decode[CreateAdminMessagePlanner](str) match
+          body.as[CreateAdminMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for CreateAdminMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
       
       case "CreateReportMessage" =>
         IO(
-          decode[CreateReportUserMessagePlanner](str) match
+          body.as[CreateReportUserMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for CreateReportMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "ViewAllReportsMessage" =>
         IO(
-          decode[ViewAllReportsMessagePlanner](str) match
+          body.as[ViewAllReportsMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ViewAllReportsMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
+        ).flatten
+
+      case "ReloadBattleObjectsMessage" =>
+        IO(
+          body.as[ReloadBattleObjectsMessagePlanner] match
+            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ReloadBattleObjectsMessage[${err.getMessage}]")
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "test" =>
         for {
-          output  <- Utils.Test.test(str)(using  PlanContext(TraceID(""), 0))
-        } yield output
+          output  <- Utils.Test.test(body.noSpaces)(using  PlanContext(TraceID(""), 0))
+        } yield Json.fromString(output)
       case _ =>
         IO.raiseError(new Exception(s"Unknown type: $messageType"))
     }
 
-  def handlePostRequest(req: Request[IO]): IO[String] = {
+  /** 请求体只解析一次，PlanContext 直接加到解析出的 Json 上，executePlan 再从这个 Json 解码出 Planner */
+  def handlePostRequest(req: Request[IO]): IO[Json] = {
     req.as[Json].map {
       bodyJson => {
-        val planContext = PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)
-        val planContextJson = planContext.asJson
-        val updatedJson = bodyJson.deepMerge(Json.obj("planContext" -> planContextJson))
-        updatedJson.toString
+        val planContext = Deadline.continueBudget(req, bodyJson,
+          Tracer.continueTrace(bodyJson, PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)))
+        bodyJson.mapObject(_.add("planContext", planContext.asJson))
       }
     }
   }
@@ -113,6 +133,13 @@ object Routes:
   val service: HttpRoutes[IO] = HttpRoutes.of[IO] {
     case GET -> Root / "health" =>
       Ok("OK")
+
+    case GET -> Root / "metrics" =>
+      Ok(Metrics.render(List(
+        Metrics.statsGauge("satintin_component_stats", "缓存和队列的统计", List(
+          "admin_token_cache" -> AdminTokenValidationProcess.tokenCache.stats
+        ))
+      )))
       
     case GET -> Root / "stream" / projectName =>
       projects.get(projectName) match {
@@ -133,7 +160,7 @@ object Routes:
       }
     case req@POST -> Root / "api" / name =>
       handlePostRequest(req).flatMap {
-        executePlan(name, _)
+        body => Metrics.timeRequest(name)(executePlan(name, body))
       }.flatMap(Ok(_))
       .handleErrorWith {
         case e: DidRollbackException =>
@@ -141,6 +168,10 @@ object Routes:
           val headers = Headers("X-DidRollback" -> "true")
           BadRequest(e.getMessage.asJson.toString).map(_.withHeaders(headers))
 
+        case e: DeadlineExceededException =>
+          println(s"Deadline exceeded: $e")
+          ServiceUnavailable(e.getMessage.asJson.toString).map(_.withHeaders(Headers(Deadline.ExceededHeader -> "true")))
+
         case e: Throwable =>
           println(s"General error: $e")
           BadRequest(e.getMessage.asJson.toString)
@@ -4,6 +4,7 @@ import Common.API.PlanContext
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
+import Common.TokenCache
 import cats.effect.IO
 import org.slf4j.LoggerFactory
 import io.circe._
@@ -11,11 +12,20 @@ import Objects.AdminService.AdminAccount
 
 case object AdminTokenValidationProcess {
   private val logger = LoggerFactory.getLogger(getClass)
-  
+
   /**
-   * 验证管理员Token
+   * 验证通过的管理员Token缓存，淘汰规则见 TokenCache
+   * 管理员Token不会轮换，TTL 过期后重新查库以感知账号停用；查库失败原样抛出，不缓存
    */
-  def validateAdminToken(adminToken: String)(using PlanContext): IO[AdminAccount] = {
+  val tokenCache: TokenCache[AdminAccount] = new TokenCache[AdminAccount](ttlMillis = 60 * 1000L, maxEntries = 1000)(_.adminID)
+
+  /**
+   * 验证管理员Token，验证结果在 TTL 内复用
+   */
+  def validateAdminToken(adminToken: String)(using PlanContext): IO[AdminAccount] =
+    tokenCache.getOrLoad(adminToken)(loadAdminByToken(adminToken))
+
+  private def loadAdminByToken(adminToken: String)(using PlanContext): IO[AdminAccount] = {
     for {
       _ <- IO(logger.info(s"[validateAdminToken] 开始验证管理员Token"))
       
@@ -1,15 +1,20 @@
-import requests
 import json
 import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Test"))
+from service_client import ServiceClient
 
 BASE_URL = "http://localhost:10012"
+http = ServiceClient(BASE_URL)  # keep-alive pool shared by every test
 
 class TestAssetService:
     
     def test_valid_token(self):
         """Test with valid user token"""
         payload = {"userToken": "test-user-token-123"}
-        response = requests.post(f"{BASE_URL}/api/asset/status", json=payload)
+        response = http.post(f"{BASE_URL}/api/asset/status", json=payload)
         
         assert response.status_code == 200
         data = response.json()
@@ -19,7 +24,7 @@ class TestAssetService:
     def test_empty_token(self):
         """Test with empty token"""
         payload = {"userToken": ""}
-        response = requests.post(f"{BASE_URL}/api/asset/status", json=payload)
+        response = http.post(f"{BASE_URL}/api/asset/status", json=payload)
         
         assert response.status_code == 400
         assert "用户Token不能为空" in response.text
@@ -27,7 +32,7 @@ class TestAssetService:
     def test_invalid_token(self):
         """Test with invalid token"""
         payload = {"userToken": "invalid-token-12345"}
-        response = requests.post(f"{BASE_URL}/api/asset/status", json=payload)
+        response = http.post(f"{BASE_URL}/api/asset/status", json=payload)
         
         assert response.status_code == 400
         assert "用户Token无效" in response.text
@@ -35,14 +40,14 @@ class TestAssetService:
     def test_missing_token_field(self):
         """Test with missing token field"""
         payload = {}
-        response = requests.post(f"{BASE_URL}/api/asset/status", json=payload)
+        response = http.post(f"{BASE_URL}/api/asset/status", json=payload)
         
         assert response.status_code == 400
     
     def test_null_token(self):
         """Test with null token"""
         payload = {"userToken": None}
-        response = requests.post(f"{BASE_URL}/api/asset/status", json=payload)
+        response = http.post(f"{BASE_URL}/api/asset/status", json=payload)
         
         assert response.status_code == 400
 
@@ -2,6 +2,7 @@ package Common.API
 
 import Common.DBAPI.DidRollbackException
 import Common.ServiceUtils.getURI
+import Global.ServiceCenter.{dbManagerServiceCode, tongWenDBServiceCode}
 import cats.data.NonEmptyList
 import cats.effect.*
 import io.circe.syntax.*
@@ -41,6 +42,16 @@ abstract class API[T: Decoder](targetService: String):
 
   def send(using Encoder[this.type], PlanContext): IO[T] = API.send[T, this.type](this)
 
+  /** DB-Manager 不认识 spanID / spanTraceID / budgetMillis，发给它的请求不带；数据库调用的 span 由 DBAPI 记录，也不受请求预算限制，保证回滚能发出去 */
+  private[API] def isDBManagerCall: Boolean =
+    targetService == tongWenDBServiceCode || targetService == dbManagerServiceCode
+
+  private[API] def targetServiceCode: String = targetService
+
+/** 目标服务返回了非 2xx 且不是回滚的响应 */
+case class UnexpectedStatusException(statusCode: Int, body: String)
+  extends Exception(s"Unexpected response status: ${statusCode}, body: $body")
+
 object API {
   trait ResponseHandler[T]:
     def handle(response: Response[IO]): IO[T]
@@ -57,23 +68,66 @@ object API {
 
   private var client: Option[Client[IO]] = None
 
-  def init(maximumClientConnection: Int): IO[Unit] = {
-    val clientResource: Resource[IO, Client[IO]] = EmberClientBuilder.default[IO]
+  private var releaseClient: IO[Unit] = IO.unit
+
+  /**
+   * 建立整个进程共用的 HTTP 客户端，直到 shutdown 才关闭
+   * 连接池按目标地址（即每个服务的端口）分别限制连接数，HTTP/1.1 keep-alive 复用连接，
+   * 一个服务变慢只会占满它自己的连接，不影响发往其他服务的请求；单个请求的时限由 PlanContext 的预算决定
+   * @param targetGuards 按服务名配置的在途上限和试探时限，连接池对每个目标的连接数与该目标的在途上限一致
+   */
+  def init(maximumClientConnection: Int, targetGuards: Map[String, TargetGuardConfig]): IO[Unit] =
+    IO(TargetGuard.configure(targetGuards)) >> EmberClientBuilder.default[IO]
       .withMaxTotal(maximumClientConnection)
-      .withTimeout(30.seconds)
+      .withMaxPerKey(requestKey => math.min(maximumClientConnection, TargetGuard.maxRequestsForPort(requestKey.authority.port)))
+      .withTimeout(Deadline.MaxBudget)
       .withIdleConnectionTime(30.seconds)
       .build
-
-    clientResource.use { httpClient =>
-      IO {
-        client = Some(httpClient)
+      .allocated
+      .flatMap { case (httpClient, release) =>
+        IO {
+          Metrics.setClientMaxConnections(maximumClientConnection)
+          client = Some(httpClient)
+          releaseClient = release
+        }
       }
+
+  /** 关闭 init 建立的客户端，由 Server 在退出时调用 */
+  def shutdown: IO[Unit] =
+    IO.defer {
+      val release = releaseClient
+      client = None
+      releaseClient = IO.unit
+      release
     }
-  }
 
   private given logger: Logger[IO] = Slf4jLogger.getLogger[IO]
 
+  /** DB-Manager 调用不经过 TargetGuard，事务的 BEGIN / COMMIT / ROLLBACK 不会因为隔舱或熔断被拒绝 */
   def send[T: Decoder, A <: API[T] : Encoder](message: A)(using context: PlanContext): IO[T] =
+    if (message.isDBManagerCall) sendRequest[T, A](message)
+    else TargetGuard.forTarget(message.targetServiceCode).flatMap { guard =>
+      val targetService = message.getClass.getPackageName.stripPrefix("APIs.")
+      Metrics.timeOutbound(targetService) {
+        Tracer.span(message.getClass.getSimpleName, Tracer.SpanKindClient, Map("peer.service" -> targetService)) {
+          spanContext => Deadline.within("outbound") {
+            guard.protect(isTargetFailure)(sendRequest[T, A](message)(using summon[Decoder[T]], summon[Encoder[A]], spanContext))
+          }(using spanContext)
+        }
+      }
+    }
+
+  /** 连接失败、超时和 5xx 算目标服务故障；目标正常返回的业务错误和回滚不算 */
+  private def isTargetFailure(error: Throwable): Boolean =
+    error match {
+      case _: DidRollbackException => false
+      case _: DeadlineExceededException => false
+      case UnexpectedStatusException(statusCode, _) => statusCode >= 500
+      case _: DecodeFailure => false
+      case _ => true
+    }
+
+  private def sendRequest[T: Decoder, A <: API[T] : Encoder](message: A)(using context: PlanContext): IO[T] =
     for {
       _ <- logger.info(s"Preparing to send message ${message}")
       uri <- message.getURIWithAPIMessageName
@@ -82,30 +136,36 @@ object API {
           "traceID" -> context.traceID.asJson,
           "transactionLevel" -> Json.fromInt(context.transactionLevel)
         )
-        jsonObj.add("planContext", planContext)
+        jsonObj.add("planContext",
+          if (message.isDBManagerCall) planContext
+          else planContext.deepMerge(Json.fromFields(
+            context.spanID.toList.flatMap(spanID => List("spanID" -> Json.fromString(spanID), "spanTraceID" -> context.spanTraceID.asJson)) ++
+              Deadline.remaining.map(left => "budgetMillis" -> Json.fromLong(left.toMillis))
+          ))
+        )
       }
       request = Request[IO](Method.POST, uri).withEntity(modifiedJson)
 
-      result <- client.get.run(request).use { response =>
+      result <- Metrics.trackClientRequest(client.get.run(request).use { response =>
         val handler = summon[ResponseHandler[T]] // Summon an instance of ResponseHandler for T
         val rollbackHeader: Option[NonEmptyList[Header.Raw]] = response.headers.get(CIString("X-DidRollback"))
+        val deadlineHeader: Option[NonEmptyList[Header.Raw]] = response.headers.get(CIString(Deadline.ExceededHeader))
 
         response.status match {
           case status if status.isSuccess =>
-            response.bodyText.compile.string.flatMap { body =>
-              IO.println(s"Response body: $body")
-            } >>
-              handler.handle(response)
+            handler.handle(response)
           case _ =>
             response.bodyText.compile.string.flatMap { body =>
-              rollbackHeader match {
-                case Some(header) =>
+              (rollbackHeader, deadlineHeader) match {
+                case (Some(header), _) =>
                   IO.raiseError(DidRollbackException(body))
+                case (_, Some(header)) =>
+                  IO.raiseError(DeadlineExceededException(message.getClass.getSimpleName))
                 case _ =>
-                  IO.raiseError(new Exception(s"Unexpected response status: ${response.status.code}, body: $body"))
+                  IO.raiseError(UnexpectedStatusException(response.status.code, body))
               }
             }
         }
-      }
+      })
     } yield result
 }
\ No newline at end of file
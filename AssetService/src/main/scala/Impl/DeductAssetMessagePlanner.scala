@@ -4,7 +4,7 @@ import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
-import Utils.{AssetStatusService, TransactionService}
+import Utils.AssetTransactionFacade
 import cats.effect.IO
 import org.slf4j.LoggerFactory
 import io.circe._
@@ -23,23 +23,10 @@ case class DeductAssetMessagePlanner(
 
   override def plan(using PlanContext): IO[String] = {
     for {
-      _ <- IO(logger.info(s"[DeductAssetMessagePlanner] 检查用户资产是否足够"))
-      currentAsset <- AssetStatusService.fetchAssetStatus(userID)
-      _ <- IO {
-        if (currentAsset < deductAmount) 
-          throw new IllegalStateException(s"用户资产不足，当前资产: ${currentAsset}, 请求扣减: ${deductAmount}")
-      }
-      _ <- IO(logger.info(s"[DeductAssetMessagePlanner] 用户资产检查通过，当前资产: ${currentAsset}"))
-
-      // Step 3: 执行扣减操作
-      _ <- IO(logger.info(s"[DeductAssetMessagePlanner] 执行扣减操作"))
-      _ <- AssetStatusService.modifyAsset(userID, -deductAmount)
-      _ <- IO(logger.info(s"[DeductAssetMessagePlanner] 资产扣减成功"))
-
-      // Step 4: 记录交易
-      _ <- IO(logger.info(s"[DeductAssetMessagePlanner] 记录交易日志"))
-      transactionID <- TransactionService.createTransactionRecord(userID, "PURCHASE", -deductAmount, "资产扣减")
-      _ <- IO(logger.info(s"[DeductAssetMessagePlanner] 交易记录成功，交易ID=${transactionID}"))
+      // 余额检查由带条件的扣减语句完成，不足时整笔回滚
+      _ <- IO(logger.info(s"[DeductAssetMessagePlanner] 执行扣减并记录交易，扣减数量: ${deductAmount}"))
+      transactionID <- AssetTransactionFacade.applyAssetTransaction(userID, "PURCHASE", -deductAmount, "资产扣减")
+      _ <- IO(logger.info(s"[DeductAssetMessagePlanner] 资产扣减成功，交易ID=${transactionID}"))
 
     } yield "资产扣减成功！"
   }
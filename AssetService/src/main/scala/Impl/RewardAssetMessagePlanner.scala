@@ -4,7 +4,7 @@ import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
-import Utils.{AssetStatusService, TransactionService}
+import Utils.AssetTransactionFacade
 import cats.effect.IO
 import org.slf4j.LoggerFactory
 import io.circe._
@@ -31,19 +31,14 @@ case class RewardAssetMessagePlanner(
         if (rewardAmount <= 0) throw new IllegalArgumentException("奖励金额必须大于0")
       }
       _ <- IO(logger.info(s"[Step 2] 奖励金额验证通过: ${rewardAmount}"))      // Step 3: 修改资产
-      _ <- IO(logger.info("[Step 3] 修改用户资产"))
-      _ <- AssetStatusService.modifyAsset(userID, rewardAmount)
-      _ <- IO(logger.info("[Step 3] 资产修改完成"))
-
-      // Step 4: 创建交易记录
-      _ <- IO(logger.info("[Step 4] 创建奖励交易记录"))
-      transactionID <- TransactionService.createTransactionRecord(
+      _ <- IO(logger.info("[Step 3] 修改用户资产并记录交易"))
+      transactionID <- AssetTransactionFacade.applyAssetTransaction(
         userID, 
         "REWARD", 
         rewardAmount, 
         "系统奖励"
       )
-      _ <- IO(logger.info(s"[Step 4] 交易记录成功，交易ID=${transactionID}"))
+      _ <- IO(logger.info(s"[Step 3] 资产修改完成，交易ID=${transactionID}"))
 
       _ <- IO(logger.info("RewardAssetMessagePlanner 执行完成"))
     } yield s"奖励发放成功，交易ID: ${transactionID}"
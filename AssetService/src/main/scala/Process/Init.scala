@@ -18,8 +18,11 @@ object Init {
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- API.init(config.maximumClientConnection, config.targetGuards)
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
+      batchSupported <- if (config.enableBatchDB) Common.DBAPI.probeBatchDB else IO.pure(false)
+      _ <- IO(GlobalVariables.enableBatchDB=batchSupported)
+      _ <- IO.whenA(config.enableBatchDB && !batchSupported)(IO(println("DB-Manager 不支持 BatchDBMessage，batchDB 改为在事务内逐条执行")))
       _ <- initSchema(schemaName)
       /** 用户资产状态表，记录用户的原石数量、抽卡次数以及最近更新时间
        * user_id: 用户的唯一ID
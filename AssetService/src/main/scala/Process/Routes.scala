@@ -1,6 +1,9 @@
 package Process
 
 import Common.API.PlanContext
+import Common.API.Tracer
+import Common.API.Metrics
+import Common.API.{Deadline, DeadlineExceededException}
 import Common.DBAPI.DidRollbackException
 import cats.effect.*
 import fs2.concurrent.Topic
@@ -31,84 +34,87 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 object Routes:
   val projects: TrieMap[String, Topic[IO, String]] = TrieMap.empty
 
-  private def executePlan(messageType: String, str: String): IO[String] =
+  private def executePlan(messageType: String, body: Json): IO[Json] =
     messageType match {
       case "CreateAssetTransactionMessage" =>
         IO(
-          decode[CreateAssetTransactionMessagePlanner](str) match
+          body.as[CreateAssetTransactionMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for CreateAssetTransactionMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
       case "RewardAssetMessage" =>
         IO(
-          decode[RewardAssetMessagePlanner](str) match
+          body.as[RewardAssetMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for RewardAssetMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "ChargeAssetMessage" =>
         IO(
-          decode[ChargeAssetMessagePlanner](str) match
+          body.as[ChargeAssetMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ChargeAssetMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "DeductAssetMessage" =>IO(
-          decode[DeductAssetMessagePlanner](str) match
+          body.as[DeductAssetMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for DeductAssetMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
         
       case "QueryAssetStatusMessage" =>
         IO(
-          decode[QueryAssetStatusMessagePlanner](str) match
+          body.as[QueryAssetStatusMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for QueryAssetStatusMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "UpdateCardDrawCountMessage" =>
         IO(
-          decode[UpdateCardDrawCountMessagePlanner](str) match
+          body.as[UpdateCardDrawCountMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UpdateCardDrawCountMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "QueryCardDrawCountMessage" =>
         IO(
-          decode[QueryCardDrawCountMessagePlanner](str) match
+          body.as[QueryCardDrawCountMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for QueryCardDrawCountMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "GetAssetTransactionMessage" =>
         IO(
-          decode[GetAssetTransactionMessagePlanner](str) match
+          body.as[GetAssetTransactionMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetAssetTransactionMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
 
       case "test" =>
         for {
-          output  <- Utils.Test.test(str)(using  PlanContext(TraceID(""), 0))
-        } yield output
+          output  <- Utils.Test.test(body.noSpaces)(using  PlanContext(TraceID(""), 0))
+        } yield Json.fromString(output)
       case _ =>
         IO.raiseError(new Exception(s"Unknown type: $messageType"))
     }
 
-  def handlePostRequest(req: Request[IO]): IO[String] = {
+  /** 请求体只解析一次，PlanContext 直接加到解析出的 Json 上，executePlan 再从这个 Json 解码出 Planner */
+  def handlePostRequest(req: Request[IO]): IO[Json] = {
     req.as[Json].map {
       bodyJson => {
-        val planContext = PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)
-        val planContextJson = planContext.asJson
-        val updatedJson = bodyJson.deepMerge(Json.obj("planContext" -> planContextJson))
-        updatedJson.toString
+        val planContext = Deadline.continueBudget(req, bodyJson,
+          Tracer.continueTrace(bodyJson, PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)))
+        bodyJson.mapObject(_.add("planContext", planContext.asJson))
       }
     }
   }
   val service: HttpRoutes[IO] = HttpRoutes.of[IO] {
     case GET -> Root / "health" =>
       Ok("OK")
+
+    case GET -> Root / "metrics" =>
+      Ok(Metrics.render())
       
     case GET -> Root / "stream" / projectName =>
       projects.get(projectName) match {
@@ -129,7 +135,7 @@ object Routes:
       }
     case req@POST -> Root / "api" / name =>
       handlePostRequest(req).flatMap {
-        executePlan(name, _)
+        body => Metrics.timeRequest(name)(executePlan(name, body))
       }.flatMap(Ok(_))
       .handleErrorWith {
         case e: DidRollbackException =>
@@ -137,6 +143,10 @@ object Routes:
           val headers = Headers("X-DidRollback" -> "true")
           BadRequest(e.getMessage.asJson.toString).map(_.withHeaders(headers))
 
+        case e: DeadlineExceededException =>
+          println(s"Deadline exceeded: $e")
+          ServiceUnavailable(e.getMessage.asJson.toString).map(_.withHeaders(Headers(Deadline.ExceededHeader -> "true")))
+
         case e: Throwable =>
           println(s"General error: $e")
           BadRequest(e.getMessage.asJson.toString)
@@ -8,7 +8,7 @@ import Common.DBAPI._
 import Common.ServiceUtils.schemaName
 import org.slf4j.LoggerFactory
 import Common.API.PlanContext
-import Common.Object.SqlParameter
+import Common.Object.{BatchStatement, SqlParameter}
 import cats.effect.IO
 import cats.implicits.*
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
@@ -90,50 +90,64 @@ case object AssetStatusService {
     } yield ()
   }
 
+  /**
+   * 原子地增减用户原石的语句：增加时先补建资产记录，随后带条件自增并返回变动后的余额
+   * 余额不足时 UPDATE 不命中任何行，返回结果为空
+   */
+  def assetChangeStatements(userID: String, changeAmount: Int, updatedAt: DateTime): List[BatchStatement] = {
+    val ensureRecord = BatchStatement.write(
+      s"""
+      INSERT INTO ${schemaName}.user_asset_status_table
+      (user_id, stone_amount, standard_card_draw_count, featured_card_draw_count, last_updated)
+      VALUES (?, 0, 0, 0, ?)
+      ON CONFLICT (user_id) DO NOTHING
+      """,
+      List(SqlParameter("String", userID), SqlParameter("DateTime", updatedAt.getMillis.toString))
+    )
+    val conditionalIncrement = BatchStatement.read(
+      s"""
+      UPDATE ${schemaName}.user_asset_status_table
+      SET stone_amount = stone_amount + ?, last_updated = ?
+      WHERE user_id = ? AND stone_amount + ? >= 0
+      RETURNING stone_amount
+      """,
+      List(
+        SqlParameter("Int", changeAmount.toString),
+        SqlParameter("DateTime", updatedAt.getMillis.toString),
+        SqlParameter("String", userID),
+        SqlParameter("Int", changeAmount.toString)
+      )
+    )
+    if (changeAmount > 0) List(ensureRecord, conditionalIncrement) else List(conditionalIncrement)
+  }
+
+  /** 从 assetChangeStatements 的批量结果中取出变动后的余额，余额不足时报错 */
+  def updatedAmount(userID: String, changeAmount: Int, results: List[Json]): IO[Int] =
+    batchRows(results.last).headOption match {
+      case Some(row) => IO.pure(decodeField[Int](row, "stone_amount"))
+      case None => IO.raiseError(new IllegalStateException(s"用户资产不足，用户: ${userID}, 请求变动: ${changeAmount}"))
+    }
+
+  def validateChange(userID: String, changeAmount: Int): IO[Unit] = IO {
+    if (userID == null || userID.trim.isEmpty)
+      throw new IllegalArgumentException("用户ID不能为空或无效")
+    if (changeAmount == 0)
+      throw new IllegalArgumentException("变动金额不能为0")
+  }
+
   /**
    * 修改用户资产数量
+   * 单条带条件的自增语句完成，不先读后写，并发修改不会丢失更新
    */
   def modifyAsset(userID: String, changeAmount: Int)(using PlanContext): IO[String] = {
     for {
       // Step 1: Validate input parameters
-      _ <- IO {
-        if (userID == null || userID.trim.isEmpty)
-          throw new IllegalArgumentException("用户ID不能为空或无效")
-        if (changeAmount == 0)
-          throw new IllegalArgumentException("变动金额不能为0")
-      }
+      _ <- validateChange(userID, changeAmount)
       _ <- IO(logger.info(s"[modifyAsset] 输入参数验证成功，userID=${userID}, changeAmount=${changeAmount}"))
 
-      // Step 2: Fetch current asset status
-      currentAsset <- fetchAssetStatus(userID)
-      _ <- IO(logger.info(s"[modifyAsset] 当前用户资产数量：${currentAsset}"))
-
-      // Step 3.1: Calculate new asset amount
-      newAssetAmount <- IO {
-        val updatedAmount = currentAsset + changeAmount
-        if (updatedAmount < 0)
-          throw new IllegalStateException(s"用户资产不足，当前资产: ${currentAsset}, 请求变动: ${changeAmount}")
-        updatedAmount
-      }
-      _ <- IO(logger.info(s"[modifyAsset] 新资产数量计算成功，新资产数量为：${newAssetAmount}"))
-
-      // Step 3.2: Update UserAssetStatusTable
-      updateAssetSql <- IO {
-        s"""
-        UPDATE ${schemaName}.user_asset_status_table
-        SET stone_amount = ?, last_updated = ?
-        WHERE user_id = ?
-        """
-      }
-      updateAssetParams <- IO {
-        List(
-          SqlParameter("Int", newAssetAmount.toString),
-          SqlParameter("DateTime", DateTime.now().getMillis.toString),
-          SqlParameter("String", userID)
-        )
-      }
-      _ <- IO(logger.info(s"[modifyAsset] 正在更新用户资产，SQL: ${updateAssetSql}, 参数: ${updateAssetParams}"))
-      _ <- writeDB(updateAssetSql, updateAssetParams)
+      // Step 2: Conditionally increment stone_amount in one round trip
+      results <- batchDB(assetChangeStatements(userID, changeAmount, DateTime.now()))
+      newAssetAmount <- updatedAmount(userID, changeAmount, results)
       _ <- IO(logger.info(s"[modifyAsset] 资产更新成功，用户ID=${userID}, 新资产数量=${newAssetAmount}"))
     } yield "资产数量更新成功!"
   }
@@ -21,21 +21,40 @@ case object AssetTransactionFacade {
   private val logger = LoggerFactory.getLogger(getClass)
 
   /**
-   * 执行完整的资产交易流程
-   * 包括资产修改和交易记录创建
+   * 资产变动和交易记录在同一次批量请求中完成
+   * 余额不足时报错，所在事务回滚，交易记录不会留下
+   * @return 交易ID
    */
-  def executeAssetTransaction(
+  def applyAssetTransaction(
     userID: String,
     transactionType: String,
     changeAmount: Int,
     changeReason: String
   )(using PlanContext): IO[String] = {
     for {
-      _ <- AssetStatusService.modifyAsset(userID, changeAmount)
-      
-      // 创建交易记录
-      transactionID <- TransactionService.createTransactionRecord(userID, transactionType, changeAmount, changeReason)
-      
-    } yield s"交易完成，交易ID: ${transactionID}"
+      _ <- AssetStatusService.validateChange(userID, changeAmount)
+      _ <- TransactionService.validateTransaction(userID, transactionType, changeAmount)
+
+      transactionID <- IO(java.util.UUID.randomUUID().toString)
+      now <- IO(DateTime.now())
+      assetStatements = AssetStatusService.assetChangeStatements(userID, changeAmount, now)
+      recordStatement = TransactionService.transactionRecordStatement(transactionID, userID, transactionType, changeAmount, changeReason, now)
+
+      results <- batchDB(assetStatements :+ recordStatement)
+      newAssetAmount <- AssetStatusService.updatedAmount(userID, changeAmount, results.take(assetStatements.size))
+      _ <- IO(logger.info(s"[applyAssetTransaction] 用户 ${userID} 资产变动 ${changeAmount}，新资产数量=${newAssetAmount}，交易ID=${transactionID}"))
+    } yield transactionID
   }
-}
\ No newline at end of file
+
+  /**
+   * 执行完整的资产交易流程
+   * 包括资产修改和交易记录创建
+   */
+  def executeAssetTransaction(
+    userID: String,
+    transactionType: String,
+    changeAmount: Int,
+    changeReason: String
+  )(using PlanContext): IO[String] =
+    applyAssetTransaction(userID, transactionType, changeAmount, changeReason).map(transactionID => s"交易完成，交易ID: ${transactionID}")
+}
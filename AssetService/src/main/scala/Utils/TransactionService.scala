@@ -8,7 +8,7 @@ import Common.DBAPI._
 import Common.ServiceUtils.schemaName
 import org.slf4j.LoggerFactory
 import Common.API.PlanContext
-import Common.Object.SqlParameter
+import Common.Object.{BatchStatement, SqlParameter}
 import cats.effect.IO
 import cats.implicits.*
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
@@ -20,6 +20,42 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 case object TransactionService {
   private val logger = LoggerFactory.getLogger(getClass)
 
+  private val transactionInsertSql =
+    s"""
+     INSERT INTO ${schemaName}.asset_transaction_table
+     (transaction_id, user_id, transaction_type, change_amount, change_reason, timestamp)
+     VALUES (?, ?, ?, ?, ?, ?)
+    """
+
+  def validateTransaction(userID: String, transactionType: String, changeAmount: Int): IO[Unit] = IO {
+    if (userID.isBlank) throw new IllegalArgumentException("用户ID不能为空")
+    if (!Set("CHARGE", "PURCHASE", "REWARD").contains(transactionType))
+      throw new IllegalArgumentException(s"交易类型不允许: ${transactionType}")
+    if (changeAmount == 0)
+      throw new IllegalArgumentException("变动的金额不能为0")
+  }
+
+  /** 插入一条交易记录的语句，供 AssetTransactionFacade 与资产变动合并成一次批量请求 */
+  def transactionRecordStatement(
+    transactionID: String,
+    userID: String,
+    transactionType: String,
+    changeAmount: Int,
+    changeReason: String,
+    timestamp: DateTime
+  ): BatchStatement =
+    BatchStatement.write(
+      transactionInsertSql,
+      List(
+        SqlParameter("String", transactionID),
+        SqlParameter("String", userID),
+        SqlParameter("String", transactionType),
+        SqlParameter("Int", changeAmount.toString),
+        SqlParameter("String", changeReason),
+        SqlParameter("DateTime", timestamp.getMillis.toString)
+      )
+    )
+
   /**
    * 创建交易记录
    */
@@ -31,13 +67,7 @@ case object TransactionService {
   )(using PlanContext): IO[String] = {
     for {
       // Step 1: Validate input parameters
-      _ <- IO {
-        if (userID.isBlank) throw new IllegalArgumentException("用户ID不能为空")
-        if (!Set("CHARGE", "PURCHASE", "REWARD").contains(transactionType))
-          throw new IllegalArgumentException(s"交易类型不允许: ${transactionType}")
-        if (changeAmount == 0)
-          throw new IllegalArgumentException("变动的金额不能为0")
-      }
+      _ <- validateTransaction(userID, transactionType, changeAmount)
 
       // Step 2.1: Generate a unique transaction ID
       transactionID <- IO(java.util.UUID.randomUUID().toString)
@@ -45,27 +75,12 @@ case object TransactionService {
       _ <- IO(logger.info(s"[createTransactionRecord] 生成交易ID：${transactionID}，时间戳：${timestamp}"))
 
       // Step 2.2: Insert transaction record into the AssetTransactionTable
-      transactionInsertSql = 
-        s"""
-         INSERT INTO ${schemaName}.asset_transaction_table
-         (transaction_id, user_id, transaction_type, change_amount, change_reason, timestamp)
-         VALUES (?, ?, ?, ?, ?, ?)
-        """
-      transactionParams <- IO {
-        List(
-          SqlParameter("String", transactionID),
-          SqlParameter("String", userID),
-          SqlParameter("String", transactionType),
-          SqlParameter("Int", changeAmount.toString),
-          SqlParameter("String", changeReason),
-          SqlParameter("DateTime", timestamp.getMillis.toString)
-        )
-      }
-      _ <- IO(logger.info(s"[createTransactionRecord] 准备插入资产交易记录，SQL：${transactionInsertSql}, 参数：${transactionParams}"))
-      _ <- writeDB(transactionInsertSql, transactionParams)
+      statement = transactionRecordStatement(transactionID, userID, transactionType, changeAmount, changeReason, timestamp)
+      _ <- IO(logger.info(s"[createTransactionRecord] 准备插入资产交易记录，SQL：${statement.sqlQuery}, 参数：${statement.parameters}"))
+      _ <- writeDB(statement.sqlQuery, statement.parameters)
 
       // Note: 此方法只做交易记录，不直接修改资产
-      // 资产修改应该通过 AssetStatusService.modifyAsset 方法完成
+      // 资产变动和记账应通过 AssetTransactionFacade.applyAssetTransaction 一次完成
       _ <- IO(logger.info(s"[createTransactionRecord] 交易记录已插入，交易ID：${transactionID}"))
     } yield transactionID
   }
@@ -0,0 +1,343 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import websockets
+
+WS_URL = "ws://localhost:10014"  # BattleService WebSocket endpoint
+USER_SERVICE_URL = "http://localhost:10010"  # UserService, used by --login
+
+# BattleService rejects a connection unless `token` belongs to `userid`
+Credential = Tuple[str, str]  # (userID, userToken)
+
+# 默认双方都出“饼”，血量不会变化，房间可以一直打下去
+DEFAULT_ACTION = {"actionCategory": "passive", "objectName": "Cake"}
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, None when there are no samples"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+@dataclass
+class LoadStats:
+    """Counters shared by every room of one run"""
+    round_latencies_ms: List[float] = field(default_factory=list)
+    rooms_started: int = 0
+    rooms_failed: int = 0
+    connect_errors: int = 0
+    frames_sent: int = 0
+    frames_received: int = 0
+    dropped_frames: int = 0       # round_result frames a player never received
+    timed_out_rounds: int = 0     # rounds where neither player saw round_result
+    closed_connections: int = 0
+    resyncs: int = 0              # patches that arrived out of order and forced a state_resync
+
+    def summary(self) -> Dict[str, object]:
+        lat = self.round_latencies_ms
+        return {
+            "rooms_started": self.rooms_started,
+            "rooms_failed": self.rooms_failed,
+            "connect_errors": self.connect_errors,
+            "rounds_completed": len(lat),
+            "timed_out_rounds": self.timed_out_rounds,
+            "frames_sent": self.frames_sent,
+            "frames_received": self.frames_received,
+            "dropped_frames": self.dropped_frames,
+            "closed_connections": self.closed_connections,
+            "resyncs": self.resyncs,
+            "p50_ms": percentile(lat, 50),
+            "p95_ms": percentile(lat, 95),
+            "p99_ms": percentile(lat, 99),
+            "max_ms": max(lat) if lat else None,
+        }
+
+
+def _post_message(base_url: str, message_type: str, payload: dict, timeout: float):
+    body = json.dumps({"type": message_type, **payload}).encode("utf-8")
+    request = urllib.request.Request(f"{base_url}/api/{message_type}", data=body,
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def login_load_user(base_url: str, index: int, password: str, timeout: float) -> Credential:
+    """Register load user `wsload_<index>` unless it already exists, then log in for a fresh token"""
+    username = f"wsload_{index}"
+    password_hash = hashlib.sha256(password.encode("utf-8")).hexdigest()  # same hash as the frontend
+    try:
+        _post_message(base_url, "RegisterUserMessage", {
+            "username": username,
+            "passwordHash": password_hash,
+            "email": f"{username}@load.test",
+            "phoneNumber": f"139{index:08d}",
+        }, timeout)
+    except urllib.error.HTTPError:
+        pass  # already registered by an earlier run
+    result = _post_message(base_url, "LoginUserMessage", {"username": username, "passwordHash": password_hash}, timeout)
+    # LoginUserMessage returns the login result as a JSON-encoded string
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result["userID"], result["userToken"]
+
+
+def collect_credentials(args) -> List[Credential]:
+    """One (userID, token) pair per connection: the --token pairs first, then --login users"""
+    needed = args.rooms * 2
+    credentials: List[Credential] = []
+    for pair in args.token:
+        user_id, sep, token = pair.partition(":")
+        if not sep or not user_id or not token:
+            raise SystemExit(f"--token expects USERID:TOKEN, got {pair!r}")
+        credentials.append((user_id, token))
+    missing = needed - len(credentials)
+    if missing > 0 and args.login:
+        print(f"Logging in {missing} load users via {args.user_url} ...")
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            credentials += pool.map(lambda i: login_load_user(args.user_url, i, args.password, args.timeout),
+                                    range(missing))
+    if len(credentials) < needed:
+        raise SystemExit(f"{args.rooms} rooms need {needed} user tokens, got {len(credentials)}; "
+                         f"pass --login or more --token USERID:TOKEN")
+    return credentials[:needed]
+
+
+class RateLimiter:
+    """Spreads events evenly at `rate` per second across all callers (0 = unlimited)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if self.interval == 0.0:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def apply_patch(state: dict, patch: dict) -> dict:
+    """
+    Apply one game_state_patch to a game_state snapshot (see GameStateDelta):
+    player1/player2 carry only the changed player fields, every other key is replaced
+    """
+    merged = dict(state)
+    for key, value in patch.items():
+        if key in ("player1", "player2") and isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = {**merged[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+class PlayerConnection:
+    """One WebSocket player; a reader task turns incoming frames into events"""
+
+    def __init__(self, base_url: str, room_id: str, credential: Credential, name: str, stats: LoadStats):
+        user_id, token = credential
+        query = urllib.parse.urlencode({"userid": user_id, "name": name, "token": token})
+        self.url = f"{base_url}/battle/{room_id}?{query}"
+        self.user_id = user_id
+        self.stats = stats
+        self.ws = None
+        self.reader: Optional[asyncio.Task] = None
+        self.in_action_phase = asyncio.Event()
+        self.round_results: asyncio.Queue = asyncio.Queue()
+        self.game_over = asyncio.Event()
+        # Latest game state rebuilt from the snapshot and the patches applied on top of it
+        self.state: Optional[dict] = None
+        self.seq: Optional[int] = None
+
+    async def connect(self, open_timeout: float):
+        self.ws = await websockets.connect(self.url, open_timeout=open_timeout, max_size=None)
+        self.reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        try:
+            async for raw in self.ws:
+                self.stats.frames_received += 1
+                try:
+                    message = json.loads(raw)
+                except ValueError:
+                    continue
+                msg_type = message.get("type")
+                data = message.get("data") or {}
+                if msg_type == "game_state":
+                    self.state, self.seq = data, message.get("seq")
+                    self._on_round_phase()
+                elif msg_type == "game_state_patch":
+                    seq = message.get("seq")
+                    if self.state is None or self.seq is None or seq != self.seq + 1:
+                        # Missed a frame: drop the patch and ask for a fresh snapshot
+                        self.stats.resyncs += 1
+                        await self.send("state_resync")
+                    else:
+                        self.state, self.seq = apply_patch(self.state, data), seq
+                        self._on_round_phase()
+                elif msg_type == "round_result":
+                    self.round_results.put_nowait(time.perf_counter())
+                elif msg_type == "game_over":
+                    self.game_over.set()
+        except websockets.ConnectionClosed:
+            self.stats.closed_connections += 1
+        finally:
+            self.game_over.set()
+
+    def _on_round_phase(self):
+        phase = self.state.get("roundPhase")
+        if phase == "action":
+            self.in_action_phase.set()
+        elif phase == "finished":
+            self.game_over.set()
+
+    async def send(self, msg_type: str, data: Optional[dict] = None):
+        frame = {"type": msg_type}
+        if data is not None:
+            frame["data"] = data
+        await self.ws.send(json.dumps(frame))
+        self.stats.frames_sent += 1
+
+    async def send_action(self, action: dict):
+        await self.send("player_action", {
+            "type": action,
+            "playerId": self.user_id,
+            "timestamp": int(time.time() * 1000),
+        })
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self.reader is not None:
+            await asyncio.gather(self.reader, return_exceptions=True)
+
+
+async def next_round_result(player: PlayerConnection, timeout: float) -> Optional[float]:
+    try:
+        return await asyncio.wait_for(player.round_results.get(), timeout)
+    except asyncio.TimeoutError:
+        return None
+
+
+async def run_room(index: int, args, credentials: List[Credential], stats: LoadStats,
+                   connect_limiter: RateLimiter):
+    room_id = f"load-room-{args.run_id}-{index}"
+    players = [
+        PlayerConnection(args.url, room_id, credentials[2 * index + offset], f"load_{index}_{side}", stats)
+        for offset, side in enumerate(("a", "b"))
+    ]
+    try:
+        for player in players:
+            await connect_limiter.wait()
+            await player.connect(args.timeout)
+            # 服务端加入房间时需要先初始化玩家状态，第二个玩家晚一点进房
+            await asyncio.sleep(args.join_delay)
+
+        for player in players:
+            await player.send("player_ready")
+        await asyncio.wait_for(
+            asyncio.gather(*(p.in_action_phase.wait() for p in players)), args.timeout
+        )
+        stats.rooms_started += 1
+
+        for _ in range(args.rounds):
+            if any(p.game_over.is_set() for p in players):
+                break
+            await players[0].send_action(args.action)
+            await players[1].send_action(args.action)
+            # 第二个 player_action 发出后开始计时，直到收到 round_result
+            second_sent = time.perf_counter()
+
+            received = await asyncio.gather(*(next_round_result(p, args.timeout) for p in players))
+            arrivals = [t for t in received if t is not None]
+            stats.dropped_frames += len(received) - len(arrivals)
+            if arrivals:
+                stats.round_latencies_ms.append((min(arrivals) - second_sent) * 1000.0)
+            else:
+                stats.timed_out_rounds += 1
+
+            if args.round_interval > 0:
+                await asyncio.sleep(args.round_interval)
+    except (OSError, asyncio.TimeoutError, websockets.InvalidHandshake, websockets.ConnectionClosed) as e:
+        if any(p.ws is None for p in players):
+            stats.connect_errors += 1
+        stats.rooms_failed += 1
+        if args.verbose:
+            print(f"Room {room_id} failed: {e!r}")
+    finally:
+        await asyncio.gather(*(p.close() for p in players), return_exceptions=True)
+
+
+async def run_load(args) -> LoadStats:
+    credentials = await asyncio.to_thread(collect_credentials, args)
+    stats = LoadStats()
+    connect_limiter = RateLimiter(args.connect_rate)
+    start = time.perf_counter()
+    await asyncio.gather(*(run_room(i, args, credentials, stats, connect_limiter) for i in range(args.rooms)))
+    elapsed = time.perf_counter() - start
+
+    summary = stats.summary()
+    summary["rooms"] = args.rooms
+    summary["elapsed_s"] = round(elapsed, 3)
+    summary["rounds_per_s"] = round(len(stats.round_latencies_ms) / elapsed, 2) if elapsed > 0 else None
+
+    print(f"Rooms: {args.rooms} ({stats.rooms_started} started, {stats.rooms_failed} failed)")
+    print(f"Rounds completed: {summary['rounds_completed']} in {summary['elapsed_s']}s ({summary['rounds_per_s']}/s)")
+    print(f"Round latency p50/p95/p99: {summary['p50_ms']} / {summary['p95_ms']} / {summary['p99_ms']} ms")
+    print(f"Dropped frames: {stats.dropped_frames}, timed-out rounds: {stats.timed_out_rounds}, "
+          f"closed connections: {stats.closed_connections}, resyncs: {stats.resyncs}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="WebSocket load generator for BattleService rooms")
+    parser.add_argument("--url", default=WS_URL, help="BattleService WebSocket base URL")
+    parser.add_argument("--rooms", type=int, default=100, help="number of rooms (two connections each)")
+    parser.add_argument("--token", action="append", default=[], metavar="USERID:TOKEN",
+                        help="credential for one connection, repeatable; used before --login users")
+    parser.add_argument("--login", action="store_true",
+                        help="register/log in load users wsload_<n> to get the remaining tokens")
+    parser.add_argument("--user-url", default=USER_SERVICE_URL, help="UserService base URL for --login")
+    parser.add_argument("--password", default="wsload-password", help="password of the --login load users")
+    parser.add_argument("--rounds", type=int, default=10, help="rounds played per room")
+    parser.add_argument("--connect-rate", type=float, default=200.0,
+                        help="new connections per second across all rooms, 0 for no limit")
+    parser.add_argument("--round-interval", type=float, default=0.0,
+                        help="seconds each room waits between rounds")
+    parser.add_argument("--join-delay", type=float, default=0.2,
+                        help="seconds between the two players of a room joining")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="seconds to wait for a handshake, the action phase or a round_result")
+    parser.add_argument("--action", type=json.loads, default=DEFAULT_ACTION,
+                        help="JSON action body sent by both players each round")
+    parser.add_argument("--json-out", help="write the summary as JSON to this file")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    args.run_id = uuid.uuid4().hex[:6]
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(run_load(parse_args()))
@@ -0,0 +1,61 @@
+package APIs.BattleService
+
+import Common.API.API
+import Global.ServiceCenter.BattleServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+
+
+/**
+ * ReloadGameObjectsMessage
+ * desc: 重新读取 active_objects_table 和 passive_objects_table，替换对战服务内存中的战斗对象注册表。修改对象表后由管理员触发。
+ * @return result: String (载入后的注册表概况)
+ */
+
+case class ReloadGameObjectsMessage() extends API[String](BattleServiceCode)
+
+
+
+case object ReloadGameObjectsMessage{
+    
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[ReloadGameObjectsMessage] = deriveEncoder
+  private val circeDecoder: Decoder[ReloadGameObjectsMessage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[ReloadGameObjectsMessage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[ReloadGameObjectsMessage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[ReloadGameObjectsMessage]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given reloadGameObjectsMessageEncoder: Encoder[ReloadGameObjectsMessage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given reloadGameObjectsMessageDecoder: Decoder[ReloadGameObjectsMessage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
@@ -0,0 +1,79 @@
+package APIs.BattleService
+
+import Common.API.API
+import Global.ServiceCenter.BattleServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.BattleService.BattleSimulationResult
+
+
+/**
+ * SimulateBattleMessage
+ * desc: 离线模拟大量对战回合，直接调用战斗结算逻辑，不读写数据库、不影响真实房间。用于测量结算吞吐和检查各行动的平衡性。
+ * @param adminToken: String (管理员的身份令牌，由 AdminService 验证)
+ * @param totalRounds: Int (模拟的总回合数，最多 1000000)
+ * @param parallelism: Int (并行的工作线程数，1 到 8)
+ * @param player1Strategy: String (玩家1的出招策略，random 或 scripted)
+ * @param player1Actions: List[String] (玩家1可用的行动，例如 Cake、Sa+Sa+Tin、object_defense:Sa；为空时使用全部内置行动)
+ * @param player2Strategy: String (玩家2的出招策略，random 或 scripted)
+ * @param player2Actions: List[String] (玩家2可用的行动，格式同 player1Actions)
+ * @param seed: Option[Long] (随机种子，填写后出招序列可复现)
+ * @return result: BattleSimulationResult (吞吐、内存分配、胜负和各行动使用统计)
+ */
+
+case class SimulateBattleMessage(
+  adminToken: String,
+  totalRounds: Int,
+  parallelism: Int,
+  player1Strategy: String,
+  player1Actions: List[String],
+  player2Strategy: String,
+  player2Actions: List[String],
+  seed: Option[Long]
+) extends API[BattleSimulationResult](BattleServiceCode)
+
+
+
+case object SimulateBattleMessage{
+    
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[SimulateBattleMessage] = deriveEncoder
+  private val circeDecoder: Decoder[SimulateBattleMessage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[SimulateBattleMessage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[SimulateBattleMessage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[SimulateBattleMessage]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given simulateBattleMessageEncoder: Encoder[SimulateBattleMessage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given simulateBattleMessageDecoder: Decoder[SimulateBattleMessage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
@@ -0,0 +1,59 @@
+package Common.API
+
+import cats.effect.IO
+import io.circe.Json
+import org.http4s.Request
+import org.typelevel.ci.CIString
+
+import scala.concurrent.duration.*
+
+/** 请求的时间预算已经用完，放弃剩余的工作 */
+case class DeadlineExceededException(stage: String) extends Exception(s"请求超出时限（${stage}）")
+
+/**
+ * 请求的时间预算
+ * PlanContext.deadlineMillis 是本进程内的截止时间（epoch 毫秒）。跨服务时 API.send 只传剩余的毫秒数 budgetMillis，
+ * 下游收到后加上自己的当前时间作为截止时间，所以每一跳都扣掉了已经花掉的时间，也不要求各服务时钟一致。
+ * 预算用完时 Planner 和 API.send 拒绝开始新的工作，执行中的工作被取消，并按 stage / reason 计入 /metrics
+ */
+object Deadline {
+  /** 调用方没有给出预算时使用 */
+  val DefaultBudget: FiniteDuration = 30.seconds
+
+  /** 调用方给出的预算最多按这么长处理，也是 API 客户端的超时 */
+  val MaxBudget: FiniteDuration = 60.seconds
+
+  /** 前端在这个请求头里给出预算（毫秒），与它自己的超时一致 */
+  val BudgetHeader = "X-Request-Budget-Ms"
+
+  /** 因预算用完而放弃的请求，响应带上这个头，调用方据此区分超时和目标服务故障 */
+  val ExceededHeader = "X-Deadline-Exceeded"
+
+  /**
+   * 服务收到请求时 PlanContext 是新建的，按调用方 planContext.budgetMillis 或前端的 X-Request-Budget-Ms 设置截止时间
+   */
+  def continueBudget(request: Request[IO], requestBody: Json, context: PlanContext): PlanContext = {
+    val budgetMillis = requestBody.hcursor.downField("planContext").get[Long]("budgetMillis").toOption
+      .orElse(request.headers.get(CIString(BudgetHeader)).flatMap(_.head.value.trim.toLongOption))
+      .getOrElse(DefaultBudget.toMillis)
+    context.copy(deadlineMillis = Some(System.currentTimeMillis() + budgetMillis.max(0L).min(MaxBudget.toMillis)))
+  }
+
+  /** 剩余的预算；没有截止时间时为 None */
+  def remaining(using context: PlanContext): Option[FiniteDuration] =
+    context.deadlineMillis.map(deadline => (deadline - System.currentTimeMillis()).max(0L).millis)
+
+  /**
+   * 在剩余预算内运行 io：预算已用完时不运行，超时则取消 io，两种情况都抛出 DeadlineExceededException
+   * @param stage 记到指标里的阶段，如 planner / outbound
+   */
+  def within[A](stage: String)(io: IO[A])(using context: PlanContext): IO[A] =
+    remaining match {
+      case None => io
+      case Some(left) if left <= Duration.Zero => shed(stage, "refused")
+      case Some(left) => io.timeoutTo(left, shed(stage, "cancelled"))
+    }
+
+  private def shed[A](stage: String, reason: String): IO[A] =
+    IO(Metrics.recordShed(stage, reason)) >> IO.raiseError(DeadlineExceededException(stage))
+}
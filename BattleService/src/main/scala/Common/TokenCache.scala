@@ -0,0 +1,86 @@
+package Common
+
+import cats.effect.IO
+import org.slf4j.LoggerFactory
+
+import java.util.concurrent.atomic.AtomicLong
+import scala.collection.concurrent.TrieMap
+
+/**
+ * token -> 身份 的进程内缓存，各服务的 token 验证共用这一套规则：
+ * 条目有 TTL，超过容量时先清掉过期条目，仍超出就淘汰最早载入的条目；
+ * 同一个所有者（用户或管理员）只保留最新的 token，按所有者失效；
+ * load 失败（无效 token 或上游故障）原样抛出且不缓存，怎么处理由调用方决定
+ * @param ttlMillis 条目存活时间（毫秒）
+ * @param maxEntries 最大条目数
+ * @param ownerOf 缓存值所属的用户或管理员ID
+ */
+class TokenCache[A](val ttlMillis: Long, val maxEntries: Int)(ownerOf: A => String) {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  private case class Entry(value: A, loadedAt: Long)
+
+  private val byToken = TrieMap.empty[String, Entry]
+  private val tokenOfOwner = TrieMap.empty[String, String]
+
+  private val hits = new AtomicLong(0)
+  private val misses = new AtomicLong(0)
+  private val invalidations = new AtomicLong(0)
+
+  /** 每次失效加一；载入前后代数不同说明期间发生过失效，结果不再写入缓存 */
+  private val generation = new AtomicLong(0)
+
+  /**
+   * 命中时直接返回缓存值，否则调用 load 并写入缓存；load 失败时原样抛出
+   */
+  def getOrLoad(token: String)(load: => IO[A]): IO[A] =
+    IO(byToken.get(token).filter(isFresh)).flatMap {
+      case Some(entry) =>
+        IO(hits.incrementAndGet()).as(entry.value)
+      case None =>
+        for {
+          _ <- IO(misses.incrementAndGet())
+          generationBefore <- IO(generation.get())
+          value <- load
+          _ <- IO(if (generation.get() == generationBefore) put(token, value))
+        } yield value
+    }
+
+  /** 只查缓存，不调用 load */
+  def cached(token: String): Option[A] =
+    byToken.get(token).filter(isFresh).map(_.value)
+
+  /** 所有者的 token 被换发、清除或账号被封禁时调用；应在相应的数据库修改提交之后调用 */
+  def invalidateOwner(ownerID: String): IO[Unit] = IO {
+    generation.incrementAndGet()
+    tokenOfOwner.remove(ownerID).foreach(byToken.remove)
+    invalidations.incrementAndGet()
+    logger.info(s"${ownerID} 的 token 缓存已失效")
+  }
+
+  def stats: Map[String, Long] = Map(
+    "hits" -> hits.get(),
+    "misses" -> misses.get(),
+    "invalidations" -> invalidations.get(),
+    "entries" -> byToken.size.toLong
+  )
+
+  private def isFresh(entry: Entry): Boolean =
+    System.currentTimeMillis() - entry.loadedAt < ttlMillis
+
+  private def put(token: String, value: A): Unit = {
+    val ownerID = ownerOf(value)
+    byToken.put(token, Entry(value, System.currentTimeMillis()))
+    tokenOfOwner.put(ownerID, token).filter(_ != token).foreach(byToken.remove)
+    if (byToken.size > maxEntries) {
+      byToken.filterNot { case (_, entry) => isFresh(entry) }.keys.foreach(remove)
+      val overflow = byToken.size - maxEntries
+      if (overflow > 0) {
+        byToken.toList.sortBy(_._2.loadedAt).take(overflow).foreach { case (staleToken, _) => remove(staleToken) }
+      }
+    }
+  }
+
+  private def remove(token: String): Unit =
+    byToken.remove(token).foreach(entry => tokenOfOwner.remove(ownerOf(entry.value), token))
+}
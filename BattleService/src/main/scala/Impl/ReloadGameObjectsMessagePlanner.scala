@@ -0,0 +1,29 @@
+package Impl
+
+import Common.API.{PlanContext, Planner}
+import Utils.GameObjectRegistry
+import cats.effect.IO
+import io.circe.Encoder
+import org.slf4j.LoggerFactory
+
+case class ReloadGameObjectsMessagePlanner(
+  override val planContext: PlanContext
+) extends Planner[String] {
+
+  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+
+  // 只读取对象表，不需要开启数据库事务
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[String]): IO[String] =
+    boundedPlan
+
+  override def plan(using planContext: PlanContext): IO[String] = {
+    for {
+      // Step 1: 从数据库重新载入战斗对象，读取失败时保留原注册表
+      _ <- IO(logger.info(s"[Step 1] 重新载入战斗对象注册表，当前版本 ${GameObjectRegistry.snapshot.version}"))
+      snapshot <- GameObjectRegistry.reload
+
+      // Step 2: 返回注册表概况
+      _ <- IO(logger.info(s"[Step 2] 注册表已替换: ${snapshot.summary}"))
+    } yield snapshot.summary
+  }
+}
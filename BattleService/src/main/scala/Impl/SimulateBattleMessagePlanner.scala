@@ -0,0 +1,57 @@
+package Impl
+
+import APIs.AdminService.ValidateAdminTokenMessage
+import Common.API.{PlanContext, Planner}
+import Objects.BattleService.BattleSimulationResult
+import Utils.BattleSimulator
+import cats.effect.IO
+import io.circe.Encoder
+import org.slf4j.LoggerFactory
+
+case class SimulateBattleMessagePlanner(
+  adminToken: String,
+  totalRounds: Int,
+  parallelism: Int,
+  player1Strategy: String,
+  player1Actions: List[String],
+  player2Strategy: String,
+  player2Actions: List[String],
+  seed: Option[Long],
+  override val planContext: PlanContext
+) extends Planner[BattleSimulationResult] {
+
+  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+
+  private val MAX_SIMULATED_ROUNDS = 1000000
+  private val MAX_PARALLELISM = 8
+
+  // 模拟只使用内存中的战斗对象注册表，不需要开启数据库事务
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[BattleSimulationResult]): IO[BattleSimulationResult] =
+    boundedPlan
+
+  override def plan(using planContext: PlanContext): IO[BattleSimulationResult] = {
+    for {
+      // Step 1: 模拟很耗 CPU，只允许管理员调用
+      _ <- IO(logger.info("[Step 1] 验证管理员Token"))
+      _ <- ValidateAdminTokenMessage(adminToken).send
+
+      // Step 2: Validate input parameters
+      _ <- IO(logger.info(s"[Step 2] 验证模拟参数 totalRounds=${totalRounds}, parallelism=${parallelism}, seed=${seed}"))
+      _ <- if (totalRounds <= 0 || totalRounds > MAX_SIMULATED_ROUNDS) {
+        IO.raiseError(new IllegalArgumentException(s"totalRounds 无效，必须在 1 到 ${MAX_SIMULATED_ROUNDS} 之间"))
+      } else IO.unit
+      _ <- if (parallelism <= 0 || parallelism > MAX_PARALLELISM) {
+        IO.raiseError(new IllegalArgumentException(s"parallelism 无效，必须在 1 到 ${MAX_PARALLELISM} 之间"))
+      } else IO.unit
+
+      // Step 3: 解析双方的出招策略
+      _ <- IO(logger.info(s"[Step 3] 解析出招策略 player1=${player1Strategy}${player1Actions}, player2=${player2Strategy}${player2Actions}"))
+      player1 <- IO.fromEither(BattleSimulator.buildStrategy(player1Strategy, player1Actions).left.map(error => new IllegalArgumentException(s"玩家1策略无效: $error")))
+      player2 <- IO.fromEither(BattleSimulator.buildStrategy(player2Strategy, player2Actions).left.map(error => new IllegalArgumentException(s"玩家2策略无效: $error")))
+
+      // Step 4: 各工作线程在 blocking 线程池上运行，避免占住处理请求和房间计时的计算线程
+      _ <- IO(logger.info("[Step 4] 开始离线对战模拟"))
+      result <- BattleSimulator.run(totalRounds, parallelism, player1, player2, seed)
+    } yield result
+  }
+}
@@ -0,0 +1,58 @@
+package Objects.BattleService
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+import scala.util.Try
+import org.joda.time.DateTime
+import java.util.UUID
+
+/**
+ * ActionUsageStat
+ * desc: 离线对战模拟中某个玩家使用某个行动的统计
+ * @param player: String (player1 或 player2)
+ * @param action: String (行动描述，例如 Sa+Sa+Tin)
+ * @param uses: Long (使用次数)
+ * @param winRate: Double (使用该行动的对局中该玩家最终获胜的比例，按使用次数加权，百分数)
+ */
+case class ActionUsageStat(
+  player: String,
+  action: String,
+  uses: Long,
+  winRate: Double
+){
+  // process class code 预留标志位，不要删除
+}
+
+case object ActionUsageStat {
+  
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[ActionUsageStat] = deriveEncoder
+  private val circeDecoder: Decoder[ActionUsageStat] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[ActionUsageStat] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[ActionUsageStat] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[ActionUsageStat]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given actionUsageStatEncoder: Encoder[ActionUsageStat] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given actionUsageStatDecoder: Decoder[ActionUsageStat] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+  //process object code 预留标志位，不要删除
+}
@@ -0,0 +1,76 @@
+package Objects.BattleService
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+import scala.util.Try
+import org.joda.time.DateTime
+import java.util.UUID
+
+/**
+ * BattleSimulationResult
+ * desc: 离线对战模拟的统计结果，用于测量战斗结算的吞吐和检查平衡性
+ * @param totalRounds: Long (模拟的总回合数)
+ * @param games: Long (完成或中止的对局数)
+ * @param player1Wins: Long (玩家1获胜的对局数)
+ * @param player2Wins: Long (玩家2获胜的对局数)
+ * @param draws: Long (平局数)
+ * @param unfinishedGames: Long (达到回合上限仍未分出胜负的对局数)
+ * @param averageRoundsPerGame: Double (平均每局回合数)
+ * @param explosionRounds: Long (发生爆点的回合数)
+ * @param cardEffectsTriggered: Long (触发的卡牌效果次数)
+ * @param elapsedMillis: Long (模拟耗时（毫秒）)
+ * @param roundsPerSecond: Double (每秒结算的回合数)
+ * @param allocatedBytesPerRound: Double (每回合平均分配的堆内存字节数，JVM 不支持统计时为 -1)
+ * @param actionUsage: List[ActionUsageStat] (每个玩家各行动的使用次数和胜率)
+ */
+case class BattleSimulationResult(
+  totalRounds: Long,
+  games: Long,
+  player1Wins: Long,
+  player2Wins: Long,
+  draws: Long,
+  unfinishedGames: Long,
+  averageRoundsPerGame: Double,
+  explosionRounds: Long,
+  cardEffectsTriggered: Long,
+  elapsedMillis: Long,
+  roundsPerSecond: Double,
+  allocatedBytesPerRound: Double,
+  actionUsage: List[ActionUsageStat]
+){
+  // process class code 预留标志位，不要删除
+}
+
+case object BattleSimulationResult {
+  
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[BattleSimulationResult] = deriveEncoder
+  private val circeDecoder: Decoder[BattleSimulationResult] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[BattleSimulationResult] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[BattleSimulationResult] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[BattleSimulationResult]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given battleSimulationResultEncoder: Encoder[BattleSimulationResult] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given battleSimulationResultDecoder: Decoder[BattleSimulationResult] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+  //process object code 预留标志位，不要删除
+}
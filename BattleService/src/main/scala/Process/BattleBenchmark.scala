@@ -0,0 +1,31 @@
+package Process
+
+import Utils.{BattleSimulator, GameObjectRegistry}
+import cats.effect.*
+import io.circe.syntax.*
+
+/**
+ * 离线战斗结算压测，不需要数据库：
+ *   sbt "runMain Process.BattleBenchmark [总回合数] [并行度] [种子]"
+ * 双方都使用 random 策略和内置对象，结果以 JSON 打印到标准输出
+ */
+object BattleBenchmark extends IOApp:
+
+  def run(args: List[String]): IO[ExitCode] =
+    val totalRounds = args.lift(0).flatMap(_.toIntOption).getOrElse(1000000)
+    val parallelism = args.lift(1).flatMap(_.toIntOption).getOrElse(Runtime.getRuntime.availableProcessors())
+    val seed = args.lift(2).flatMap(_.toLongOption).orElse(Some(42L))
+
+    for
+      _ <- IO(GameObjectRegistry.loadBuiltins())
+      strategies <- IO.fromEither(
+        (for
+          player1 <- BattleSimulator.buildStrategy("random", Nil)
+          player2 <- BattleSimulator.buildStrategy("random", Nil)
+        yield (player1, player2)).left.map(new IllegalArgumentException(_))
+      )
+      // 先跑一轮预热，让 JIT 编译热路径，再计时
+      _ <- BattleSimulator.run(math.min(totalRounds, 100000), parallelism, strategies._1, strategies._2, seed)
+      result <- BattleSimulator.run(totalRounds, parallelism, strategies._1, strategies._2, seed)
+      _ <- IO.println(result.asJson.spaces2)
+    yield ExitCode.Success
@@ -10,7 +10,7 @@ import java.util.UUID
 import Global.DBConfig
 import Process.ProcessUtils.server2DB
 import Global.GlobalVariables
-import Utils.BattleRoomTicker
+import Utils.{BattleRoomTicker, GameObjectRegistry}
 
 object Init {
   def init(config: ServerConfig): IO[Unit] = {
@@ -19,8 +19,11 @@ object Init {
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- API.init(config.maximumClientConnection, config.targetGuards)
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
+      batchSupported <- if (config.enableBatchDB) Common.DBAPI.probeBatchDB else IO.pure(false)
+      _ <- IO(GlobalVariables.enableBatchDB=batchSupported)
+      _ <- IO.whenA(config.enableBatchDB && !batchSupported)(IO(println("DB-Manager 不支持 BatchDBMessage，batchDB 改为在事务内逐条执行")))
       _ <- initSchema(schemaName)
             /** 战斗状态表，记录战斗房间的实时状态信息
        * room_id: 房间的唯一ID
@@ -150,6 +153,7 @@ object Init {
       // 初始化游戏数据
       _ <- IO.println("初始化游戏数据...")
       _ <- InitGameData.initGameData
+      _ <- GameObjectRegistry.reload
       
       // Start the battle room ticker for periodic updates
       _ <- IO.println("Starting BattleRoomTicker...")
@@ -21,8 +21,8 @@ object InitGameData {
     } yield ()
   }
   
-  private def initActiveObjects(using PlanContext): IO[Unit] = {
-    val activeObjects = List(
+  /** 内置主动对象：(名称, 基础类, 攻击类型, 伤害, 防御, 能量消耗, 描述) */
+  val activeObjects: List[(String, String, String, Int, Int, Int, String)] = List(
       // 撒类
       ("Sa", "sa", "normal", 1, 5, 1, "基础撒"),
       
@@ -41,6 +41,20 @@ object InitGameData {
       ("Nuclear", "nuclear", "nuclear", 5, 6, 5, "强力核爆")
     )
 
+  /** 内置被动对象：(名称, 对象类型, 基础类, 能量获取, 伤害倍率, 护盾倍率, 防御的攻击类型, 描述) */
+  val passiveObjects: List[(String, String, String, Int, Double, Double, String, String)] = List(
+      // 饼类
+      ("Cake", "cake", "cake", 1, 1.0, 1.0, "", "基础饼"),
+      ("Pouch", "cake", "cake", 2, 3.0, 1.0, "", "馕"),
+      
+      // 盾类
+      ("BasicShield", "shield", "shield", 0, 1.0, 1.0, "", "基础盾"),
+
+      // 攻击类型防御
+      ("BasicDefense", "attack_type_defense", "type_defense", 0, 1.0, 1.0, "normal,antiair", "基础攻击防御")
+    )
+
+  private def initActiveObjects(using PlanContext): IO[Unit] = {
     activeObjects.traverse { case (name, baseClass, attackType, damage, defense, energyCost, description) =>
       writeDB(
         s"""
@@ -64,18 +78,6 @@ object InitGameData {
   }
   
   private def initPassiveObjects(using PlanContext): IO[Unit] = {
-    val passiveObjects = List(
-      // 饼类
-      ("Cake", "cake", "cake", 1, 1.0, 1.0, "", "基础饼"),
-      ("Pouch", "cake", "cake", 2, 3.0, 1.0, "", "馕"),
-      
-      // 盾类
-      ("BasicShield", "shield", "shield", 0, 1.0, 1.0, "", "基础盾"),
-
-      // 攻击类型防御
-      ("BasicDefense", "attack_type_defense", "type_defense", 0, 1.0, 1.0, "normal,antiair", "基础攻击防御")
-    )
-
     passiveObjects.traverse { case (name, objectType, baseClass, energyGain, damageMultiplier, shieldMultiplier, targetAttackTypes, description) =>
       writeDB(
         s"""
@@ -2,6 +2,9 @@ package Process
 
 import APIs.UserService.GetUserInfoMessage
 import Common.API.PlanContext
+import Common.API.Tracer
+import Common.API.Metrics
+import Common.API.{Deadline, DeadlineExceededException}
 import Common.DBAPI.DidRollbackException
 import cats.effect.*
 import fs2.concurrent.Topic
@@ -30,6 +33,10 @@ import cats.effect.std.Queue
 import org.http4s.server.websocket.WebSocketBuilder
 import cats.syntax.semigroupk.*
 import Utils.BattleWebSocketManager
+import Utils.UserTokenCache
+import Utils.BattleMetrics
+import Impl.ReloadGameObjectsMessagePlanner
+import Impl.SimulateBattleMessagePlanner
 import Utils.BattleRoomTicker
 import Objects.BattleService.{BattleAction, CardEffect, GameOverResult, GameState, PlayerState, RoundResult}
 import Utils.BattleRoomTicker.getClass
@@ -50,14 +57,48 @@ object Routes:
     }
   }
 
-  
-  def handlePostRequest(req: Request[IO]): IO[String] = {
+  /**
+   * 取房间，不存在时创建；并发创建时只有放入 battleRooms 的那个会被启动
+   */
+  def roomManager(roomId: String): IO[BattleWebSocketManager] =
+    battleRooms.get(roomId) match {
+      case Some(manager) => IO.pure(manager)
+      case None =>
+        BattleWebSocketManager.create(roomId).flatMap { created =>
+          IO(battleRooms.putIfAbsent(roomId, created)).flatMap {
+            case Some(existing) => IO.pure(existing)
+            case None => created.start.as(created)
+          }
+        }
+    }
+
+  private def executePlan(messageType: String, body: Json): IO[Json] =
+    messageType match {
+      case "ReloadGameObjectsMessage" =>
+        IO(
+          body.as[ReloadGameObjectsMessagePlanner] match
+            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ReloadGameObjectsMessage[${err.getMessage}]")
+            case Right(value) => value.fullPlan.map(_.asJson)
+        ).flatten
+
+      case "SimulateBattleMessage" =>
+        IO(
+          body.as[SimulateBattleMessagePlanner] match
+            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for SimulateBattleMessage[${err.getMessage}]")
+            case Right(value) => value.fullPlan.map(_.asJson)
+        ).flatten
+
+      case _ =>
+        IO.raiseError(new Exception(s"Unknown type: $messageType"))
+    }
+
+  /** 请求体只解析一次，PlanContext 直接加到解析出的 Json 上，executePlan 再从这个 Json 解码出 Planner */
+  def handlePostRequest(req: Request[IO]): IO[Json] = {
     req.as[Json].map {
       bodyJson => {
-        val planContext = PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)
-        val planContextJson = planContext.asJson
-        val updatedJson = bodyJson.deepMerge(Json.obj("planContext" -> planContextJson))
-        updatedJson.toString
+        val planContext = Deadline.continueBudget(req, bodyJson,
+          Tracer.continueTrace(bodyJson, PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)))
+        bodyJson.mapObject(_.add("planContext", planContext.asJson))
       }
     }
   }
@@ -69,20 +110,19 @@ object Routes:
 
     val websocketRoute = HttpRoutes.of[IO] {
       // Battle WebSocket endpoint
-      case GET -> Root / "battle" / roomId :? IDQueryParamMatcher(userID) :? NameQueryParamMatcher(userName) =>
+      case GET -> Root / "battle" / roomId :? IDQueryParamMatcher(userID) :? NameQueryParamMatcher(userName) :? TokenQueryParamMatcher(userToken) =>
         val logger = LoggerFactory.getLogger(getClass)
         logger.info(s"WebSocket connection request for room: $roomId with userName: $userName and userID: $userID")
 
         // Validate token and get user ID
-        validateToken(userID).flatMap {
-          case Some(userId) =>
+        validateToken(userID, userToken.getOrElse("")).attempt.flatMap {
+          case Right(Some(userId)) =>
             logger.info(s"Token validated for user: $userId")
 
-            // Get or create room manager
-            val manager = battleRooms.getOrElseUpdate(roomId, new BattleWebSocketManager(roomId))
-
             // Create a queue for this connection
             for {
+              // Get or create room manager
+              manager <- roomManager(roomId)
               queue <- Queue.unbounded[IO, WebSocketFrame]
               _ <- IO(logger.info(s"Created queue for user $userId"))
 
@@ -112,9 +152,14 @@ object Routes:
               _ <- IO(logger.info(s"WebSocket built successfully for user $userId"))
             } yield response
 
-          case None =>
-            logger.warn(s"Invalid userID: $userID")
-            BadRequest("Invalid userID")
+          case Right(None) =>
+            logger.warn(s"Invalid token for userID: $userID")
+            Forbidden("Invalid user token")
+
+          // UserService 不可用时不能当作 token 无效，客户端可以稍后重试
+          case Left(error) =>
+            logger.warn(s"Token validation unavailable for userID: $userID: ${error.getMessage}")
+            ServiceUnavailable("User token validation unavailable")
         }
     }
 
@@ -125,12 +170,11 @@ object Routes:
   // Extract token from query parameters
   object IDQueryParamMatcher extends QueryParamDecoderMatcher[String]("userid")
   object NameQueryParamMatcher extends QueryParamDecoderMatcher[String]("name")
+  object TokenQueryParamMatcher extends OptionalQueryParamDecoderMatcher[String]("token")
 
-  // Validate token and return user ID if valid
-  private def validateToken(token: String): IO[Option[String]] = {
-    // In a real implementation, this would validate the token with UserService
-    IO.pure(Some(token))
-  }
+  // Validate token with UserService (cached) and return user ID if it belongs to the claimed user; fails if UserService is unavailable
+  private def validateToken(userID: String, userToken: String): IO[Option[String]] =
+    UserTokenCache.validate(userToken).map(_.filter(_ == userID))
 
   // Handle WebSocket messages
   private def handleWebSocketMessage(roomId: String, userId: String, message: String): IO[Unit] = {
@@ -162,6 +206,13 @@ object Routes:
               _ <- setPlayerReady(roomId, userId)
             } yield ()
 
+          case "state_resync" =>
+            // 客户端 seq 不连续，重新发送全量快照
+            battleRooms.get(roomId) match {
+              case Some(manager) => manager.resendSnapshot(userId)
+              case None => IO(logger.warn(s"Room not found: $roomId"))
+            }
+
           case _ =>
             IO(logger.warn(s"Unknown message type: ${wsMessage.`type`}"))
         }
@@ -175,16 +226,11 @@ object Routes:
   private def processPlayerAction(roomId: String, userId: String, actionJson: String): IO[Unit] = {
     val logger = LoggerFactory.getLogger(getClass)
     logger.info(s"Processing action JSON for user $userId in room $roomId")
-    
-    // 创建PlanContext
-    implicit val planContext: PlanContext = PlanContext(TraceID(java.util.UUID.randomUUID().toString), 0)
 
     battleRooms.get(roomId) match {
       case Some(manager) =>
-        // 使用parseAndRecordPlayerAction处理JSON字符串
-        manager.parseAndRecordPlayerAction(userId, actionJson) >>
-        // 检查是否所有玩家都已提交动作
-        manager.checkAndProcessActions
+        // 使用parseAndRecordPlayerAction处理JSON字符串，双方都提交后房间会自行结算
+        manager.parseAndRecordPlayerAction(userId, actionJson)
 
       case None =>
         IO(logger.warn(s"Room not found: $roomId"))
@@ -212,6 +258,9 @@ object Routes:
     case GET -> Root / "health" =>
       Ok("OK")
 
+    case GET -> Root / "metrics" =>
+      BattleMetrics.gauges.flatMap(gauges => Ok(Metrics.render(gauges)))
+
     case GET -> Root / "stream" / projectName =>
       projects.get(projectName) match {
         case Some(topic) =>
@@ -229,4 +278,23 @@ object Routes:
             }
           }
       }
+
+    case req@POST -> Root / "api" / name =>
+      handlePostRequest(req).flatMap {
+        body => Metrics.timeRequest(name)(executePlan(name, body))
+      }.flatMap(Ok(_))
+      .handleErrorWith {
+        case e: DidRollbackException =>
+          println(s"Rollback error: $e")
+          val headers = Headers("X-DidRollback" -> "true")
+          BadRequest(e.getMessage.asJson.toString).map(_.withHeaders(headers))
+
+        case e: DeadlineExceededException =>
+          println(s"Deadline exceeded: $e")
+          ServiceUnavailable(e.getMessage.asJson.toString).map(_.withHeaders(Headers(Deadline.ExceededHeader -> "true")))
+
+        case e: Throwable =>
+          println(s"General error: $e")
+          BadRequest(e.getMessage.asJson.toString)
+      }
   }
@@ -6,78 +6,59 @@ import io.circe.{Decoder, Encoder, Json}
 import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
 import io.circe.syntax._
 import cats.effect.IO
-import cats.implicits._  // 添加这个导入
 import org.slf4j.LoggerFactory
 import Common.API.PlanContext
-import Common.DBAPI.{readDBJsonOptional, writeDB, decodeField, decodeType}  // 修正导入
+import Common.DBAPI.{readDBRows, decodeField}
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import Utils.ObjectCreationError._
 
 /**
  * 主动对象管理器
- * 负责从数据库创建和管理主动对象
+ * 负责把数据库记录转换为主动对象，创建时从 GameObjectRegistry 查找
  */
 object ActiveObjectManager {
   private val logger = LoggerFactory.getLogger(getClass)
 
   /**
-   * 从数据库安全地创建主动对象
+   * 从对象注册表创建主动对象
    */
-  def createActiveObjectFromDB(objectName: String)(using PlanContext): IO[Either[ObjectCreationError, AttackObject]] = {
-    for {
-      recordOpt <- fetchActiveObjectRecord(objectName)
-      result <- recordOpt match {
-        case Some(record) => 
-          IO.pure(createActiveObjectFromRecord(record))
-        case None => 
-          IO.pure(Left(ObjectNotFoundError(objectName)))
-      }
-    } yield result
-  }
+  def createActiveObject(objectName: String): Either[ObjectCreationError, AttackObject] =
+    GameObjectRegistry.activeObject(objectName)
 
   /**
-   * 从数据库批量创建主动对象
+   * 从对象注册表批量创建主动对象
    */
-  def createActiveObjectsFromDB(objectNames: List[String])(using PlanContext): IO[List[Either[ObjectCreationError, AttackObject]]] = {
-    objectNames.traverse(createActiveObjectFromDB)  // 使用 traverse 方法
-  }
+  def createActiveObjects(objectNames: List[String]): List[Either[ObjectCreationError, AttackObject]] =
+    objectNames.map(createActiveObject)
 
   /**
    * 创建主动行动
    */
-  def createActiveAction(attackObjects: Map[String, Int])(using PlanContext): IO[Either[ObjectCreationError, ActiveAction]] = {
-    for {
-      objectResults <- attackObjects.keys.toList.traverse(createActiveObjectFromDB)  // 使用 traverse 方法
-      result <- {
-        val errors = objectResults.collect { case Left(error) => error }
-        if (errors.nonEmpty) {
-          IO.pure(Left(errors.head))
-        } else {
-          val objects = objectResults.collect { case Right(obj) => obj }
-          val objectMap = objects.map(obj => obj -> attackObjects(obj.objectName)).toMap
-          IO.pure(Right(ActiveAction.create(objectMap)))
-        }
-      }
-    } yield result
+  def createActiveAction(attackObjects: Map[String, Int]): Either[ObjectCreationError, ActiveAction] = {
+    val objectResults = createActiveObjects(attackObjects.keys.toList)
+    val errors = objectResults.collect { case Left(error) => error }
+    if (errors.nonEmpty) {
+      Left(errors.head)
+    } else {
+      val objects = objectResults.collect { case Right(obj) => obj }
+      val objectMap = objects.map(obj => obj -> attackObjects(obj.objectName)).toMap
+      Right(ActiveAction.create(objectMap))
+    }
   }
 
   /**
-   * 从数据库获取主动对象记录
+   * 读取 active_objects_table 的全部记录并转换成主动对象，供 GameObjectRegistry 构建注册表
+   * @return 对象名 -> 创建结果，记录本身有误时保留对应的错误
    */
-  private def fetchActiveObjectRecord(objectName: String)(using PlanContext): IO[Option[ActiveObjectRecord]] = {
-    readDBJsonOptional(  // 使用 readDBJsonOptional 而不是 readDB
+  def loadActiveObjects(using PlanContext): IO[Map[String, Either[ObjectCreationError, AttackObject]]] = {
+    readDBRows(
       s"""
       SELECT object_name, base_class, attack_type, damage, defense, energy_cost, description
       FROM $schemaName.active_objects_table
-      WHERE object_name = ?
       """,
-      List(SqlParameter("String", objectName))
-    ).map(_.map(convertJsonToActiveRecord))
-     .handleErrorWith { error =>
-       logger.error(s"Database error fetching active object $objectName: ${error.getMessage}")
-       IO.pure(None)
-     }
+      List()
+    ).map(_.map(convertJsonToActiveRecord).map(record => record.objectName -> createActiveObjectFromRecord(record)).toMap)
   }
 
   /**
@@ -98,7 +79,7 @@ object ActiveObjectManager {
   /**
    * 从记录创建主动对象
    */
-  private def createActiveObjectFromRecord(record: ActiveObjectRecord): Either[ObjectCreationError, AttackObject] = {
+  def createActiveObjectFromRecord(record: ActiveObjectRecord): Either[ObjectCreationError, AttackObject] = {
     for {
       baseClass <- createBaseClass(record.baseClass)
       attackType <- createAttackType(record.attackType)
@@ -9,7 +9,6 @@ import io.circe.syntax._
 import cats.effect.IO
 import cats.implicits._
 import org.slf4j.LoggerFactory
-import Common.API.PlanContext
 
 /**
  * 前端行动类型：被动行动接口
@@ -41,7 +40,7 @@ case class FrontendBattleAction(
 
 /**
  * 战斗行动管理器
- * 负责将前端的行动格式转换为后端行动对象
+ * 负责将前端的行动格式转换为后端行动对象，对象定义从 GameObjectRegistry 查找，不访问数据库
  */
 object BattleActionManager {
   private val logger = LoggerFactory.getLogger(getClass)
@@ -49,14 +48,14 @@ object BattleActionManager {
   /**
    * 解析前端传来的JSON格式行动数据
    */
-  def parseActionJson(jsonStr: String)(using PlanContext): IO[Either[Throwable, BattleAction]] = {
+  def parseActionJson(jsonStr: String): IO[Either[Throwable, BattleAction]] = {
   (for {
     json <- IO.fromEither(parse(jsonStr).left.map(err => new Exception(s"解析JSON失败: ${err.message}")))
     action <- parseBattleAction(json)
   } yield action).attempt
 }
 
-private def parseBattleAction(json: Json)(using PlanContext): IO[BattleAction] = {
+private def parseBattleAction(json: Json): IO[BattleAction] = {
   for {
     playerId <- IO.fromEither(json.hcursor.downField("playerId").as[String]
       .left.map(err => new Exception(s"解析playerId失败: ${err.message}")))
@@ -80,7 +79,7 @@ private def parseBattleAction(json: Json)(using PlanContext): IO[BattleAction] =
   /**
    * 解析被动行动
    */
-  private def parsePassiveAction(json: Json)(using PlanContext): IO[PassiveAction] = {
+  private def parsePassiveAction(json: Json): IO[PassiveAction] = {
     for {
       // 解析基本字段
       objectName <- IO.fromEither(json.hcursor.downField("objectName").as[String]
@@ -99,9 +98,9 @@ private def parseBattleAction(json: Json)(using PlanContext): IO[BattleAction] =
               .left.map(err => new Exception(s"解析targetObject失败: ${err.message}")))
               
             // 如果有目标对象，创建AttackObject
-            targetObjectResult <- targetObjectName match {
-              case Some(name) => ActiveObjectManager.createActiveObjectFromDB(name)
-              case None => IO.pure(Left(ObjectCreationError.MissingRequiredFieldError("PassiveAction", "targetObject")))
+            targetObjectResult = targetObjectName match {
+              case Some(name) => ActiveObjectManager.createActiveObject(name)
+              case None => Left(ObjectCreationError.MissingRequiredFieldError("PassiveAction", "targetObject"))
             }
             
             // 使用PassiveObjectManager创建被动对象
@@ -110,7 +109,7 @@ private def parseBattleAction(json: Json)(using PlanContext): IO[BattleAction] =
                      defenseType = Some("object_defense"),
               targetObject = targetObjectResult.toOption,
               targetAction = None
-            ).flatMap {
+            ) match {
               case Right(action) => IO.pure(action)
               case Left(error) => IO.raiseError(new Exception(s"创建ObjectDefense失败: $error"))
             }
@@ -136,7 +135,7 @@ private def parseBattleAction(json: Json)(using PlanContext): IO[BattleAction] =
             }
             
             // 使用ActiveObjectManager.createActiveAction创建主动行动
-            activeActionResult <- ActiveObjectManager.createActiveAction(attackObjectsMap)
+            activeActionResult = ActiveObjectManager.createActiveAction(attackObjectsMap)
             
             // 处理返回结果
             targetAction <- activeActionResult match {
@@ -150,15 +149,15 @@ private def parseBattleAction(json: Json)(using PlanContext): IO[BattleAction] =
               defenseType = Some("action_defense"),
               targetObject = None,
               targetAction = targetAction
-            ).flatMap {
+            ) match {
               case Right(action) => IO.pure(action)
               case Left(error) => IO.raiseError(new Exception(s"创建ActionDefense失败: $error"))
             }
           } yield action
             
         case _ =>
-          // 常规被动对象直接从数据库创建
-          PassiveObjectManager.createPassiveObjectFromDB(objectName).flatMap {
+          // 常规被动对象直接从注册表创建
+          PassiveObjectManager.createPassiveObject(objectName) match {
             case Right(action) => IO.pure(action)
             case Left(error) => IO.raiseError(new Exception(s"创建被动对象失败: $error"))
           }
@@ -169,7 +168,7 @@ private def parseBattleAction(json: Json)(using PlanContext): IO[BattleAction] =
   /**
    * 解析主动行动
    */
-  private def parseActiveAction(json: Json)(using PlanContext): IO[ActiveAction] = {
+  private def parseActiveAction(json: Json): IO[ActiveAction] = {
     for {
       // 解析主动行动的攻击对象名称列表
       actionNames <- IO.fromEither(json.hcursor.downField("actions").as[List[String]]
@@ -185,7 +184,7 @@ private def parseBattleAction(json: Json)(using PlanContext): IO[BattleAction] =
       }
       
       // 使用ActiveObjectManager.createActiveAction创建主动行动
-      activeActionResult <- ActiveObjectManager.createActiveAction(attackObjectsMap)
+      activeActionResult = ActiveObjectManager.createActiveAction(attackObjectsMap)
       
       // 处理返回结果
       activeAction <- activeActionResult match {
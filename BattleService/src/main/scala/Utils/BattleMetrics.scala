@@ -0,0 +1,33 @@
+package Utils
+
+import Common.API.Metrics
+import Process.Routes
+import cats.effect.IO
+import cats.implicits.*
+
+/**
+ * BattleService 自己的指标：房间数、连接数、发送队列和房间邮箱的长度
+ * 队列长度只导出所有连接 / 房间的合计和最大值，不按房间、玩家打标签，battleRooms 再多时序数也不变
+ */
+object BattleMetrics {
+
+  def gauges: IO[List[Metrics.Gauge]] =
+    for {
+      rooms <- IO(Routes.battleRooms.values.toList)
+      queueDepths <- rooms.flatTraverse(_.connectionQueues.values.toList.traverse(_.size))
+      mailboxDepths <- rooms.traverse(_.mailboxDepth)
+    } yield List(
+      Metrics.Gauge("satintin_battle_rooms", "Routes.battleRooms 中的房间数", List(Map.empty[String, String] -> rooms.size.toDouble)),
+      Metrics.Gauge("satintin_battle_sockets", "已连接的 WebSocket 数", List(Map.empty[String, String] -> queueDepths.size.toDouble)),
+      Metrics.Gauge("satintin_battle_socket_queue_depth", "所有连接待发送的帧数（stat: sum 合计, max 最大）", depthSamples(queueDepths)),
+      Metrics.Gauge("satintin_battle_room_mailbox_depth", "所有房间待处理的命令数（stat: sum 合计, max 最大）", depthSamples(mailboxDepths)),
+      Metrics.Gauge("satintin_battle_scheduled_rooms", "BattleRoomTicker 中等待计时的房间数", List(Map.empty[String, String] -> BattleRoomTicker.scheduledRoomCount.toDouble)),
+      Metrics.statsGauge("satintin_component_stats", "缓存和队列的统计", List("user_token_cache" -> UserTokenCache.stats))
+    )
+
+  private def depthSamples(depths: List[Int]): List[(Map[String, String], Double)] =
+    List(
+      Map("stat" -> "sum") -> depths.sum.toDouble,
+      Map("stat" -> "max") -> depths.maxOption.getOrElse(0).toDouble
+    )
+}
@@ -0,0 +1,52 @@
+package Utils
+
+import APIs.CardService.{CardTemplate, GetCardTemplateByIDMessage, LoadBattleDeckMessage}
+import cats.effect.IO
+import Common.API.{PlanContext, TraceID}
+import Objects.BattleService.{CardState, PlayerState}
+
+/** 对战房间加入新玩家时，从 CardService 加载玩家的战斗卡组 */
+private[Utils] object BattlePlayerLoader {
+
+  private def ChooseEffect(rarity: String): Double = {
+    rarity match {
+      case "普通" => 0.05
+      case "稀有" => 0.15
+      case "传说" => 0.99
+      case _ => 0.1
+    }
+  }
+
+  private def ConvertCardTemplateToBattleCard(card: CardTemplate): CardState = {
+    CardState(cardId = card.cardID, name = card.cardName, `type` = card.description, rarity = card.rarity, effectChance = ChooseEffect(card.rarity))
+  }
+
+  private def getInitialCardList(playerId: String, userName: String): IO[List[String]] = {
+    implicit val planContext: PlanContext = PlanContext(TraceID(java.util.UUID.randomUUID().toString), 0)
+    LoadBattleDeckMessage(playerId).send.map { battleDeck =>
+      battleDeck
+    }.handleErrorWith { error =>
+      IO.pure(List(s"Error in getInitialCards of Player $playerId "))
+    }
+  }
+
+  /**
+   * 加载玩家的卡组，在房间 fiber 之外运行
+   * @return 玩家状态，以及是否加载成功
+   */
+  def load(roomId: String, playerId: String, userName: String): IO[(PlayerState, Boolean)] = {
+    implicit val planContext: PlanContext = PlanContext(TraceID(java.util.UUID.randomUUID().toString), 0)
+    (for {
+      initialCardList <- getInitialCardList(playerId, userName)
+      card1 <- GetCardTemplateByIDMessage(initialCardList.head).send
+      card1_battle = ConvertCardTemplateToBattleCard(card1)
+      card2 <- GetCardTemplateByIDMessage(initialCardList(1)).send
+      card2_battle = ConvertCardTemplateToBattleCard(card2)
+      card3 <- GetCardTemplateByIDMessage(initialCardList(2)).send
+      card3_battle = ConvertCardTemplateToBattleCard(card3)
+    } yield (PlayerState(playerId = playerId, username = userName, health = 6, energy = 0, rank = "黑铁", cards = List(card1_battle, card2_battle, card3_battle), isReady = false, isConnected = true), true))
+      .handleErrorWith { error =>
+        IO.pure((PlayerState(playerId = playerId, username = s"Error initializing player $playerId in room $roomId from backend", health = 6, energy = 0, rank = "黑铁", cards = List(), isReady = false, isConnected = true), false))
+      }
+  }
+}
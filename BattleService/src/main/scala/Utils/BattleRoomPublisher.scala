@@ -0,0 +1,71 @@
+package Utils
+
+import cats.effect.IO
+import cats.implicits.*
+import io.circe.Json
+import io.circe.generic.auto.*
+import io.circe.syntax.*
+import org.http4s.websocket.WebSocketFrame
+import org.slf4j.LoggerFactory
+import Objects.BattleService.GameState
+
+/**
+ * 房间向玩家推送消息：状态按 seq 发快照或增量（见 GameStateDelta），其余消息序列化一次后发给所有连接
+ * 只在房间 fiber 里调用，发送失败只记日志，不影响房间处理后续命令
+ */
+private[Utils] final class BattleRoomPublisher(roomId: String) {
+  import BattleRoomPublisher.WebSocketMessage
+
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /**
+   * 更新房间状态并推送：第一次发送全量快照，之后只发送与上一次推送相比变化的字段
+   */
+  def publishState(state: BattleRoomState, newState: GameState): IO[BattleRoomState] =
+    state.publishedState match {
+      case Some(previous) =>
+        val changes = GameStateDelta.diff(previous, newState)
+        if (changes.isEmpty) IO.pure(state.copy(gameState = Some(newState)))
+        else {
+          val seq = state.stateSeq + 1
+          broadcastText(state, GameStateDelta.patchMessage(changes, seq))
+            .as(state.copy(gameState = Some(newState), publishedState = Some(newState), stateSeq = seq))
+        }
+      case None =>
+        val seq = state.stateSeq + 1
+        broadcastText(state, GameStateDelta.snapshotMessage(newState, seq))
+          .as(state.copy(gameState = Some(newState), publishedState = Some(newState), stateSeq = seq))
+    }
+
+  /** 发送与当前 seq 对应的全量快照 */
+  def sendSnapshot(state: BattleRoomState, playerId: String): IO[Unit] =
+    state.publishedState match {
+      case Some(published) => offerFrame(state, playerId, WebSocketFrame.Text(GameStateDelta.snapshotMessage(published, state.stateSeq)))
+      case None => IO.unit
+    }
+
+  def broadcast(state: BattleRoomState, message: WebSocketMessage): IO[Unit] =
+    broadcastText(state, message.asJson.noSpaces)
+
+  def broadcastExcept(state: BattleRoomState, message: WebSocketMessage, exceptPlayerId: String): IO[Unit] = {
+    val frame = WebSocketFrame.Text(message.asJson.noSpaces)
+    state.connections.keys.toList.filterNot(_ == exceptPlayerId).traverse_(playerId => offerFrame(state, playerId, frame))
+  }
+
+  /** 消息只序列化一次，同一个帧发给所有连接 */
+  private def broadcastText(state: BattleRoomState, text: String): IO[Unit] = {
+    val frame = WebSocketFrame.Text(text)
+    state.connections.keys.toList.traverse_(playerId => offerFrame(state, playerId, frame))
+  }
+
+  private def offerFrame(state: BattleRoomState, playerId: String, frame: WebSocketFrame): IO[Unit] =
+    state.connections.get(playerId) match {
+      case Some(queue) =>
+        queue.offer(frame).handleErrorWith(error => IO(logger.warn(s"Room $roomId failed to send to $playerId: ${error.getMessage}")))
+      case None => IO.unit
+    }
+}
+
+private[Utils] object BattleRoomPublisher {
+  case class WebSocketMessage(`type`: String, data: Json)
+}
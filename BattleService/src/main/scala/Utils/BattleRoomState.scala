@@ -0,0 +1,44 @@
+package Utils
+
+import cats.effect.IO
+import cats.effect.std.Queue
+import org.http4s.websocket.WebSocketFrame
+import Objects.BattleService.{BattleAction, GameState, PlayerState}
+
+/**
+ * 房间 fiber 独占的状态，只在 BattleWebSocketManager 的命令处理 fiber 里读写
+ * @param gameState 当前对战状态
+ * @param connections 玩家ID -> 发送队列
+ * @param currentActions 本回合已提交的行动
+ * @param publishedState 最近一次推送给客户端的状态，增量以它为基准
+ * @param stateSeq 最近一次推送的序号
+ * @param loading 正在加载卡组的玩家
+ */
+private[Utils] final case class BattleRoomState(
+  gameState: Option[GameState],
+  connections: Map[String, Queue[IO, WebSocketFrame]],
+  currentActions: Map[String, BattleAction],
+  publishedState: Option[GameState],
+  stateSeq: Long,
+  loading: Set[String]
+)
+
+private[Utils] object BattleRoomState {
+  val empty: BattleRoomState = BattleRoomState(None, Map.empty, Map.empty, None, 0L, Set.empty)
+}
+
+/** 投进房间邮箱的命令，由房间 fiber 按入队顺序处理 */
+private[Utils] sealed trait BattleRoomCommand
+
+private[Utils] object BattleRoomCommand {
+  final case class Connect(playerId: String, userName: String, queue: Queue[IO, WebSocketFrame]) extends BattleRoomCommand
+  /** 卡组在房间 fiber 之外加载完成 */
+  final case class PlayerLoaded(playerId: String, player: PlayerState, loaded: Boolean) extends BattleRoomCommand
+  final case class Disconnect(playerId: String) extends BattleRoomCommand
+  final case class RecordAction(playerId: String, action: BattleAction) extends BattleRoomCommand
+  final case class Ready(playerId: String) extends BattleRoomCommand
+  /** BattleRoomTicker 到期的一次倒计时，deadline 为到期时间（epoch 毫秒） */
+  final case class Tick(deadline: Long) extends BattleRoomCommand
+  final case class ReplaceState(state: GameState) extends BattleRoomCommand
+  final case class Resync(playerId: String) extends BattleRoomCommand
+}
@@ -1,121 +1,209 @@
 package Utils
 
 import cats.effect.*
-import fs2.Stream
-import io.circe.syntax._ // for .asJson
+import cats.effect.std.Queue
+import cats.implicits.*
 import org.slf4j.LoggerFactory
 
 import scala.concurrent.duration.*
 import Process.Routes
-import Objects.BattleService.{BattleAction, GameOverResult, GameState, PlayerState}
+import Objects.BattleService.{GameOverResult, GameState}
 import io.circe.Json
-import cats.Foldable.ops.toAllFoldableOps
+
+import java.util.concurrent.ConcurrentSkipListSet
+import scala.collection.concurrent.TrieMap
 
 /**
  * Handles periodic updates for battle rooms
+ *
+ * 房间按 roomId 的哈希分到若干分片，每个分片一个 fiber，分片之间互不等待
+ * 每个房间只在行动阶段才有下一次到期时间，分片按到期时间排序，睡到最早的到期时间再处理；没有到期时间的房间不会被访问
+ * 到期时分片只把 Tick 投进房间邮箱，不等待处理；房间处理完后自己调用 scheduleNext 顺延，
+ * 一个变慢的房间只会推迟它自己的下一次计时，不会拖住同一分片的其他房间，也不会堆积多个 Tick
  */
 object BattleRoomTicker {
   private val logger = LoggerFactory.getLogger(getClass)
-  
+
+  /** 倒计时步长，每个房间从进入行动阶段起每隔这么久扣一次 remainingTime */
+  val TickInterval: FiniteDuration = 1.second
+
+  private val shardCount: Int = math.max(1, Runtime.getRuntime.availableProcessors())
+
+  /**
+   * 一个分片
+   * deadlines 按 (到期时间, roomId) 排序；pending 记录每个房间当前的到期时间，保证一个房间最多只有一个计时
+   */
+  private final class Shard(val index: Int, val wake: Queue[IO, Unit]) {
+    val deadlines = new ConcurrentSkipListSet[(Long, String)](Ordering[(Long, String)])
+    val pending: TrieMap[String, Long] = TrieMap.empty
+
+    def add(roomId: String, deadline: Long): Boolean =
+      pending.putIfAbsent(roomId, deadline) match {
+        case None =>
+          deadlines.add((deadline, roomId))
+          true
+        case Some(_) => false
+      }
+
+    def remove(roomId: String): Unit =
+      pending.remove(roomId).foreach(deadline => deadlines.remove((deadline, roomId)))
+
+    /** 取出所有 now 之前到期的房间 */
+    def takeDue(now: Long): List[(String, Long)] = {
+      val due = List.newBuilder[(String, Long)]
+      var head = first
+      while (head.exists(_._1 <= now)) {
+        val (deadline, roomId) = head.get
+        deadlines.remove((deadline, roomId))
+        if (pending.remove(roomId, deadline)) due += ((roomId, deadline))
+        head = first
+      }
+      due.result()
+    }
+
+    def nextDeadline: Option[Long] = first.map(_._1)
+
+    private def first: Option[(Long, String)] = Option(deadlines.ceiling((Long.MinValue, "")))
+  }
+
+  @volatile private var shards: Vector[Shard] = Vector.empty
+
+  private def shardOf(roomId: String): Option[Shard] = {
+    val current = shards
+    if (current.isEmpty) None else Some(current(Math.floorMod(roomId.hashCode, current.size)))
+  }
+
   /**
    * Start the ticker for periodic updates
    */
   def start: IO[Unit] = {
-    logger.info("Starting BattleRoomTicker")
-    
-    // Run ticker every second
-    Stream.awakeEvery[IO](1.second)
-      .evalMap(_ => tickTask())
-      .compile
-      .drain
+    logger.info(s"Starting BattleRoomTicker with $shardCount shards")
+
+    for {
+      created <- (0 until shardCount).toList.traverse(index => Queue.dropping[IO, Unit](1).map(new Shard(index, _)))
+      _ <- IO { shards = created.toVector }
+      // 已经处于行动阶段的房间补上计时
+      _ <- Routes.battleRooms.toList.traverse_ { case (roomId, manager) =>
+        if (manager.getGameState.exists(_.roundPhase == "action")) ensureScheduled(roomId) else IO.unit
+      }
+      _ <- created.parTraverse_(runShard)
+    } yield ()
   }
-  
+
   /**
-   * Periodic task to update all active battle rooms
+   * 房间进入行动阶段时调用：没有计时的房间从现在起 TickInterval 后开始倒计时，已有计时的保持不变
    */
-  private def tickTask(): IO[Unit] = {
-    //logger.debug("Running battle room ticker task")
-    
-    // Update all active rooms
-    Routes.battleRooms.toList.traverse_ { case (roomId, manager) =>
-      updateRoom(roomId, manager)
+  def ensureScheduled(roomId: String): IO[Unit] =
+    IO.realTime.flatMap(now => scheduleAt(roomId, now.toMillis + TickInterval.toMillis))
+
+  /** 房间处理完到期时间为 deadline 的 Tick 后调用，仍在行动阶段时顺延一个 TickInterval */
+  def scheduleNext(roomId: String, deadline: Long): IO[Unit] =
+    scheduleAt(roomId, deadline + TickInterval.toMillis)
+
+  /** 取消房间的计时；对局结束、离开行动阶段或房间从 Routes.battleRooms 移除时调用 */
+  def cancel(roomId: String): IO[Unit] = IO(shardOf(roomId).foreach(_.remove(roomId)))
+
+  /** 当前有计时的房间数 */
+  def scheduledRoomCount: Int = shards.map(_.pending.size).sum
+
+  private def scheduleAt(roomId: String, deadline: Long): IO[Unit] =
+    shardOf(roomId) match {
+      case Some(shard) =>
+        IO(shard.add(roomId, deadline)).flatMap { added =>
+          // 新到期时间可能早于分片正在等待的时间，叫醒分片重新计算
+          if (added) shard.wake.offer(()) else IO.unit
+        }
+      case None =>
+        IO(logger.warn(s"BattleRoomTicker 尚未启动，房间 $roomId 的计时被忽略"))
+    }
+
+  private def runShard(shard: Shard): IO[Unit] = {
+    val step = for {
+      now <- IO.realTime.map(_.toMillis)
+      _ <- shard.takeDue(now).traverse_ { case (roomId, deadline) => tickRoom(roomId, deadline) }
+      after <- IO.realTime.map(_.toMillis)
+      _ <- shard.nextDeadline match {
+        case Some(deadline) => IO.race(IO.sleep(math.max(0L, deadline - after).millis), shard.wake.take).void
+        case None => shard.wake.take
+      }
+    } yield ()
+
+    step.foreverM.handleErrorWith { error =>
+      IO(logger.error(s"BattleRoomTicker shard ${shard.index} stopped: ${error.getMessage}")) >> runShard(shard)
     }
   }
-  
+
   /**
-   * Update a single battle room
+   * 把一次到期的 Tick 投进房间邮箱就返回；扣时间和顺延下一次计时都由房间自己的 fiber 完成
    */
-  private def updateRoom(roomId: String, manager: BattleWebSocketManager): IO[Unit] = {
-    // Get current game state
-    IO.fromOption(manager.getGameState)(new RuntimeException(s"No game state for room $roomId"))
-      .flatMap { state =>
-        // Only update if game is in progress
-        if (state.roundPhase == "action") {
-          // only tick down players who haven’t acted yet
-          val p1 = if (state.player1.hasActed) state.player1
-          else state.player1.copy(remainingTime = state.player1.remainingTime - 1)
-
-          val p2 = if (state.player2.hasActed) state.player2
-          else state.player2.copy(remainingTime = state.player2.remainingTime - 1)
-
-          val updatedState = state.copy(player1 = p1, player2 = p2)
-          
-          // Check if time is up
-          if (updatedState.player1.remainingTime <= 0) {
-            handleTimeUp(roomId, updatedState.player1.playerId, manager, updatedState)
-          }
-          else if (updatedState.player2.remainingTime <= 0) {
-            handleTimeUp(roomId, updatedState.player2.playerId, manager, updatedState)
-          }
-          else {
-            // Just update the time
-            manager.broadcastGameState(updatedState)
-          }
-        } else {
-          IO.unit
-        }
+  private def tickRoom(roomId: String, deadline: Long): IO[Unit] =
+    Routes.battleRooms.get(roomId) match {
+      case Some(manager) =>
+        manager.tick(deadline)
+          .handleErrorWith(error => IO(logger.error(s"Error updating room $roomId: ${error.getMessage}")))
+      case None =>
+        IO.unit
+    }
+
+  /** 一次倒计时的结果 */
+  sealed trait TickOutcome
+  /** 不在行动阶段，或双方都已行动、倒计时暂停 */
+  case object Unchanged extends TickOutcome
+  case class Countdown(state: GameState) extends TickOutcome
+  case class TimedOut(state: GameState, result: GameOverResult) extends TickOutcome
+
+  /**
+   * 对房间状态扣一次倒计时，只扣还没行动的玩家；有玩家时间耗尽时对局结束
+   */
+  def tickState(roomId: String, state: GameState): TickOutcome = {
+    // Only update if game is in progress
+    if (state.roundPhase != "action" || (state.player1.hasActed && state.player2.hasActed)) {
+      Unchanged
+    } else {
+      // only tick down players who haven’t acted yet
+      val p1 = if (state.player1.hasActed) state.player1
+      else state.player1.copy(remainingTime = state.player1.remainingTime - 1)
+
+      val p2 = if (state.player2.hasActed) state.player2
+      else state.player2.copy(remainingTime = state.player2.remainingTime - 1)
+
+      val updatedState = state.copy(player1 = p1, player2 = p2)
+
+      // Check if time is up
+      if (updatedState.player1.remainingTime <= 0) {
+        timeUp(roomId, updatedState.player1.playerId, updatedState)
+      }
+      else if (updatedState.player2.remainingTime <= 0) {
+        timeUp(roomId, updatedState.player2.playerId, updatedState)
       }
-      .handleErrorWith { error =>
-        IO(logger.error(s"Error updating room $roomId: ${error.getMessage}"))
+      else {
+        // Just update the time
+        Countdown(updatedState)
       }
+    }
   }
-  
+
   /**
    * Handle time up for a round
    */
-  private def handleTimeUp(roomId: String, playerId: String, manager: BattleWebSocketManager, state: GameState): IO[Unit] = {
-    // Check if game is already finished to avoid duplicate messages
-    if (state.roundPhase == "finished") {
-      logger.warn(s"Room $roomId: Player $playerId timed out but game is already finished.")
-      IO.unit
+  private def timeUp(roomId: String, playerId: String, state: GameState): TickOutcome = {
+    val winnerName = if (state.player1.playerId == playerId) {
+      state.player2.username
     } else {
-      IO { 
-        val winnerName = if (state.player1.playerId == playerId) {
-          state.player2.username
-        } else {
-          state.player1.username
-        }
-        val reason = s"${if (state.player1.playerId == playerId) state.player1.username else state.player2.username}未采取行动"
-
-        val gameOverState = state.copy(
-          roundPhase = "finished"
-        )
-        val gameOverResult = GameOverResult(
-          winner = winnerName,
-          reason = reason,
-          rewards = Some(Json.obj(
-            "stones" -> Json.fromInt(10),
-            "rankChange" -> Json.fromInt(5)
-          )),
-        )
-
-        // First update the manager's internal state
-        manager.updateGameState(gameOverState)
-        
-        // Then broadcast the game over message
-        logger.info(s"Room $roomId: Player $playerId timed out. Winner: ${gameOverResult.winner}, Reason: ${gameOverResult.reason}")
-        manager.broadcast(manager.WebSocketMessage("game_over", gameOverResult.asJson))
-      }
+      state.player1.username
     }
+    val reason = s"${if (state.player1.playerId == playerId) state.player1.username else state.player2.username}未采取行动"
+
+    val gameOverResult = GameOverResult(
+      winner = winnerName,
+      reason = reason,
+      rewards = Some(Json.obj(
+        "stones" -> Json.fromInt(10),
+        "rankChange" -> Json.fromInt(5)
+      )),
+    )
+
+    logger.info(s"Room $roomId: Player $playerId timed out. Winner: ${gameOverResult.winner}, Reason: ${gameOverResult.reason}")
+    TimedOut(state.copy(roundPhase = "finished"), gameOverResult)
   }
-}
\ No newline at end of file
+}
@@ -0,0 +1,288 @@
+package Utils
+
+import Objects.BattleService._
+import Objects.BattleService.core._
+import Utils.gamecore.{BattleConstants, BattleResolver}
+import cats.effect.IO
+import cats.implicits._
+import org.slf4j.LoggerFactory
+
+import java.lang.management.ManagementFactory
+import java.util.SplittableRandom
+
+/**
+ * 离线对战模拟器
+ * 不经过 WebSocket 和数据库，直接用 GameObjectRegistry 中的对象反复调用 BattleResolver，
+ * 覆盖爆点、主动对主动、主动对被动、被动对被动和卡牌效果的完整结算流程
+ * 用于测量结算吞吐（回合/秒、每回合分配的内存）和统计各行动的胜率
+ *
+ * 行动描述语法：
+ *  - "Cake"                     单个被动对象或主动对象
+ *  - "Sa+Sa+Tin"                主动行动，同名对象叠加
+ *  - "object_defense:Sa"        针对某个主动对象的对象防御
+ *  - "action_defense:Sa+Tin"    针对某个主动行动的行动防御
+ */
+object BattleSimulator {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /** 单局回合上限，超过后记为未分胜负并开始下一局 */
+  val MaxRoundsPerGame: Int = 200
+
+  val Player1 = "player1"
+  val Player2 = "player2"
+
+  /** 模拟玩家的卡组：穿透、发育、反弹各一张 */
+  private val simulatedCards: List[CardState] = List(
+    CardState("sim-penetrate", "模拟穿透", "穿透", "rare", 0.15),
+    CardState("sim-develop", "模拟发育", "发育", "rare", 0.15),
+    CardState("sim-reflect", "模拟反弹", "反弹", "rare", 0.15)
+  )
+
+  /**
+   * 解析后的行动
+   * @param label 原始描述
+   * @param action 被动或主动行动
+   */
+  final case class ActionSpec(label: String, action: Either[PassiveAction, ActiveAction]) {
+    /** 能量不足时使用会爆点：主动行动需要足够的能量，盾需要能量大于 0 */
+    def affordable(energy: Int): Boolean = action match {
+      case Right(active) => active.getTotalEnergyCost <= energy
+      case Left(passive) => passive.passiveObject.baseClass != BaseClass.Shield || energy > 0
+    }
+  }
+
+  /**
+   * 出招策略
+   * random：每回合在当前能量用得起的行动中均匀随机选择（用不起时才会爆点）
+   * scripted：按顺序循环使用给定的行动，不检查能量
+   */
+  final case class Strategy(mode: String, specs: Vector[ActionSpec]) {
+    def choose(energy: Int, roundIndex: Int, rng: SplittableRandom): Int =
+      if (mode == "scripted") roundIndex % specs.size
+      else {
+        var affordableCount = 0
+        var i = 0
+        while (i < specs.size) {
+          if (specs(i).affordable(energy)) affordableCount += 1
+          i += 1
+        }
+        if (affordableCount == 0) rng.nextInt(specs.size)
+        else {
+          var pick = rng.nextInt(affordableCount)
+          var index = 0
+          while (pick > 0 || !specs(index).affordable(energy)) {
+            if (specs(index).affordable(energy)) pick -= 1
+            index += 1
+          }
+          index
+        }
+      }
+  }
+
+  /**
+   * 解析一条行动描述
+   */
+  def parseSpec(label: String): Either[String, ActionSpec] = {
+    def activeAction(names: String): Either[String, ActiveAction] = {
+      val counts = names.split('+').map(_.trim).filter(_.nonEmpty).groupBy(identity).map { case (name, occurrences) => name -> occurrences.length }
+      if (counts.isEmpty) Left(s"行动 $label 中没有对象")
+      else ActiveObjectManager.createActiveAction(counts).left.map(_.message)
+    }
+
+    label.split(':').map(_.trim) match {
+      case Array("object_defense", target) =>
+        for {
+          targetObject <- ActiveObjectManager.createActiveObject(target).left.map(_.message)
+          action <- PassiveObjectManager.createPassiveObjectSmart("ObjectDefense", Some("object_defense"), Some(targetObject), None).left.map(_.message)
+        } yield ActionSpec(label, Left(action))
+      case Array("action_defense", target) =>
+        for {
+          targetAction <- activeAction(target)
+          action <- PassiveObjectManager.createPassiveObjectSmart("ActionDefense", Some("action_defense"), None, Some(targetAction)).left.map(_.message)
+        } yield ActionSpec(label, Left(action))
+      case Array(names) if !names.contains('+') && GameObjectRegistry.passiveAction(names).isRight =>
+        GameObjectRegistry.passiveAction(names).left.map(_.message).map(action => ActionSpec(label, Left(action)))
+      case Array(names) =>
+        activeAction(names).map(action => ActionSpec(label, Right(action)))
+      case _ =>
+        Left(s"无法解析行动 $label")
+    }
+  }
+
+  /**
+   * 默认行动集合：注册表中的全部被动对象、每个主动对象单独使用，以及针对每个主动对象的对象防御
+   */
+  def defaultSpecs: List[String] = {
+    val snapshot = GameObjectRegistry.snapshot
+    val passives = snapshot.passiveActions.collect { case (name, Right(_)) => name }.toList.sorted
+    val actives = snapshot.activeObjects.collect { case (name, Right(_)) => name }.toList.sorted
+    passives ++ actives ++ actives.map(name => s"object_defense:$name")
+  }
+
+  /**
+   * 构建策略；actions 为空时使用默认行动集合
+   */
+  def buildStrategy(mode: String, actions: List[String]): Either[String, Strategy] =
+    for {
+      _ <- if (mode == "random" || mode == "scripted") Right(()) else Left(s"未知策略 $mode，只支持 random 和 scripted")
+      labels = if (actions.isEmpty) defaultSpecs else actions
+      _ <- if (labels.isEmpty) Left("没有可用的行动，战斗对象注册表可能尚未载入") else Right(())
+      specs <- labels.traverse(parseSpec)
+    } yield Strategy(mode, specs.toVector)
+
+  /**
+   * 并行运行模拟
+   * @param totalRounds 总回合数，平均分给各个工作线程
+   * @param parallelism 工作线程数
+   * @param seed 随机种子；出招选择可复现，卡牌效果的触发使用 gamecore 自己的随机数，不受种子控制
+   */
+  def run(totalRounds: Int, parallelism: Int, player1: Strategy, player2: Strategy, seed: Option[Long]): IO[BattleSimulationResult] = {
+    val baseSeed = seed.getOrElse(System.nanoTime())
+    val quotas = (0 until parallelism).toList.map(i => totalRounds / parallelism + (if (i < totalRounds % parallelism) 1 else 0)).filter(_ > 0)
+    for {
+      start <- IO.monotonic
+      stats <- quotas.zipWithIndex.parTraverse { case (quota, worker) =>
+        IO.blocking(simulateWorker(quota, player1, player2, new SplittableRandom(baseSeed + worker)))
+      }
+      end <- IO.monotonic
+      result = summarize(stats.foldLeft(WorkerStats.empty(player1, player2))(_ merge _), (end - start).toMillis, player1, player2)
+      _ <- IO(logger.info(s"对战模拟完成: ${result.copy(actionUsage = Nil)}"))
+    } yield result
+  }
+
+  /**
+   * 单个工作线程的统计，使用数组计数避免在热路径上分配
+   */
+  private final class WorkerStats(player1Actions: Int, player2Actions: Int) {
+    var rounds = 0L
+    var games = 0L
+    var player1Wins = 0L
+    var player2Wins = 0L
+    var draws = 0L
+    var unfinished = 0L
+    var explosions = 0L
+    var cardEffects = 0L
+    /** -1 表示不支持统计 */
+    var allocatedBytes = 0L
+    val player1Uses = new Array[Long](player1Actions)
+    val player1WinningUses = new Array[Long](player1Actions)
+    val player2Uses = new Array[Long](player2Actions)
+    val player2WinningUses = new Array[Long](player2Actions)
+
+    def merge(other: WorkerStats): WorkerStats = {
+      rounds += other.rounds
+      games += other.games
+      player1Wins += other.player1Wins
+      player2Wins += other.player2Wins
+      draws += other.draws
+      unfinished += other.unfinished
+      explosions += other.explosions
+      cardEffects += other.cardEffects
+      allocatedBytes = if (allocatedBytes < 0 || other.allocatedBytes < 0) -1L else allocatedBytes + other.allocatedBytes
+      addInto(player1Uses, other.player1Uses)
+      addInto(player1WinningUses, other.player1WinningUses)
+      addInto(player2Uses, other.player2Uses)
+      addInto(player2WinningUses, other.player2WinningUses)
+      this
+    }
+  }
+
+  private object WorkerStats {
+    def empty(player1: Strategy, player2: Strategy): WorkerStats = new WorkerStats(player1.specs.size, player2.specs.size)
+  }
+
+  private def addInto(target: Array[Long], source: Array[Long]): Unit = {
+    var i = 0
+    while (i < target.length) {
+      target(i) += source(i)
+      i += 1
+    }
+  }
+
+  private def initialState(): GameState = GameState(
+    roomId = "simulation",
+    player1 = PlayerState(Player1, Player1, BattleConstants.INITIAL_HEALTH, 0, "simulated", simulatedCards),
+    player2 = PlayerState(Player2, Player2, BattleConstants.INITIAL_HEALTH, 0, "simulated", simulatedCards),
+    currentRound = 1,
+    roundPhase = "action"
+  )
+
+  private def simulateWorker(quota: Int, player1: Strategy, player2: Strategy, rng: SplittableRandom): WorkerStats = {
+    val stats = WorkerStats.empty(player1, player2)
+    val gameUses1 = new Array[Long](player1.specs.size)
+    val gameUses2 = new Array[Long](player2.specs.size)
+    val threadBean = ManagementFactory.getThreadMXBean match {
+      case bean: com.sun.management.ThreadMXBean if bean.isThreadAllocatedMemorySupported && bean.isThreadAllocatedMemoryEnabled => Some(bean)
+      case _ => None
+    }
+    val threadId = Thread.currentThread().getId
+    val allocatedBefore = threadBean.map(_.getThreadAllocatedBytes(threadId)).getOrElse(0L)
+
+    var state = initialState()
+    var roundInGame = 0
+
+    def endGame(): Unit = {
+      stats.games += 1
+      state.winner match {
+        case Some(Player1) => stats.player1Wins += 1; addInto(stats.player1WinningUses, gameUses1)
+        case Some(Player2) => stats.player2Wins += 1; addInto(stats.player2WinningUses, gameUses2)
+        case _ => if (state.roundPhase == "finished") stats.draws += 1 else stats.unfinished += 1
+      }
+      addInto(stats.player1Uses, gameUses1)
+      addInto(stats.player2Uses, gameUses2)
+      java.util.Arrays.fill(gameUses1, 0L)
+      java.util.Arrays.fill(gameUses2, 0L)
+      state = initialState()
+      roundInGame = 0
+    }
+
+    while (stats.rounds < quota) {
+      val index1 = player1.choose(state.player1.energy, roundInGame, rng)
+      val index2 = player2.choose(state.player2.energy, roundInGame, rng)
+      gameUses1(index1) += 1
+      gameUses2(index2) += 1
+      val action1 = BattleAction(player1.specs(index1).action, Player1, roundInGame.toLong)
+      val action2 = BattleAction(player2.specs(index2).action, Player2, roundInGame.toLong)
+      // 与房间中的流程一致：结算前双方已记录本回合行动（反弹效果依赖对手的 currentAction）
+      val acted = state.copy(
+        player1 = state.player1.copy(currentAction = Some(action1), hasActed = true),
+        player2 = state.player2.copy(currentAction = Some(action2), hasActed = true)
+      )
+      val (next, roundResult) = BattleResolver(acted, action1, action2)
+      stats.rounds += 1
+      stats.cardEffects += roundResult.cardEffects.size
+      if (roundResult.results.hcursor.get[Boolean]("exploded").getOrElse(false)) stats.explosions += 1
+      state = next
+      roundInGame += 1
+      if (state.roundPhase == "finished" || roundInGame >= MaxRoundsPerGame) endGame()
+    }
+    if (roundInGame > 0) endGame()
+
+    stats.allocatedBytes = threadBean.map(_.getThreadAllocatedBytes(threadId) - allocatedBefore).getOrElse(-1L)
+    stats
+  }
+
+  private def summarize(stats: WorkerStats, elapsedMillis: Long, player1: Strategy, player2: Strategy): BattleSimulationResult = {
+    def usage(player: String, strategy: Strategy, uses: Array[Long], winningUses: Array[Long]): List[ActionUsageStat] =
+      strategy.specs.indices.toList.map { i =>
+        ActionUsageStat(player, strategy.specs(i).label, uses(i), if (uses(i) == 0) 0.0 else winningUses(i) * 100.0 / uses(i))
+      }
+
+    BattleSimulationResult(
+      totalRounds = stats.rounds,
+      games = stats.games,
+      player1Wins = stats.player1Wins,
+      player2Wins = stats.player2Wins,
+      draws = stats.draws,
+      unfinishedGames = stats.unfinished,
+      averageRoundsPerGame = if (stats.games == 0) 0.0 else stats.rounds.toDouble / stats.games,
+      explosionRounds = stats.explosions,
+      cardEffectsTriggered = stats.cardEffects,
+      elapsedMillis = elapsedMillis,
+      roundsPerSecond = if (elapsedMillis == 0) 0.0 else stats.rounds * 1000.0 / elapsedMillis,
+      allocatedBytesPerRound = if (stats.allocatedBytes < 0 || stats.rounds == 0) -1.0 else stats.allocatedBytes.toDouble / stats.rounds,
+      actionUsage = usage(Player1, player1, stats.player1Uses, stats.player1WinningUses) ++
+        usage(Player2, player2, stats.player2Uses, stats.player2WinningUses)
+    )
+  }
+}
@@ -1,6 +1,5 @@
 package Utils
 
-import APIs.CardService.{CardTemplate, GetCardTemplateByIDMessage, LoadBattleDeckMessage}
 import cats.effect.*
 import cats.effect.std.Queue
 import cats.implicits.*
@@ -9,90 +8,50 @@ import io.circe.generic.auto.*
 import io.circe.syntax.*
 import org.http4s.websocket.WebSocketFrame
 import org.slf4j.LoggerFactory
-import scala.collection.concurrent.TrieMap
-import Common.API.{PlanContext, TraceID}
-import Objects.BattleService.{BattleAction, CardState, GameOverResult, GameState, PlayerState, RoundResult}
-import cats.effect.unsafe.implicits.global
-import scala.concurrent.duration.*
+import Objects.BattleService.{BattleAction, GameOverResult, GameState, PlayerState}
 import Utils.gamecore.BattleResolver
+import Process.Routes
+
+/**
+ * 一个对战房间
+ *
+ * 房间是一个单消费者的邮箱：连接、断开、准备、行动、计时、外部状态替换都以命令的形式入队，
+ * 由房间自己的 fiber 按顺序处理，房间状态（BattleRoomState）只在这个 fiber 里读写，推送由 BattleRoomPublisher 完成。
+ * 加载卡组等远程调用（BattlePlayerLoader）在单独的 fiber 里完成，结果再作为命令投回邮箱，不阻塞房间。
+ * 通过 BattleWebSocketManager.create 创建，start 之后才开始处理命令；
+ * 对局结束且所有玩家都断开后，房间把自己从 Routes.battleRooms 移除并取消计时，fiber 随之结束。
+ */
+class BattleWebSocketManager private (roomId: String, mailbox: Queue[IO, BattleRoomCommand]) {
+  import BattleRoomCommand.*
+  import BattleRoomPublisher.WebSocketMessage
 
-class BattleWebSocketManager(roomId: String) {
   private val logger = LoggerFactory.getLogger(getClass)
-  private val connections = TrieMap[String, Queue[IO, WebSocketFrame]]()
-  private val currentActions = TrieMap[String, BattleAction]()
-  private val playerReady = TrieMap[String, Boolean]()
-  private var gameState: Option[GameState] = None
 
-  def updateGameState(newState: GameState): Unit = {
-    gameState = Some(newState)
-  }
+  private val publisher = new BattleRoomPublisher(roomId)
+  import publisher.{broadcast, broadcastExcept, publishState, sendSnapshot}
 
-  private def getInitialCardList(playerId: String, userName: String): IO[List[String]] = {
-    implicit val planContext: PlanContext = PlanContext(TraceID(java.util.UUID.randomUUID().toString), 0)
-    LoadBattleDeckMessage(playerId).send.map { battleDeck =>
-      battleDeck
-    }.handleErrorWith { error =>
-      IO.pure(List(s"Error in getInitialCards of Player $playerId "))
-    }
-  }
+  // 最近一次处理完命令后的状态，只供外部只读查看
+  @volatile private var latestState: Option[GameState] = None
 
-  def addConnection(playerId: String, userName: String, queue: Queue[IO, WebSocketFrame]): IO[Unit] = {
-    for {
-      _ <- IO(connections.put(playerId, queue))
-      _ <- if (!gameState.exists(_.player1.playerId == playerId) && 
-               !gameState.exists(_.player2.playerId == playerId)) {
-        initializePlayerInGameStateIO(playerId, userName)
-      } else {
-        IO.unit
-      }
-      _ <- IO.sleep(100.milliseconds)
-      _ <- IO {
-        gameState.foreach { state =>
-          sendToPlayer(playerId, WebSocketMessage("game_state", state.asJson))
-        }
-      }
-      playerJoinedMessage = WebSocketMessage(
-        "player_joined", 
-        Json.obj(
-          "playerId" -> Json.fromString(playerId),
-          "username" -> Json.fromString(userName)
-        )
-      )
-      _ <- IO(broadcastExcept(playerJoinedMessage, playerId))
-    } yield ()
-  }
+  // 最近一次处理完命令后的连接，只供 /metrics 查看
+  @volatile private var latestConnections: Map[String, Queue[IO, WebSocketFrame]] = Map.empty
 
-  def removeConnection(playerId: String): IO[Unit] = IO {
-    connections.remove(playerId)
-    currentActions.remove(playerId)
-    playerReady.remove(playerId)
-    val playerLeftMessage = WebSocketMessage("player_left", Json.obj("playerId" -> Json.fromString(playerId)))
-    broadcast(playerLeftMessage)
-    gameState.foreach { state =>
-      val updatedState = if (state.player1.playerId == playerId) {
-        state.copy(player1 = state.player1.copy(isConnected = false))
-      } else if (state.player2.playerId == playerId) {
-        state.copy(player2 = state.player2.copy(isConnected = false))
-      } else {
-        state
-      }
-      gameState = Some(updatedState)
-      broadcastGameState(updatedState)
-    }
-  }
+  /** 启动房间的命令处理 fiber */
+  def start: IO[Unit] = loop(BattleRoomState.empty).start.void
 
-  def recordPlayerAction(playerId: String, action: BattleAction): IO[Unit] = IO {
-    currentActions.put(playerId, action)
-    gameState.foreach { state =>
-      if (state.player1.playerId == playerId) {
-        gameState = Some(state.copy(player1 = state.player1.copy(hasActed = true, currentAction = Some(action))))
-      } else if (state.player2.playerId == playerId) {
-        gameState = Some(state.copy(player2 = state.player2.copy(hasActed = true, currentAction = Some(action))))
-      }
-    }
-  }
-  
-  def parseAndRecordPlayerAction(playerId: String, jsonStr: String)(using PlanContext): IO[Unit] = {
+  def addConnection(playerId: String, userName: String, queue: Queue[IO, WebSocketFrame]): IO[Unit] =
+    mailbox.offer(Connect(playerId, userName, queue))
+
+  def removeConnection(playerId: String): IO[Unit] =
+    mailbox.offer(Disconnect(playerId))
+
+  def recordPlayerAction(playerId: String, action: BattleAction): IO[Unit] =
+    mailbox.offer(RecordAction(playerId, action))
+
+  /**
+   * 解析玩家行动后交给房间记录；双方都提交后房间会立即结算本回合
+   */
+  def parseAndRecordPlayerAction(playerId: String, jsonStr: String): IO[Unit] = {
     for {
       actionResult <- BattleActionManager.parseActionJson(jsonStr)
       _ <- actionResult match {
@@ -102,178 +61,220 @@ class BattleWebSocketManager(roomId: String) {
     } yield ()
   }
 
-  def setPlayerReady(playerId: String): IO[Unit] = IO {
-    playerReady.put(playerId, true)
-    gameState.foreach { state =>
-      val updatedState = if (state.player1.playerId == playerId) {
-        state.copy(player1 = state.player1.copy(isReady = true))
-      } else if (state.player2.playerId == playerId) {
-        state.copy(player2 = state.player2.copy(isReady = true))
-      } else {
-        state
-      }
-      gameState = Some(updatedState)
-      broadcast(WebSocketMessage("game_state", updatedState.asJson))
-    }
-    checkAndStartGame
-  }
+  def setPlayerReady(playerId: String): IO[Unit] =
+    mailbox.offer(Ready(playerId))
+
+  /** 用外部给出的状态替换房间状态并推送 */
+  def broadcastGameState(state: GameState): IO[Unit] =
+    mailbox.offer(ReplaceState(state))
+
+  /** 客户端发现 seq 不连续时请求重新发送快照 */
+  def resendSnapshot(playerId: String): IO[Unit] =
+    mailbox.offer(Resync(playerId))
+
+  /**
+   * 由 BattleRoomTicker 调用，只把一次倒计时投进邮箱，不等待处理
+   * 房间处理完后如果仍在行动阶段，由房间自己按 deadline 顺延下一次计时，所以同一房间最多只有一个 Tick 在途
+   * @param deadline 本次计时的到期时间（epoch 毫秒）
+   */
+  def tick(deadline: Long): IO[Unit] =
+    mailbox.offer(Tick(deadline))
 
-  def checkAndProcessActions: IO[Unit] = {
-    if (currentActions.size >= 2) {
-      gameState match {
-        case Some(state) =>
-          val player1Id = state.player1.playerId
-          val player2Id = state.player2.playerId
-          (currentActions.get(player1Id), currentActions.get(player2Id)) match {
-            case (Some(action1), Some(action2)) =>
-              currentActions.clear()
-              processActions(player1Id, action1, player2Id, action2)
+  def getGameState: Option[GameState] = latestState
+
+  /** 玩家ID -> 发送队列 */
+  def connectionQueues: Map[String, Queue[IO, WebSocketFrame]] = latestConnections
+
+  /** 邮箱中尚未处理的命令数 */
+  def mailboxDepth: IO[Int] = mailbox.size
+
+  private def loop(state: BattleRoomState): IO[Unit] =
+    mailbox.take.flatMap { command =>
+      handle(state, command).handleErrorWith { error =>
+        IO(logger.error(s"Room $roomId failed to handle ${command.getClass.getSimpleName}: ${error.getMessage}")) >>
+          (command match {
+            case Tick(deadline) => rescheduleIfActive(state, deadline)
             case _ => IO.unit
-          }
-        case None => IO.unit
+          }).as(state)
       }
-    } else {
-      IO.unit
+    }.flatMap { next =>
+      IO {
+        latestState = next.gameState
+        latestConnections = next.connections
+      } >> closeIfAbandoned(next).ifM(IO.unit, loop(next))
     }
-  }
 
-  private def processActions(player1Id: String, action1: BattleAction, player2Id: String, action2: BattleAction): IO[Unit] = {
-    implicit val planContext: PlanContext = PlanContext(TraceID(java.util.UUID.randomUUID().toString), 0)
-    for {
-      stateBeforeBattleOpt <- IO(gameState)
-      _ <- if (stateBeforeBattleOpt.isEmpty) { IO.unit } else IO.unit
-      result <- stateBeforeBattleOpt match {
-        case Some(stateBeforeBattle) =>
-          val (updatedGameState, roundResult) = BattleResolver(stateBeforeBattle, action1, action2)
-          IO {
-            gameState = Some(updatedGameState)
-            broadcast(WebSocketMessage("game_state", updatedGameState.asJson))
-            broadcast(WebSocketMessage("round_result", roundResult.asJson))
-          }
-        case None => IO.unit
+  /**
+   * 对局已结束、所有玩家都已断开且邮箱里没有新命令时，把房间从 Routes.battleRooms 移除并取消计时
+   * @return 房间已关闭，命令处理 fiber 应当结束
+   */
+  private def closeIfAbandoned(state: BattleRoomState): IO[Boolean] =
+    if (state.connections.isEmpty && state.gameState.exists(_.roundPhase == "finished")) {
+      mailbox.size.flatMap { pending =>
+        if (pending > 0) IO.pure(false)
+        else IO(Routes.battleRooms.remove(roomId, this)) >> BattleRoomTicker.cancel(roomId) >>
+          IO(logger.info(s"Room $roomId finished and all players left, removed")).as(true)
       }
-      _ <- checkGameOver
-    } yield ()
-  }
+    } else IO.pure(false)
 
-  private def checkGameOver: IO[Unit] = {
-    IO {
-      gameState.foreach { state =>
-        if (state.player1.health <= 0 || state.player2.health <= 0) {
-          val winnerName = if (state.player1.health <= 0 ) { state.player2.username } else { state.player1.username }
-          val reason = "health_zero"
-          val gameOverResult = GameOverResult(winner = winnerName, reason = reason, rewards = Some(Json.obj("stones" -> Json.fromInt(10), "rankChange" -> Json.fromInt(5))))
-          val updatedState = state.copy(roundPhase = "finished", winner = Some(winnerName))
-          gameState = Some(updatedState)
-          broadcast(WebSocketMessage("game_state", updatedState.asJson))
-          broadcast(WebSocketMessage("game_over", gameOverResult.asJson))
+  private def handle(state: BattleRoomState, command: BattleRoomCommand): IO[BattleRoomState] = command match {
+    case Connect(playerId, userName, queue) =>
+      val withConnection = state.copy(connections = state.connections + (playerId -> queue))
+      val isKnownPlayer = state.gameState.exists(s => s.player1.playerId == playerId || s.player2.playerId == playerId)
+      val playerJoinedMessage = WebSocketMessage(
+        "player_joined",
+        Json.obj(
+          "playerId" -> Json.fromString(playerId),
+          "username" -> Json.fromString(userName)
+        )
+      )
+      for {
+        // 先给新连接一份快照，之后的增量都以它为基准
+        _ <- sendSnapshot(withConnection, playerId)
+        _ <- broadcastExcept(withConnection, playerJoinedMessage, playerId)
+        next <- if (isKnownPlayer || state.loading.contains(playerId)) {
+          IO.pure(withConnection)
+        } else {
+          BattlePlayerLoader.load(roomId, playerId, userName)
+            .flatMap { case (player, loaded) => mailbox.offer(PlayerLoaded(playerId, player, loaded)) }
+            .start
+            .as(withConnection.copy(loading = withConnection.loading + playerId))
         }
-      }
-    }
-  }
-
-  private def ChooseEffect(rarity: String): Double = {
-    rarity match {
-      case "普通" => 0.05
-      case "稀有" => 0.15
-      case "传说" => 0.99
-      case _ => 0.1
-    }
-  }
-
-  private def ConvertCardTemplateToBattleCard(card: CardTemplate): CardState = {
-    CardState(cardId = card.cardID, name = card.cardName, `type` = card.description, rarity = card.rarity, effectChance = ChooseEffect(card.rarity))
-  }
+      } yield next
 
-  private def initializePlayerInGameStateIO(playerId: String, userName: String): IO[Unit] = {
-    implicit val planContext: PlanContext = PlanContext(TraceID(java.util.UUID.randomUUID().toString), 0)
-    (for {
-      initialCardList <- getInitialCardList(playerId, userName)
-      card1 <- GetCardTemplateByIDMessage(initialCardList.head).send
-      card1_battle = ConvertCardTemplateToBattleCard(card1)
-      card2 <- GetCardTemplateByIDMessage(initialCardList(1)).send
-      card2_battle = ConvertCardTemplateToBattleCard(card2)
-      card3 <- GetCardTemplateByIDMessage(initialCardList(2)).send
-      card3_battle = ConvertCardTemplateToBattleCard(card3)
-      _ <- IO {
-        val newPlayerState = PlayerState(playerId = playerId, username = userName, health = 6, energy = 0, rank = "黑铁", cards = List(card1_battle, card2_battle, card3_battle), isReady = false, isConnected = true)
-        gameState match {
-          case Some(state) =>
-            if (state.player1.playerId.nonEmpty && state.player1.playerId != playerId && state.player2.playerId.isEmpty) {
-              val updatedState = state.copy(player2 = newPlayerState)
-              gameState = Some(updatedState)
-              broadcast(WebSocketMessage("game_state", updatedState.asJson))
-            }
-          case None =>
-            val newState = GameState(roomId = roomId, player1 = newPlayerState, player2 = PlayerState(playerId = "", username = "Waiting for opponent...", health = 6, energy = 0, rank = "", cards = List(), isConnected = false), currentRound = 1, roundPhase = "waiting", winner = None)
-            gameState = Some(newState)
-            broadcast(WebSocketMessage("game_state", newState.asJson))
-        }
+    case PlayerLoaded(playerId, player, loaded) =>
+      val base = state.copy(loading = state.loading - playerId)
+      state.gameState match {
+        case Some(current) =>
+          if (current.player1.playerId.nonEmpty && current.player1.playerId != playerId && current.player2.playerId.isEmpty) {
+            publishState(base, current.copy(player2 = player))
+          } else {
+            IO.pure(base)
+          }
+        case None if loaded =>
+          val newState = GameState(roomId = roomId, player1 = player, player2 = PlayerState(playerId = "", username = "Waiting for opponent...", health = 6, energy = 0, rank = "", cards = List(), isConnected = false), currentRound = 1, roundPhase = "waiting", winner = None)
+          publishState(base, newState)
+        case None =>
+          IO.pure(base)
       }
-    } yield ()).handleErrorWith { error =>
-      IO {
-        val newPlayerState = PlayerState(playerId = playerId, username = s"Error initializing player $playerId in room $roomId from backend", health = 6, energy = 0, rank = "黑铁", cards = List(), isReady = false, isConnected = true)
-        gameState match {
-          case Some(state) =>
-            if (state.player1.playerId.nonEmpty && state.player1.playerId != playerId && state.player2.playerId.isEmpty) {
-              val updatedState = state.copy(player2 = newPlayerState)
-              gameState = Some(updatedState)
-              broadcast(WebSocketMessage("game_state", updatedState.asJson))
+
+    case Disconnect(playerId) =>
+      val remaining = state.copy(connections = state.connections - playerId, currentActions = state.currentActions - playerId)
+      val playerLeftMessage = WebSocketMessage("player_left", Json.obj("playerId" -> Json.fromString(playerId)))
+      for {
+        _ <- broadcast(remaining, playerLeftMessage)
+        next <- remaining.gameState match {
+          case Some(current) =>
+            val updated = if (current.player1.playerId == playerId) {
+              current.copy(player1 = current.player1.copy(isConnected = false))
+            } else if (current.player2.playerId == playerId) {
+              current.copy(player2 = current.player2.copy(isConnected = false))
+            } else {
+              current
             }
-          case None =>
+            publishState(remaining, updated)
+          case None => IO.pure(remaining)
         }
+      } yield next
+
+    case RecordAction(playerId, action) =>
+      val recorded = state.copy(currentActions = state.currentActions + (playerId -> action))
+      val withAction = recorded.gameState match {
+        case Some(current) if current.player1.playerId == playerId =>
+          recorded.copy(gameState = Some(current.copy(player1 = current.player1.copy(hasActed = true, currentAction = Some(action)))))
+        case Some(current) if current.player2.playerId == playerId =>
+          recorded.copy(gameState = Some(current.copy(player2 = current.player2.copy(hasActed = true, currentAction = Some(action)))))
+        case _ => recorded
       }
-    }
-  }
-  
-  private def checkAndStartGame: Unit = {
-    gameState.foreach { state =>
-      if (state.player1.isReady && state.player2.isReady) {
-        val updatedState = state.copy(roundPhase = "action", player1 = state.player1.copy(remainingTime = 3000, hasActed = false), player2 = state.player2.copy(remainingTime = 3000, hasActed = false))
-        gameState = Some(updatedState)
-        broadcastGameState(updatedState)
+      processActionsIfComplete(withAction)
+
+    case Ready(playerId) =>
+      state.gameState match {
+        case Some(current) =>
+          val updated = if (current.player1.playerId == playerId) {
+            current.copy(player1 = current.player1.copy(isReady = true))
+          } else if (current.player2.playerId == playerId) {
+            current.copy(player2 = current.player2.copy(isReady = true))
+          } else {
+            current
+          }
+          publishState(state, updated).flatMap(startGameIfReady)
+        case None => IO.pure(state)
       }
-    }
-  }
 
-  def broadcastGameState(state: GameState): IO[Unit] = IO {
-    gameState = Some(state)
-    broadcast(WebSocketMessage("game_state", state.asJson))
-  }
+    case Tick(deadline) =>
+      val next = state.gameState match {
+        case Some(current) =>
+          BattleRoomTicker.tickState(roomId, current) match {
+            case BattleRoomTicker.Countdown(updated) =>
+              publishState(state, updated)
+            case BattleRoomTicker.TimedOut(updated, result) =>
+              publishState(state, updated).flatTap(next => broadcast(next, WebSocketMessage("game_over", result.asJson)) >> BattleRoomTicker.cancel(roomId))
+            case BattleRoomTicker.Unchanged =>
+              IO.pure(state)
+          }
+        case None => IO.pure(state)
+      }
+      next.flatTap(after => rescheduleIfActive(after, deadline))
 
-  def broadcast(message: WebSocketMessage): Unit = {
-    val jsonMessage = message.asJson.noSpaces
-    connections.foreach { case (playerId, queue) =>
-      queue.offer(WebSocketFrame.Text(jsonMessage)).attempt.unsafeRunSync() match {
-        case Right(_) => 
-        case Left(error) => connections.remove(playerId)
+    case ReplaceState(newState) =>
+      publishState(state, newState).flatTap { _ =>
+        if (newState.roundPhase == "action") BattleRoomTicker.ensureScheduled(roomId) else BattleRoomTicker.cancel(roomId)
       }
-    }
+
+    case Resync(playerId) =>
+      sendSnapshot(state, playerId).as(state)
   }
 
-  private def broadcastExcept(message: WebSocketMessage, exceptPlayerId: String): Unit = {
-    val jsonMessage = message.asJson.noSpaces
-    connections.foreach { case (playerId, queue) =>
-      if (playerId != exceptPlayerId) {
-        queue.offer(WebSocketFrame.Text(jsonMessage)).attempt.unsafeRunSync() match {
-          case Right(_) => 
-          case Left(error) => connections.remove(playerId)
+  /** 处理完一次 Tick 后仍在行动阶段时，从本次到期时间顺延一个 TickInterval */
+  private def rescheduleIfActive(state: BattleRoomState, deadline: Long): IO[Unit] =
+    if (state.gameState.exists(_.roundPhase == "action")) BattleRoomTicker.scheduleNext(roomId, deadline) else IO.unit
+
+  /** 双方行动都已提交时结算本回合 */
+  private def processActionsIfComplete(state: BattleRoomState): IO[BattleRoomState] =
+    state.gameState match {
+      case Some(current) =>
+        (state.currentActions.get(current.player1.playerId), state.currentActions.get(current.player2.playerId)) match {
+          case (Some(action1), Some(action2)) =>
+            val (updatedGameState, roundResult) = BattleResolver(current, action1, action2)
+            for {
+              published <- publishState(state.copy(currentActions = Map.empty), updatedGameState)
+              _ <- broadcast(published, WebSocketMessage("round_result", roundResult.asJson))
+              _ <- if (updatedGameState.roundPhase == "action") BattleRoomTicker.ensureScheduled(roomId) else IO.unit
+              next <- checkGameOver(published)
+            } yield next
+          case _ => IO.pure(state)
         }
-      }
+      case None => IO.pure(state)
     }
-  }
 
-  private def sendToPlayer(playerId: String, message: WebSocketMessage): Unit = {
-    val jsonMessage = message.asJson.noSpaces
-    connections.get(playerId).foreach { queue =>
-      queue.offer(WebSocketFrame.Text(jsonMessage)).attempt.unsafeRunSync() match {
-        case Right(_) => 
-        case Left(error) => connections.remove(playerId)
-      }
+  private def checkGameOver(state: BattleRoomState): IO[BattleRoomState] =
+    state.gameState match {
+      case Some(current) if current.player1.health <= 0 || current.player2.health <= 0 =>
+        val winnerName = if (current.player1.health <= 0 ) { current.player2.username } else { current.player1.username }
+        val reason = "health_zero"
+        val gameOverResult = GameOverResult(winner = winnerName, reason = reason, rewards = Some(Json.obj("stones" -> Json.fromInt(10), "rankChange" -> Json.fromInt(5))))
+        for {
+          next <- publishState(state, current.copy(roundPhase = "finished", winner = Some(winnerName)))
+          _ <- broadcast(next, WebSocketMessage("game_over", gameOverResult.asJson))
+          // 对局结束，不再需要倒计时
+          _ <- BattleRoomTicker.cancel(roomId)
+        } yield next
+      case _ => IO.pure(state)
     }
-  }
 
-  def getGameState: Option[GameState] = gameState
-  def getPlayerAction(playerId: String): Option[BattleAction] = currentActions.get(playerId)
-  case class WebSocketMessage(`type`: String, data: Json)
+  private def startGameIfReady(state: BattleRoomState): IO[BattleRoomState] =
+    state.gameState match {
+      case Some(current) if current.player1.isReady && current.player2.isReady =>
+        val updatedState = current.copy(roundPhase = "action", player1 = current.player1.copy(remainingTime = 3000, hasActed = false), player2 = current.player2.copy(remainingTime = 3000, hasActed = false))
+        publishState(state, updatedState).flatTap(_ => BattleRoomTicker.ensureScheduled(roomId))
+      case _ => IO.pure(state)
+    }
+}
+
+object BattleWebSocketManager {
+
+  /** 创建房间，调用方放入 Routes.battleRooms 成功后再 start */
+  def create(roomId: String): IO[BattleWebSocketManager] =
+    Queue.unbounded[IO, BattleRoomCommand].map(mailbox => new BattleWebSocketManager(roomId, mailbox))
 }
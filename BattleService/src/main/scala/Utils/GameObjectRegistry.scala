@@ -0,0 +1,86 @@
+package Utils
+
+import Objects.BattleService.core._
+import cats.effect.IO
+import cats.implicits._
+import org.slf4j.LoggerFactory
+import Common.API.PlanContext
+import Utils.ObjectCreationError._
+import Process.InitGameData
+
+/**
+ * 战斗对象注册表
+ * active_objects_table 和 passive_objects_table 是静态的游戏数据，启动时一次读入，构建成不可变的快照；
+ * 解析玩家行动时只在内存中查找，不再访问数据库。修改表数据后由管理员触发 reload 替换快照
+ */
+object GameObjectRegistry {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /**
+   * 一份完整的注册表
+   * @param activeObjects 对象名 -> 主动对象（记录有误时为错误）
+   * @param passiveActions 对象名 -> 被动行动（记录有误时为错误）
+   * @param version 第几次载入，从 1 开始
+   * @param loadedAt 载入时间（毫秒）
+   */
+  final case class Snapshot(
+    activeObjects: Map[String, Either[ObjectCreationError, AttackObject]],
+    passiveActions: Map[String, Either[ObjectCreationError, PassiveAction]],
+    version: Long,
+    loadedAt: Long
+  ) {
+    def summary: String = {
+      val invalid = activeObjects.values.count(_.isLeft) + passiveActions.values.count(_.isLeft)
+      s"版本 $version：主动对象 ${activeObjects.size} 个，被动对象 ${passiveActions.size} 个，无效记录 $invalid 条"
+    }
+  }
+
+  @volatile private var current: Snapshot = Snapshot(Map.empty, Map.empty, 0L, 0L)
+
+  def snapshot: Snapshot = current
+
+  def activeObject(objectName: String): Either[ObjectCreationError, AttackObject] =
+    current.activeObjects.getOrElse(objectName, Left(ObjectNotFoundError(objectName)))
+
+  def passiveAction(objectName: String): Either[ObjectCreationError, PassiveAction] =
+    current.passiveActions.getOrElse(objectName, Left(ObjectNotFoundError(objectName)))
+
+  /**
+   * 用 InitGameData 中的内置对象定义构建快照，不访问数据库；供离线模拟和压测使用
+   */
+  def loadBuiltins(): Snapshot = {
+    val activeObjects = InitGameData.activeObjects.map { case (name, baseClass, attackType, damage, defense, energyCost, description) =>
+      name -> ActiveObjectManager.createActiveObjectFromRecord(
+        ActiveObjectManager.ActiveObjectRecord(name, baseClass, attackType, damage, defense, energyCost, description)
+      )
+    }.toMap
+    val passiveActions = InitGameData.passiveObjects.map { case (name, objectType, baseClass, energyGain, damageMultiplier, shieldMultiplier, targetTypes, description) =>
+      name -> PassiveObjectManager.createPassiveObjectFromRecord(
+        PassiveObjectManager.PassiveObjectRecord(name, objectType, baseClass, energyGain, damageMultiplier, shieldMultiplier, Some(targetTypes), description)
+      )
+    }.toMap
+    synchronized {
+      current = Snapshot(activeObjects, passiveActions, current.version + 1, System.currentTimeMillis())
+      current
+    }
+  }
+
+  /**
+   * 从数据库重新载入并整体替换快照；读取失败时抛出错误，保留原来的快照
+   */
+  def reload(using PlanContext): IO[Snapshot] =
+    for {
+      (activeObjects, passiveActions) <- (ActiveObjectManager.loadActiveObjects, PassiveObjectManager.loadPassiveActions).parTupled
+      loadedAt <- IO.realTime.map(_.toMillis)
+      next <- IO {
+        synchronized {
+          current = Snapshot(activeObjects, passiveActions, current.version + 1, loadedAt)
+          current
+        }
+      }
+      _ <- (activeObjects.values ++ passiveActions.values).toList.collect { case Left(error) => error }.traverse_ { error =>
+        IO(logger.warn(s"战斗对象记录无效: ${error.message}"))
+      }
+      _ <- IO(logger.info(s"战斗对象注册表已载入，${next.summary}"))
+    } yield next
+}
@@ -0,0 +1,80 @@
+package Utils
+
+import Objects.BattleService.{GameState, PlayerState}
+import io.circe.{Encoder, Json, JsonObject}
+import io.circe.syntax._
+
+import scala.collection.mutable.ListBuffer
+
+/**
+ * 对战状态增量编码
+ *
+ * 协议：
+ *  - 加入房间或客户端请求 state_resync 时发送全量快照 {"type":"game_state","seq":n,"data":GameState}
+ *  - 之后每次状态变化只发送变化的字段 {"type":"game_state_patch","seq":n,"data":{...}}
+ *  - patch 中 player1/player2 只包含变化的玩家字段，其余字段整体替换；值为 null 表示该字段变为空
+ *  - 客户端只在 seq 恰好是上一次的 seq + 1 时应用 patch，否则发送 state_resync 重新拉取快照
+ */
+object GameStateDelta {
+
+  /**
+   * 计算 prev 到 next 变化的字段，没有变化时返回空对象
+   */
+  def diff(prev: GameState, next: GameState): JsonObject = {
+    if (prev eq next) JsonObject.empty
+    else {
+      val fields = ListBuffer.empty[(String, Json)]
+      field(fields, "roomId", prev.roomId, next.roomId)
+      playerField(fields, "player1", prev.player1, next.player1)
+      playerField(fields, "player2", prev.player2, next.player2)
+      field(fields, "currentRound", prev.currentRound, next.currentRound)
+      field(fields, "roundPhase", prev.roundPhase, next.roundPhase)
+      field(fields, "winner", prev.winner, next.winner)
+      JsonObject.fromIterable(fields)
+    }
+  }
+
+  /** 全量快照消息 */
+  def snapshotMessage(state: GameState, seq: Long): String =
+    Json.obj(
+      "type" -> Json.fromString("game_state"),
+      "seq" -> Json.fromLong(seq),
+      "data" -> state.asJson
+    ).noSpaces
+
+  /** 增量消息 */
+  def patchMessage(changes: JsonObject, seq: Long): String =
+    Json.obj(
+      "type" -> Json.fromString("game_state_patch"),
+      "seq" -> Json.fromLong(seq),
+      "data" -> Json.fromJsonObject(changes)
+    ).noSpaces
+
+  private def playerField(fields: ListBuffer[(String, Json)], name: String, prev: PlayerState, next: PlayerState): Unit =
+    if (!(prev eq next)) {
+      // 换了一个玩家（例如第二名玩家加入）时直接发送整个玩家状态
+      if (prev.playerId != next.playerId) fields += name -> next.asJson
+      else {
+        val changes = playerDiff(prev, next)
+        if (changes.nonEmpty) fields += name -> Json.fromJsonObject(changes)
+      }
+    }
+
+  private def playerDiff(prev: PlayerState, next: PlayerState): JsonObject = {
+    val fields = ListBuffer.empty[(String, Json)]
+    field(fields, "username", prev.username, next.username)
+    field(fields, "health", prev.health, next.health)
+    field(fields, "energy", prev.energy, next.energy)
+    field(fields, "rank", prev.rank, next.rank)
+    field(fields, "cards", prev.cards, next.cards)
+    field(fields, "isReady", prev.isReady, next.isReady)
+    field(fields, "currentAction", prev.currentAction, next.currentAction)
+    field(fields, "isConnected", prev.isConnected, next.isConnected)
+    field(fields, "remainingTime", prev.remainingTime, next.remainingTime)
+    field(fields, "hasActed", prev.hasActed, next.hasActed)
+    JsonObject.fromIterable(fields)
+  }
+
+  private def field[A: Encoder](fields: ListBuffer[(String, Json)], name: String, prev: A, next: A): Unit =
+    if (prev != next) fields += name -> next.asJson
+}
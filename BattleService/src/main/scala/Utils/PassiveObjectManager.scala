@@ -6,17 +6,16 @@ import io.circe.{Decoder, Encoder, Json}
 import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
 import io.circe.syntax._
 import cats.effect.IO
-import cats.implicits._  // 添加这个导入
 import org.slf4j.LoggerFactory
 import Common.API.PlanContext
-import Common.DBAPI.{readDBJsonOptional, writeDB, decodeField, decodeType}  // 修正导入
+import Common.DBAPI.{readDBRows, decodeField}
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import Utils.ObjectCreationError._
 
 /**
  * 被动对象管理器
- * 负责从数据库创建和管理被动对象，支持动态创建ObjectDefense和ActionDefense
+ * 负责把数据库记录转换为被动对象，创建时从 GameObjectRegistry 查找，支持动态创建ObjectDefense和ActionDefense
  */
 object PassiveObjectManager {
   private val logger = LoggerFactory.getLogger(getClass)
@@ -29,38 +28,29 @@ object PassiveObjectManager {
     defenseType: Option[String] = None,
     targetObject: Option[AttackObject] = None,
     targetAction: Option[ActiveAction] = None
-  )(using PlanContext): IO[Either[ObjectCreationError, PassiveAction]] = {
+  ): Either[ObjectCreationError, PassiveAction] = {
     
-    logger.info(s"智能创建被动对象: $objectName, defenseType: $defenseType")
+    if (logger.isDebugEnabled) logger.debug(s"智能创建被动对象: $objectName, defenseType: $defenseType")
     
     // 如果是防御类型，直接创建临时对象
     defenseType match {
       case Some("object_defense") =>
-        IO.pure(createObjectDefenseTemporarily(objectName, targetObject))
+        createObjectDefenseTemporarily(objectName, targetObject)
       
       case Some("action_defense") =>
-        IO.pure(createActionDefenseTemporarily(objectName, targetAction))
+        createActionDefenseTemporarily(objectName, targetAction)
       
       case _ =>
-        // 否则从数据库查找
-        createPassiveObjectFromDB(objectName)
+        // 否则从注册表查找
+        createPassiveObject(objectName)
     }
   }
 
   /**
-   * 从数据库安全地创建被动对象
+   * 从对象注册表创建被动对象
    */
-  def createPassiveObjectFromDB(objectName: String)(using PlanContext): IO[Either[ObjectCreationError, PassiveAction]] = {
-    for {
-      recordOpt <- fetchPassiveObjectRecord(objectName)
-      result <- recordOpt match {
-        case Some(record) => 
-          IO.pure(createPassiveObjectFromRecord(record))
-        case None => 
-          IO.pure(Left(ObjectNotFoundError(objectName)))
-      }
-    } yield result
-  }
+  def createPassiveObject(objectName: String): Either[ObjectCreationError, PassiveAction] =
+    GameObjectRegistry.passiveAction(objectName)
 
   /**
    * 创建被动行动 - 使用工厂方法
@@ -110,22 +100,18 @@ object PassiveObjectManager {
   }
 
   /**
-   * 从数据库获取被动对象记录
+   * 读取 passive_objects_table 的全部记录并转换成被动行动，供 GameObjectRegistry 构建注册表
+   * @return 对象名 -> 创建结果，记录本身有误时保留对应的错误
    */
-  private def fetchPassiveObjectRecord(objectName: String)(using PlanContext): IO[Option[PassiveObjectRecord]] = {
-    readDBJsonOptional(  // 使用 readDBJsonOptional 而不是 readDB
+  def loadPassiveActions(using PlanContext): IO[Map[String, Either[ObjectCreationError, PassiveAction]]] = {
+    readDBRows(
       s"""
       SELECT object_name, object_type, base_class, energy_gain, damage_multiplier, 
              shield_multiplier, target_attack_types, description
       FROM $schemaName.passive_objects_table
-      WHERE object_name = ?
       """,
-      List(SqlParameter("String", objectName))
-    ).map(_.map(convertJsonToPassiveRecord))
-     .handleErrorWith { error =>
-       logger.error(s"Database error fetching passive object $objectName: ${error.getMessage}")
-       IO.pure(None)
-     }
+      List()
+    ).map(_.map(convertJsonToPassiveRecord).map(record => record.objectName -> createPassiveObjectFromRecord(record)).toMap)
   }
 
   /**
@@ -151,7 +137,7 @@ object PassiveObjectManager {
   /**
    * 从记录创建被动对象
    */
-  private def createPassiveObjectFromRecord(record: PassiveObjectRecord): Either[ObjectCreationError, PassiveAction] = {
+  def createPassiveObjectFromRecord(record: PassiveObjectRecord): Either[ObjectCreationError, PassiveAction] = {
     for {
       baseClass <- createBaseClass(record.baseClass)
       passiveObject <- record.objectType.toLowerCase match {
@@ -0,0 +1,32 @@
+package Utils
+
+import APIs.UserService.ValidateUserTokenMessage
+import Common.API.{PlanContext, TraceID, UnexpectedStatusException}
+import Common.TokenCache
+import cats.effect.IO
+import org.slf4j.LoggerFactory
+
+import java.util.UUID
+
+/**
+ * WebSocket 握手用的 usertoken -> userID 缓存，淘汰规则见 TokenCache
+ * UserService 的登出、换发和封禁事件不会通知到这里，所以只靠较短的 TTL 控制过期；
+ * 验证失败的 token 不缓存
+ */
+object UserTokenCache extends TokenCache[String](ttlMillis = 60 * 1000L, maxEntries = 5000)(userID => userID) {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /**
+   * 返回 token 对应的 userID；缓存未命中时向 UserService 验证
+   * UserService 以 4xx 拒绝时返回 None；连接失败、5xx、熔断和超时原样抛出，不当作验证失败
+   */
+  def validate(userToken: String): IO[Option[String]] =
+    if (userToken.isEmpty) IO.pure(None)
+    else {
+      given PlanContext = PlanContext(TraceID(UUID.randomUUID().toString), 0)
+      getOrLoad(userToken)(ValidateUserTokenMessage(userToken).send).map(Option(_)).recoverWith {
+        case UnexpectedStatusException(statusCode, body) if statusCode >= 400 && statusCode < 500 =>
+          IO(logger.warn(s"usertoken 验证失败: ${statusCode} ${body}")).as(None)
+      }
+    }
+}
@@ -20,7 +20,7 @@ def resolveSameObjectSingleActions(single1: SingleAction, single2: SingleAction)
   val stack2 = single2.getTotalStackCount
   val diff = stack1 - stack2
   
-  logger.info(s"同对象单一行动对比: P1:${stack1}层, P2:${stack2}层, 差值:${diff}")
+  debugLog(logger, s"同对象单一行动对比: P1:${stack1}层, P2:${stack2}层, 差值:${diff}")
   
   if (diff > 0) {
     // player1 有优势
@@ -40,7 +40,7 @@ def resolveSameObjectSingleActions(single1: SingleAction, single2: SingleAction)
     (baseDamage * (-diff), 0)
   } else {
     // 平衡
-    logger.info("双方层数相同，无伤害")
+    debugLog(logger, "双方层数相同，无伤害")
     (0, 0)
   }
 }
@@ -54,7 +54,7 @@ def resolveMixedActions(active1: ActiveAction, active2: ActiveAction): (Int, Int
   val p1Defense = active1.getTotalDefense
   val p2Defense = active2.getTotalDefense
   
-  logger.info(s"混合行动对比: P1攻击${p1TotalAttack}/防御${p1Defense}, P2攻击${p2TotalAttack}/防御${p2Defense}")
+  debugLog(logger, s"混合行动对比: P1攻击${p1TotalAttack}/防御${p1Defense}, P2攻击${p2TotalAttack}/防御${p2Defense}")
   
   (math.max(0, p2TotalAttack - p1Defense), math.max(0, p1TotalAttack - p2Defense))
 }
@@ -75,14 +75,14 @@ def resolveEnergyActiveVSActive(
   active2: ActiveAction,
   roundNumber: Int
 ): (PlayerState, PlayerState, Json) = {
-  logger.info(s"解决主动vs主动能量变化")
+  debugLog(logger, s"解决主动vs主动能量变化")
   
   try {
     // 步骤1: 计算能量消耗
     val p1EnergyChange = -active1.getTotalEnergyCost
     val p2EnergyChange = -active2.getTotalEnergyCost
     
-    logger.info(s"能量消耗: P1:${active1.getTotalEnergyCost}, P2:${active2.getTotalEnergyCost}")
+    debugLog(logger, s"能量消耗: P1:${active1.getTotalEnergyCost}, P2:${active2.getTotalEnergyCost}")
     
     // 步骤2: 使用纯函数式方法更新能量
     val p1Final = modifyPlayerEnergy(p1EnergyChange)(player1)
@@ -124,23 +124,23 @@ def resolveDamageActiveVSActive(
   active2: ActiveAction,
   roundNumber: Int
 ): (PlayerState, PlayerState, Json) = {
-  logger.info(s"解决主动vs主动伤害计算")
+  debugLog(logger, s"解决主动vs主动伤害计算")
   
   try {
     // 计算伤害
     val (p1Damage, p2Damage) = (active1, active2) match {
       // 双方都是单一行动且为同对象
       case (single1: SingleAction, single2: SingleAction) if single1.isSameObjectAs(single2) =>
-        logger.info("双方都是同对象单一行动")
+        debugLog(logger, "双方都是同对象单一行动")
         resolveSameObjectSingleActions(single1, single2)
       
       // 其他情况都是混合行动处理
       case _ =>
-        logger.info("混合行动处理")
+        debugLog(logger, "混合行动处理")
         resolveMixedActions(active1, active2)
     }
     
-    logger.info(s"伤害计算结果: P1受到${p1Damage}伤害, P2受到${p2Damage}伤害")
+    debugLog(logger, s"伤害计算结果: P1受到${p1Damage}伤害, P2受到${p2Damage}伤害")
     
     // 使用纯函数式方法更新健康值
     val p1Final = modifyPlayerHealth(-p1Damage)(player1)
@@ -31,25 +31,25 @@ def resolveEnergyActiveVSPassive(
   isPlayer1Active: Boolean,
   roundNumber: Int
 ): (PlayerState, PlayerState, Json) = {
-  logger.info(s"解决主动vs被动能量变化: ${if (isPlayer1Active) "P1主动P2被动" else "P1被动P2主动"}")
+  debugLog(logger, s"解决主动vs被动能量变化: ${if (isPlayer1Active) "P1主动P2被动" else "P1被动P2主动"}")
   try {
     // 被动方的能量变化
     val passiveEnergyChange = passive.passiveObject match {
       case cake: CakeObject => 
-        logger.info(s"饼类被动，能量增益: ${cake.energyGain}")
+        debugLog(logger, s"饼类被动，能量增益: ${cake.energyGain}")
         cake.energyGain
       case _: ShieldObject => 
         val passivePlayer = if (isPlayer1Active) player2 else player1
         val energyLoss = passivePlayer.energy
-        logger.info(s"盾类被动，消耗所有能量: ${energyLoss}")
+        debugLog(logger, s"盾类被动，消耗所有能量: ${energyLoss}")
         -energyLoss
       case _ => 
-        logger.info("其他被动类型，无能量变化")
+        debugLog(logger, "其他被动类型，无能量变化")
         0
     }
     // 主动方消耗能量
     val activeEnergyChange = -active.getTotalEnergyCost
-    logger.info(s"主动方消耗能量: ${active.getTotalEnergyCost}")
+    debugLog(logger, s"主动方消耗能量: ${active.getTotalEnergyCost}")
     // 根据谁是主动方分配能量变化
     val (p1EnergyChange, p2EnergyChange) = if (isPlayer1Active) {
       (activeEnergyChange, passiveEnergyChange)
@@ -96,11 +96,11 @@ def resolveDamageActiveVSPassive(
   isPlayer1Active: Boolean,
   roundNumber: Int
 ): (PlayerState, PlayerState, Json) = {
-  logger.info(s"解决主动vs被动伤害计算: ${if (isPlayer1Active) "P1主动P2被动" else "P1被动P2主动"}")
+  debugLog(logger, s"解决主动vs被动伤害计算: ${if (isPlayer1Active) "P1主动P2被动" else "P1被动P2主动"}")
   try {
     // 计算伤害
     val (passiveDamage, activeDamage) = PassiveDamageCalculator.calculateDamage(active, passive)
-    logger.info(s"伤害计算: 被动方受到${passiveDamage}伤害, 主动方受到${activeDamage}伤害")
+    debugLog(logger, s"伤害计算: 被动方受到${passiveDamage}伤害, 主动方受到${activeDamage}伤害")
     // 根据谁是主动方分配伤害
     val (p1Damage, p2Damage) = if (isPlayer1Active) {
       (activeDamage, passiveDamage) // P1是主动方，P2是被动方
@@ -20,13 +20,13 @@ private val logger = LoggerFactory.getLogger(classOf[GameState])
  */
 def getEnergyDealer(player1Action: BattleAction, player2Action: BattleAction): GameState => GameState = {
   gameState => {
-    logger.info(s"处理第${gameState.currentRound}轮能量变化")
+    debugLog(logger, s"处理第${gameState.currentRound}轮能量变化")
     
     // 根据action类型处理能量消耗和获取
     (player1Action.Action, player2Action.Action) match {
       // 双方都被动
       case (Left(passive1), Left(passive2)) =>
-        logger.info("能量处理: 双方都是被动行动")
+        debugLog(logger, "能量处理: 双方都是被动行动")
         val (p1, p2, _) = resolveEnergyPassiveVSPassive(
           gameState.player1, gameState.player2, passive1, passive2, gameState.currentRound
         )
@@ -34,7 +34,7 @@ def getEnergyDealer(player1Action: BattleAction, player2Action: BattleAction): G
       
       // 双方都主动
       case (Right(active1), Right(active2)) =>
-        logger.info("能量处理: 双方都是主动行动")
+        debugLog(logger, "能量处理: 双方都是主动行动")
         val (p1, p2, _) = resolveEnergyActiveVSActive(
           gameState.player1, gameState.player2, active1, active2, gameState.currentRound
         )
@@ -42,7 +42,7 @@ def getEnergyDealer(player1Action: BattleAction, player2Action: BattleAction): G
       
       // 玩家1主动，玩家2被动
       case (Right(active), Left(passive)) =>
-        logger.info("能量处理: 玩家1主动，玩家2被动")
+        debugLog(logger, "能量处理: 玩家1主动，玩家2被动")
         val (p1, p2, _) = resolveEnergyActiveVSPassive(
           gameState.player1, gameState.player2, active, passive, isPlayer1Active = true, gameState.currentRound
         )
@@ -50,7 +50,7 @@ def getEnergyDealer(player1Action: BattleAction, player2Action: BattleAction): G
       
       // 玩家1被动，玩家2主动
       case (Left(passive), Right(active)) =>
-        logger.info("能量处理: 玩家1被动，玩家2主动")
+        debugLog(logger, "能量处理: 玩家1被动，玩家2主动")
         val (p1, p2, _) = resolveEnergyActiveVSPassive(
           gameState.player1, gameState.player2, active, passive, isPlayer1Active = false, gameState.currentRound
         )
@@ -67,13 +67,13 @@ def getEnergyDealer(player1Action: BattleAction, player2Action: BattleAction): G
  */
 def getDamageDealer(player1Action: BattleAction, player2Action: BattleAction): GameState => GameState = {
   gameState => {
-    logger.info(s"处理第${gameState.currentRound}轮伤害计算")
+    debugLog(logger, s"处理第${gameState.currentRound}轮伤害计算")
     
     // 根据action类型处理战斗伤害
     (player1Action.Action, player2Action.Action) match {
       // 双方都被动
       case (Left(passive1), Left(passive2)) =>
-        logger.info("伤害处理: 双方都是被动行动")
+        debugLog(logger, "伤害处理: 双方都是被动行动")
         val (p1, p2, battleResultJson) = resolveDamagePassiveVSPassive(
           gameState.player1, gameState.player2, passive1, passive2, gameState.currentRound
         )
@@ -81,7 +81,7 @@ def getDamageDealer(player1Action: BattleAction, player2Action: BattleAction): G
       
       // 双方都主动
       case (Right(active1), Right(active2)) =>
-        logger.info("伤害处理: 双方都是主动行动")
+        debugLog(logger, "伤害处理: 双方都是主动行动")
         val (p1, p2, battleResultJson) = resolveDamageActiveVSActive(
           gameState.player1, gameState.player2, active1, active2, gameState.currentRound
         )
@@ -89,7 +89,7 @@ def getDamageDealer(player1Action: BattleAction, player2Action: BattleAction): G
       
       // 玩家1主动，玩家2被动
       case (Right(active), Left(passive)) =>
-        logger.info("伤害处理: 玩家1主动，玩家2被动")
+        debugLog(logger, "伤害处理: 玩家1主动，玩家2被动")
         val (p1, p2, battleResultJson) = resolveDamageActiveVSPassive(
           gameState.player1, gameState.player2, active, passive, isPlayer1Active = true, gameState.currentRound
         )
@@ -97,7 +97,7 @@ def getDamageDealer(player1Action: BattleAction, player2Action: BattleAction): G
       
       // 玩家1被动，玩家2主动
       case (Left(passive), Right(active)) =>
-        logger.info("伤害处理: 玩家1被动，玩家2主动")
+        debugLog(logger, "伤害处理: 玩家1被动，玩家2主动")
         val (p1, p2, battleResultJson) = resolveDamageActiveVSPassive(
           gameState.player1, gameState.player2, active, passive, isPlayer1Active = false, gameState.currentRound
         )
@@ -106,6 +106,70 @@ def getDamageDealer(player1Action: BattleAction, player2Action: BattleAction): G
   }
 }
 
+/**
+ * 计算一名玩家本回合的能量变化（未截断到 0）
+ * 能量只取决于自己的行动：主动行动消耗总能量，饼获得能量，盾消耗全部能量
+ * @param action 该玩家的行动
+ * @param player 结算前的玩家状态
+ */
+def resolveEnergyChange(action: Either[PassiveAction, ActiveAction], player: PlayerState): Int = {
+  action match {
+    case Right(active) => -active.getTotalEnergyCost
+    case Left(passive) => calculatePassiveEnergyChange(passive, player)
+  }
+}
+
+/**
+ * 计算本回合双方的能量变化，与 getEnergyDealer 的规则相同，但只返回数值
+ * 与各 resolveEnergy* 一样，解析出错时记录日志，双方能量都不变
+ * @return (玩家1的能量变化, 玩家2的能量变化)
+ */
+def resolveRoundEnergyChange(player1Action: BattleAction, player2Action: BattleAction, player1: PlayerState, player2: PlayerState): (Int, Int) = {
+  try {
+    (resolveEnergyChange(player1Action.Action, player1), resolveEnergyChange(player2Action.Action, player2))
+  } catch {
+    case e: Exception =>
+      logger.error("能量变化解析过程中出现错误", e)
+      (0, 0)
+  }
+}
+
+/**
+ * 计算本回合双方受到的行动伤害，与 getDamageDealer 的规则相同，但只返回数值
+ * 与各 resolveDamage* 一样，计算出错时记录日志，双方都不受伤害
+ * @return (玩家1受到的伤害, 玩家2受到的伤害)
+ */
+def resolveRoundDamage(player1Action: BattleAction, player2Action: BattleAction): (Int, Int) = {
+  try {
+    resolveRoundDamageUnguarded(player1Action, player2Action)
+  } catch {
+    case e: Exception =>
+      logger.error("伤害计算过程中出现错误", e)
+      (0, 0)
+  }
+}
+
+private def resolveRoundDamageUnguarded(player1Action: BattleAction, player2Action: BattleAction): (Int, Int) = {
+  (player1Action.Action, player2Action.Action) match {
+    case (Left(_), Left(_)) =>
+      (0, 0)
+
+    case (Right(single1: SingleAction), Right(single2: SingleAction)) if single1.isSameObjectAs(single2) =>
+      resolveSameObjectSingleActions(single1, single2)
+
+    case (Right(active1), Right(active2)) =>
+      resolveMixedActions(active1, active2)
+
+    case (Right(active), Left(passive)) =>
+      val (passiveDamage, activeDamage) = PassiveDamageCalculator.calculateDamage(active, passive)
+      (activeDamage, passiveDamage)
+
+    case (Left(passive), Right(active)) =>
+      val (passiveDamage, activeDamage) = PassiveDamageCalculator.calculateDamage(active, passive)
+      (passiveDamage, activeDamage)
+  }
+}
+
 /**
  * 组合多个游戏状态处理函数
  * @param handlers 要组合的处理函数列表
@@ -11,52 +11,66 @@ import io.circe.syntax._
 import scala.util.Random
 import Utils.gamecore.{clearPlayerEnergy, modifyPlayerEnergy, modifyPlayerHealth}
 
-def BattleResolver(gameState: GameState, player1Action: BattleAction, player2Action: BattleAction): (GameState,RoundResult)= {
-  val logger = LoggerFactory.getLogger(getClass)
+private val resolverLogger = LoggerFactory.getLogger("Utils.gamecore.BattleResolver")
 
-  // 记录战斗前的状态
-  val stateBeforeBattle: GameState = gameState
+/**
+ * 结算一个回合
+ * 能量、行动伤害、卡牌效果和扣血清能量都在 RoundTally 的四个数值上依次完成，
+ * 结束后只生成一次最终的 PlayerState / GameState 和 RoundResult
+ */
+def BattleResolver(gameState: GameState, player1Action: BattleAction, player2Action: BattleAction): (GameState,RoundResult)= {
+  debugLog(resolverLogger, s"开始解决第${gameState.currentRound}轮战斗")
 
   // 检查爆点
-  val explosionResult: ExplosionHandler.ExplosionResult = {
-    logger.info(s"开始解决第${gameState.currentRound}轮战斗")
+  val explosionResult: ExplosionHandler.ExplosionResult =
     ExplosionHandler.checkExplosions(gameState, player1Action, player2Action)
-  }
- 
-  // 基于爆点结果的初始玩家状态
-  val initialUpdatedPlayers: (PlayerState, PlayerState) = {
-    (explosionResult.updatedPlayer1, explosionResult.updatedPlayer2)
-  }
 
   if (!explosionResult.hasExploded) {
-    val playerEnergyDealer = getEnergyDealer(player1Action,player2Action)
-    val gameState1 = playerEnergyDealer(gameState)
-    
-    val playerDamageDealer = getDamageDealer(player1Action,player2Action)
-    val gameState2 = playerDamageDealer(gameState1)
-    
+    val player1 = gameState.player1
+    val player2 = gameState.player2
+
+    // 能量变化
+    val (player1EnergyChange, player2EnergyChange) = resolveRoundEnergyChange(player1Action, player2Action, player1, player2)
+    val tally = new RoundTally(
+      health1 = player1.health,
+      energy1 = math.max(0, player1.energy + player1EnergyChange),
+      health2 = player2.health,
+      energy2 = math.max(0, player2.energy + player2EnergyChange)
+    )
+
+    // 行动伤害
+    val (player1Damage, player2Damage) = resolveRoundDamage(player1Action, player2Action)
+    tally.damage(isPlayer1 = true, player1Damage)
+    tally.damage(isPlayer1 = false, player2Damage)
+
     // 应用卡牌效果
-    val cardEffectResult = Utils.gamecore.processCardEffects(gameState2)
-    val gameState3 = cardEffectResult.updatedGameState
-    val cardEffects = cardEffectResult.triggeredEffects
-    
+    val cardEffects = applyRoundCardEffects(gameState, tally)
+
     // 检查是否有扣血，如果有则清零能量
-    val gameState3WithEnergyReset = resetEnergyIfDamaged(gameState, gameState3)
-    
-    val gameState4 = updateGameState(gameState3WithEnergyReset)
-    
-    val roundResult = getRoundResult(gameState, gameState4, player1Action, player2Action, cardEffects)
-    
-    val gameState5 = determineGameStatus(gameState4)
+    if (tally.health1 < player1.health || tally.health2 < player2.health) {
+      debugLog(resolverLogger, "检测到有玩家受到伤害，清零双方能量")
+      tally.energy1 = 0
+      tally.energy2 = 0
+    }
+
+    val roundResult = RoundResult(
+      gameState.currentRound,
+      player1Action,
+      player2Action,
+      results = roundResultJson(
+        tally.health1 - player1.health, tally.energy1 - player1.energy,
+        tally.health2 - player2.health, tally.energy2 - player2.energy
+      ),
+      cardEffects = cardEffects
+    )
 
-    (gameState5, roundResult)
+    (finishRound(gameState, tally.writeBackPlayer1(player1), tally.writeBackPlayer2(player2)), roundResult)
     
   } else {
-    logger.info("检测到爆点，跳过正常结算")
-    val gameStateupdated = updateGameState(gameState)
-    val gameStatefinal = determineGameStatus(gameStateupdated)
-    
-    
+    debugLog(resolverLogger, "检测到爆点，跳过正常结算")
+    // 爆点玩家按 ExplosionHandler 的结果扣血，与返回给客户端的 results 一致
+    val gameStatefinal = finishRound(gameState, explosionResult.updatedPlayer1, explosionResult.updatedPlayer2)
+
     val roundResult = RoundResult(
       round = gameState.currentRound,
       player1Action = player1Action,
@@ -68,6 +82,56 @@ def BattleResolver(gameState: GameState, player1Action: BattleAction, player2Act
   }
 }
 
+/**
+ * 回合结算过程中的双方数值
+ * 结算的每一步只修改这四个数，最后再写回 PlayerState，避免每一步复制整个 GameState
+ */
+final class RoundTally(var health1: Int, var energy1: Int, var health2: Int, var energy2: Int) {
+  def energy(isPlayer1: Boolean): Int = if (isPlayer1) energy1 else energy2
+
+  def setEnergy(isPlayer1: Boolean, value: Int): Unit =
+    if (isPlayer1) energy1 = value else energy2 = value
+
+  def damage(isPlayer1: Boolean, amount: Int): Unit =
+    if (isPlayer1) health1 -= amount else health2 -= amount
+
+  def writeBackPlayer1(player: PlayerState): PlayerState =
+    if (player.health == health1 && player.energy == energy1) player else player.copy(health = health1, energy = energy1)
+
+  def writeBackPlayer2(player: PlayerState): PlayerState =
+    if (player.health == health2 && player.energy == energy2) player else player.copy(health = health2, energy = energy2)
+
+  def writeBack(gameState: GameState): GameState =
+    gameState.copy(player1 = writeBackPlayer1(gameState.player1), player2 = writeBackPlayer2(gameState.player2))
+}
+
+object RoundTally {
+  def of(gameState: GameState): RoundTally =
+    new RoundTally(gameState.player1.health, gameState.player1.energy, gameState.player2.health, gameState.player2.energy)
+}
+
+/**
+ * 合并 updateGameState 和 determineGameStatus：进入下一轮，并判断是否结束，只复制一次 GameState
+ */
+private def finishRound(gameState: GameState, player1: PlayerState, player2: PlayerState): GameState = {
+  if (player1.health <= 0 || player2.health <= 0) {
+    gameState.copy(
+      player1 = player1,
+      player2 = player2,
+      currentRound = gameState.currentRound + 1,
+      roundPhase = "finished",
+      winner = winnerOf(player1, player2)
+    )
+  } else {
+    gameState.copy(
+      player1 = player1.copy(currentAction = None, remainingTime = 60, hasActed = false),
+      player2 = player2.copy(currentAction = None, remainingTime = 60, hasActed = false),
+      currentRound = gameState.currentRound + 1,
+      roundPhase = "action" // 回合结束后进入下一轮"action"阶段
+    )
+  }
+}
+
 /**
  * 检查是否有玩家扣血，如果有则清零双方能量
  * @param stateBeforeBattle 战斗前的游戏状态
@@ -75,14 +139,12 @@ def BattleResolver(gameState: GameState, player1Action: BattleAction, player2Act
  * @return 处理后的游戏状态
  */
 def resetEnergyIfDamaged(stateBeforeBattle: GameState, stateAfterBattle: GameState): GameState = {
-  val logger = LoggerFactory.getLogger(getClass)
-  
   // 检查是否有玩家受到伤害
   val player1Damaged = stateAfterBattle.player1.health < stateBeforeBattle.player1.health
   val player2Damaged = stateAfterBattle.player2.health < stateBeforeBattle.player2.health
   
   if (player1Damaged || player2Damaged) {
-    logger.info("检测到有玩家受到伤害，清零双方能量")
+    debugLog(resolverLogger, "检测到有玩家受到伤害，清零双方能量")
     // 使用纯函数式方法清零双方能量
     stateAfterBattle.copy(
       player1 = clearPlayerEnergy(stateAfterBattle.player1),
@@ -99,19 +161,9 @@ def determineGameStatus(gameState: GameState): GameState = {
   val player2 = gameState.player2
 
   if (player1.health <= 0 || player2.health <= 0) {
-    val winner = if (player1.health <= 0 && player2.health <= 0) {
-      if (player1.health == player2.health) None // 平局
-      else if (player1.health > player2.health) Some(player1.username)
-      else Some(player2.username)
-    } else if (player1.health <= 0) {
-      Some(player2.username)
-    } else {
-      Some(player1.username)
-    }
-
     gameState.copy(
       roundPhase = "finished",
-      winner = winner
+      winner = winnerOf(player1, player2)
     ) 
   } else {
     gameState.copy(
@@ -120,6 +172,22 @@ def determineGameStatus(gameState: GameState): GameState = {
     ) // 继续游戏
   }
 }
+
+/**
+ * 至少一方血量归零时的胜者，双方同时归零且血量相同为平局
+ */
+private def winnerOf(player1: PlayerState, player2: PlayerState): Option[String] = {
+  if (player1.health <= 0 && player2.health <= 0) {
+    if (player1.health == player2.health) None // 平局
+    else if (player1.health > player2.health) Some(player1.username)
+    else Some(player2.username)
+  } else if (player1.health <= 0) {
+    Some(player2.username)
+  } else {
+    Some(player1.username)
+  }
+}
+
 def updateGameState(gameState: GameState): GameState = {
 
   gameState.copy(
@@ -145,16 +213,19 @@ def getRoundResult(
     stateBeforeBattle.currentRound,
     player1Action,
     player2Action,
-    results = Json.obj(
-      "player1" -> Json.obj(
-        "healthChange" -> Json.fromInt(player1HealthChange),
-        "energyChange" -> Json.fromInt(player1EnergyChange)
-      ),
-      "player2" -> Json.obj(
-        "healthChange" -> Json.fromInt(player2HealthChange),
-        "energyChange" -> Json.fromInt(player2EnergyChange)
-      )
-    ),
+    results = roundResultJson(player1HealthChange, player1EnergyChange, player2HealthChange, player2EnergyChange),
     cardEffects = cardEffects
   )
 }
+
+private def roundResultJson(player1HealthChange: Int, player1EnergyChange: Int, player2HealthChange: Int, player2EnergyChange: Int): Json =
+  Json.obj(
+    "player1" -> Json.obj(
+      "healthChange" -> Json.fromInt(player1HealthChange),
+      "energyChange" -> Json.fromInt(player1EnergyChange)
+    ),
+    "player2" -> Json.obj(
+      "healthChange" -> Json.fromInt(player2HealthChange),
+      "energyChange" -> Json.fromInt(player2EnergyChange)
+    )
+  )
@@ -2,7 +2,13 @@ package Utils.gamecore
 
 import Objects.BattleService._
 import Objects.BattleService.core._
-import org.slf4j.LoggerFactory
+import org.slf4j.{Logger, LoggerFactory}
+
+/**
+ * 结算过程的调试日志：每回合都会调用，先判断级别，关闭 debug 时不拼接消息
+ */
+inline def debugLog(logger: Logger, inline message: String): Unit =
+  if (logger.isDebugEnabled) logger.debug(message)
 
 /**
  * 战斗工具类
@@ -20,7 +26,7 @@ object BattleUtils {
     p2Damage: Int
   ): (PlayerState, PlayerState) = {
     if (p1Damage > 0 || p2Damage > 0) {
-      logger.info("有人扣血，双方能量清零")
+      debugLog(logger, "有人扣血，双方能量清零")
       (player1.clearEnergy(), player2.clearEnergy())
     } else {
       (player1, player2)
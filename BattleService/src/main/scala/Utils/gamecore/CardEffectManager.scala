@@ -30,7 +30,7 @@ case class CardEffectResult(
  * @return 应用卡牌效果后的游戏状态
  */
 def applyCardEffects(gameState: GameState): GameState = {
-  logger.info(s"开始应用卡牌效果")
+  debugLog(logger, s"开始应用卡牌效果")
   val result = processCardEffects(gameState)
   result.updatedGameState
 }
@@ -41,100 +41,76 @@ def applyCardEffects(gameState: GameState): GameState = {
  * @return 卡牌效果结果
  */
 def processCardEffects(gameState: GameState): CardEffectResult = {
-  // 分别处理玩家1和玩家2的卡牌效果
-  val player1EffectResult = processPlayerCards(gameState, isPlayer1 = true)
-  // 使用player1处理后的结果继续处理player2
-  val player2EffectResult = processPlayerCards(player1EffectResult.updatedGameState, isPlayer1 = false)
-  
-  // 合并两次处理的效果
+  val tally = RoundTally.of(gameState)
+  val triggeredEffects = applyRoundCardEffects(gameState, tally)
   CardEffectResult(
-    updatedGameState = player2EffectResult.updatedGameState,
-    triggeredEffects = player1EffectResult.triggeredEffects ++ player2EffectResult.triggeredEffects
+    updatedGameState = if (triggeredEffects.isEmpty) gameState else tally.writeBack(gameState),
+    triggeredEffects = triggeredEffects
   )
 }
 
 /**
- * 处理单个玩家的所有卡牌效果
- * @param gameState 当前游戏状态
- * @param isPlayer1 是否处理玩家1
- * @return 卡牌效果结果
+ * 在结算数值上依次应用双方的卡牌效果，先玩家1后玩家2，每张卡牌按顺序各掷一次概率
+ * @param gameState 提供卡牌和双方本回合行动
+ * @param tally 结算中的双方数值，原地修改
+ * @return 触发的卡牌效果
  */
-private def processPlayerCards(gameState: GameState, isPlayer1: Boolean): CardEffectResult = {
-  // 获取当前玩家和对手
-  val (player, opponent) = if (isPlayer1) {
-    (gameState.player1, gameState.player2)
-  } else {
-    (gameState.player2, gameState.player1)
-  }
-  
-  // 使用fold操作处理所有卡牌效果
-  val initial = CardEffectResult(gameState, List.empty[CardEffect])
-  
-  player.cards.foldLeft(initial) { (result, card) =>
+def applyRoundCardEffects(gameState: GameState, tally: RoundTally): List[CardEffect] = {
+  val player1Effects = applyPlayerCards(gameState.player1, gameState.player2, tally, isPlayer1 = true)
+  val player2Effects = applyPlayerCards(gameState.player2, gameState.player1, tally, isPlayer1 = false)
+  if (player2Effects.isEmpty) player1Effects
+  else if (player1Effects.isEmpty) player2Effects
+  else player1Effects ++ player2Effects
+}
+
+/**
+ * 应用单个玩家的所有卡牌效果
+ */
+private def applyPlayerCards(player: PlayerState, opponent: PlayerState, tally: RoundTally, isPlayer1: Boolean): List[CardEffect] = {
+  var triggered: List[CardEffect] = Nil
+  var cards = player.cards
+  while (cards.nonEmpty) {
+    val card = cards.head
     // 检查是否触发效果（基于概率）
     if (random.nextDouble() < card.effectChance) {
-      val effect = CardEffect(
+      debugLog(logger, s"玩家 ${player.username} 的卡牌 ${card.name} 触发效果: ${card.`type`}")
+      applyCardEffect(card, opponent, tally, isPlayer1)
+      triggered = CardEffect(
         playerId = player.playerId,
         cardName = card.name,
         effectType = card.`type`,
         triggered = true
-      )
-      logger.info(s"玩家 ${player.username} 的卡牌 ${card.name} 触发效果: ${card.`type`}")
-      
-      // 应用单个卡牌效果并更新结果
-      val updatedGameState = applyCardEffect(card, result.updatedGameState, isPlayer1)
-      CardEffectResult(
-        updatedGameState = updatedGameState,
-        triggeredEffects = result.triggeredEffects :+ effect
-      )
-    } else {
-      // 未触发效果，保持原状态
-      result
+      ) :: triggered
     }
+    cards = cards.tail
   }
+  if (triggered.isEmpty || triggered.tail.isEmpty) triggered else triggered.reverse
 }
 
 /**
  * 应用单个卡牌效果
  * @param card 要应用效果的卡牌
- * @param gameState 当前游戏状态
+ * @param opponent 对手（反弹效果依据对手本回合的行动）
+ * @param tally 结算中的双方数值
  * @param isPlayer1 是否为玩家1的卡牌
- * @return 更新后的游戏状态
  */
-private def applyCardEffect(card: CardState, gameState: GameState, isPlayer1: Boolean): GameState = {
-  // 获取当前玩家和对手
-  val (player, opponent) = if (isPlayer1) {
-    (gameState.player1, gameState.player2)
-  } else {
-    (gameState.player2, gameState.player1)
-  }
-  
+private def applyCardEffect(card: CardState, opponent: PlayerState, tally: RoundTally, isPlayer1: Boolean): Unit = {
   // 根据卡牌类型应用效果
-  val (updatedPlayer, updatedOpponent) = card.`type` match {
+  card.`type` match {
     case "穿透" => // 穿透效果：额外造成1点伤害
-      logger.info(s"应用穿透效果：${card.name}")
-      (player, opponent.takeDamage(1))
+      debugLog(logger, s"应用穿透效果：${card.name}")
+      tally.damage(!isPlayer1, 1)
       
     case "发育" => // 发育效果：获得1点能量
-      logger.info(s"应用发育效果：${card.name}")
-      val updatedPlayer = player.copy(energy = math.min(player.energy + 1, BattleConstants.MAX_ENERGY))
-      (updatedPlayer, opponent)
+      debugLog(logger, s"应用发育效果：${card.name}")
+      tally.setEnergy(isPlayer1, math.min(tally.energy(isPlayer1) + 1, BattleConstants.MAX_ENERGY))
       
     case "反弹" => // 反弹效果：对手受到其造成伤害的一部分反弹
-      logger.info(s"应用反弹效果：${card.name}")
-      val damageToReflect = calculateDamageToReflect(opponent.currentAction)
-      (player, opponent.takeDamage(damageToReflect))
+      debugLog(logger, s"应用反弹效果：${card.name}")
+      tally.damage(!isPlayer1, calculateDamageToReflect(opponent.currentAction))
       
     case _ =>
       logger.warn(s"未知卡牌效果类型：${card.`type`}")
-      (player, opponent)
-  }
-  
-  // 更新游戏状态
-  if (isPlayer1) {
-    gameState.copy(player1 = updatedPlayer, player2 = updatedOpponent)
-  } else {
-    gameState.copy(player1 = updatedOpponent, player2 = updatedPlayer)
   }
 }
 
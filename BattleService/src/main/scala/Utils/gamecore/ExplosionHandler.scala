@@ -11,6 +11,9 @@ import org.slf4j.LoggerFactory
  */
 object ExplosionHandler {
   private val logger = LoggerFactory.getLogger(getClass)
+
+  // 没有爆点时的结果每回合都相同，复用同一个 JSON
+  private val notExplodedJson: Json = Json.obj("exploded" -> Json.False)
   
   /**
    * 爆点结果
@@ -55,7 +58,7 @@ object ExplosionHandler {
         if (player2Exploded) player2.playerId else ""
       ).filter(_.nonEmpty)
       
-      logger.info(s"爆点玩家: ${explodedPlayers.mkString(", ")}")
+      debugLog(logger, s"爆点玩家: ${explodedPlayers.mkString(", ")}")
       
       // 更新玩家状态 - 爆点玩家扣3血
       val updatedPlayer1 = if (player1Exploded) player1.takeDamage(3) else player1
@@ -91,7 +94,7 @@ object ExplosionHandler {
         player2Exploded = false,
         updatedPlayer1 = player1,
         updatedPlayer2 = player2,
-        resultsJson = Json.obj("exploded" -> Json.False)
+        resultsJson = notExplodedJson
       )
     }
   }
@@ -51,7 +51,7 @@ object PassiveDamageCalculator {
                     totalAttack.getOrElse(AttackType.AntiAir, 0)
     val damage = (baseDamage * cake.damageMultiplier).toInt
     
-    logger.info(s"饼类被动伤害计算: 基础伤害${baseDamage} × 倍数${cake.damageMultiplier} = ${damage}")
+    debugLog(logger, s"饼类被动伤害计算: 基础伤害${baseDamage} × 倍数${cake.damageMultiplier} = ${damage}")
     (damage, 0)
   }
   
@@ -65,7 +65,7 @@ object PassiveDamageCalculator {
     }.values.sum
     val undefendedDamage = totalAttack.values.sum - defendedDamage
     
-    logger.info(s"攻击类型防御: 防御了${defendedDamage}伤害, 剩余${undefendedDamage}伤害")
+    debugLog(logger, s"攻击类型防御: 防御了${defendedDamage}伤害, 剩余${undefendedDamage}伤害")
     (undefendedDamage, 0)
   }
   
@@ -79,7 +79,7 @@ object PassiveDamageCalculator {
     val activeDamage = totalAttack.getOrElse(AttackType.Normal, 0) + 
                       totalAttack.getOrElse(AttackType.Penetration, 0)
     
-    logger.info(s"盾类被动: 被动方受到${passiveDamage.toInt}伤害, 主动方受到${activeDamage}伤害")
+    debugLog(logger, s"盾类被动: 被动方受到${passiveDamage.toInt}伤害, 主动方受到${activeDamage}伤害")
     (passiveDamage.toInt, activeDamage)
   }
   
@@ -97,7 +97,7 @@ object PassiveDamageCalculator {
     val totalDamage = totalAttack.values.sum
     val passiveDamage = totalDamage - defendedDamage
     
-    logger.info(s"对象防御: 防御了${defendedDamage}伤害, 剩余${passiveDamage}伤害")
+    debugLog(logger, s"对象防御: 防御了${defendedDamage}伤害, 剩余${passiveDamage}伤害")
     (passiveDamage, 0)
   }
   
@@ -106,12 +106,12 @@ object PassiveDamageCalculator {
    */
   private def calculateActionDefenseDamage(active: ActiveAction, defense: ActionDefenseObject): (Int, Int) = {
     val damage = if (defense.canDefendAgainst(active)) {
-      logger.info("行动防御生效，伤害为0")
+      debugLog(logger, "行动防御生效，伤害为0")
       0
     } else {
       val totalAttack = active.getTotalAttack
       val totalDamage = totalAttack.values.sum
-      logger.info(s"行动防御不生效，受到${totalDamage}伤害")
+      debugLog(logger, s"行动防御不生效，受到${totalDamage}伤害")
       totalDamage
     }
     (damage, 0)
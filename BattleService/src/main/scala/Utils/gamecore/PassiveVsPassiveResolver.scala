@@ -21,13 +21,13 @@ private val logger = LoggerFactory.getLogger(classOf[PassiveAction])
 def calculatePassiveEnergyChange(passive: PassiveAction, player: PlayerState): Int = {
   passive.passiveObject match {
     case cake: CakeObject => 
-      logger.info(s"饼类行动，能量增益: ${cake.energyGain}")
+      debugLog(logger, s"饼类行动，能量增益: ${cake.energyGain}")
       cake.energyGain
     case _: ShieldObject => 
-      logger.info(s"盾类行动，消耗所有能量: ${player.energy}")
+      debugLog(logger, s"盾类行动，消耗所有能量: ${player.energy}")
       -player.energy
     case _ => 
-      logger.info("其他被动行动，无能量变化")
+      debugLog(logger, "其他被动行动，无能量变化")
       0
   }
 }
@@ -48,14 +48,14 @@ def resolveEnergyPassiveVSPassive(
   passive2: PassiveAction,
   roundNumber: Int
 ): (PlayerState, PlayerState, Json) = {
-  logger.info(s"解决被动vs被动能量变化: ${passive1.passiveObject.getClass.getSimpleName} vs ${passive2.passiveObject.getClass.getSimpleName}")
+  debugLog(logger, s"解决被动vs被动能量变化: ${passive1.passiveObject.getClass.getSimpleName} vs ${passive2.passiveObject.getClass.getSimpleName}")
   
   try {
     // 步骤1: 计算能量变化
     val p1EnergyChange = calculatePassiveEnergyChange(passive1, player1)
     val p2EnergyChange = calculatePassiveEnergyChange(passive2, player2)
     
-    logger.info(s"能量变化: P1:${p1EnergyChange}, P2:${p2EnergyChange}")
+    debugLog(logger, s"能量变化: P1:${p1EnergyChange}, P2:${p2EnergyChange}")
     
     // 步骤2: 使用纯函数式方法更新能量
     val p1Final = modifyPlayerEnergy(p1EnergyChange)(player1)
@@ -97,7 +97,7 @@ def resolveDamagePassiveVSPassive(
   passive2: PassiveAction,
   roundNumber: Int
 ): (PlayerState, PlayerState, Json) = {
-  logger.info(s"解决被动vs被动伤害计算: ${passive1.passiveObject.getClass.getSimpleName} vs ${passive2.passiveObject.getClass.getSimpleName}")
+  debugLog(logger, s"解决被动vs被动伤害计算: ${passive1.passiveObject.getClass.getSimpleName} vs ${passive2.passiveObject.getClass.getSimpleName}")
   
   try {
     // 被动对被动通常不会造成伤害，所以直接返回原始状态和空的伤害结果
@@ -1,12 +1,17 @@
-import requests
 import json
 import pytest
 import uuid
 from typing import List, Dict, Any
 import concurrent.futures
 import time
+import sys
+from pathlib import Path
 
-BASE_URL = "http://localhost:10015"  # Assuming CardService runs on port 10015
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "Test"))
+from service_client import ServiceClient
+
+BASE_URL = "http://localhost:10011"  # CardService server_port, see SERVICE_PORTS in Test/service_client.py
+http = ServiceClient(BASE_URL)  # keep-alive pool shared by every test
 
 class TestCardService:
     """Test suite for CardService APIs"""
@@ -27,7 +32,7 @@ class TestCardService:
             "cardID": self.test_card_id
         }
         
-        response = requests.post(f"{BASE_URL}/api/UpgradeCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/UpgradeCard", json=payload)
         
         print(f"UpgradeCard Valid - Status: {response.status_code}")
         print(f"UpgradeCard Valid - Response: {response.text}")
@@ -43,7 +48,7 @@ class TestCardService:
             "cardID": self.test_card_id
         }
         
-        response = requests.post(f"{BASE_URL}/api/UpgradeCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/UpgradeCard", json=payload)
         
         print(f"UpgradeCard Invalid Token - Status: {response.status_code}")
         print(f"UpgradeCard Invalid Token - Response: {response.text}")
@@ -59,7 +64,7 @@ class TestCardService:
             "cardID": "not-owned-card-999"
         }
         
-        response = requests.post(f"{BASE_URL}/api/UpgradeCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/UpgradeCard", json=payload)
         
         print(f"UpgradeCard Not Owned - Status: {response.status_code}")
         print(f"UpgradeCard Not Owned - Response: {response.text}")
@@ -75,7 +80,7 @@ class TestCardService:
             "cardID": self.test_card_id
         }
         
-        response = requests.post(f"{BASE_URL}/api/UpgradeCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/UpgradeCard", json=payload)
         
         print(f"UpgradeCard Insufficient Resources - Status: {response.status_code}")
         print(f"UpgradeCard Insufficient Resources - Response: {response.text}")
@@ -93,7 +98,7 @@ class TestCardService:
             "cardIDs": self.test_card_ids[:3]  # Maximum 3 cards
         }
         
-        response = requests.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
+        response = http.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
         
         print(f"ConfigureBattleDeck Valid - Status: {response.status_code}")
         print(f"ConfigureBattleDeck Valid - Response: {response.text}")
@@ -109,7 +114,7 @@ class TestCardService:
             "cardIDs": [self.test_card_id]
         }
         
-        response = requests.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
+        response = http.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
         
         print(f"ConfigureBattleDeck Single - Status: {response.status_code}")
         print(f"ConfigureBattleDeck Single - Response: {response.text}")
@@ -125,7 +130,7 @@ class TestCardService:
             "cardIDs": ["card-001", "card-002", "card-003", "card-004"]  # More than 3
         }
         
-        response = requests.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
+        response = http.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
         
         print(f"ConfigureBattleDeck Too Many - Status: {response.status_code}")
         print(f"ConfigureBattleDeck Too Many - Response: {response.text}")
@@ -141,7 +146,7 @@ class TestCardService:
             "cardIDs": []
         }
         
-        response = requests.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
+        response = http.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
         
         print(f"ConfigureBattleDeck Empty - Status: {response.status_code}")
         print(f"ConfigureBattleDeck Empty - Response: {response.text}")
@@ -157,7 +162,7 @@ class TestCardService:
             "cardIDs": ["not-owned-card-1", "not-owned-card-2"]
         }
         
-        response = requests.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
+        response = http.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
         
         print(f"ConfigureBattleDeck Not Owned - Status: {response.status_code}")
         print(f"ConfigureBattleDeck Not Owned - Response: {response.text}")
@@ -175,7 +180,7 @@ class TestCardService:
             "drawCount": 1
         }
         
-        response = requests.post(f"{BASE_URL}/api/DrawCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/DrawCard", json=payload)
         
         print(f"DrawCard Single - Status: {response.status_code}")
         print(f"DrawCard Single - Response: {response.text}")
@@ -193,7 +198,7 @@ class TestCardService:
             "drawCount": 5
         }
         
-        response = requests.post(f"{BASE_URL}/api/DrawCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/DrawCard", json=payload)
         
         print(f"DrawCard Multiple - Status: {response.status_code}")
         print(f"DrawCard Multiple - Response: {response.text}")
@@ -211,7 +216,7 @@ class TestCardService:
             "drawCount": 10
         }
         
-        response = requests.post(f"{BASE_URL}/api/DrawCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/DrawCard", json=payload)
         
         print(f"DrawCard Ten Pull - Status: {response.status_code}")
         print(f"DrawCard Ten Pull - Response: {response.text}")
@@ -229,7 +234,7 @@ class TestCardService:
             "drawCount": 10
         }
         
-        response = requests.post(f"{BASE_URL}/api/DrawCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/DrawCard", json=payload)
         
         print(f"DrawCard Insufficient Stones - Status: {response.status_code}")
         print(f"DrawCard Insufficient Stones - Response: {response.text}")
@@ -248,7 +253,7 @@ class TestCardService:
                 "drawCount": count
             }
             
-            response = requests.post(f"{BASE_URL}/api/DrawCard", json=payload)
+            response = http.post(f"{BASE_URL}/api/DrawCard", json=payload)
             
             print(f"DrawCard Invalid Count {count} - Status: {response.status_code}")
             print(f"DrawCard Invalid Count {count} - Response: {response.text}")
@@ -263,7 +268,7 @@ class TestCardService:
             "drawCount": 1
         }
         
-        response = requests.post(f"{BASE_URL}/api/DrawCard", json=payload)
+        response = http.post(f"{BASE_URL}/api/DrawCard", json=payload)
         
         print(f"DrawCard Invalid Token - Status: {response.status_code}")
         print(f"DrawCard Invalid Token - Response: {response.text}")
@@ -280,7 +285,7 @@ class TestCardService:
             "userID": self.valid_token
         }
         
-        response = requests.post(f"{BASE_URL}/api/GetPlayerCards", json=payload)
+        response = http.post(f"{BASE_URL}/api/GetPlayerCards", json=payload)
         
         print(f"GetPlayerCards Valid - Status: {response.status_code}")
         print(f"GetPlayerCards Valid - Response: {response.text}")
@@ -303,7 +308,7 @@ class TestCardService:
             "userID": self.invalid_token
         }
         
-        response = requests.post(f"{BASE_URL}/api/GetPlayerCards", json=payload)
+        response = http.post(f"{BASE_URL}/api/GetPlayerCards", json=payload)
         
         print(f"GetPlayerCards Invalid Token - Status: {response.status_code}")
         print(f"GetPlayerCards Invalid Token - Response: {response.text}")
@@ -318,7 +323,7 @@ class TestCardService:
             "userID": ""
         }
         
-        response = requests.post(f"{BASE_URL}/api/GetPlayerCards", json=payload)
+        response = http.post(f"{BASE_URL}/api/GetPlayerCards", json=payload)
         
         print(f"GetPlayerCards Empty Token - Status: {response.status_code}")
         print(f"GetPlayerCards Empty Token - Response: {response.text}")
@@ -333,7 +338,7 @@ class TestCardService:
             "userID": "short"  # Less than 10 characters
         }
         
-        response = requests.post(f"{BASE_URL}/api/GetPlayerCards", json=payload)
+        response = http.post(f"{BASE_URL}/api/GetPlayerCards", json=payload)
         
         print(f"GetPlayerCards Short Token - Status: {response.status_code}")
         print(f"GetPlayerCards Short Token - Response: {response.text}")
@@ -355,7 +360,7 @@ class TestCardServiceIntegration:
             "drawCount": 3
         }
         
-        draw_response = requests.post(f"{BASE_URL}/api/DrawCard", json=draw_payload)
+        draw_response = http.post(f"{BASE_URL}/api/DrawCard", json=draw_payload)
         print(f"Integration - Draw Cards: {draw_response.status_code}")
         
         if draw_response.status_code == 200:
@@ -367,7 +372,7 @@ class TestCardServiceIntegration:
                 "userID": token
             }
             
-            get_response = requests.post(f"{BASE_URL}/api/GetPlayerCards", json=get_payload)
+            get_response = http.post(f"{BASE_URL}/api/GetPlayerCards", json=get_payload)
             print(f"Integration - Get Cards: {get_response.status_code}")
             
             if get_response.status_code == 200:
@@ -381,7 +386,7 @@ class TestCardServiceIntegration:
                         "cardIDs": [card["cardID"] for card in player_cards[:3]]
                     }
                     
-                    deck_response = requests.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=deck_payload)
+                    deck_response = http.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=deck_payload)
                     print(f"Integration - Configure Deck: {deck_response.status_code}")
                     
                     # Step 4: Upgrade a card
@@ -392,7 +397,7 @@ class TestCardServiceIntegration:
                             "cardID": player_cards[0]["cardID"]
                         }
                         
-                        upgrade_response = requests.post(f"{BASE_URL}/api/UpgradeCard", json=upgrade_payload)
+                        upgrade_response = http.post(f"{BASE_URL}/api/UpgradeCard", json=upgrade_payload)
                         print(f"Integration - Upgrade Card: {upgrade_response.status_code}")
     
     def test_concurrent_card_operations(self):
@@ -416,7 +421,7 @@ class TestCardServiceIntegration:
                 }
                 endpoint = "/api/GetPlayerCards"
             
-            response = requests.post(f"{BASE_URL}{endpoint}", json=payload)
+            response = http.post(f"{BASE_URL}{endpoint}", json=payload)
             return {
                 "user_id": user_id,
                 "operation": operation_type,
@@ -460,7 +465,7 @@ class TestCardServiceLoadTesting:
             }
             
             start_time = time.time()
-            response = requests.post(f"{BASE_URL}/api/DrawCard", json=payload)
+            response = http.post(f"{BASE_URL}/api/DrawCard", json=payload)
             end_time = time.time()
             
             print(f"Draw {i+1}: {response.status_code} - {(end_time - start_time)*1000:.2f}ms")
@@ -487,7 +492,7 @@ class TestCardServiceLoadTesting:
                 "cardIDs": deck
             }
             
-            response = requests.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
+            response = http.post(f"{BASE_URL}/api/ConfigureBattleDeck", json=payload)
             print(f"Deck Config {i+1}: {response.status_code} - {len(deck)} cards")
 
 if __name__ == "__main__":
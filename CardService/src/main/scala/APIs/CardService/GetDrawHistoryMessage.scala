@@ -23,10 +23,16 @@ import Objects.CardService.DrawHistoryEntry
  * GetDrawHistoryMessage
  * desc: 根据用户Token查询抽卡历史，返回所有获得的卡、抽取时间与卡池类型。
  * @param userID: String (用户的身份令牌，用于验证用户的合法性。)
+ * @param beforeTime: Option[Long] (分页游标，只返回该时间之前的抽卡记录，不填则从最新一条开始。)
+ * @param beforeDrawID: Option[String] (与 beforeTime 一起组成 (drawTime, drawId) 游标，取上一页最后一条的 drawId，同一时间的记录翻页时不会漏掉。)
+ * @param pageSize: Option[Int] (本页最多返回的抽卡记录条数，默认 50，最大 200。)
  * @return drawHistory: List[DrawHistoryEntry] (用户的抽卡历史记录列表)
  */
 case class GetDrawHistoryMessage(
-  userID: String
+  userID: String,
+  beforeTime: Option[Long],
+  beforeDrawID: Option[String],
+  pageSize: Option[Int]
 ) extends API[List[DrawHistoryEntry]](CardServiceCode)
 
 case object GetDrawHistoryMessage{
@@ -57,6 +63,6 @@ case object GetDrawHistoryMessage{
     else circeDecoder
 
   def apply(userID: String): GetDrawHistoryMessage = {
-    new GetDrawHistoryMessage(userID)
+    new GetDrawHistoryMessage(userID, None, None, None)
   }
 }
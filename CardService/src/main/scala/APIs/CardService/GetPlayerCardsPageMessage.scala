@@ -0,0 +1,68 @@
+package APIs.CardService
+
+import Common.API.API
+import Global.ServiceCenter.CardServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.CardService.CardInventoryPage
+
+/**
+ * GetPlayerCardsPageMessage
+ * desc: 按游标分页返回用户所拥有的卡牌，适用于卡牌很多的用户。
+ * @param userID: String (用户的身份令牌，用于验证用户的合法性。)
+ * @param cursor: Option[String] (上一页返回的 nextCursor，首页不填)
+ * @param pageSize: Int (每页条数，1 到 200)
+ * @return page: CardInventoryPage (当前页卡牌和下一页游标)
+ */
+
+case class GetPlayerCardsPageMessage(
+  userID: String,
+  cursor: Option[String],
+  pageSize: Int
+) extends API[CardInventoryPage](CardServiceCode)
+
+
+
+case object GetPlayerCardsPageMessage{
+    
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[GetPlayerCardsPageMessage] = deriveEncoder
+  private val circeDecoder: Decoder[GetPlayerCardsPageMessage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[GetPlayerCardsPageMessage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[GetPlayerCardsPageMessage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[GetPlayerCardsPageMessage]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given getPlayerCardsPageMessageEncoder: Encoder[GetPlayerCardsPageMessage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given getPlayerCardsPageMessageDecoder: Decoder[GetPlayerCardsPageMessage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
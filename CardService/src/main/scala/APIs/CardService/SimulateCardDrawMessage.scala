@@ -0,0 +1,72 @@
+package APIs.CardService
+
+import Common.API.API
+import Global.ServiceCenter.CardServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.CardService.DrawSimulationResult
+
+/**
+ * SimulateCardDrawMessage
+ * desc: 离线模拟大量抽卡，只统计稀有度分布，不读写数据库、不扣原石。仅限管理员调用。
+ * @param adminToken: String (管理员的身份令牌，由 AdminService 验证)
+ * @param totalDraws: Int (模拟的总抽数，最多 1000000)
+ * @param drawsPerRequest: Int (每次请求的抽数，1 到 10，10 表示十连)
+ * @param startPity: Int (初始保底计数)
+ * @param seed: Option[Long] (随机种子，填写后结果可复现)
+ * @return result: DrawSimulationResult (稀有度分布、保底曲线和十连保底统计)
+ */
+
+case class SimulateCardDrawMessage(
+  adminToken: String,
+  totalDraws: Int,
+  drawsPerRequest: Int,
+  startPity: Int,
+  seed: Option[Long]
+) extends API[DrawSimulationResult](CardServiceCode)
+
+
+
+case object SimulateCardDrawMessage{
+    
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[SimulateCardDrawMessage] = deriveEncoder
+  private val circeDecoder: Decoder[SimulateCardDrawMessage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[SimulateCardDrawMessage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[SimulateCardDrawMessage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[SimulateCardDrawMessage]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given simulateCardDrawMessageEncoder: Encoder[SimulateCardDrawMessage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given simulateCardDrawMessageDecoder: Decoder[SimulateCardDrawMessage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
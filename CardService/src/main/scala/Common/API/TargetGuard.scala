@@ -0,0 +1,181 @@
+package Common.API
+
+import Common.ServiceUtils.{portMap, serviceName}
+import Global.ServiceCenter.fullNameMap
+import cats.effect.std.Semaphore
+import cats.effect.{IO, Outcome}
+
+import java.util.concurrent.atomic.{AtomicInteger, AtomicLong, AtomicReference}
+import scala.collection.concurrent.TrieMap
+import scala.concurrent.duration.*
+
+/** 目标服务熔断中或并发请求已满时，API.send 不发出请求直接失败 */
+case class TargetUnavailableException(targetService: String, reason: String)
+  extends Exception(s"目标服务 ${targetService} 暂不可用: ${reason}")
+
+/**
+ * 单个目标服务的隔舱与试探配置，在 server_config.json 的 targetGuards 中按服务名（如 "userservice"）配置，没写的字段使用默认值
+ * @param maxRequests 同时在途的请求数，也是连接池对该目标的最大连接数，默认 TargetGuard.MaxRequestsPerTarget
+ * @param probeTimeoutMillis 半开时试探请求的最长时间（毫秒），默认 TargetGuard.ProbeTimeout
+ */
+case class TargetGuardConfig(maxRequests: Option[Int] = None, probeTimeoutMillis: Option[Long] = None)
+
+/**
+ * API.send 对每个目标服务（serviceCode）的保护：并发隔舱 + 熔断器
+ * 隔舱限制发往同一目标的同时在途请求数，等待超过 BulkheadWait 直接失败，一个变慢的服务只会占满它自己的配额；
+ * 连续 FailureThreshold 次连接失败、超时或 5xx 后熔断 OpenDuration，期间请求立即失败；
+ * 熔断结束后只放行一个试探请求（半开），成功则恢复，失败或超过试探时限则重新熔断，
+ * 试探最多占用试探时限，不会让其余请求在半开状态下等到整个请求预算用完。
+ * 熔断前已放行的请求晚到的结果不改变熔断和半开状态，只有试探请求能结束熔断。
+ * 在途上限和试探时限可以按目标配置（见 TargetGuardConfig）。
+ * DB-Manager 不经过这里：事务的 BEGIN / COMMIT / ROLLBACK 不能因为隔舱已满或熔断而发不出去
+ */
+final class TargetGuard private (targetService: String, bulkhead: Semaphore[IO], probeTimeout: FiniteDuration) {
+  import TargetGuard.*
+
+  private val state = new AtomicReference[State](Closed(0))
+  private val inFlight = new AtomicInteger(0)
+  private val rejected = new AtomicLong(0)
+  private val shortCircuited = new AtomicLong(0)
+
+  /**
+   * @param isTargetFailure 哪些错误算目标服务故障；业务错误（4xx、回滚）说明目标正常响应，不计入熔断
+   */
+  def protect[A](isTargetFailure: Throwable => Boolean)(io: IO[A]): IO[A] =
+    IO.uncancelable { poll =>
+      poll(bulkhead.acquire.timeoutTo(BulkheadWait,
+        IO(rejected.incrementAndGet()) >> IO.raiseError(TargetUnavailableException(targetService, "并发请求已满"))
+      )) >> poll(guarded(isTargetFailure)(io)).guarantee(bulkhead.release)
+    }
+
+  private def guarded[A](isTargetFailure: Throwable => Boolean)(io: IO[A]): IO[A] =
+    IO(admit()).flatMap {
+      case Rejected =>
+        IO(shortCircuited.incrementAndGet()) >> IO.raiseError(TargetUnavailableException(targetService, "熔断中"))
+      case admission =>
+        val attempt = if (admission == Probe) {
+          io.timeoutTo(probeTimeout, IO.raiseError(TargetUnavailableException(targetService, "试探请求超时")))
+        } else io
+        IO(inFlight.incrementAndGet()) >> attempt.guaranteeCase { outcome =>
+          IO {
+            inFlight.decrementAndGet()
+            outcome match {
+              case Outcome.Errored(error) if isTargetFailure(error) => onFailure(admission)
+              case Outcome.Canceled() => if (admission == Probe) onProbeCanceled()
+              case _ => onResponse(admission)
+            }
+          }
+        }
+    }
+
+  private def admit(): Admission =
+    state.get() match {
+      case Closed(_) => Admitted
+      case HalfOpen => Rejected
+      case open @ Open(until) =>
+        if (System.currentTimeMillis() < until) Rejected
+        else if (state.compareAndSet(open, HalfOpen)) Probe
+        else admit()
+    }
+
+  /** 目标正常响应（包括业务错误）：试探成功则恢复，未熔断时清零连续失败数；熔断前放行的请求晚到时不改变状态 */
+  private def onResponse(admission: Admission): Unit =
+    if (admission == Probe) state.compareAndSet(HalfOpen, Closed(0))
+    else state.updateAndGet {
+      case Closed(_) => Closed(0)
+      case other => other
+    }
+
+  /** 未熔断时累计连续失败，试探失败则重新熔断；熔断前放行的请求晚到的失败不延长熔断 */
+  private def onFailure(admission: Admission): Unit = {
+    val now = System.currentTimeMillis()
+    state.updateAndGet {
+      case Closed(failures) if failures + 1 < FailureThreshold => Closed(failures + 1)
+      case Closed(_) => Open(now + OpenDuration.toMillis)
+      case HalfOpen if admission == Probe => Open(now + OpenDuration.toMillis)
+      case other => other
+    }
+  }
+
+  /** 试探请求被取消时不知道目标是否恢复，让下一个请求重新试探 */
+  private def onProbeCanceled(): Unit =
+    state.compareAndSet(HalfOpen, Open(0))
+
+  def stats: Map[String, Long] = Map(
+    "state" -> (state.get() match {
+      case Closed(_) => 0L
+      case Open(_) => 1L
+      case HalfOpen => 2L
+    }),
+    "in_flight" -> inFlight.get().toLong,
+    "rejected" -> rejected.get(),
+    "short_circuited" -> shortCircuited.get()
+  )
+}
+
+object TargetGuard {
+  /** 每个目标服务默认的同时在途请求数，也是 API 客户端连接池对每个目标的默认最大连接数 */
+  val MaxRequestsPerTarget: Int = 256
+
+  /** 隔舱已满时最多等待的时间 */
+  val BulkheadWait: FiniteDuration = 1.second
+
+  /** 连续失败多少次后熔断 */
+  val FailureThreshold: Int = 5
+
+  /** 熔断持续时间 */
+  val OpenDuration: FiniteDuration = 10.seconds
+
+  /** 半开时试探请求的默认最长时间，超时按失败处理并重新熔断 */
+  val ProbeTimeout: FiniteDuration = 2.seconds
+
+  private sealed trait State
+  private final case class Closed(consecutiveFailures: Int) extends State
+  private final case class Open(untilMillis: Long) extends State
+  private case object HalfOpen extends State
+
+  /** 一个请求能否通过熔断器；Probe 是半开时放行的唯一试探请求 */
+  private sealed trait Admission
+  private case object Admitted extends Admission
+  private case object Probe extends Admission
+  private case object Rejected extends Admission
+
+  private val guards = TrieMap.empty[String, TargetGuard]
+
+  /** 按服务名的配置，由 API.init 在建立任何 guard 之前设置 */
+  @volatile private var configs: Map[String, TargetGuardConfig] = Map.empty
+
+  def configure(targetConfigs: Map[String, TargetGuardConfig]): Unit =
+    configs = targetConfigs.map { case (name, config) => name.toLowerCase -> config }
+
+  private def configFor(targetService: String): TargetGuardConfig =
+    if (fullNameMap.contains(targetService)) configs.getOrElse(serviceName(targetService), TargetGuardConfig())
+    else TargetGuardConfig()
+
+  /** 目标服务同时在途的请求数上限 */
+  def maxRequests(targetService: String): Int =
+    configFor(targetService).maxRequests.getOrElse(MaxRequestsPerTarget)
+
+  /** 按端口找到目标服务的在途上限，给 API 客户端连接池按目标地址限制连接数用；不认识的端口用默认值 */
+  def maxRequestsForPort(port: Option[Int]): Int =
+    port.flatMap(p => fullNameMap.keys.find(portMap(_) == p)).map(maxRequests).getOrElse(MaxRequestsPerTarget)
+
+  private def probeTimeout(targetService: String): FiniteDuration =
+    configFor(targetService).probeTimeoutMillis.map(_.millis).getOrElse(ProbeTimeout)
+
+  def forTarget(targetService: String): IO[TargetGuard] =
+    IO(guards.get(targetService)).flatMap {
+      case Some(guard) => IO.pure(guard)
+      case None =>
+        Semaphore[IO](maxRequests(targetService)).map { bulkhead =>
+          val guard = new TargetGuard(targetService, bulkhead, probeTimeout(targetService))
+          guards.putIfAbsent(targetService, guard).getOrElse(guard)
+        }
+    }
+
+  /** 各目标服务的隔舱与熔断状态，给 /metrics 用 */
+  def stats: List[(String, Map[String, Long])] =
+    guards.toList.sortBy(_._1).map { case (targetService, guard) =>
+      (if (fullNameMap.contains(targetService)) serviceName(targetService) else targetService) -> guard.stats
+    }
+}
@@ -0,0 +1,9 @@
+package Common.DBAPI
+
+import Common.API.API
+import Common.Object.BatchStatement
+import Global.ServiceCenter.tongWenDBServiceCode
+import io.circe.Json
+
+/** 一次往返按顺序执行多条语句；不在事务中时 DB-Manager 会把整批放进同一个事务。结果与 statements 一一对应 */
+case class BatchDBMessage(statements: List[BatchStatement]) extends API[List[Json]](tongWenDBServiceCode)
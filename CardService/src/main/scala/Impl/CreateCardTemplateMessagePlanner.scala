@@ -9,7 +9,9 @@ import cats.effect.IO
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
+import io.circe.Encoder
 import io.circe.generic.auto.*
+import Utils.CardTemplateCache
 
 case class CreateCardTemplateMessagePlanner(
   userID: String,
@@ -22,6 +24,10 @@ case class CreateCardTemplateMessagePlanner(
 
   val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
 
+  // 事务提交后再清空模板缓存，避免并发读在提交前把旧模板重新载入缓存
+  override def fullPlan(using encoder: Encoder[String]): IO[String] =
+    super.fullPlan.flatTap(_ => CardTemplateCache.invalidateAll)
+
   override def plan(using planContext: PlanContext): IO[String] = {
     for {
       // Step 2: Validate input parameters
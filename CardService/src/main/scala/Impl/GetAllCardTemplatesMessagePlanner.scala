@@ -12,6 +12,7 @@ import io.circe._
 import io.circe.syntax._
 import io.circe.generic.auto._
 import cats.implicits.*
+import Utils.CardTemplateCache
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 
 case class GetAllCardTemplatesMessagePlanner(
@@ -19,7 +20,10 @@ case class GetAllCardTemplatesMessagePlanner(
 ) extends Planner[List[CardTemplate]] {
   val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
 
-  override def plan(using PlanContext): IO[List[CardTemplate]] = {
+  override def plan(using PlanContext): IO[List[CardTemplate]] =
+    CardTemplateCache.getPool(CardTemplateCache.allTemplatesKey)(queryAllCardTemplates)
+
+  private def queryAllCardTemplates(using PlanContext): IO[List[CardTemplate]] = {
     for {
       
       // Step 2: Query all card templates from database
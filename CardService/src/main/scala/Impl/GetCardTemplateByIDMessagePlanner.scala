@@ -12,6 +12,7 @@ import io.circe._
 import io.circe.syntax._
 import io.circe.generic.auto._
 import cats.implicits.*
+import Utils.CardTemplateCache
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 
 case class GetCardTemplateByIDMessagePlanner(
@@ -20,7 +21,10 @@ case class GetCardTemplateByIDMessagePlanner(
 ) extends Planner[CardTemplate] {
   val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
 
-  override def plan(using PlanContext): IO[CardTemplate] = {
+  override def plan(using PlanContext): IO[CardTemplate] =
+    CardTemplateCache.getCard(cardID)(queryCardTemplate)
+
+  private def queryCardTemplate(using PlanContext): IO[CardTemplate] = {
     for {
       // Step 2: Query card template from database by cardID
       sqlQuery <- IO {
@@ -17,76 +17,92 @@ import io.circe.parser._
 import org.joda.time.DateTime
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 import java.util.UUID
+import Utils.CardTemplateUtils.fetchCardTemplatesByIDs
 
 case class GetDrawHistoryMessagePlanner(
   userID: String,
+  beforeTime: Option[Long],   // 只返回该时间（毫秒）之前的抽卡记录，不填则从最新一条开始
+  beforeDrawID: Option[String], // 与 beforeTime 组成 (drawTime, drawId) 游标，取上一页最后一条的 drawId
+  pageSize: Option[Int],      // 本页最多返回的抽卡记录条数（每条记录可能有多张卡）
   override val planContext: PlanContext
 ) extends Planner[List[DrawHistoryEntry]] {
   val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
 
+  private val DEFAULT_PAGE_SIZE = 50
+  private val MAX_PAGE_SIZE = 200
+
   override def plan(using planContext: PlanContext): IO[List[DrawHistoryEntry]] = {
     for {
-      // Step 3: Query draw history from database
-      _ <- IO(logger.info(s"[Step 3] 查询用户抽卡历史记录"))
+      // Step 2: Validate page size
+      size = pageSize.getOrElse(DEFAULT_PAGE_SIZE)
+      _ <- if (size <= 0 || size > MAX_PAGE_SIZE) {
+        IO.raiseError(new IllegalArgumentException(s"pageSize 无效，必须在 1 到 ${MAX_PAGE_SIZE} 之间"))
+      } else IO.unit
+
+      // Step 3: Query one page of draw history from database
+      _ <- IO(logger.info(s"[Step 3] 查询用户抽卡历史记录, beforeTime=${beforeTime}, beforeDrawID=${beforeDrawID}, pageSize=${size}"))
+      (cursorCondition, cursorParameters) = (beforeTime, beforeDrawID) match {
+        case (Some(time), Some(drawID)) =>
+          (" AND (draw_time, draw_id) < (?, ?)", List(SqlParameter("DateTime", time.toString), SqlParameter("String", drawID)))
+        case (Some(time), None) =>
+          (" AND draw_time < ?", List(SqlParameter("DateTime", time.toString)))
+        case _ =>
+          ("", Nil)
+      }
       drawLogs <- readDBRows(
         s"""
         SELECT draw_id, card_list, draw_time, pool_type
         FROM ${schemaName}.card_draw_log_table
-        WHERE user_id = ?
-        ORDER BY draw_time DESC
+        WHERE user_id = ?${cursorCondition}
+        ORDER BY draw_time DESC, draw_id DESC
+        LIMIT ?
         """,
-        List(SqlParameter("String", userID))
+        List(SqlParameter("String", userID)) ++ cursorParameters :+ SqlParameter("Int", size.toString)
       )
       _ <- IO(logger.info(s"[Step 3.1] 查询到 ${drawLogs.length} 条抽卡记录"))
 
-      // Step 4: Parse card lists and get card templates
-      _ <- IO(logger.info(s"[Step 4] 解析抽卡记录并获取卡牌模板信息"))
-      drawHistory <- drawLogs.traverse { row =>
+      // Step 4: Parse card lists
+      _ <- IO(logger.info(s"[Step 4] 解析抽卡记录"))
+      parsedLogs <- drawLogs.traverse { row =>
         val drawId = decodeField[String](row, "draw_id")
         val cardListJson = decodeField[String](row, "card_list")
         val drawTime = decodeField[DateTime](row, "draw_time")
         val poolType = row.hcursor.downField("poolType").as[String].getOrElse("err")
-          for {
-          // Parse card list JSON - card IDs are stored as strings
-          cardList <- IO.fromEither(parser.parse(cardListJson).flatMap(_.as[List[String]]))
-            .handleErrorWith(e => 
-              IO(logger.error(s"[Step 4.1] 解析卡牌列表JSON失败: drawId=${drawId}, error=${e.getMessage}"))
-                >> IO.raiseError(new RuntimeException(s"解析卡牌列表失败: ${e.getMessage}"))
-            )
-          
-          // Get card templates for each card
-          cardEntries <- cardList.traverse { cardId =>            readDBRows(
-              s"""
-              SELECT card_id, card_name, description, rarity, type
-              FROM ${schemaName}.card_template_table
-              WHERE card_id = ?
-              """,
-              List(SqlParameter("String", cardId))
-            ).flatMap { rows =>              rows.headOption match {
-                case Some(cardRow) =>
-                  IO.pure(DrawHistoryEntry(
-                    drawId = drawId,
-                    cardId = decodeField[String](cardRow, "card_id"),
-                    cardName = decodeField[String](cardRow, "card_name"),
-                    cardDescription = decodeField[String](cardRow, "description"),
-                    rarity = decodeField[String](cardRow, "rarity"),
-                    cardType = decodeField[String](cardRow, "type"),
-                    drawTime = drawTime,
-                    poolType = poolType
-                  ))
-                case None =>
-                  IO(logger.warn(s"[Step 4.2] 卡牌模板不存在: cardId=${cardId}"))
-                    >> IO.raiseError(new RuntimeException(s"卡牌模板不存在: cardId=${cardId}"))
-              }
-            }
+        // Parse card list JSON - card IDs are stored as strings
+        IO.fromEither(parser.parse(cardListJson).flatMap(_.as[List[String]]))
+          .handleErrorWith(e =>
+            IO(logger.error(s"[Step 4.1] 解析卡牌列表JSON失败: drawId=${drawId}, error=${e.getMessage}"))
+              >> IO.raiseError(new RuntimeException(s"解析卡牌列表失败: ${e.getMessage}"))
+          )
+          .map(cardList => (drawId, cardList, drawTime, poolType))
+      }
+
+      // Step 5: Resolve all card templates of this page at once (cache first, then one ANY(?) query)
+      templates <- fetchCardTemplatesByIDs(parsedLogs.flatMap(_._2))
+      drawHistory <- parsedLogs.flatTraverse { case (drawId, cardList, drawTime, poolType) =>
+        cardList.traverse { cardId =>
+          templates.get(cardId) match {
+            case Some(template) =>
+              IO.pure(DrawHistoryEntry(
+                drawId = drawId,
+                cardId = template.cardID,
+                cardName = template.cardName,
+                cardDescription = template.description,
+                rarity = template.rarity,
+                cardType = template.cardType,
+                drawTime = drawTime,
+                poolType = poolType
+              ))
+            case None =>
+              IO(logger.warn(s"[Step 5.1] 卡牌模板不存在: cardId=${cardId}"))
+                >> IO.raiseError(new RuntimeException(s"卡牌模板不存在: cardId=${cardId}"))
           }
-        } yield cardEntries
-      }.map(_.flatten)
-      
-      _ <- IO(logger.info(s"[Step 4.3] 成功解析 ${drawHistory.length} 张卡牌的历史记录"))
+        }
+      }
+      _ <- IO(logger.info(s"[Step 5.2] 成功解析 ${drawHistory.length} 张卡牌的历史记录"))
 
-      // Step 5: Return result
-      _ <- IO(logger.info(s"[Step 5] 返回抽卡历史查询结果"))
+      // Step 6: Return result
+      _ <- IO(logger.info(s"[Step 6] 返回抽卡历史查询结果"))
     } yield drawHistory
   }
-}
\ No newline at end of file
+}
@@ -0,0 +1,24 @@
+package Impl
+
+import Common.API.{PlanContext, Planner}
+import Objects.CardService.CardInventoryPage
+import Utils.CardInventoryUtils.fetchUserCardInventoryPage
+import cats.effect.IO
+import io.circe.generic.auto._
+import org.slf4j.LoggerFactory
+
+case class GetPlayerCardsPageMessagePlanner(
+  userID: String,
+  cursor: Option[String],
+  pageSize: Int,
+  override val planContext: PlanContext
+) extends Planner[CardInventoryPage] {
+  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+
+  override def plan(using planContext: PlanContext): IO[CardInventoryPage] = {
+    for {
+      page <- fetchUserCardInventoryPage(userID, cursor, pageSize)
+      _ <- IO(logger.info(s"[Step 3.1] 成功拉取用户卡牌分页: 本页 ${page.cards.size} 条记录, nextCursor=${page.nextCursor}"))
+    } yield page
+  }
+}
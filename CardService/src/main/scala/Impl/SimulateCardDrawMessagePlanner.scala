@@ -0,0 +1,52 @@
+package Impl
+
+import APIs.AdminService.ValidateAdminTokenMessage
+import Common.API.{PlanContext, Planner}
+import Objects.CardService.DrawSimulationResult
+import Utils.GachaSampler
+import cats.effect.IO
+import io.circe.Encoder
+import org.slf4j.LoggerFactory
+
+case class SimulateCardDrawMessagePlanner(
+  adminToken: String,
+  totalDraws: Int,
+  drawsPerRequest: Int,
+  startPity: Int,
+  seed: Option[Long],
+  override val planContext: PlanContext
+) extends Planner[DrawSimulationResult] {
+
+  val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+
+  private val MAX_SIMULATED_DRAWS = 1000000
+
+  // 模拟只用内存中的概率表，不需要开启数据库事务
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[DrawSimulationResult]): IO[DrawSimulationResult] =
+    boundedPlan
+
+  override def plan(using planContext: PlanContext): IO[DrawSimulationResult] = {
+    for {
+      // Step 1: 模拟很耗 CPU，只允许管理员调用
+      _ <- IO(logger.info("[Step 1] 验证管理员Token"))
+      _ <- ValidateAdminTokenMessage(adminToken).send
+
+      // Step 2: Validate input parameters
+      _ <- IO(logger.info(s"[Step 2] 验证模拟参数 totalDraws=${totalDraws}, drawsPerRequest=${drawsPerRequest}, startPity=${startPity}, seed=${seed}"))
+      _ <- if (totalDraws <= 0 || totalDraws > MAX_SIMULATED_DRAWS) {
+        IO.raiseError(new IllegalArgumentException(s"totalDraws 无效，必须在 1 到 ${MAX_SIMULATED_DRAWS} 之间"))
+      } else IO.unit
+      _ <- if (drawsPerRequest <= 0 || drawsPerRequest > GachaSampler.TenPull) {
+        IO.raiseError(new IllegalArgumentException(s"drawsPerRequest 无效，必须在 1 到 ${GachaSampler.TenPull} 之间"))
+      } else IO.unit
+      _ <- if (startPity < 0 || startPity >= GachaSampler.HardPity) {
+        IO.raiseError(new IllegalArgumentException(s"startPity 无效，必须在 0 到 ${GachaSampler.HardPity - 1} 之间"))
+      } else IO.unit
+
+      // Step 3: 纯计算，GachaSampler 分批执行并在批间让出计算线程
+      _ <- IO(logger.info("[Step 3] 开始离线抽卡模拟"))
+      result <- GachaSampler.simulate(totalDraws, drawsPerRequest, startPity, seed)
+      _ <- IO(logger.info(s"模拟完成: ${result.copy(legendaryByPity = Nil)}"))
+    } yield result
+  }
+}
@@ -0,0 +1,56 @@
+package Objects.CardService
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+import scala.util.Try
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.CardService.CardEntry
+
+/**
+ * CardInventoryPage
+ * desc: 按 userCardID 键集分页的用户卡牌列表
+ * @param cards: 列表包含 CardEntry (当前页的卡牌)
+ * @param nextCursor: Option[String] (下一页的游标，没有下一页时为空)
+ */
+case class CardInventoryPage(
+  cards: List[CardEntry],
+  nextCursor: Option[String]
+){
+  // process class code 预留标志位，不要删除
+}
+
+case object CardInventoryPage {
+  
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[CardInventoryPage] = deriveEncoder
+  private val circeDecoder: Decoder[CardInventoryPage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[CardInventoryPage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[CardInventoryPage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[CardInventoryPage]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given cardInventoryPageEncoder: Encoder[CardInventoryPage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given cardInventoryPageDecoder: Decoder[CardInventoryPage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+  //process object code 预留标志位，不要删除
+}
+
@@ -0,0 +1,77 @@
+package Objects.CardService
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+import scala.util.Try
+import org.joda.time.DateTime
+import java.util.UUID
+
+/**
+ * DrawSimulationResult
+ * desc: 离线抽卡模拟的统计结果，用于验证保底曲线和十连保底
+ * @param totalDraws: Long (模拟的总抽数)
+ * @param requestCount: Long (模拟的抽卡请求次数)
+ * @param legendaryCount: Long (传说数量)
+ * @param rareCount: Long (稀有数量)
+ * @param normalCount: Long (普通数量)
+ * @param legendaryRate: Double (传说占比，百分数)
+ * @param rareRate: Double (稀有占比，百分数)
+ * @param normalRate: Double (普通占比，百分数)
+ * @param averageDrawsPerLegendary: Double (平均多少抽出一次传说)
+ * @param maxDrawsWithoutLegendary: Int (最长连续未出传说的抽数，不应超过 90)
+ * @param legendaryByPity: List[Long] (第 i 个元素为在保底计数 i+1 时出传说的次数)
+ * @param tenPullGuaranteeTriggered: Long (十连保底触发次数)
+ * @param tenPullsWithoutRare: Long (没有稀有及以上的十连次数，应为 0)
+ */
+case class DrawSimulationResult(
+  totalDraws: Long,
+  requestCount: Long,
+  legendaryCount: Long,
+  rareCount: Long,
+  normalCount: Long,
+  legendaryRate: Double,
+  rareRate: Double,
+  normalRate: Double,
+  averageDrawsPerLegendary: Double,
+  maxDrawsWithoutLegendary: Int,
+  legendaryByPity: List[Long],
+  tenPullGuaranteeTriggered: Long,
+  tenPullsWithoutRare: Long
+){
+  // process class code 预留标志位，不要删除
+}
+
+case object DrawSimulationResult {
+  
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[DrawSimulationResult] = deriveEncoder
+  private val circeDecoder: Decoder[DrawSimulationResult] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[DrawSimulationResult] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[DrawSimulationResult] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[DrawSimulationResult]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given drawSimulationResultEncoder: Encoder[DrawSimulationResult] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given drawSimulationResultDecoder: Decoder[DrawSimulationResult] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+  //process object code 预留标志位，不要删除
+}
+
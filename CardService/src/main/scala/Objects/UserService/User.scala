@@ -31,7 +31,7 @@ import Objects.UserService.MessageEntry
  * @param banDays: Int (用户当前被封禁的天数)
  * @param isOnline: Boolean (用户是否在线)
  * @param matchStatus: String (用户当前的匹配状态)
- * @param stoneAmount: Int (用户拥有的石头数量)
+ * @param stoneAmount: Option[Int] (用户拥有的石头数量，AssetService 不可用时为空)
  * @param credits: Int (用户的积分数量)
  * @param rank: String (用户的段位)
  * @param rankPosition: Int (用户在段位中的排名)
@@ -51,7 +51,7 @@ case class User(
   banDays: Int,
   isOnline: Boolean,
   matchStatus: String,
-  stoneAmount: Int,
+  stoneAmount: Option[Int],
   credits: Int,
   rank: String,
   rankPosition: Int,
@@ -23,8 +23,11 @@ object Init {
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- API.init(config.maximumClientConnection, config.targetGuards)
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
+      batchSupported <- if (config.enableBatchDB) Common.DBAPI.probeBatchDB else IO.pure(false)
+      _ <- IO(GlobalVariables.enableBatchDB=batchSupported)
+      _ <- IO.whenA(config.enableBatchDB && !batchSupported)(IO(println("DB-Manager 不支持 BatchDBMessage，batchDB 改为在事务内逐条执行")))
       _ <- initSchema(schemaName)      /** 抽卡日志表，记录用户抽卡的相关信息
        * draw_id: 抽卡日志的唯一ID
        * user_id: 用户ID
@@ -47,6 +50,20 @@ object Init {
         """,
         List()
       )
+      // 抽卡历史按 user_id 过滤、按 (draw_time, draw_id) 游标倒序分页；旧版本建的索引不含 draw_id，换成新索引
+      _ <- writeDB(
+        s"""
+        CREATE INDEX IF NOT EXISTS card_draw_log_table_user_time_id_idx
+        ON "${schemaName}"."card_draw_log_table" (user_id, draw_time, draw_id);
+        """,
+        List()
+      )
+      _ <- writeDB(
+        s"""
+        DROP INDEX IF EXISTS "${schemaName}".card_draw_log_table_user_time_idx;
+        """,
+        List()
+      )
       /** 用户卡牌表，记录用户拥有的卡牌及其信息
        * user_card_id: 用户卡牌的唯一ID
        * user_id: 用户ID
@@ -66,6 +83,14 @@ object Init {
             acquisition_time TIMESTAMP NOT NULL
         );
          
+        """,
+        List()
+      )
+      // 库存查询按 user_id 过滤、按 user_card_id 做键集分页
+      _ <- writeDB(
+        s"""
+        CREATE INDEX IF NOT EXISTS user_card_table_user_id_idx
+        ON "${schemaName}"."user_card_table" (user_id, user_card_id);
         """,
         List()
       )      /** 卡牌模板表，包含每张卡牌的基本信息
@@ -1,6 +1,10 @@
 package Process
 
 import Common.API.PlanContext
+import Common.API.Tracer
+import Common.API.Metrics
+import Common.API.{Deadline, DeadlineExceededException}
+import Utils.CardTemplateCache
 import Common.DBAPI.DidRollbackException
 import cats.effect.*
 import fs2.concurrent.Topic
@@ -16,6 +20,7 @@ import scala.collection.concurrent.TrieMap
 import Common.Serialize.CustomColumnTypes.*
 import Impl.UpgradeCardMessagePlanner
 import Impl.GetPlayerCardsMessagePlanner
+import Impl.GetPlayerCardsPageMessagePlanner
 import Impl.DrawCardMessagePlanner
 import Impl.ConfigureBattleDeckMessagePlanner
 import Impl.LoadBattleDeckMessagePlanner
@@ -23,6 +28,7 @@ import Impl.CreateCardTemplateMessagePlanner
 import Impl.GetDrawHistoryMessagePlanner
 import Impl.GetAllCardTemplatesMessagePlanner
 import Impl.GetCardTemplateByIDMessagePlanner
+import Impl.SimulateCardDrawMessagePlanner
 import Common.API.TraceID
 import org.joda.time.DateTime
 import org.http4s.circe.*
@@ -31,89 +37,108 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 
 object Routes:
   val projects: TrieMap[String, Topic[IO, String]] = TrieMap.empty
-  private def executePlan(messageType: String, str: String): IO[String] =
+  private def executePlan(messageType: String, body: Json): IO[Json] =
     messageType match {
       case "UpgradeCardMessage" =>
         IO(
-          decode[UpgradeCardMessagePlanner](str) match
+          body.as[UpgradeCardMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for UpgradeCardMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "GetPlayerCardsMessage" =>
         IO(
-          decode[GetPlayerCardsMessagePlanner](str) match
+          body.as[GetPlayerCardsMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetPlayerCardsMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
+        ).flatten
+
+      case "GetPlayerCardsPageMessage" =>
+        IO(
+          body.as[GetPlayerCardsPageMessagePlanner] match
+            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetPlayerCardsPageMessage[${err.getMessage}]")
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "DrawCardMessage" =>
         IO(
-          decode[DrawCardMessagePlanner](str) match
+          body.as[DrawCardMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for DrawCardMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
       case "ConfigureBattleDeckMessage" =>
         IO(
-          decode[ConfigureBattleDeckMessagePlanner](str) match
+          body.as[ConfigureBattleDeckMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ConfigureBattleDeckMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "LoadBattleDeckMessage" =>
         IO(
-          decode[LoadBattleDeckMessagePlanner](str) match
+          body.as[LoadBattleDeckMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for LoadBattleDeckMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "CreateCardTemplateMessage" =>
         IO(
-          decode[CreateCardTemplateMessagePlanner](str) match
+          body.as[CreateCardTemplateMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for CreateCardTemplateMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
       case "GetDrawHistoryMessage" =>
         IO(
-          decode[GetDrawHistoryMessagePlanner](str) match
+          body.as[GetDrawHistoryMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetDrawHistoryMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
       case "GetAllCardTemplatesMessage" =>
         IO(
-          decode[GetAllCardTemplatesMessagePlanner](str) match
+          body.as[GetAllCardTemplatesMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetAllCardTemplatesMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "GetCardTemplateByIDMessage" =>
         IO(
-          decode[GetCardTemplateByIDMessagePlanner](str) match
+          body.as[GetCardTemplateByIDMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetCardTemplateByIDMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
+        ).flatten
+
+      case "SimulateCardDrawMessage" =>
+        IO(
+          body.as[SimulateCardDrawMessagePlanner] match
+            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for SimulateCardDrawMessage[${err.getMessage}]")
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "test" =>
         for {
-          output  <- Utils.Test.test(str)(using  PlanContext(TraceID(""), 0))
-        } yield output
+          output  <- Utils.Test.test(body.noSpaces)(using  PlanContext(TraceID(""), 0))
+        } yield Json.fromString(output)
       case _ =>
         IO.raiseError(new Exception(s"Unknown type: $messageType"))
     }
 
-  def handlePostRequest(req: Request[IO]): IO[String] = {
+  /** 请求体只解析一次，PlanContext 直接加到解析出的 Json 上，executePlan 再从这个 Json 解码出 Planner */
+  def handlePostRequest(req: Request[IO]): IO[Json] = {
     req.as[Json].map {
       bodyJson => {
-        val planContext = PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)
-        val planContextJson = planContext.asJson
-        val updatedJson = bodyJson.deepMerge(Json.obj("planContext" -> planContextJson))
-        updatedJson.toString
+        val planContext = Deadline.continueBudget(req, bodyJson,
+          Tracer.continueTrace(bodyJson, PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)))
+        bodyJson.mapObject(_.add("planContext", planContext.asJson))
       }
     }
   }
   val service: HttpRoutes[IO] = HttpRoutes.of[IO] {
     case GET -> Root / "health" =>
       Ok("OK")
+
+    case GET -> Root / "metrics" =>
+      Ok(Metrics.render(List(
+        Metrics.statsGauge("satintin_component_stats", "缓存和队列的统计", List("card_template_cache" -> CardTemplateCache.stats))
+      )))
       
     case GET -> Root / "stream" / projectName =>
       projects.get(projectName) match {
@@ -134,7 +159,7 @@ object Routes:
       }
     case req@POST -> Root / "api" / name =>
       handlePostRequest(req).flatMap {
-        executePlan(name, _)
+        body => Metrics.timeRequest(name)(executePlan(name, body))
       }.flatMap(Ok(_))
       .handleErrorWith {
         case e: DidRollbackException =>
@@ -142,6 +167,10 @@ object Routes:
           val headers = Headers("X-DidRollback" -> "true")
           BadRequest(e.getMessage.asJson.toString).map(_.withHeaders(headers))
 
+        case e: DeadlineExceededException =>
+          println(s"Deadline exceeded: $e")
+          ServiceUnavailable(e.getMessage.asJson.toString).map(_.withHeaders(Headers(Deadline.ExceededHeader -> "true")))
+
         case e: Throwable =>
           println(s"General error: $e")
           BadRequest(e.getMessage.asJson.toString)
@@ -14,9 +14,10 @@ import Common.Object.{SqlParameter, ParameterList}
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 import Objects.CardService.{CardEntry, DrawResult, CardTemplate}
 import APIs.AssetService.{QueryAssetStatusMessage, DeductAssetMessage, UpdateCardDrawCountMessage, QueryCardDrawCountMessage}
-import Utils.CardInventoryUtils.fetchUserCardInventory
-import Utils.CardTemplateUtils.fetchCardTemplatesFromDB
+import Utils.CardInventoryUtils.fetchUserOwnedCardIDs
+import Utils.CardTemplateUtils.fetchCardTemplates
 import java.util.UUID
+import java.util.concurrent.ThreadLocalRandom
 
 case object CardDrawUtils {
   private val logger = LoggerFactory.getLogger(getClass)
@@ -55,84 +56,29 @@ case object CardDrawUtils {
       currentDrawCount <- QueryCardDrawCountMessage(userID, poolType).send
       _ <- IO(logger.info(s"用户在${poolType}池当前抽卡次数: ${currentDrawCount}"))
 
-      // Step 3: Fetch user's card inventory
-      _ <- IO(logger.info(s"获取用户[userID=${userID}]的卡牌库存"))
-      userCardInventory <- fetchUserCardInventory(userID)
-      userOwnedCardIDs = userCardInventory.map(_.cardID)
+      // Step 3: Fetch IDs of the cards the user already owns
+      _ <- IO(logger.info(s"获取用户[userID=${userID}]已拥有的卡牌ID"))
+      userOwnedCardIDs <- fetchUserOwnedCardIDs(userID)
       _ <- IO(logger.info(s"用户已有卡牌 cardIDs=${userOwnedCardIDs.mkString(", ")}"))
 
-      // Step 3.5: Fetch card templates from database based on pool type
-      _ <- IO(logger.info(s"从数据库获取卡牌模板，卡池类型=${poolType}"))
-      cardTemplatesFromDB <- fetchCardTemplatesFromDB(poolType)
-      templatesByRarityFromDB = cardTemplatesFromDB.groupBy(_.rarity)
-      _ <- IO(logger.info(s"从数据库获取到 ${cardTemplatesFromDB.size} 个卡牌模板"))
+      // Step 3.5: Fetch card templates (cached) based on pool type
+      _ <- IO(logger.info(s"获取卡牌模板，卡池类型=${poolType}"))
+      cardTemplatesFromDB <- fetchCardTemplates(poolType)
+      poolSampler = GachaSampler.poolSampler(poolType, cardTemplatesFromDB)
+      _ <- IO(logger.info(s"获取到 ${cardTemplatesFromDB.size} 个卡牌模板"))
 
-      // Step 4: 生成抽卡结果
+      // Step 4: 生成抽卡结果，稀有度按预先算好的保底概率表一次抽完
       (generatedInfos, finalDrawCount, hasGotLegendary) <- IO {
-        var currentPityCount = currentDrawCount
-        var gotLegendary     = false
-        var tenDrawNormalCnt = 0
-
-        val results = (1 to drawCount).toList.map { drawIndex =>
-          currentPityCount += 1
-          
-          // Calculate probabilities based on pity system
-          val baseLegendaryRate = 0.6
-          val pityLegendaryRate = if (currentPityCount > 73) {
-            // Pity system: 0.6% + 6% * (n-73) after 73 draws
-            baseLegendaryRate + 6.0 * (currentPityCount - 73)
-          } else {
-            baseLegendaryRate
-          }
-          // Ensure 100% legendary at 90th draw
-          val legendaryRate = if (currentPityCount >= 90) 100.0 else pityLegendaryRate
-          val baseRareRate = 5.5
-          
-          // Adjust rare rate if legendary rate increases
-          val adjustedRareRate = if (legendaryRate > baseLegendaryRate) {
-            baseRareRate * (100.0 - legendaryRate) / (100.0 - baseLegendaryRate)
-          } else {
-            baseRareRate
-          }
-          
-          var normalRate = 100.0 - legendaryRate - adjustedRareRate
-          var finalRareRate = adjustedRareRate
-          
-          // 十连抽保底机制：如果是十连抽且前9抽都是普通卡，第10抽必须出稀有以上
-          if (drawCount == 10 && drawIndex == 10 && tenDrawNormalCnt == 9) {
-            // 第10抽且前9抽都是普通卡，将普通卡概率全部分给稀有卡
-            finalRareRate = adjustedRareRate + normalRate
-            normalRate = 0.0
-            println(s"十连抽保底触发：第10抽，前9抽都是普通卡，稀有概率调整为${finalRareRate}%，普通概率调整为${normalRate}%")
-          }
-          
-          // Log the probabilities for this draw
-          println(s"第${drawIndex}抽: 当前累计抽卡次数=${currentPityCount}, 传说概率=${legendaryRate}%, 稀有概率=${finalRareRate}%, 普通概率=${normalRate}%")
-          
-          val rand = scala.util.Random.nextDouble() * 100
-          val rarityName = if (rand < legendaryRate) {
-            gotLegendary = true
-            currentPityCount = 0  // Reset pity counter when getting legendary
-            "传说"
-          } else if (rand < legendaryRate + finalRareRate) {
-            "稀有"
-          } else {
-            // 统计十连抽中的普通卡数量
-            if (drawCount == 10) {
-              tenDrawNormalCnt += 1
-            }
-            "普通"
-          }
-          val pool = templatesByRarityFromDB.getOrElse(rarityName, Nil)
-          if (pool.isEmpty) {
-            throw new IllegalStateException(s"数据库中没有找到稀有度为 ${rarityName} 的卡牌模板")
-          }
-          
-          val template = pool(scala.util.Random.nextInt(pool.size))
-          val creationTime = DateTime.now
-          val userCardID = UUID.randomUUID().toString
+        val rng = ThreadLocalRandom.current()
+        val rarityDraw = GachaSampler.drawRarities(currentDrawCount, drawCount, rng)
+        if (rarityDraw.guaranteeTriggered) {
+          logger.info("十连抽保底触发：前9抽都是普通卡，第10抽至少为稀有")
+        }
+        val creationTime = DateTime.now
+        val results = rarityDraw.rarities.toList.map { rarity =>
+          val template = poolSampler.pick(rarity, rng)
           CardEntry(
-            userCardID = userCardID,
+            userCardID = UUID.randomUUID().toString,
             cardID = template.cardID,
             rarityLevel = template.rarity,
             cardLevel = 1,
@@ -142,13 +88,7 @@ case object CardDrawUtils {
             creationTime = creationTime
           )
         }
-        
-        // 记录十连抽保底结果
-        if (drawCount == 10) {
-          println(s"十连抽完成，普通卡数量：${tenDrawNormalCnt}/10")
-        }
-        
-        (results, currentPityCount, gotLegendary)
+        (results, rarityDraw.finalPity, rarityDraw.gotLegendary)
       }
 
       _ <- IO(logger.info(s"生成的抽卡结果: ${generatedInfos.map(info => s"[cardID=${info.cardID}, rarity=${info.rarityLevel}]").mkString(", ")}"))
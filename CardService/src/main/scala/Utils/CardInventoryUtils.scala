@@ -12,83 +12,111 @@ import Common.API.PlanContext
 import cats.effect.IO
 import Common.Object.SqlParameter
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
-import Objects.CardService.CardEntry
+import Objects.CardService.{CardEntry, CardInventoryPage}
 
 case object CardInventoryUtils {
   private val logger = LoggerFactory.getLogger(getClass)
 
+  /** 分页接口单页最大条数 */
+  val MAX_PAGE_SIZE = 200
+
+  private def inventoryQuery(keysetCondition: String, limitClause: String): String =
+    s"""
+      SELECT
+        uc.user_card_id,
+        uc.card_id,
+        uc.rarity_level,
+        uc.card_level,
+        uc.acquisition_time,
+        ct.card_name,
+        ct.description,
+        ct.type as card_type
+      FROM ${schemaName}.user_card_table uc
+      INNER JOIN ${schemaName}.card_template_table ct ON uc.card_id = ct.card_id
+      WHERE uc.user_id = ?${keysetCondition}
+      ORDER BY uc.user_card_id${limitClause};
+      """.stripMargin
+
+  private def toCardEntry(json: Json): CardEntry = {
+    val userCardID  = decodeField[String](json, "userCardID")
+    val cardID      = decodeField[String](json, "cardID")
+    val rarityLevel = decodeField[String](json, "rarityLevel")
+    val cardLevel   = decodeField[Int](json, "cardLevel")
+    val acquisitionTime = new DateTime(decodeField[Long](json, "acquisitionTime"))
+    val cardName    = decodeField[String](json, "cardName")
+    val description = decodeField[String](json, "description")
+    val cardType    = decodeField[String](json, "cardType")
+    CardEntry(userCardID, cardID, rarityLevel, cardLevel, cardName, description, cardType, acquisitionTime)
+  }
+
+  private def validateUserID(userID: String): IO[Unit] =
+    if (userID == null || userID.trim.isEmpty) {
+      IO.raiseError(new IllegalArgumentException("输入参数 userID 不能为空或为空字符串"))
+    } else {
+      IO(logger.info(s"userID ${userID} 通过验证"))
+    }
+
   /**
-   * 获取用户的卡牌库存
+   * 获取用户的卡牌库存，一次查询取回全部卡牌
    * @param userID 用户ID
-   * @return 用户的卡牌列表
+   * @return 用户的卡牌列表，按 userCardID 排序
    */
   def fetchUserCardInventory(userID: String)(using PlanContext): IO[List[CardEntry]] = {
     for {
       // Step 1: Validate input parameter
       _ <- IO(logger.info(s"开始验证输入参数 userId: ${userID}"))
-      _ <- if (userID == null || userID.trim.isEmpty) {
-             IO.raiseError(new IllegalArgumentException("输入参数 userID 不能为空或为空字符串"))
-           } else {
-             IO(logger.info(s"userID ${userID} 通过验证"))
-           }
+      _ <- validateUserID(userID)
 
-      // Step 2: 分页查询大量数据
-      _ <- IO(logger.info(s"准备分页查询用户卡牌信息，userID=${userID}"))
-      
-      // 先查询总数
-      countQuery <- IO {
-        s"SELECT COUNT(*) as total FROM ${schemaName}.user_card_table WHERE user_id = ?"
-      }
-      countResult <- readDBRows(countQuery, List(SqlParameter("String", userID)))
-      totalCards <- IO {
-        countResult.headOption.map(json => decodeField[Int](json, "total")).getOrElse(0)
-      }
-      _ <- IO(logger.info(s"用户总卡牌数量: ${totalCards}"))
+      // Step 2: 单次查询用户全部卡牌
+      _ <- IO(logger.info(s"查询用户卡牌信息，userID=${userID}"))
+      queryResults <- readDBRows(inventoryQuery("", ""), List(SqlParameter("String", userID)))
+      cardEntries <- IO(queryResults.map(toCardEntry))
+      _ <- IO(logger.info(s"查询完成，总计 ${cardEntries.size} 条记录"))
+    } yield cardEntries
+  }
+
+  /**
+   * 按 userCardID 键集分页获取用户卡牌
+   * @param userID 用户ID
+   * @param cursor 上一页返回的 nextCursor，首页传 None
+   * @param pageSize 每页条数
+   * @return 当前页卡牌以及下一页游标（没有下一页时为 None）
+   */
+  def fetchUserCardInventoryPage(userID: String, cursor: Option[String], pageSize: Int)(using PlanContext): IO[CardInventoryPage] = {
+    for {
+      _ <- validateUserID(userID)
+      _ <- if (pageSize <= 0 || pageSize > MAX_PAGE_SIZE) {
+        IO.raiseError(new IllegalArgumentException(s"pageSize 无效，必须在 1 到 ${MAX_PAGE_SIZE} 之间"))
+      } else IO.unit
 
-      // 分批查询，每批50张卡牌
-      batchSize = 50
-      totalBatches = Math.ceil(totalCards.toDouble / batchSize).toInt
-      
-      allCardEntries <- (0 until totalBatches).toList.traverse { batchIndex =>
-        val offset = batchIndex * batchSize
-        val sqlQuery = s"""
-          SELECT 
-            uc.user_card_id,
-            uc.card_id, 
-            uc.rarity_level, 
-            uc.card_level,
-            uc.acquisition_time,
-            ct.card_name,
-            ct.description,
-            ct.type as card_type
-          FROM ${schemaName}.user_card_table uc
-          INNER JOIN ${schemaName}.card_template_table ct ON uc.card_id = ct.card_id
-          WHERE uc.user_id = ?
-          LIMIT ${batchSize} OFFSET ${offset};
-          """.stripMargin
-        
-        for {
-          _ <- IO(logger.info(s"查询第${batchIndex + 1}批，偏移量: ${offset}"))
-          queryResults <- readDBRows(sqlQuery, List(SqlParameter("String", userID)))
-          cardEntries <- IO {
-            queryResults.map { json =>
-              val userCardID  = decodeField[String](json, "userCardID")
-              val cardID      = decodeField[String](json, "cardID")
-              val rarityLevel = decodeField[String](json, "rarityLevel")
-              val cardLevel   = decodeField[Int](json, "cardLevel")
-              val acquisitionTime = DateTime.now
-              val cardName    = decodeField[String](json, "cardName")
-              val description = decodeField[String](json, "description")
-              val cardType    = decodeField[String](json, "cardType")
-              CardEntry(userCardID, cardID, rarityLevel, cardLevel, cardName, description, cardType, acquisitionTime)
-            }
-          }
-        } yield cardEntries
+      // 多取一条用来判断是否还有下一页
+      sqlQuery = inventoryQuery(if (cursor.isDefined) " AND uc.user_card_id > ?" else "", " LIMIT ?")
+      queryParams = List(SqlParameter("String", userID)) ++
+        cursor.map(SqlParameter("String", _)).toList :+
+        SqlParameter("Int", (pageSize + 1).toString)
+      _ <- IO(logger.info(s"分页查询用户卡牌 userID=${userID}, cursor=${cursor}, pageSize=${pageSize}"))
+      queryResults <- readDBRows(sqlQuery, queryParams)
+      page <- IO {
+        val cards = queryResults.take(pageSize).map(toCardEntry)
+        val nextCursor = if (queryResults.size > pageSize) cards.lastOption.map(_.userCardID) else None
+        CardInventoryPage(cards, nextCursor)
       }
-      
-      finalCardEntries = allCardEntries.flatten
-      _ <- IO(logger.info(s"成功分批查询完成，总计 ${finalCardEntries.size} 条记录"))
+      _ <- IO(logger.info(s"本页 ${page.cards.size} 条记录, nextCursor=${page.nextCursor}"))
+    } yield page
+  }
 
-    } yield finalCardEntries
+  /**
+   * 获取用户已拥有的卡牌模板ID，抽卡判断新卡时只需要这一列
+   * @param userID 用户ID
+   * @return 卡牌模板ID集合
+   */
+  def fetchUserOwnedCardIDs(userID: String)(using PlanContext): IO[Set[String]] = {
+    for {
+      _ <- validateUserID(userID)
+      queryResults <- readDBRows(
+        s"SELECT DISTINCT card_id FROM ${schemaName}.user_card_table WHERE user_id = ?",
+        List(SqlParameter("String", userID))
+      )
+    } yield queryResults.map(json => decodeField[String](json, "cardID")).toSet
   }
 }
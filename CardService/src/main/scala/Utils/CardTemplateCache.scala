@@ -0,0 +1,114 @@
+package Utils
+
+import cats.effect.IO
+import org.slf4j.LoggerFactory
+import Objects.CardService.CardTemplate
+
+import java.util.concurrent.atomic.AtomicLong
+import scala.collection.concurrent.TrieMap
+
+/**
+ * 卡牌模板进程内缓存
+ * 卡池模板按 poolType 缓存，单张模板按 cardID 缓存；条目有 TTL，超过容量时淘汰最早载入的条目
+ * 模板只会由 CreateCardTemplateMessage 新增，新增后调用 invalidateAll 清空
+ */
+case object CardTemplateCache {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /** 缓存条目存活时间（毫秒） */
+  val ttlMillis: Long = 10 * 60 * 1000L
+
+  /** 按卡池缓存的最大条目数 */
+  val maxPoolEntries: Int = 16
+
+  /** 按卡牌ID缓存的最大条目数 */
+  val maxCardEntries: Int = 4096
+
+  /** GetAllCardTemplatesMessage 使用的卡池键 */
+  val allTemplatesKey: String = "*"
+
+  private case class Entry[A](value: A, loadedAt: Long)
+
+  private val byPool = TrieMap.empty[String, Entry[List[CardTemplate]]]
+  private val byCardID = TrieMap.empty[String, Entry[CardTemplate]]
+
+  private val hits = new AtomicLong(0)
+  private val misses = new AtomicLong(0)
+  private val invalidations = new AtomicLong(0)
+
+  /** 每次失效加一；载入前后代数不同说明期间发生过失效，结果不再写入缓存 */
+  private val generation = new AtomicLong(0)
+
+  def getPool(poolType: String)(load: => IO[List[CardTemplate]]): IO[List[CardTemplate]] =
+    getOrLoad(byPool, poolType, maxPoolEntries)(
+      load.flatTap { templates =>
+        IO(templates.foreach(template => put(byCardID, template.cardID, template, maxCardEntries)))
+      }
+    )
+
+  def getCard(cardID: String)(load: => IO[CardTemplate]): IO[CardTemplate] =
+    getOrLoad(byCardID, cardID, maxCardEntries)(load)
+
+  /**
+   * 批量获取单张模板：命中的直接返回，未命中的 ID 交给 loadMissing 一次查出并写入缓存
+   * @return cardID -> 模板，数据库中不存在的 ID 不在结果中
+   */
+  def getCards(cardIDs: List[String])(loadMissing: List[String] => IO[List[CardTemplate]]): IO[Map[String, CardTemplate]] =
+    for {
+      cached <- IO(cardIDs.distinct.map(id => id -> byCardID.get(id).filter(isFresh).map(_.value)))
+      found = cached.collect { case (id, Some(template)) => id -> template }.toMap
+      missing = cached.collect { case (id, None) => id }
+      _ <- IO {
+        hits.addAndGet(found.size.toLong)
+        misses.addAndGet(missing.size.toLong)
+      }
+      generationBefore <- IO(generation.get())
+      loaded <- if (missing.isEmpty) IO.pure(Nil) else loadMissing(missing)
+      _ <- IO {
+        if (generation.get() == generationBefore) loaded.foreach(template => put(byCardID, template.cardID, template, maxCardEntries))
+      }
+    } yield found ++ loaded.map(template => template.cardID -> template)
+
+  def invalidateAll: IO[Unit] = IO {
+    generation.incrementAndGet()
+    byPool.clear()
+    byCardID.clear()
+    invalidations.incrementAndGet()
+    logger.info(s"卡牌模板缓存已清空，当前统计: ${stats}")
+  }
+
+  def stats: Map[String, Long] = Map(
+    "hits" -> hits.get(),
+    "misses" -> misses.get(),
+    "invalidations" -> invalidations.get(),
+    "poolEntries" -> byPool.size.toLong,
+    "cardEntries" -> byCardID.size.toLong
+  )
+
+  private def getOrLoad[A](cache: TrieMap[String, Entry[A]], key: String, maxEntries: Int)(load: => IO[A]): IO[A] =
+    IO(cache.get(key).filter(isFresh)).flatMap {
+      case Some(entry) =>
+        IO(hits.incrementAndGet()).as(entry.value)
+      case None =>
+        for {
+          _ <- IO(misses.incrementAndGet())
+          generationBefore <- IO(generation.get())
+          value <- load
+          _ <- IO(if (generation.get() == generationBefore) put(cache, key, value, maxEntries))
+        } yield value
+    }
+
+  private def isFresh[A](entry: Entry[A]): Boolean =
+    System.currentTimeMillis() - entry.loadedAt < ttlMillis
+
+  private def put[A](cache: TrieMap[String, Entry[A]], key: String, value: A, maxEntries: Int): Unit = {
+    cache.put(key, Entry(value, System.currentTimeMillis()))
+    if (cache.size > maxEntries) {
+      cache.filterNot { case (_, entry) => isFresh(entry) }.keys.foreach(cache.remove)
+      val overflow = cache.size - maxEntries
+      if (overflow > 0) {
+        cache.toList.sortBy(_._2.loadedAt).take(overflow).foreach { case (staleKey, _) => cache.remove(staleKey) }
+      }
+    }
+  }
+}
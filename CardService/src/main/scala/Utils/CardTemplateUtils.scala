@@ -15,6 +15,14 @@ import Objects.CardService.CardTemplate
 case object CardTemplateUtils {
   private val logger = LoggerFactory.getLogger(getClass)
 
+  /**
+   * 获取卡牌模板，优先读取 CardTemplateCache，未命中或过期时回源数据库
+   * @param poolType 卡池类型
+   * @return 卡牌模板列表
+   */
+  def fetchCardTemplates(poolType: String)(using PlanContext): IO[List[CardTemplate]] =
+    CardTemplateCache.getPool(poolType)(fetchCardTemplatesFromDB(poolType))
+
   /**
    * 从数据库获取卡牌模板
    * @param poolType 卡池类型
@@ -51,4 +59,34 @@ case object CardTemplateUtils {
       _ <- IO(logger.info(s"成功转换为 CardTemplate 对象，共 ${cardTemplates.size} 个模板"))
     } yield cardTemplates
   }
-}
\ No newline at end of file
+
+  /**
+   * 按ID批量获取卡牌模板，缓存未命中的部分用一次 ANY(?) 查询补齐
+   * @param cardIDs 卡牌模板ID列表，可重复
+   * @return cardID -> 卡牌模板
+   */
+  def fetchCardTemplatesByIDs(cardIDs: List[String])(using PlanContext): IO[Map[String, CardTemplate]] =
+    CardTemplateCache.getCards(cardIDs)(fetchCardTemplatesByIDsFromDB)
+
+  private def fetchCardTemplatesByIDsFromDB(cardIDs: List[String])(using PlanContext): IO[List[CardTemplate]] = {
+    for {
+      _ <- IO(logger.info(s"从数据库批量获取 ${cardIDs.size} 个卡牌模板"))
+      queryResults <- readDBRows(
+        s"""
+        SELECT card_id, card_name, rarity, description, type
+        FROM ${schemaName}.card_template_table
+        WHERE card_id = ANY(?)
+        """,
+        List(SqlParameter("Array[String]", cardIDs.asJson.noSpaces))
+      )
+    } yield queryResults.map { json =>
+      CardTemplate(
+        decodeField[String](json, "card_id"),
+        decodeField[String](json, "card_name"),
+        decodeField[String](json, "rarity"),
+        decodeField[String](json, "description"),
+        decodeField[String](json, "type")
+      )
+    }
+  }
+}
@@ -0,0 +1,192 @@
+package Utils
+
+import Objects.CardService.{CardTemplate, DrawSimulationResult}
+import cats.effect.IO
+
+import java.util.Random
+import java.util.concurrent.ThreadLocalRandom
+import scala.collection.concurrent.TrieMap
+
+/**
+ * 抽卡采样器
+ * 每个保底步数的稀有度累积概率在对象初始化时一次性算好，按卡池分好的模板数组在模板变化时重建，
+ * 一次请求的 N 抽在同一个循环里完成
+ */
+case object GachaSampler {
+
+  /** 稀有度下标，与 rarityNames 对应 */
+  val Legendary = 0
+  val Rare = 1
+  val Normal = 2
+  val rarityNames: Vector[String] = Vector("传说", "稀有", "普通")
+
+  /** 累计抽数达到该值时必出传说 */
+  val HardPity = 90
+  /** 累计抽数超过该值后传说概率每抽提升 6% */
+  val SoftPityStart = 73
+  val TenPull = 10
+
+  private val BaseLegendaryRate = 0.6
+  private val BaseRareRate = 5.5
+
+  /** legendaryCut(p): 第 p 抽（保底计数自增之后）出传说的概率，取值 [0, 1] */
+  private val legendaryCut: Array[Double] = Array.tabulate(HardPity + 1)(pity => legendaryRate(pity) / 100.0)
+
+  /** rareCut(p): 出稀有及以上的累积概率 */
+  private val rareCut: Array[Double] = Array.tabulate(HardPity + 1) { pity =>
+    val legendary = legendaryRate(pity)
+    val rare = if (legendary > BaseLegendaryRate) BaseRareRate * (100.0 - legendary) / (100.0 - BaseLegendaryRate) else BaseRareRate
+    (legendary + rare) / 100.0
+  }
+
+  private def legendaryRate(pity: Int): Double =
+    if (pity >= HardPity) 100.0
+    else if (pity > SoftPityStart) BaseLegendaryRate + 6.0 * (pity - SoftPityStart)
+    else BaseLegendaryRate
+
+  /**
+   * 一次请求的稀有度抽取结果
+   * @param rarities 每一抽的稀有度下标
+   * @param finalPity 本次请求结束后的保底计数
+   * @param guaranteeTriggered 是否触发了十连保底
+   */
+  case class RarityDraw(rarities: Array[Int], finalPity: Int, guaranteeTriggered: Boolean) {
+    def gotLegendary: Boolean = rarities.contains(Legendary)
+  }
+
+  /**
+   * 从当前保底计数开始连续抽取 drawCount 次稀有度
+   * 十连抽且前 9 抽都是普通时，第 10 抽的普通概率全部并入稀有
+   */
+  def drawRarities(startPity: Int, drawCount: Int, rng: Random = ThreadLocalRandom.current()): RarityDraw = {
+    val rarities = new Array[Int](drawCount)
+    var pity = startPity
+    var normalCount = 0
+    var guaranteeTriggered = false
+    var i = 0
+    while (i < drawCount) {
+      pity += 1
+      val step = math.min(pity, HardPity)
+      val guarantee = drawCount == TenPull && i == TenPull - 1 && normalCount == TenPull - 1
+      val roll = rng.nextDouble()
+      val rarity =
+        if (roll < legendaryCut(step)) Legendary
+        else if (guarantee || roll < rareCut(step)) Rare
+        else Normal
+
+      if (guarantee) guaranteeTriggered = true
+      if (rarity == Legendary) pity = 0
+      if (rarity == Normal) normalCount += 1
+      rarities(i) = rarity
+      i += 1
+    }
+    RarityDraw(rarities, pity, guaranteeTriggered)
+  }
+
+  /** 按稀有度分好的卡池模板，source 用来判断模板缓存是否已经换了一批 */
+  final class PoolSampler(val source: List[CardTemplate]) {
+    private val byRarity: Array[Array[CardTemplate]] = {
+      val grouped = source.groupBy(_.rarity)
+      rarityNames.map(name => grouped.getOrElse(name, Nil).toArray).toArray
+    }
+
+    def pick(rarity: Int, rng: Random): CardTemplate = {
+      val templates = byRarity(rarity)
+      if (templates.isEmpty) {
+        throw new IllegalStateException(s"数据库中没有找到稀有度为 ${rarityNames(rarity)} 的卡牌模板")
+      }
+      templates(rng.nextInt(templates.length))
+    }
+  }
+
+  private val poolSamplers = TrieMap.empty[String, PoolSampler]
+
+  /** 取卡池对应的采样器；模板缓存重新载入后列表实例会变化，此时重建 */
+  def poolSampler(poolType: String, templates: List[CardTemplate]): PoolSampler =
+    poolSamplers.get(poolType) match {
+      case Some(sampler) if sampler.source eq templates => sampler
+      case _ =>
+        val sampler = new PoolSampler(templates)
+        poolSamplers.put(poolType, sampler)
+        sampler
+    }
+
+  /** 模拟每批推进的抽数，批与批之间让出计算线程 */
+  private val SimulationChunkDraws = 10000
+
+  /**
+   * 离线模拟抽卡，只抽稀有度，不访问数据库
+   * 纯计算，在计算线程池上分批执行，每批之后 IO.cede，长时间模拟不会占住处理其他请求的线程
+   * @param totalDraws 总抽数
+   * @param drawsPerRequest 每次请求的抽数（1 到 10）
+   * @param startPity 初始保底计数
+   * @param seed 随机种子，用于复现
+   */
+  def simulate(totalDraws: Int, drawsPerRequest: Int, startPity: Int, seed: Option[Long]): IO[DrawSimulationResult] = {
+    def loop(simulation: Simulation): IO[DrawSimulationResult] =
+      IO(simulation.advance(SimulationChunkDraws)).flatMap { finished =>
+        if (finished) IO(simulation.result) else IO.cede >> loop(simulation)
+      }
+    IO(new Simulation(totalDraws, drawsPerRequest, startPity, seed)).flatMap(loop)
+  }
+
+  /** 一次模拟的累计状态，由 simulate 分批推进 */
+  private final class Simulation(totalDraws: Int, drawsPerRequest: Int, startPity: Int, seed: Option[Long]) {
+    private val rng = seed.map(new Random(_)).getOrElse(new Random())
+    private val rarityCounts = new Array[Long](rarityNames.size)
+    private val legendaryAtPity = new Array[Long](HardPity + 1)
+    private var pity = startPity
+    private var drawsDone = 0
+    private var requests = 0L
+    private var guaranteeTriggered = 0L
+    private var tenPullsWithoutRare = 0L
+    private var maxDrawsWithoutLegendary = 0
+
+    /** 至少再模拟 draws 抽（按整次请求推进），返回是否已经完成 */
+    def advance(draws: Int): Boolean = {
+      val target = math.min(totalDraws.toLong, drawsDone.toLong + draws)
+      while (drawsDone < target) {
+        val count = math.min(drawsPerRequest, totalDraws - drawsDone)
+        val result = drawRarities(pity, count, rng)
+        var i = 0
+        while (i < count) {
+          val rarity = result.rarities(i)
+          rarityCounts(rarity) += 1
+          pity += 1
+          if (rarity == Legendary) {
+            legendaryAtPity(math.min(pity, HardPity)) += 1
+            maxDrawsWithoutLegendary = math.max(maxDrawsWithoutLegendary, pity)
+            pity = 0
+          }
+          i += 1
+        }
+        maxDrawsWithoutLegendary = math.max(maxDrawsWithoutLegendary, pity)
+        if (result.guaranteeTriggered) guaranteeTriggered += 1
+        if (count == TenPull && result.rarities.forall(_ == Normal)) tenPullsWithoutRare += 1
+        requests += 1
+        drawsDone += count
+      }
+      drawsDone >= totalDraws
+    }
+
+    def result: DrawSimulationResult = {
+      val legendaryCount = rarityCounts(Legendary)
+      def percent(n: Long): Double = if (totalDraws == 0) 0.0 else n * 100.0 / totalDraws
+      DrawSimulationResult(
+        totalDraws = totalDraws.toLong,
+        requestCount = requests,
+        legendaryCount = legendaryCount,
+        rareCount = rarityCounts(Rare),
+        normalCount = rarityCounts(Normal),
+        legendaryRate = percent(legendaryCount),
+        rareRate = percent(rarityCounts(Rare)),
+        normalRate = percent(rarityCounts(Normal)),
+        averageDrawsPerLegendary = if (legendaryCount == 0) 0.0 else legendaryAtPity.zipWithIndex.map { case (n, p) => n * p }.sum.toDouble / legendaryCount,
+        maxDrawsWithoutLegendary = maxDrawsWithoutLegendary,
+        legendaryByPity = legendaryAtPity.toList.drop(1),
+        tenPullGuaranteeTriggered = guaranteeTriggered,
+        tenPullsWithoutRare = tenPullsWithoutRare
+      )
+    }
+  }
+}
@@ -0,0 +1,193 @@
+import argparse
+import concurrent.futures
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from service_client import ServiceClient, base_url
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "api_latency.json"
+DEFAULT_CONCURRENCY = [1, 8, 32]
+
+
+def _fixtures(args) -> Dict[str, dict]:
+    """Request bodies for each benchmarked /api/<Message> endpoint
+
+    FindOrCreateMatchRoomMessage is left out: it is a long poll that holds an
+    unpaired request for MatchmakingQueue.LongPollTimeout, so its latency is the
+    timeout, not service time.
+    """
+    return {
+        "DrawCardMessage": {"userID": args.user_id, "drawCount": 1, "poolType": "standard"},
+        "GetPlayerCardsMessage": {"userID": args.user_id},
+        "LoadBattleDeckMessage": {"userID": args.user_id},
+        "QueryAssetStatusMessage": {"userID": args.user_id},
+        "GetUserInfoMessage": {"userID": args.user_id},
+        "GetChatHistoryMessage": {"userToken": args.user_token, "friendID": args.friend_id},
+        "ViewSystemStatsMessage": {"adminToken": args.admin_token},
+    }
+
+
+ENDPOINT_SERVICES = {
+    "DrawCardMessage": "CardService",
+    "GetPlayerCardsMessage": "CardService",
+    "LoadBattleDeckMessage": "CardService",
+    "QueryAssetStatusMessage": "AssetService",
+    "GetUserInfoMessage": "UserService",
+    "GetChatHistoryMessage": "UserService",
+    "ViewSystemStatsMessage": "AdminService",
+}
+
+
+def percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def run_level(call: Callable[[], int], concurrency: int, total: int) -> Dict[str, object]:
+    """Fire `total` requests with `concurrency` workers and summarise the latency of the successful ones"""
+    latencies: List[float] = []
+    errors = 0
+
+    def timed() -> Tuple[float, bool]:
+        start = time.perf_counter()
+        try:
+            ok = 200 <= call() < 300
+        except Exception:
+            ok = False
+        return (time.perf_counter() - start) * 1000.0, ok
+
+    wall_start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for elapsed_ms, ok in executor.map(lambda _: timed(), range(total)):
+            if ok:
+                latencies.append(elapsed_ms)
+            else:
+                errors += 1
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rps": round(len(latencies) / wall, 2) if wall > 0 else None,
+        "mean_ms": _rounded(statistics.fmean(latencies) if latencies else None),
+        "p50_ms": _rounded(percentile(latencies, 50)),
+        "p95_ms": _rounded(percentile(latencies, 95)),
+        "p99_ms": _rounded(percentile(latencies, 99)),
+    }
+
+
+def run_benchmarks(args) -> Dict[str, Dict[str, dict]]:
+    fixtures = _fixtures(args)
+    results: Dict[str, Dict[str, dict]] = {}
+    for endpoint in args.endpoints:
+        client = ServiceClient(base_url(ENDPOINT_SERVICES[endpoint], args.host), pool_size=max(args.concurrency))
+        payload = fixtures[endpoint]
+
+        def call() -> int:
+            return client.call(endpoint, payload).status_code
+
+        for _ in range(args.warmup):
+            call()
+
+        results[endpoint] = {}
+        for level in args.concurrency:
+            stats = run_level(call, level, max(args.requests, level))
+            results[endpoint][str(level)] = stats
+            print(f"{endpoint:<30} c={level:<4} p50={str(stats['p50_ms']):>9}ms p95={str(stats['p95_ms']):>9}ms "
+                  f"p99={str(stats['p99_ms']):>9}ms rps={str(stats['rps']):>8} errors={stats['errors']}")
+    return results
+
+
+def compare(results: Dict[str, Dict[str, dict]], baseline: Dict[str, Dict[str, dict]], threshold: float) -> List[str]:
+    """p95 regressions beyond `threshold` (0.2 = 20% slower) against the stored baseline"""
+    regressions = []
+    for endpoint, levels in results.items():
+        for level, stats in levels.items():
+            base = baseline.get(endpoint, {}).get(level)
+            if not base or not base.get("p95_ms"):
+                continue
+            limit = base["p95_ms"] * (1.0 + threshold)
+            if stats["p95_ms"] is not None and stats["p95_ms"] > limit:
+                regressions.append(
+                    f"{endpoint} c={level}: p95 {stats['p95_ms']}ms > baseline {base['p95_ms']}ms (+{threshold:.0%})"
+                )
+    return regressions
+
+
+def error_failures(results: Dict[str, Dict[str, dict]], max_error_rate: float) -> List[str]:
+    """Levels whose error rate exceeds `max_error_rate` (0 = any failed request fails the run)"""
+    failures = []
+    for endpoint, levels in results.items():
+        for level, stats in levels.items():
+            if stats["errors"] and stats["error_rate"] > max_error_rate:
+                failures.append(
+                    f"{endpoint} c={level}: {stats['errors']}/{stats['requests']} requests failed "
+                    f"({stats['error_rate']:.1%} > {max_error_rate:.1%})"
+                )
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Latency benchmark for the planner /api/<Message> endpoints")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--endpoints", nargs="+", default=list(ENDPOINT_SERVICES), choices=list(ENDPOINT_SERVICES))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per endpoint")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="overwrite the baseline with this run")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("SATT_BENCH_THRESHOLD", "0.2")),
+                        help="allowed p95 regression ratio before the run fails")
+    parser.add_argument("--max-error-rate", type=float, default=float(os.environ.get("SATT_BENCH_MAX_ERROR_RATE", "0")),
+                        help="allowed share of failed requests per level before the run fails (default: none)")
+    parser.add_argument("--user-id", default=os.environ.get("SATT_BENCH_USER_ID", "bench-user-0000000001"))
+    parser.add_argument("--user-token", default=os.environ.get("SATT_BENCH_USER_TOKEN", "bench-user-token-0000000001"))
+    parser.add_argument("--friend-id", default=os.environ.get("SATT_BENCH_FRIEND_ID", "bench-user-0000000002"))
+    parser.add_argument("--admin-token", default=os.environ.get("SATT_BENCH_ADMIN_TOKEN", "bench-admin-token"))
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = run_benchmarks(args)
+
+    failures = error_failures(results, args.max_error_rate)
+    for line in failures:
+        print(f"✗ {line}")
+    if failures:
+        # latencies only cover successful requests, so an erroring run is neither comparable nor a valid baseline
+        return 1
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; rerun with --save-baseline to create one")
+        return 0
+
+    regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+    for line in regressions:
+        print(f"✗ {line}")
+    if not regressions:
+        print("✓ No p95 regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,463 @@
+"""
+Local stand-in for the DB-Manager service behind Common.DBAPI.
+
+Speaks the same `/api/<Message>` protocol the Scala services use
+(ReadDBRowsMessage, ReadDBValueMessage, WriteDBMessage, WriteDBListMessage,
+BatchDBMessage, InitSchemaMessage, SwitchDataSourceMessage, StartTransactionMessage,
+EndTransactionMessage) on top of SQLite, so suites and benchmarks can run
+without Postgres. Each schema is its own SQLite file, so a transaction that is
+writing card_service does not block asset_service writes issued by the
+downstream call it is waiting on.
+
+Services probe BatchDBMessage at startup and fall back to one call per
+statement when the DB-Manager they talk to rejects it.
+
+Run:  python Test/db_standin.py --latency-ms 2
+Stats: GET /stats (per message type and per traceID round trips), POST /stats/reset
+"""
+import argparse
+import json
+import os
+import queue
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# DB-Manager 的服务码是 A000002，对应端口 10002（见 Common.ServiceUtils.portMap）
+DB_MANAGER_PORT = 10002
+
+
+class StatementError(Exception):
+    pass
+
+
+_CAST = re.compile(r"::\s*[a-zA-Z_]+(\s*\[\])?")
+_NOW = re.compile(r"\bNOW\(\)", re.IGNORECASE)
+_FOR_UPDATE = re.compile(r"\bFOR\s+UPDATE\b", re.IGNORECASE)
+_SERIAL_PK = re.compile(r"\b(BIG)?SERIAL\s+PRIMARY\s+KEY\b", re.IGNORECASE)
+# SQLite 的索引名带 schema 前缀、表名不带：CREATE INDEX s.idx ON table(...)
+_CREATE_INDEX = re.compile(
+    r'\bCREATE\s+(UNIQUE\s+)?INDEX\s+(IF\s+NOT\s+EXISTS\s+)?("?\w+"?)\s+ON\s+("?\w+"?)\.("?\w+"?)',
+    re.IGNORECASE,
+)
+_ANY_PARAM = re.compile(r"=\s*ANY\s*\(\s*\?\s*\)", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"(=\s*ANY\s*\(\s*\?\s*\)|\?)", re.IGNORECASE)
+_NOW_MILLIS = "(CAST(strftime('%s','now') AS INTEGER) * 1000)"
+
+
+def translate(sql: str, params: List[dict]) -> Tuple[str, list]:
+    """Rewrite the Postgres dialect the planners use into SQLite and bind parameters"""
+    sql = _CAST.sub("", sql)
+    sql = _NOW.sub(_NOW_MILLIS, sql)
+    sql = _FOR_UPDATE.sub("", sql)
+    sql = _SERIAL_PK.sub("INTEGER PRIMARY KEY AUTOINCREMENT", sql)
+    sql = _CREATE_INDEX.sub(lambda m: f"CREATE {m.group(1) or ''}INDEX {m.group(2) or ''}{m.group(4)}.{m.group(3)} ON {m.group(5)}", sql)
+
+    out: List[str] = []
+    values: list = []
+    params_iter = iter(params)
+    for token in _PLACEHOLDER.split(sql):
+        if token != "?" and not _ANY_PARAM.fullmatch(token):
+            out.append(token)
+            continue
+        try:
+            param = next(params_iter)
+        except StopIteration:
+            raise StatementError(f"Not enough parameters ({len(params)}) for statement")
+        if token == "?":
+            out.append("?")
+            values.append(json.dumps(_bind_array(param)) if _is_array(param) else _bind(param))
+        else:
+            # `= ANY(?)` 的数组参数展开成 IN (?, ?, ...)
+            items = _bind_array(param)
+            out.append("IN (" + (", ".join("?" for _ in items) or "NULL") + ")")
+            values.extend(items)
+    if next(params_iter, None) is not None:
+        raise StatementError(f"Too many parameters ({len(params)}) for statement")
+    return "".join(out), values
+
+
+def _is_array(param: dict) -> bool:
+    return param["dataType"].lower().startswith("array[")
+
+
+def _bind(param: dict):
+    data_type, value = param["dataType"].lower(), param["value"]
+    if value is None:
+        return None
+    if data_type in ("int", "long", "datetime"):
+        return int(value)
+    if data_type == "double":
+        return float(value)
+    if data_type == "boolean":
+        return 1 if str(value).lower().startswith("t") else 0
+    return value
+
+
+def _bind_array(param: dict) -> list:
+    items = json.loads(param["value"]) if param["value"] else []
+    return [int(i) for i in items] if param["dataType"].lower() == "array[int]" else items
+
+
+def snake_to_camel(name: str) -> str:
+    """Mirror of Common.DBAPI.snakeToCamel, which is how the real DB-Manager names row fields"""
+    head, *tail = name.split("_")
+    return head + "".join("ID" if part == "id" else part[:1].upper() + part[1:] for part in tail)
+
+
+class SchemaStore:
+    """SQLite files per schema, plus a pool of autocommit connections that attach all of them"""
+
+    def __init__(self, data_dir: Path):
+        self.root = data_dir
+        self.project = "default"
+        self.schemas: Dict[str, Path] = {}
+        self.lock = threading.Lock()
+        self.idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+
+    def switch_project(self, project: str):
+        with self.lock:
+            self.project = project
+            self.schemas.clear()
+            project_dir = self.root / project
+            project_dir.mkdir(parents=True, exist_ok=True)
+            for existing in project_dir.glob("*.db"):
+                self.schemas[existing.stem] = existing
+        self._drain_idle()
+
+    def init_schema(self, schema: str):
+        with self.lock:
+            if schema not in self.schemas:
+                path = self.root / self.project / f"{schema}.db"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                setup = sqlite3.connect(path)
+                setup.execute("PRAGMA journal_mode=WAL")
+                setup.close()
+                self.schemas[schema] = path
+
+    def _drain_idle(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def connect(self) -> sqlite3.Connection:
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None,
+                                   detect_types=sqlite3.PARSE_DECLTYPES, timeout=30)
+            conn.execute("PRAGMA busy_timeout = 30000")
+        attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+        with self.lock:
+            missing = [(name, path) for name, path in self.schemas.items() if name not in attached]
+        for name, path in missing:
+            conn.execute("ATTACH DATABASE ? AS " + _quote(name), (str(path),))
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        self.idle.put(conn)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _convert_timestamp(raw: bytes):
+    # 服务端按毫秒时间戳写入 DateTime；DEFAULT CURRENT_TIMESTAMP 之类的文本原样返回
+    text = raw.decode("utf-8")
+    return int(text) if text.lstrip("-").isdigit() else text
+
+
+sqlite3.register_converter("BOOLEAN", lambda raw: raw not in (b"0", b"", b"f", b"false"))
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+sqlite3.register_converter("DATE", _convert_timestamp)
+
+
+class DBManager:
+    def __init__(self, store: SchemaStore, latency_ms: float, jitter_ms: float):
+        self.store = store
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.transactions: Dict[str, sqlite3.Connection] = {}
+        self.tx_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.by_message: Counter = Counter()
+        self.by_trace: Dict[str, Counter] = defaultdict(Counter)
+
+    # ---------- bookkeeping ----------
+
+    def record(self, message: str, trace_id: str):
+        with self.stats_lock:
+            self.by_message[message] += 1
+            self.by_trace[trace_id][message] += 1
+
+    def stats(self) -> dict:
+        with self.stats_lock:
+            per_trace = {trace: sum(c.values()) for trace, c in self.by_trace.items()}
+            return {
+                "total": sum(self.by_message.values()),
+                "byMessage": dict(self.by_message),
+                "byTrace": {trace: dict(c) for trace, c in self.by_trace.items()},
+                "roundTripsPerTrace": per_trace,
+                "openTransactions": len(self.transactions),
+            }
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.by_message.clear()
+            self.by_trace.clear()
+
+    def inject_latency(self):
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms > 0 else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    # ---------- statement execution ----------
+
+    def _run(self, trace_id: str, fn):
+        """Run `fn(conn)` on the trace's transaction connection, or on a pooled autocommit one"""
+        with self.tx_lock:
+            tx_conn = self.transactions.get(trace_id)
+        if tx_conn is not None:
+            try:
+                return fn(tx_conn)
+            except Exception:
+                # 事务内出错：DB-Manager 负责回滚，并通过 X-DidRollback 告诉调用方不必再 EndTransaction
+                self._finish(trace_id, commit=False)
+                raise
+        conn = self.store.connect()
+        try:
+            return fn(conn)
+        finally:
+            self.store.release(conn)
+
+    def start_transaction(self, trace_id: str) -> str:
+        conn = self.store.connect()
+        conn.execute("BEGIN")
+        with self.tx_lock:
+            previous = self.transactions.pop(trace_id, None)
+            self.transactions[trace_id] = conn
+        if previous is not None:
+            previous.execute("ROLLBACK")
+            self.store.release(previous)
+        return "OK"
+
+    def _finish(self, trace_id: str, commit: bool):
+        with self.tx_lock:
+            conn = self.transactions.pop(trace_id, None)
+        if conn is None:
+            return
+        try:
+            conn.execute("COMMIT" if commit else "ROLLBACK")
+        finally:
+            self.store.release(conn)
+
+    def end_transaction(self, trace_id: str, commit: bool) -> str:
+        self._finish(trace_id, commit)
+        return "OK"
+
+    def in_transaction(self, trace_id: str) -> bool:
+        with self.tx_lock:
+            return trace_id in self.transactions
+
+    def read_rows(self, trace_id: str, sql: str, params: List[dict]) -> list:
+        query, values = translate(sql, params)
+
+        return self._run(trace_id, lambda conn: _fetch_rows(conn, query, values))
+
+    def read_value(self, trace_id: str, sql: str, params: List[dict]) -> str:
+        rows = self.read_rows(trace_id, sql, params)
+        if not rows:
+            raise StatementError("Query returned no rows")
+        value = next(iter(rows[0].values()))
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return "" if value is None else str(value)
+
+    def write(self, trace_id: str, sql: str, params: List[dict]) -> str:
+        query, values = translate(sql, params)
+
+        def fn(conn):
+            statements = split_statements(query) if not values else [query]
+            for statement in statements:
+                conn.execute(statement, values)
+        self._run(trace_id, fn)
+        return "OK"
+
+    def batch(self, trace_id: str, statements: List[dict]) -> list:
+        """BatchDBMessage: ordered reads/writes in one call, atomic when no transaction is open"""
+        translated = [(s["kind"], *translate(s["sqlQuery"], s.get("parameters", []))) for s in statements]
+        own_transaction = not self.in_transaction(trace_id)
+
+        def fn(conn):
+            if own_transaction:
+                conn.execute("BEGIN")
+            results = []
+            try:
+                for kind, query, values in translated:
+                    if kind == "read":
+                        results.append(_fetch_rows(conn, query, values))
+                    else:
+                        conn.execute(query, values)
+                        results.append("OK")
+            except Exception:
+                if own_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            if own_transaction:
+                conn.execute("COMMIT")
+            return results
+        return self._run(trace_id, fn)
+
+    def write_list(self, trace_id: str, sql: str, param_lists: List[dict]) -> str:
+        batches = [translate(sql, p["l"]) for p in param_lists]
+
+        def fn(conn):
+            for query, values in batches:
+                conn.execute(query, values)
+        self._run(trace_id, fn)
+        return "OK"
+
+
+def _fetch_rows(conn: sqlite3.Connection, query: str, values: list) -> list:
+    cursor = conn.execute(query, values)
+    names = [snake_to_camel(col[0]) for col in cursor.description or []]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def split_statements(script: str) -> List[str]:
+    """Split a parameterless script (Init's CREATE TABLE blocks) into single statements"""
+    statements, buffer = [], ""
+    for piece in script.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip(" \t\r\n;"):
+                statements.append(buffer)
+            buffer = ""
+    if buffer.strip(" \t\r\n;"):
+        statements.append(buffer.rstrip(";"))
+    return statements
+
+
+def make_handler(manager: DBManager):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _reply(self, status: int, body: str, rollback: bool = False, content_type: str = "text/plain"):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            if rollback:
+                self.send_header("X-DidRollback", "true")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, "OK")
+            elif self.path == "/stats":
+                self._reply(200, json.dumps(manager.stats(), ensure_ascii=False), content_type="application/json")
+            else:
+                self._reply(404, "Not found")
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+            if self.path == "/stats/reset":
+                manager.reset_stats()
+                self._reply(200, "OK")
+                return
+            if not self.path.startswith("/api/"):
+                self._reply(404, "Not found")
+                return
+
+            message = self.path[len("/api/"):]
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError as e:
+                self._reply(400, json.dumps(f"Invalid JSON: {e}"))
+                return
+            trace_id = str((body.get("planContext") or {}).get("traceID", ""))
+            manager.record(message, trace_id)
+            manager.inject_latency()
+
+            in_tx = manager.in_transaction(trace_id)
+            try:
+                self._dispatch(message, body, trace_id)
+            except Exception as e:
+                # 只有在事务内出错、并且已经替调用方回滚时，才带上 X-DidRollback
+                self._reply(400, json.dumps(f"{type(e).__name__}: {e}", ensure_ascii=False),
+                            rollback=in_tx and not manager.in_transaction(trace_id))
+
+        def _dispatch(self, message: str, body: dict, trace_id: str):
+            if message == "ReadDBRowsMessage":
+                rows = manager.read_rows(trace_id, body["sqlQuery"], body.get("parameters", []))
+                self._reply(200, json.dumps(rows, ensure_ascii=False, default=str), content_type="application/json")
+            elif message == "ReadDBValueMessage":
+                self._reply(200, manager.read_value(trace_id, body["sqlQuery"], body.get("parameters", [])))
+            elif message == "WriteDBMessage":
+                self._reply(200, manager.write(trace_id, body["sqlStatement"], body.get("parameters", [])))
+            elif message == "WriteDBListMessage":
+                self._reply(200, manager.write_list(trace_id, body["sqlStatement"], body.get("parameters", [])))
+            elif message == "BatchDBMessage":
+                results = manager.batch(trace_id, body.get("statements", []))
+                self._reply(200, json.dumps(results, ensure_ascii=False, default=str), content_type="application/json")
+            elif message == "StartTransactionMessage":
+                self._reply(200, manager.start_transaction(trace_id))
+            elif message == "EndTransactionMessage":
+                self._reply(200, manager.end_transaction(trace_id, bool(body.get("commit"))))
+            elif message == "InitSchemaMessage":
+                manager.store.init_schema(body["schemaName"])
+                self._reply(200, "OK")
+            elif message == "SwitchDataSourceMessage":
+                manager.store.switch_project(body["projectName"])
+                self._reply(200, "OK")
+            else:
+                raise StatementError(f"Unknown type: {message}")
+
+    return Handler
+
+
+def serve(host: str, port: int, data_dir: Optional[str], latency_ms: float, jitter_ms: float) -> ThreadingHTTPServer:
+    root = Path(data_dir) if data_dir else Path(tempfile.mkdtemp(prefix="satt-db-"))
+    store = SchemaStore(root)
+    store.switch_project("default")
+    manager = DBManager(store, latency_ms, jitter_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(manager))
+    server.daemon_threads = True
+    server.manager = manager
+    print(f"DB-Manager stand-in on http://{host}:{server.server_address[1]} (data: {root}, latency: {latency_ms}ms ±{jitter_ms}ms)")
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite-backed stand-in for the DB-Manager service")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=DB_MANAGER_PORT)
+    parser.add_argument("--data-dir", default=os.environ.get("SATT_DB_DIR"),
+                        help="where schema files live; defaults to a fresh temp dir")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay injected into every call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="extra uniform random delay per call")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    httpd = serve(args.host, args.port, args.data_dir, args.latency_ms, args.jitter_ms)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
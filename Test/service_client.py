@@ -0,0 +1,133 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 各服务端口，与各服务的 server_port 配置一致：UserService 10010 ... BattleService 10014
+SERVICE_PORTS = {
+    "UserService": 10010,
+    "CardService": 10011,
+    "AssetService": 10012,
+    "AdminService": 10013,
+    "BattleService": 10014,
+}
+
+DEFAULT_POOL_SIZE = int(os.environ.get("SATT_POOL_SIZE", "64"))
+DEFAULT_RETRIES = int(os.environ.get("SATT_RETRIES", "2"))
+DEFAULT_TIMEOUT = float(os.environ.get("SATT_TIMEOUT", "30"))
+
+
+def base_url(service: str, host: str = "localhost") -> str:
+    return f"http://{host}:{SERVICE_PORTS[service]}"
+
+
+def _retry_policy(retries: int) -> Retry:
+    # 只对连接失败重试；/api/ 接口都是 POST 且不幂等，读超时和 5xx 不重发
+    return Retry(total=retries, connect=retries, read=0, status=0, backoff_factor=0.1, allowed_methods=None)
+
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(base: str, pool_size: Optional[int] = None, retries: Optional[int] = None) -> requests.Session:
+    """
+    Keep-alive session shared by every caller of the same base URL.
+
+    The pool blocks when all `pool_size` connections are busy instead of opening
+    throwaway sockets, so high-concurrency suites reuse connections rather than
+    burning through ephemeral ports.
+    """
+    base = base.rstrip("/")
+    with _sessions_lock:
+        session = _sessions.get(base)
+        if session is None:
+            size = pool_size or DEFAULT_POOL_SIZE
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=size,
+                pool_block=True,
+                max_retries=_retry_policy(DEFAULT_RETRIES if retries is None else retries),
+            )
+            session = requests.Session()
+            session.mount(base + "/", adapter)
+            _sessions[base] = session
+        return session
+
+
+class ServiceClient:
+    """Thin wrapper so suites can post `/api/<Message>` paths against one service"""
+
+    def __init__(self, base: str, pool_size: Optional[int] = None, retries: Optional[int] = None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        self.base = base.rstrip("/")
+        self.session = get_session(self.base, pool_size, retries)
+        self.timeout = timeout
+
+    def _url(self, path_or_url: str) -> str:
+        return path_or_url if path_or_url.startswith("http") else f"{self.base}{path_or_url}"
+
+    def post(self, path_or_url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(self._url(path_or_url), **kwargs)
+
+    def get(self, path_or_url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.get(self._url(path_or_url), **kwargs)
+
+    def call(self, message_type: str, payload: dict, **kwargs) -> requests.Response:
+        """POST to /api/<message_type> with the `type` field filled in"""
+        return self.post(f"/api/{message_type}", json={"type": message_type, **payload}, **kwargs)
+
+
+class AsyncServiceClient:
+    """
+    httpx-based async variant with the same pooling semantics.
+
+    Usage:
+        async with AsyncServiceClient(base_url("CardService")) as client:
+            await client.call("DrawCardMessage", {"userID": token, "drawCount": 1})
+    """
+
+    def __init__(self, base: str, pool_size: Optional[int] = None, retries: Optional[int] = None,
+                 timeout: float = DEFAULT_TIMEOUT):
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("AsyncServiceClient requires httpx: pip install httpx") from e
+
+        size = pool_size or DEFAULT_POOL_SIZE
+        self.client = httpx.AsyncClient(
+            base_url=base.rstrip("/"),
+            limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+            transport=httpx.AsyncHTTPTransport(retries=DEFAULT_RETRIES if retries is None else retries),
+            timeout=timeout,
+        )
+
+    async def post(self, path: str, **kwargs):
+        return await self.client.post(path, **kwargs)
+
+    async def get(self, path: str, **kwargs):
+        return await self.client.get(path, **kwargs)
+
+    async def call(self, message_type: str, payload: dict, **kwargs):
+        return await self.post(f"/api/{message_type}", json={"type": message_type, **payload}, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+def close_all():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,236 @@
+"""
+Tests for the DB-Manager stand-in: the Postgres -> SQLite translation and every
+/api/<Message> type, talking to a real server on a free port.
+
+Run:  python -m pytest -q Test/test_db_standin.py
+"""
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from db_standin import StatementError, serve, snake_to_camel, split_statements, translate
+
+SCHEMA = "card_service"
+
+
+def param(data_type, value):
+    return {"dataType": data_type, "value": value}
+
+
+# ============= SQL translation =============
+
+def test_translate_strips_casts_for_update_and_now():
+    sql, values = translate("SELECT a::int, b::text[] FROM s.t WHERE c > NOW() FOR UPDATE", [])
+    assert "::" not in sql
+    assert "FOR UPDATE" not in sql.upper()
+    assert "strftime('%s','now')" in sql
+    assert values == []
+
+
+def test_translate_serial_primary_key():
+    sql, _ = translate("CREATE TABLE s.t (id SERIAL PRIMARY KEY, other BIGSERIAL PRIMARY KEY)", [])
+    assert sql.count("INTEGER PRIMARY KEY AUTOINCREMENT") == 2
+
+
+def test_translate_create_index_moves_schema_to_index_name():
+    sql, _ = translate('CREATE INDEX IF NOT EXISTS t_user_idx ON "s"."t" (user_id, draw_time)', [])
+    assert sql == 'CREATE INDEX IF NOT EXISTS "s".t_user_idx ON "t" (user_id, draw_time)'
+
+
+def test_translate_binds_scalar_types():
+    sql, values = translate(
+        "INSERT INTO s.t VALUES (?, ?, ?, ?, ?, ?)",
+        [param("String", "x"), param("Int", "3"), param("DateTime", "1700000000000"),
+         param("Double", "1.5"), param("Boolean", "true"), param("String", None)],
+    )
+    assert sql.count("?") == 6
+    assert values == ["x", 3, 1700000000000, 1.5, 1, None]
+
+
+def test_translate_array_parameter_is_json_outside_any():
+    _, values = translate("UPDATE s.t SET ids = ?", [param("Array[String]", '["a","b"]')])
+    assert values == ['["a", "b"]']
+
+
+def test_translate_expands_any_into_in_list():
+    sql, values = translate("SELECT * FROM s.t WHERE id = ANY(?) AND n > ?",
+                            [param("Array[Int]", "[1, 2, 3]"), param("Int", "0")])
+    assert "IN (?, ?, ?)" in sql
+    assert values == [1, 2, 3, 0]
+
+
+def test_translate_empty_any_matches_nothing():
+    sql, values = translate("SELECT * FROM s.t WHERE id = ANY(?)", [param("Array[String]", "[]")])
+    assert "IN (NULL)" in sql
+    assert values == []
+
+
+@pytest.mark.parametrize("sql, params", [
+    ("SELECT * FROM s.t WHERE a = ? AND b = ?", [param("Int", "1")]),
+    ("SELECT * FROM s.t WHERE a = ?", [param("Int", "1"), param("Int", "2")]),
+])
+def test_translate_rejects_parameter_count_mismatch(sql, params):
+    with pytest.raises(StatementError):
+        translate(sql, params)
+
+
+def test_snake_to_camel_matches_dbapi():
+    assert snake_to_camel("user_id") == "userID"
+    assert snake_to_camel("draw_time") == "drawTime"
+    assert snake_to_camel("credits") == "credits"
+
+
+def test_split_statements_keeps_semicolons_inside_literals():
+    script = "CREATE TABLE a (x TEXT DEFAULT ';');\nCREATE TABLE b (y INT);\n"
+    assert [s.strip() for s in split_statements(script)] == [
+        "CREATE TABLE a (x TEXT DEFAULT ';');",
+        "CREATE TABLE b (y INT);",
+    ]
+
+
+# ============= message protocol =============
+
+@pytest.fixture()
+def db(tmp_path):
+    server = serve("127.0.0.1", 0, str(tmp_path), 0.0, 0.0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = StandinClient(f"http://127.0.0.1:{server.server_address[1]}")
+    client.send("SwitchDataSourceMessage", projectName="SaTT")
+    client.send("InitSchemaMessage", schemaName=SCHEMA)
+    client.send("WriteDBMessage", sqlStatement=f"""
+        CREATE TABLE IF NOT EXISTS "{SCHEMA}"."item_table" (item_id VARCHAR NOT NULL PRIMARY KEY, amount INT NOT NULL);
+        CREATE INDEX IF NOT EXISTS item_amount_idx ON "{SCHEMA}"."item_table" (amount);
+    """, parameters=[])
+    yield client
+    server.shutdown()
+    server.server_close()
+
+
+class StandinClient:
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def post(self, message, trace_id="trace-1", **body):
+        body["planContext"] = {"traceID": trace_id, "transactionLevel": 0}
+        request = urllib.request.Request(f"{self.base_url}/api/{message}", data=json.dumps(body).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.headers, response.read().decode("utf-8")
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers, error.read().decode("utf-8")
+
+    def send(self, message, trace_id="trace-1", **body):
+        status, _, text = self.post(message, trace_id, **body)
+        assert status == 200, text
+        return text
+
+    def insert(self, item_id, amount, trace_id="trace-1"):
+        return self.send("WriteDBMessage", trace_id, sqlStatement=f"INSERT INTO {SCHEMA}.item_table VALUES (?, ?)",
+                         parameters=[param("String", item_id), param("Int", str(amount))])
+
+    def rows(self, trace_id="trace-1"):
+        return json.loads(self.send("ReadDBRowsMessage", trace_id,
+                                    sqlQuery=f"SELECT item_id, amount FROM {SCHEMA}.item_table ORDER BY item_id",
+                                    parameters=[]))
+
+
+def test_write_and_read_rows_use_camel_case_fields(db):
+    assert db.insert("a", 1) == "OK"
+    assert db.rows() == [{"itemID": "a", "amount": 1}]
+
+
+def test_read_value_returns_first_column(db):
+    db.insert("a", 7)
+    value = db.send("ReadDBValueMessage", sqlQuery=f"SELECT amount FROM {SCHEMA}.item_table WHERE item_id = ?",
+                    parameters=[param("String", "a")])
+    assert value == "7"
+
+
+def test_read_value_without_rows_fails(db):
+    status, _, _ = db.post("ReadDBValueMessage", sqlQuery=f"SELECT amount FROM {SCHEMA}.item_table", parameters=[])
+    assert status == 400
+
+
+def test_write_list_runs_every_parameter_list(db):
+    db.send("WriteDBListMessage", sqlStatement=f"INSERT INTO {SCHEMA}.item_table VALUES (?, ?)", parameters=[
+        {"l": [param("String", "a"), param("Int", "1")]},
+        {"l": [param("String", "b"), param("Int", "2")]},
+    ])
+    assert [row["itemID"] for row in db.rows()] == ["a", "b"]
+
+
+def test_batch_returns_results_in_order(db):
+    results = json.loads(db.send("BatchDBMessage", statements=[
+        {"kind": "write", "sqlQuery": f"INSERT INTO {SCHEMA}.item_table VALUES (?, ?)",
+         "parameters": [param("String", "a"), param("Int", "5")]},
+        {"kind": "read", "sqlQuery": f"SELECT amount FROM {SCHEMA}.item_table WHERE item_id = ANY(?)",
+         "parameters": [param("Array[String]", '["a"]')]},
+    ]))
+    assert results == ["OK", [{"amount": 5}]]
+
+
+def test_empty_batch_answers_the_startup_probe(db):
+    assert json.loads(db.send("BatchDBMessage", statements=[])) == []
+
+
+def test_batch_outside_transaction_is_atomic(db):
+    status, headers, _ = db.post("BatchDBMessage", statements=[
+        {"kind": "write", "sqlQuery": f"INSERT INTO {SCHEMA}.item_table VALUES (?, ?)",
+         "parameters": [param("String", "a"), param("Int", "1")]},
+        {"kind": "write", "sqlQuery": f"INSERT INTO {SCHEMA}.item_table VALUES (?, ?)",
+         "parameters": [param("String", "a"), param("Int", "2")]},
+    ])
+    assert status == 400
+    assert headers.get("X-DidRollback") is None
+    assert db.rows() == []
+
+
+def test_transaction_commit_makes_writes_visible(db):
+    db.send("StartTransactionMessage", "tx")
+    db.insert("a", 1, trace_id="tx")
+    assert db.rows(trace_id="other") == []
+    db.send("EndTransactionMessage", "tx", commit=True)
+    assert db.rows(trace_id="other") == [{"itemID": "a", "amount": 1}]
+
+
+def test_transaction_rollback_discards_writes(db):
+    db.send("StartTransactionMessage", "tx")
+    db.insert("a", 1, trace_id="tx")
+    db.send("EndTransactionMessage", "tx", commit=False)
+    assert db.rows() == []
+
+
+def test_error_inside_transaction_rolls_back_and_sets_header(db):
+    db.send("StartTransactionMessage", "tx")
+    db.insert("a", 1, trace_id="tx")
+    status, headers, _ = db.post("WriteDBMessage", "tx", sqlStatement=f"INSERT INTO {SCHEMA}.item_table VALUES (?, ?)",
+                                 parameters=[param("String", "a"), param("Int", "2")])
+    assert status == 400
+    assert headers.get("X-DidRollback") == "true"
+    assert db.rows() == []
+
+
+def test_error_outside_transaction_has_no_rollback_header(db):
+    status, headers, _ = db.post("ReadDBRowsMessage", sqlQuery="SELECT * FROM missing_table", parameters=[])
+    assert status == 400
+    assert headers.get("X-DidRollback") is None
+
+
+def test_unknown_message_type_is_rejected(db):
+    status, _, text = db.post("NoSuchMessage")
+    assert status == 400
+    assert "Unknown type" in text
+
+
+def test_stats_count_round_trips_per_trace(db):
+    db.rows(trace_id="counted")
+    db.rows(trace_id="counted")
+    with urllib.request.urlopen(f"{db.base_url}/stats") as response:
+        stats = json.loads(response.read())
+    assert stats["roundTripsPerTrace"]["counted"] == 2
+    assert stats["byMessage"]["ReadDBRowsMessage"] >= 2
@@ -0,0 +1,218 @@
+"""
+Waterfall viewer for the spans written by Common.API.Tracer.
+
+Each service appends OTLP/JSON (one ExportTraceServiceRequest per line) to the
+file named by TRACE_EXPORT_FILE. Give every service its own file and pass them
+all here; spans are joined across services by traceId / parentSpanId.
+
+Run:  python Test/trace_viewer.py traces/*.jsonl                  # slowest traces
+      python Test/trace_viewer.py traces/*.jsonl --list --root DrawCardMessagePlanner
+      python Test/trace_viewer.py traces/*.jsonl --trace <traceId> --html waterfall.html
+"""
+import argparse
+import glob
+import html
+import json
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+KIND_NAMES = {1: "internal", 2: "server", 3: "client"}
+STATUS_ERROR = 2
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_span_id: str
+    name: str
+    service: str
+    kind: int
+    start_ns: int
+    end_ns: int
+    attributes: Dict[str, str]
+    error: Optional[str]
+    children: List["Span"] = field(default_factory=list)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+def _attributes(raw: Iterable[dict]) -> Dict[str, str]:
+    return {item["key"]: next(iter(item.get("value", {}).values()), "") for item in raw or []}
+
+
+def load_spans(paths: Iterable[str]) -> List[Span]:
+    spans: List[Span] = []
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line_number, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"{path}:{line_number}: skipping malformed line", file=sys.stderr)
+                    continue
+                for resource_spans in request.get("resourceSpans", []):
+                    resource = _attributes(resource_spans.get("resource", {}).get("attributes"))
+                    service = resource.get("service.name", "?")
+                    for scope_spans in resource_spans.get("scopeSpans", []):
+                        for raw in scope_spans.get("spans", []):
+                            status = raw.get("status", {})
+                            spans.append(Span(
+                                trace_id=raw["traceId"],
+                                span_id=raw["spanId"],
+                                parent_span_id=raw.get("parentSpanId", ""),
+                                name=raw["name"],
+                                service=service,
+                                kind=int(raw.get("kind", 1)),
+                                start_ns=int(raw["startTimeUnixNano"]),
+                                end_ns=int(raw["endTimeUnixNano"]),
+                                attributes=_attributes(raw.get("attributes")),
+                                error=status.get("message", "error") if status.get("code") == STATUS_ERROR else None,
+                            ))
+    return spans
+
+
+def build_traces(spans: List[Span]) -> Dict[str, List[Span]]:
+    """traceId -> root spans (spans whose parent was not recorded), children sorted by start time"""
+    by_trace: Dict[str, Dict[str, Span]] = defaultdict(dict)
+    for span in spans:
+        by_trace[span.trace_id][span.span_id] = span
+
+    roots: Dict[str, List[Span]] = {}
+    for trace_id, members in by_trace.items():
+        trace_roots = []
+        for span in members.values():
+            parent = members.get(span.parent_span_id)
+            if parent is None:
+                trace_roots.append(span)
+            else:
+                parent.children.append(span)
+        for span in members.values():
+            span.children.sort(key=lambda child: child.start_ns)
+        roots[trace_id] = sorted(trace_roots, key=lambda span: span.start_ns)
+    return roots
+
+
+def _walk(span: Span, depth: int = 0):
+    yield span, depth
+    for child in span.children:
+        yield from _walk(child, depth + 1)
+
+
+def trace_bounds(roots: List[Span]):
+    return min(root.start_ns for root in roots), max(root.end_ns for root in roots)
+
+
+def trace_summary(trace_id: str, roots: List[Span]) -> dict:
+    start, end = trace_bounds(roots)
+    members = [span for root in roots for span, _ in _walk(root)]
+    return {
+        "trace_id": trace_id,
+        "root": roots[0].name,
+        "duration_ms": (end - start) / 1e6,
+        "spans": len(members),
+        "services": sorted({span.service for span in members}),
+        "db_calls": sum(1 for span in members if span.name.startswith("DB ")),
+        "errors": sum(1 for span in members if span.error),
+    }
+
+
+def render_text(trace_id: str, roots: List[Span], width: int = 60) -> str:
+    start, end = trace_bounds(roots)
+    total = max(end - start, 1)
+    rows = [(span, depth) for root in roots for span, depth in _walk(root)]
+    label_width = min(max(len("  " * depth + span.name) for span, depth in rows), 60)
+    service_width = max(len(span.service) for span, _ in rows)
+
+    lines = [f"trace {trace_id}  {(end - start) / 1e6:.2f} ms  {len(rows)} spans"]
+    for span, depth in rows:
+        offset = int((span.start_ns - start) / total * width)
+        length = max(1, int((span.end_ns - span.start_ns) / total * width))
+        bar = " " * offset + ("!" if span.error else "█") * min(length, width - offset)
+        label = ("  " * depth + span.name)[:label_width]
+        lines.append(f"{label:<{label_width}}  {span.service:<{service_width}}  {span.duration_ms:9.2f} ms  |{bar:<{width}}|")
+        if span.error:
+            lines.append(f"{'':<{label_width}}  {'':<{service_width}}  error: {span.error}")
+    return "\n".join(lines)
+
+
+def render_html(traces: List[tuple]) -> str:
+    sections = []
+    for trace_id, roots in traces:
+        start, end = trace_bounds(roots)
+        total = max(end - start, 1)
+        rows = []
+        for span, depth in (item for root in roots for item in _walk(root)):
+            left = (span.start_ns - start) / total * 100
+            width = max((span.end_ns - span.start_ns) / total * 100, 0.2)
+            tooltip = "\n".join([f"{span.service} / {KIND_NAMES.get(span.kind, span.kind)}"]
+                                + [f"{key}: {value}" for key, value in span.attributes.items()]
+                                + ([f"error: {span.error}"] if span.error else []))
+            rows.append(
+                f'<tr title="{html.escape(tooltip)}"><td style="padding-left:{depth * 14}px">{html.escape(span.name)}</td>'
+                f"<td>{html.escape(span.service)}</td><td class=num>{span.duration_ms:.2f}</td>"
+                f'<td class=lane><div class="bar{" err" if span.error else ""}" style="left:{left:.3f}%;width:{width:.3f}%"></div></td></tr>'
+            )
+        sections.append(
+            f"<h2>{html.escape(roots[0].name)} <small>{html.escape(trace_id)} · {(end - start) / 1e6:.2f} ms</small></h2>"
+            "<table><tr><th>span</th><th>service</th><th>ms</th><th>timeline</th></tr>" + "".join(rows) + "</table>"
+        )
+    return (
+        "<!doctype html><meta charset=utf-8><title>traces</title><style>"
+        "body{font:13px sans-serif;margin:20px}table{border-collapse:collapse;width:100%;margin-bottom:24px}"
+        "td,th{padding:2px 6px;border-bottom:1px solid #eee;white-space:nowrap;text-align:left}.num{text-align:right}"
+        ".lane{position:relative;width:55%}.bar{position:absolute;top:4px;height:10px;background:#4a90d9}"
+        ".bar.err{background:#d9534f}small{color:#888;font-weight:normal}</style>"
+        + "".join(sections)
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-request waterfalls from Common.API.Tracer OTLP/JSON files")
+    parser.add_argument("files", nargs="+", help="OTLP/JSON span files (globs are expanded)")
+    parser.add_argument("--trace", help="show only this traceId")
+    parser.add_argument("--root", help="only traces whose root span name contains this text")
+    parser.add_argument("--list", action="store_true", help="print one summary line per trace instead of waterfalls")
+    parser.add_argument("--top", type=int, default=5, help="number of slowest traces to show")
+    parser.add_argument("--width", type=int, default=60, help="timeline width in characters")
+    parser.add_argument("--html", type=Path, help="also write the selected waterfalls to this HTML file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    paths = [path for pattern in args.files for path in (sorted(glob.glob(pattern)) or [pattern])]
+    traces = build_traces(load_spans(paths))
+    if args.trace:
+        traces = {trace_id: roots for trace_id, roots in traces.items() if trace_id == args.trace}
+    if args.root:
+        traces = {trace_id: roots for trace_id, roots in traces.items() if args.root in roots[0].name}
+    if not traces:
+        print("no matching traces", file=sys.stderr)
+        return 1
+
+    summaries = sorted((trace_summary(trace_id, roots) for trace_id, roots in traces.items()),
+                       key=lambda summary: summary["duration_ms"], reverse=True)
+    if args.list:
+        for summary in summaries:
+            print(f"{summary['trace_id']}  {summary['duration_ms']:9.2f} ms  {summary['spans']:4d} spans  "
+                  f"{summary['db_calls']:3d} db  {summary['errors']:2d} err  {summary['root']}  [{', '.join(summary['services'])}]")
+        return 0
+
+    selected = [(summary["trace_id"], traces[summary["trace_id"]]) for summary in summaries[:args.top]]
+    print("\n\n".join(render_text(trace_id, roots, args.width) for trace_id, roots in selected))
+    if args.html:
+        args.html.write_text(render_html(selected), encoding="utf-8")
+        print(f"\nwrote {args.html}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,10 +20,10 @@ import java.util.UUID
 
 /**
  * FindOrCreateMatchRoomMessage
- * desc: 查找或创建匹配房间。
+ * desc: 进入匹配队列并长轮询等待对手；没有对手时最多等待约25秒后返回 waiting，客户端应立即重新请求，排队位置保留。
  * @param userID: String (用户ID，用于标识当前用户。)
  * @param matchType: String (匹配类型，例如'quick'或'ranked')
- * @return roomID: String (房间ID)
+ * @return result: Json ({status: matched, room_id, opponent_id} 或 {status: waiting})
  */
 
 case class FindOrCreateMatchRoomMessage(
@@ -23,12 +23,18 @@ import Objects.UserService.MessageEntry
  * desc: 获取与指定用户的聊天历史记录。
  * @param userToken: String (当前用户的凭证，用于验证用户身份。)
  * @param friendID: String (对话好友的用户ID。)
+ * @param beforeTime: Option[Long] (分页游标，只返回该时间之前的消息，不填则从最新一条开始。)
+ * @param beforeMessageID: Option[Long] (与 beforeTime 一起组成 (messageTime, messageID) 游标，取本页第一条的 messageID，同一时间的消息翻页时不会漏掉。)
+ * @param pageSize: Option[Int] (本页最多返回的条数，不填默认 100，最大 500。)
  * @return messages: MessageEntry[] (聊天历史记录列表，包含消息来源、内容及时间。)
  */
 
 case class GetChatHistoryMessage(
   userToken: String,
-  friendID: String
+  friendID: String,
+  beforeTime: Option[Long] = None,
+  beforeMessageID: Option[Long] = None,
+  pageSize: Option[Int] = None
 ) extends API[List[MessageEntry]](UserServiceCode)
 
 
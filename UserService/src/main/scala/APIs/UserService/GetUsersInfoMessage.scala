@@ -0,0 +1,66 @@
+package APIs.UserService
+
+import Common.API.API
+import Global.ServiceCenter.UserServiceCode
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+import Objects.UserService.PublicUserProfile
+
+/**
+ * GetUsersInfoMessage
+ * desc: 批量获取用户的公开资料，用于好友列表、黑名单等一次展示多个用户的页面。只返回公开字段，不存在的用户不出现在结果中。
+ * @param userToken: String (当前用户的凭证，用于验证用户身份。)
+ * @param userIDs: List[String] (目标用户ID列表，最多 200 个)
+ * @return users: List[PublicUserProfile] (按 userIDs 顺序排列的用户公开资料)
+ */
+
+case class GetUsersInfoMessage(
+  userToken: String,
+  userIDs: List[String]
+) extends API[List[PublicUserProfile]](UserServiceCode)
+
+
+
+case object GetUsersInfoMessage{
+    
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[GetUsersInfoMessage] = deriveEncoder
+  private val circeDecoder: Decoder[GetUsersInfoMessage] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[GetUsersInfoMessage] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[GetUsersInfoMessage] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[GetUsersInfoMessage]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given getUsersInfoMessageEncoder: Encoder[GetUsersInfoMessage] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given getUsersInfoMessageDecoder: Decoder[GetUsersInfoMessage] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+}
+
@@ -22,11 +22,17 @@ import Objects.UserService.MessageEntry
  * ReceiveMessagesMessage
  * desc: 按分类返回用户的消息记录，包括好友消息、大世界消息、系统消息。
  * @param userToken: String (用户凭证，用于验证用户身份。)
+ * @param beforeTime: Option[Long] (分页游标，只返回该时间之前的消息，不填则从最新一条开始。)
+ * @param beforeMessageID: Option[Long] (与 beforeTime 一起组成 (messageTime, messageID) 游标，取本页第一条的 messageID。)
+ * @param pageSize: Option[Int] (本页最多返回的条数，不填默认 100，最大 500；返回条数等于 pageSize 时可能还有更早的消息。)
  * @return messages: MessageEntry:1022 (用户的消息记录列表，包含消息来源、内容及时间。)
  */
 
 case class ReceiveMessagesMessage(
-  userToken: String
+  userToken: String,
+  beforeTime: Option[Long] = None,
+  beforeMessageID: Option[Long] = None,
+  pageSize: Option[Int] = None
 ) extends API[List[MessageEntry]](UserServiceCode)
 
 
@@ -19,7 +19,7 @@ import java.util.UUID
 
 /**
  * SendMessageMessage
- * desc: 向指定用户发送消息，将消息存储到双方的message_box中。
+ * desc: 向指定用户发送消息，消息作为一行写入 message_table，按双方的会话索引读取。
  * @param userToken: String (发送者的用户凭证，用于验证用户身份。)
  * @param recipientID: String (接收者的用户ID。)
  * @param messageContent: String (消息内容。)
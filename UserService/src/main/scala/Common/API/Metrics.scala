@@ -0,0 +1,150 @@
+package Common.API
+
+import cats.effect.IO
+
+import java.util.concurrent.atomic.AtomicInteger
+import java.util.concurrent.atomic.LongAdder
+import scala.collection.concurrent.TrieMap
+
+/**
+ * 进程内指标，由 Routes 的 GET /metrics 以 Prometheus 文本格式输出
+ * 入站请求按 executePlan 的消息名、出站 API.send 按目标服务、DBAPI 按操作分别统计次数、错误数和延迟直方图
+ */
+object Metrics {
+  /** 延迟直方图的桶上界（秒） */
+  private val LatencyBuckets: Vector[Double] = Vector(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+  /** 每组指标最多的标签取值数，超出的都记到 "other"，避免未知消息名让指标无限增长 */
+  private val MaxLabelValues = 256
+
+  private final class Timer {
+    val count = new LongAdder
+    val errors = new LongAdder
+    val sumNanos = new LongAdder
+    val buckets: Vector[LongAdder] = LatencyBuckets.map(_ => new LongAdder)
+
+    def observe(nanos: Long, failed: Boolean): Unit = {
+      count.increment()
+      if (failed) errors.increment()
+      sumNanos.add(nanos)
+      val seconds = nanos / 1e9
+      val index = LatencyBuckets.indexWhere(seconds <= _)
+      if (index >= 0) buckets(index).increment()
+    }
+  }
+
+  private final class TimerFamily(val name: String, val help: String, val label: String) {
+    val timers = TrieMap.empty[String, Timer]
+
+    def timer(labelValue: String): Timer =
+      timers.getOrElse(labelValue,
+        if (timers.size >= MaxLabelValues) timers.getOrElseUpdate("other", new Timer)
+        else timers.getOrElseUpdate(labelValue, new Timer)
+      )
+  }
+
+  private val requests = new TimerFamily("satintin_api_requests", "本服务处理的 /api 请求", "message")
+  private val outbound = new TimerFamily("satintin_outbound_requests", "API.send 发往其他服务的请求", "target")
+  private val dbCalls = new TimerFamily("satintin_db_calls", "DBAPI 调用", "operation")
+
+  private val shedCounts = TrieMap.empty[(String, String), LongAdder]
+
+  private val clientInFlight = new AtomicInteger(0)
+  @volatile private var clientMaxConnections: Int = 0
+
+  /**
+   * 服务自己的瞬时指标
+   * @param samples 标签 -> 值
+   */
+  final case class Gauge(name: String, help: String, samples: List[(Map[String, String], Double)])
+
+  /** 把若干组件的 stats（缓存、队列等）合成一个 gauge，component / stat 作为标签 */
+  def statsGauge(name: String, help: String, stats: List[(String, Map[String, Long])]): Gauge =
+    Gauge(name, help, stats.flatMap { case (component, values) =>
+      values.toList.map { case (stat, value) => Map("component" -> component, "stat" -> stat) -> value.toDouble }
+    })
+
+  def timeRequest[A](messageType: String)(io: IO[A]): IO[A] = time(requests.timer(messageType))(io)
+
+  def timeOutbound[A](targetService: String)(io: IO[A]): IO[A] = time(outbound.timer(targetService))(io)
+
+  def timeDB[A](operation: String)(io: IO[A]): IO[A] = time(dbCalls.timer(operation))(io)
+
+  /**
+   * 记录一次因请求预算用完而放弃的工作
+   * @param stage planner / outbound
+   * @param reason refused：开始前预算已用完；cancelled：执行中超时被取消
+   */
+  def recordShed(stage: String, reason: String): Unit =
+    shedCounts.getOrElseUpdate((stage, reason), new LongAdder).increment()
+
+  /** 统计占用 HTTP 客户端连接的请求数，与 API.init 的最大连接数一起反映连接池使用率 */
+  def trackClientRequest[A](io: IO[A]): IO[A] =
+    IO(clientInFlight.incrementAndGet()).bracket(_ => io)(_ => IO(clientInFlight.decrementAndGet()).void)
+
+  def setClientMaxConnections(maximumClientConnection: Int): Unit =
+    clientMaxConnections = maximumClientConnection
+
+  private def time[A](timer: Timer)(io: IO[A]): IO[A] =
+    IO.monotonic.flatMap { start =>
+      io.guaranteeCase { outcome =>
+        IO.monotonic.map(end => timer.observe((end - start).toNanos, !outcome.isSuccess))
+      }
+    }
+
+  /** Prometheus 文本格式（0.0.4） */
+  def render(gauges: List[Gauge] = Nil): String = {
+    val builder = new StringBuilder
+    List(requests, outbound, dbCalls).foreach(renderFamily(builder, _))
+    renderShed(builder)
+    (Gauge("satintin_http_client_in_flight", "正在使用 HTTP 客户端连接的出站请求数（含 DB-Manager）", List(Map.empty[String, String] -> clientInFlight.get().toDouble)) ::
+      Gauge("satintin_http_client_max_connections", "HTTP 客户端连接池的最大连接数", List(Map.empty[String, String] -> clientMaxConnections.toDouble)) ::
+      statsGauge("satintin_api_target_guard", "API.send 各目标服务的隔舱和熔断状态（state: 0 正常, 1 熔断, 2 半开）", TargetGuard.stats) ::
+      gauges).foreach(renderGauge(builder, _))
+    builder.toString
+  }
+
+  private def renderFamily(builder: StringBuilder, family: TimerFamily): Unit = {
+    val timers = family.timers.toList.sortBy(_._1)
+    builder.append(s"# HELP ${family.name}_seconds ${family.help}的延迟\n")
+    builder.append(s"# TYPE ${family.name}_seconds histogram\n")
+    timers.foreach { case (labelValue, timer) =>
+      val labelPair = s"""${family.label}="${escape(labelValue)}""""
+      var cumulative = 0L
+      LatencyBuckets.zip(timer.buckets).foreach { case (bound, bucket) =>
+        cumulative += bucket.sum()
+        builder.append(s"""${family.name}_seconds_bucket{${labelPair},le="${bound}"} ${cumulative}\n""")
+      }
+      builder.append(s"""${family.name}_seconds_bucket{${labelPair},le="+Inf"} ${timer.count.sum()}\n""")
+      builder.append(s"${family.name}_seconds_sum{${labelPair}} ${timer.sumNanos.sum() / 1e9}\n")
+      builder.append(s"${family.name}_seconds_count{${labelPair}} ${timer.count.sum()}\n")
+    }
+    builder.append(s"# HELP ${family.name}_errors_total ${family.help}中失败的次数\n")
+    builder.append(s"# TYPE ${family.name}_errors_total counter\n")
+    timers.foreach { case (labelValue, timer) =>
+      builder.append(s"""${family.name}_errors_total{${family.label}="${escape(labelValue)}"} ${timer.errors.sum()}\n""")
+    }
+  }
+
+  private def renderShed(builder: StringBuilder): Unit = {
+    builder.append("# HELP satintin_deadline_shed_total 因请求预算用完而放弃的工作\n")
+    builder.append("# TYPE satintin_deadline_shed_total counter\n")
+    shedCounts.toList.sortBy(_._1).foreach { case ((stage, reason), count) =>
+      builder.append(s"""satintin_deadline_shed_total{stage="${escape(stage)}",reason="${escape(reason)}"} ${count.sum()}\n""")
+    }
+  }
+
+  private def renderGauge(builder: StringBuilder, gauge: Gauge): Unit = {
+    builder.append(s"# HELP ${gauge.name} ${gauge.help}\n")
+    builder.append(s"# TYPE ${gauge.name} gauge\n")
+    gauge.samples.foreach { case (labels, value) =>
+      val labelText =
+        if (labels.isEmpty) ""
+        else labels.toList.sortBy(_._1).map { case (key, labelValue) => s"""${key}="${escape(labelValue)}"""" }.mkString("{", ",", "}")
+      builder.append(s"${gauge.name}${labelText} ${value}\n")
+    }
+  }
+
+  private def escape(labelValue: String): String =
+    labelValue.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+}
@@ -1,3 +1,9 @@
 package Common.API
 
-case class PlanContext(traceID:TraceID, transactionLevel: Int)
+/**
+ * @param spanID 当前 span 的ID，由 Tracer 维护；下游服务以它作为父 span
+ * @param spanTraceID 当前 span 所属的链路ID。每个服务收到请求时都会换一个新的 traceID（DB-Manager 按它区分事务），
+ *                    链路ID 则沿调用链保持不变；为空时由 traceID 生成
+ * @param deadlineMillis 本次请求在本进程内的截止时间（epoch 毫秒），由 Deadline 维护；为空时不限时
+ */
+case class PlanContext(traceID:TraceID, transactionLevel: Int, spanID: Option[String] = None, spanTraceID: Option[String] = None, deadlineMillis: Option[Long] = None)
@@ -9,7 +9,7 @@ trait Planner[ReturnType]:
 
   def planWithErrorControl(using planContext:PlanContext, encoder: Encoder[ReturnType]):IO[ReturnType]=
     startTransaction{
-      plan
+      boundedPlan
     }.onError{e=>
       errorRecovery>>  //这里会运行定制化的error recovery
       IO.println("error:"+e)
@@ -18,7 +18,19 @@ trait Planner[ReturnType]:
   /** 默认是不做任何error recovery的。但是如果在文件系统中出了问题，应该需要调用writeToLocalGitMessage把local的内容重置一遍才对 */
   def errorRecovery(using planContext:PlanContext):IO[Unit]=IO.unit
 
-  def fullPlan(using encoder: Encoder[ReturnType]): IO[ReturnType] =
-    IO.println(this) >> planWithErrorControl(using this.planContext, encoder)
+  /**
+   * 在请求的剩余预算内执行 plan，预算用完时不再开始或被取消
+   * 预算只作用于 plan 本身，放在事务里面：超时后由 startTransaction 回滚，BEGIN / COMMIT / ROLLBACK 不会被取消。
+   * 重写 planWithErrorControl 跳过事务的 Planner 也应调用这里而不是直接调用 plan
+   */
+  def boundedPlan(using planContext: PlanContext): IO[ReturnType] =
+    Deadline.within("planner")(plan)
+
+  def fullPlan(using encoder: Encoder[ReturnType]): IO[ReturnType] = {
+    given PlanContext = this.planContext
+    Tracer.span(this.getClass.getSimpleName, Tracer.SpanKindServer) { context =>
+      planWithErrorControl(using context, encoder)
+    }
+  }
 
   val planContext: PlanContext = PlanContext(TraceID(""), 0)
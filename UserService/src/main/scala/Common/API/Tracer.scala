@@ -0,0 +1,173 @@
+package Common.API
+
+import Common.ServiceUtils.serviceShortName
+import cats.effect.{IO, Outcome}
+import io.circe.Json
+
+import java.io.{BufferedWriter, FileWriter}
+import java.nio.charset.StandardCharsets
+import java.security.MessageDigest
+import java.time.Instant
+import java.util.concurrent.atomic.AtomicInteger
+import java.util.concurrent.{ConcurrentLinkedQueue, Executors, ThreadLocalRandom, TimeUnit}
+
+/**
+ * 基于 PlanContext.traceID 的跨服务链路追踪
+ * 当前 span 的ID和链路ID保存在 PlanContext.spanID / spanTraceID 中，随 API.send 传给下游服务，
+ * 下游 Routes 用 continueTrace 接上，其 Planner 的 span 以调用方的 span 为父节点。
+ * 设置环境变量 TRACE_EXPORT_FILE 后，结束的 span 每秒以 OTLP/JSON（每行一个 ExportTraceServiceRequest）追加写入该文件；
+ * 未设置时不记录也不生成 span，PlanContext 原样传递
+ */
+object Tracer {
+  val ExportFileEnvKey = "TRACE_EXPORT_FILE"
+
+  /** OTLP 的 span kind */
+  val SpanKindInternal = 1
+  val SpanKindServer = 2
+  val SpanKindClient = 3
+
+  /** 属性值的最大长度，超出部分截断（主要是 SQL） */
+  private val MaxAttributeLength = 1000
+
+  /** 未写出的 span 超过这个数量时丢弃新的 span，避免写文件跟不上时占满内存 */
+  private val MaxPendingSpans = 100000
+
+  private val FlushIntervalMillis = 1000L
+
+  private val exportFile: Option[String] = Option(System.getenv(ExportFileEnvKey)).filter(_.nonEmpty)
+
+  def enabled: Boolean = exportFile.isDefined
+
+  private final case class FinishedSpan(
+    traceID: String,
+    spanID: String,
+    parentSpanID: Option[String],
+    name: String,
+    kind: Int,
+    startNanos: Long,
+    endNanos: Long,
+    attributes: Map[String, String],
+    error: Option[String]
+  )
+
+  private val pending = new ConcurrentLinkedQueue[FinishedSpan]()
+  private val pendingCount = new AtomicInteger(0)
+
+  /** 第一次记录 span 时才启动写文件的后台线程 */
+  private lazy val exporter: Unit = {
+    val scheduler = Executors.newSingleThreadScheduledExecutor { runnable =>
+      val thread = new Thread(runnable, "trace-exporter")
+      thread.setDaemon(true)
+      thread
+    }
+    scheduler.scheduleWithFixedDelay(() => flush(), FlushIntervalMillis, FlushIntervalMillis, TimeUnit.MILLISECONDS)
+    Runtime.getRuntime.addShutdownHook(new Thread(() => flush()))
+  }
+
+  /**
+   * 在一个新的 span 中运行 body，body 拿到的 PlanContext 以这个 span 为当前 span
+   * @param kind SpanKindServer / SpanKindClient / SpanKindInternal
+   */
+  def span[A](name: String, kind: Int, attributes: Map[String, String] = Map.empty)(body: PlanContext => IO[A])(using context: PlanContext): IO[A] =
+    if (!enabled) body(context)
+    else IO.defer {
+      val spanID = newSpanID()
+      val spanTraceID = context.spanTraceID.getOrElse(otlpTraceID(context.traceID.id))
+      val startNanos = epochNanos()
+      body(context.copy(spanID = Some(spanID), spanTraceID = Some(spanTraceID))).guaranteeCase { outcome =>
+        IO(record(FinishedSpan(
+          traceID = spanTraceID,
+          spanID = spanID,
+          parentSpanID = context.spanID,
+          name = name,
+          kind = kind,
+          startNanos = startNanos,
+          endNanos = epochNanos(),
+          attributes = attributes,
+          error = outcome match {
+            case Outcome.Succeeded(_) => None
+            case Outcome.Errored(error) => Some(Option(error.getMessage).getOrElse(error.getClass.getSimpleName))
+            case Outcome.Canceled() => Some("canceled")
+          }
+        )))
+      }
+    }
+
+  /**
+   * 服务收到请求时 PlanContext 是新建的，从请求体的 planContext 中接上调用方的 spanID 和 spanTraceID
+   */
+  def continueTrace(requestBody: Json, context: PlanContext): PlanContext = {
+    val incoming = requestBody.hcursor.downField("planContext")
+    context.copy(
+      spanID = incoming.get[String]("spanID").toOption,
+      spanTraceID = incoming.get[String]("spanTraceID").toOption
+    )
+  }
+
+  private def record(span: FinishedSpan): Unit = {
+    exporter
+    if (pendingCount.incrementAndGet() <= MaxPendingSpans) pending.add(span)
+    else pendingCount.decrementAndGet()
+  }
+
+  private def flush(): Unit = synchronized {
+    val spans = Iterator.continually(pending.poll()).takeWhile(_ != null).toList
+    if (spans.nonEmpty) {
+      pendingCount.addAndGet(-spans.size)
+      exportFile.foreach { path =>
+        val writer = new BufferedWriter(new FileWriter(path, StandardCharsets.UTF_8, true))
+        try {
+          writer.write(exportRequest(spans).noSpaces)
+          writer.newLine()
+        } finally writer.close()
+      }
+    }
+  }
+
+  /** OTLP/JSON 的 ExportTraceServiceRequest */
+  private def exportRequest(spans: List[FinishedSpan]): Json =
+    Json.obj(
+      "resourceSpans" -> Json.arr(Json.obj(
+        "resource" -> Json.obj("attributes" -> attributesJson(Map("service.name" -> serviceShortName))),
+        "scopeSpans" -> Json.arr(Json.obj(
+          "scope" -> Json.obj("name" -> Json.fromString("Common.API.Tracer")),
+          "spans" -> Json.fromValues(spans.map(spanJson))
+        ))
+      ))
+    )
+
+  private def spanJson(span: FinishedSpan): Json =
+    Json.obj(
+      "traceId" -> Json.fromString(span.traceID),
+      "spanId" -> Json.fromString(span.spanID),
+      "parentSpanId" -> Json.fromString(span.parentSpanID.getOrElse("")),
+      "name" -> Json.fromString(span.name),
+      "kind" -> Json.fromInt(span.kind),
+      "startTimeUnixNano" -> Json.fromString(span.startNanos.toString),
+      "endTimeUnixNano" -> Json.fromString(span.endNanos.toString),
+      "attributes" -> attributesJson(span.attributes),
+      "status" -> span.error.fold(Json.obj("code" -> Json.fromInt(1))) { message =>
+        Json.obj("code" -> Json.fromInt(2), "message" -> Json.fromString(message))
+      }
+    )
+
+  private def attributesJson(attributes: Map[String, String]): Json =
+    Json.fromValues(attributes.toList.map { case (key, value) =>
+      Json.obj("key" -> Json.fromString(key), "value" -> Json.obj("stringValue" -> Json.fromString(value.take(MaxAttributeLength))))
+    })
+
+  private def epochNanos(): Long = {
+    val now = Instant.now()
+    now.getEpochSecond * 1000000000L + now.getNano
+  }
+
+  private def newSpanID(): String =
+    f"${ThreadLocalRandom.current().nextLong()}%016x"
+
+  /** OTLP 要求 32 位十六进制的 traceId；UUID 去掉连字符直接使用，其他格式取 MD5 */
+  private def otlpTraceID(traceID: String): String = {
+    val compact = traceID.replace("-", "").toLowerCase
+    if (compact.length == 32 && compact.forall(c => Character.digit(c, 16) >= 0)) compact
+    else MessageDigest.getInstance("MD5").digest(traceID.getBytes(StandardCharsets.UTF_8)).map(byte => f"${byte & 0xff}%02x").mkString
+  }
+}
@@ -4,6 +4,7 @@ import io.circe.{Decoder, Encoder, Json, HCursor}
 import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
 import io.circe.generic.auto.*
 import Common.Serialize.JacksonSerializeUtils
+import Common.API.TargetGuardConfig
 import com.fasterxml.jackson.core.`type`.TypeReference
 import scala.util.Try
 
@@ -42,7 +43,13 @@ case class ServerConfig(
                          /** connection的最长存活时间 */
                          connectionLiveMinutes: Int,
 
-                         isTest:Boolean
+                         isTest:Boolean,
+
+                         /** 是否使用 BatchDBMessage；启动时会先试探 DB-Manager 是否支持，不支持时 batchDB 在事务内逐条执行 */
+                         enableBatchDB: Boolean = true,
+
+                         /** 按目标服务名（如 "userservice"）配置 API.send 的在途上限和试探时限，没有配置的目标使用 TargetGuard 的默认值 */
+                         targetGuards: Map[String, TargetGuardConfig] = Map.empty
                        )
 
 case object ServerConfig{
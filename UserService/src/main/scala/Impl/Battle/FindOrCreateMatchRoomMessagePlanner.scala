@@ -3,9 +3,10 @@ package Impl.Battle
 import APIs.UserService.FindOrCreateMatchRoomMessage
 import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
-import Common.Object.SqlParameter
+import Common.Object.{BatchStatement, SqlParameter}
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
+import Utils.MatchmakingQueue
 import org.slf4j.LoggerFactory
 import io.circe._
 import io.circe.syntax._
@@ -14,7 +15,6 @@ import cats.implicits.*
 import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 import org.joda.time.DateTime
 import org.joda.time.format.DateTimeFormat
-import java.util.UUID
 
 case class FindOrCreateMatchRoomMessagePlanner(
   userID: String,
@@ -25,6 +25,10 @@ case class FindOrCreateMatchRoomMessagePlanner(
   // 去除matchType两端的空格
   private val trimmedMatchType = matchType.trim()
 
+  // 长轮询期间可能等待对手数十秒，不能占着数据库事务；配对成功后的写入在 persistMatch 自己的短事务里完成
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[Json]): IO[Json] =
+    boundedPlan
+
   override def plan(using planContext: PlanContext): IO[Json] = {
     for {
       // Step 1: 验证匹配类型是否有效
@@ -32,53 +36,30 @@ case class FindOrCreateMatchRoomMessagePlanner(
       _ <- validateMatchType()
       _ <- IO(logger.info(s"[Step 1] 匹配类型验证通过"))
 
-      // Step 2: 查找可用的匹配房间
-      _ <- IO(logger.info(s"[Step 2] 开始查找可用的匹配房间，类型: ${trimmedMatchType}"))
-      existingRoomOpt <- findAvailableRoom(trimmedMatchType)
-      
-      // Step 3: 如果没有找到可用房间，则创建新房间
-      roomInfo <- existingRoomOpt match {
-        case Some(roomInfo) => 
-          for {
-            _ <- IO(logger.info(s"[Step 3] 找到可用的匹配房间: ${roomInfo.asJson.noSpaces}"))
-            // 匹配成功后删除房间
-            // 根据日志分析，字段名为"roomID"
-            roomId = roomInfo.hcursor.downField("roomID").as[String].getOrElse("")
-            _ <- IO(logger.info(s"[Step 3] 找到的房间ID: ${roomId}"))
-            _ <- deleteRoom(roomId)
-            result <- IO.pure(roomInfo)
-          } yield result
-        case None =>
-          for {
-            _ <- IO(logger.info(s"[Step 3] 未找到可用的匹配房间，创建新房间"))
-            newRoom <- createNewRoom(userID, trimmedMatchType)
-            _ <- IO(logger.info(s"[Step 3] 创建的新房间: ${newRoom.asJson.noSpaces}"))
-          } yield newRoom
-      }
+      // Step 2: 确定匹配队列，排位赛按段位分队列
+      rankBucket <- if (trimmedMatchType == "ranked") findUserRank(userID).map(Some(_)) else IO.pure(None)
+      queueKey = MatchmakingQueue.queueKey(trimmedMatchType, rankBucket)
+      _ <- IO(logger.info(s"[Step 2] 进入匹配队列: ${queueKey}"))
 
-      // Step 4: 更新用户的match_status
-      _ <- IO(logger.info(s"[Step 4] 更新用户的匹配状态"))
-      _ <- updateUserMatchStatus(userID, trimmedMatchType)
-      _ <- IO(logger.info(s"[Step 4] 用户匹配状态更新成功"))
+      // Step 3: 与队列中的等待者配对，或者等待对手，最多等待一个长轮询周期；配对记录写入失败时本次请求失败，对方继续排队
+      matched <- MatchmakingQueue.seek(userID, queueKey)(persistMatch(_, rankBucket))
 
-      // 从日志分析，确定字段名为"roomID"
-      roomId = roomInfo.hcursor.downField("roomID").as[String] match {
-        case Right(id) if id.nonEmpty => 
-          id
-        case _ => 
-          // 如果从JSON中获取失败，记录错误并返回一个新生成的ID
-          val fallbackId = UUID.randomUUID().toString
-          logger.error(s"[ERROR] 无法从roomInfo中获取roomID: ${roomInfo.asJson.noSpaces}，使用备用ID: ${fallbackId}")
-          fallbackId
+      // 构建返回结果：配对成功时返回房间ID，否则客户端重新发起请求继续等待
+      result = matched match {
+        case Some(m) =>
+          val opponentID = if (m.ownerID == userID) m.opponentID else m.ownerID
+          logger.info(s"[Step 3] 配对成功，房间ID: ${m.roomID}，对手: ${opponentID}")
+          Json.obj(
+            "status" -> Json.fromString("matched"),
+            "room_id" -> Json.fromString(m.roomID),
+            "opponent_id" -> Json.fromString(opponentID)
+          )
+        case None =>
+          logger.info(s"[Step 3] ${MatchmakingQueue.LongPollTimeout} 内没有对手，保留排队位置")
+          Json.obj(
+            "status" -> Json.fromString("waiting")
+          )
       }
-      
-      _ <- IO(logger.info(s"[FINAL] 返回的房间ID: ${roomId}"))
-      
-      // 构建返回结果，总是返回roomID
-      result = Json.obj(
-        "room_id" -> Json.fromString(roomId)
-      )
-
     } yield result
   }
 
@@ -93,88 +74,51 @@ case class FindOrCreateMatchRoomMessagePlanner(
     }
   }
 
-  private def findAvailableRoom(matchType: String)(using PlanContext): IO[Option[Json]] = {
-    // 查找状态为open且匹配类型相同的房间
-    // 不考虑段位匹配
-    // 使用别名确保返回的字段名一致
-    val sql = s"""
-      SELECT room_id as "roomID", owner_id as "ownerID", match_type as "matchType", 
-             create_time as "createTime", status, expire_time as "expireTime"
-      FROM ${schemaName}.match_room_table
-      WHERE status = 'open' AND match_type = ? AND expire_time > NOW()
-      ORDER BY create_time ASC LIMIT 1
-    """
-    
-    readDBJsonOptional(sql, List(SqlParameter("String", matchType)))
+  private def findUserRank(userID: String)(using PlanContext): IO[String] = {
+    readDBJsonOptional(
+      s"SELECT rank FROM ${schemaName}.user_rank_table WHERE user_id = ?;",
+      List(SqlParameter("String", userID))
+    ).map(_.flatMap(_.hcursor.downField("rank").as[String].toOption).getOrElse("unranked"))
   }
 
-  private def createNewRoom(userID: String, matchType: String)(using PlanContext): IO[Json] = {
-    val roomID = UUID.randomUUID().toString
+  /**
+   * 只持久化最终的配对结果：写入一条 matched 状态的房间记录，并更新双方的 match_status
+   */
+  private def persistMatch(matched: MatchmakingQueue.Match, rankBucket: Option[String])(using PlanContext): IO[Unit] = {
     val createTime = new DateTime()
     // 设置过期时间为30分钟后
     val expireTime = createTime.plusMinutes(30)
-    // 默认段位为0，Int类型
-    val defaultRank = 0
     
     // 使用PostgreSQL兼容的时间戳格式
     val formatter = DateTimeFormat.forPattern("yyyy-MM-dd HH:mm:ss.SSS")
-    val createTimeStr = formatter.print(createTime)
-    val expireTimeStr = formatter.print(expireTime)
-    
-    val sql = s"""
-      INSERT INTO ${schemaName}.match_room_table 
-      (room_id, owner_id, match_type, owner_rank, create_time, status, expire_time)
-      VALUES (?, ?, ?, ?, ?::timestamp, 'open', ?::timestamp);
-    """
-    
-    val params = List(
-      SqlParameter("String", roomID),
-      SqlParameter("String", userID),
-      SqlParameter("String", matchType),
-      SqlParameter("Int", defaultRank.toString),
-      SqlParameter("String", createTimeStr),
-      SqlParameter("String", expireTimeStr)
-    )
-    
-    writeDB(sql, params).map { _ =>
-      // 记录日志，确保roomID被正确生成
-      logger.info(s"[CreateNewRoom] 成功创建房间，ID: ${roomID}")
-      
-      // 确保创建的JSON对象使用与数据库返回相同的字段名
-      Json.obj(
-        "roomID" -> Json.fromString(roomID),
-        "ownerID" -> Json.fromString(userID),
-        "matchType" -> Json.fromString(matchType),
-        "ownerRank" -> Json.fromInt(defaultRank),
-        "createTime" -> Json.fromString(createTimeStr),
-        "status" -> Json.fromString("open"),
-        "expireTime" -> Json.fromString(expireTimeStr),
-        "is_new_room" -> Json.fromBoolean(true)
-      )
-    }
-  }
-
-  private def deleteRoom(roomID: String)(using PlanContext): IO[Unit] = {
-    val sql = s"""
-      DELETE FROM ${schemaName}.match_room_table
-      WHERE room_id = ?;
-    """
 
-    writeDB(sql, List(
-      SqlParameter("String", roomID)
-    )).map(_ => ())
-  }
-
-  private def updateUserMatchStatus(userID: String, matchStatus: String)(using PlanContext): IO[Unit] = {
-    val sql = s"""
-      UPDATE ${schemaName}.user_table
-      SET match_status = ?
-      WHERE user_id = ?;
-    """
-
-    writeDB(sql, List(
-      SqlParameter("String", matchStatus),
-      SqlParameter("String", userID)
-    )).map(_ => ())
+    // 房间记录和双方状态一起提交，不会出现只写了一半的配对
+    startTransaction {
+      batchDB(List(
+        BatchStatement.write(
+          s"""
+          INSERT INTO ${schemaName}.match_room_table 
+          (room_id, owner_id, match_type, owner_rank, create_time, status, expire_time)
+          VALUES (?, ?, ?, ?, ?::timestamp, 'matched', ?::timestamp);
+          """,
+          List(
+            SqlParameter("String", matched.roomID),
+            SqlParameter("String", matched.ownerID),
+            SqlParameter("String", trimmedMatchType),
+            SqlParameter("String", rankBucket.getOrElse("0")),
+            SqlParameter("String", formatter.print(createTime)),
+            SqlParameter("String", formatter.print(expireTime))
+          )
+        ),
+        BatchStatement.write(
+          s"UPDATE ${schemaName}.user_table SET match_status = ? WHERE user_id IN (?, ?);",
+          List(
+            SqlParameter("String", trimmedMatchType),
+            SqlParameter("String", matched.ownerID),
+            SqlParameter("String", matched.opponentID)
+          )
+        )
+      )).void
+    }
   }
-}
\ No newline at end of file
+}
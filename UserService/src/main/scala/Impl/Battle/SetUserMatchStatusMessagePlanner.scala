@@ -6,6 +6,7 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import cats.effect.IO
+import Utils.MatchmakingQueue
 import org.slf4j.LoggerFactory
 import io.circe._
 import io.circe.syntax._
@@ -37,6 +38,9 @@ case class SetUserMatchStatusMessagePlanner(
       _ <- updateUserMatchStatus(userID, matchStatus)
       _ <- IO(logger.info(s"[Step 3] 用户匹配状态更新成功"))
 
+      // Step 4: 不再进行快速或排位匹配时退出匹配队列
+      _ <- if (matchStatus == "quick" || matchStatus == "ranked") IO.unit else MatchmakingQueue.cancel(userID)
+
     } yield s"${matchStatus}"
   }
 
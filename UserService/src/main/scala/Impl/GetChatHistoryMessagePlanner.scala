@@ -5,6 +5,7 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import Objects.UserService.MessageEntry
+import Utils.MessageStore
 import Utils.UserTokenValidator.getUserIDFromToken
 import cats.effect.IO
 import org.joda.time.DateTime
@@ -18,6 +19,9 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 case class GetChatHistoryMessagePlanner(
   userToken: String,  // 用户的认证令牌，用于验证当前用户身份
   friendID: String,   // 对话好友的用户ID
+  beforeTime: Option[Long], // 只返回该时间（毫秒）之前的消息，不填则从最新一条开始
+  beforeMessageID: Option[Long], // 与 beforeTime 组成 (messageTime, messageID) 游标，取本页第一条的 messageID
+  pageSize: Option[Int],    // 本页最多返回的条数，不填为 MessageStore.DEFAULT_PAGE_SIZE
   override val planContext: PlanContext
 ) extends Planner[List[MessageEntry]] {
   val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
@@ -33,19 +37,10 @@ case class GetChatHistoryMessagePlanner(
       _ <- IO(logger.info(s"验证好友用户: ${friendID}"))
       _ <- verifyUserExists(friendID)
 
-      // Step 3: Get current user's messages
-      _ <- IO(logger.info(s"获取当前用户的消息记录"))
-      currentUserMessages <- getMessageBox(currentUserID)
-
-      // Step 4: Get friend's messages
-      _ <- IO(logger.info(s"获取好友的消息记录"))
-      friendMessages <- getMessageBox(friendID)
-
-      // Step 5: Filter and combine messages between the two users
-      _ <- IO(logger.info("筛选并合并两用户之间的聊天记录"))
-      chatHistory <- IO {
-        filterChatMessages(currentUserMessages, friendMessages, currentUserID, friendID)
-      }
+      // Step 3: 按会话索引分页读取双方的聊天记录
+      size <- MessageStore.validatePageSize(pageSize)
+      _ <- IO(logger.info(s"读取聊天记录: beforeTime=${beforeTime}, beforeMessageID=${beforeMessageID}, pageSize=${size}"))
+      chatHistory <- MessageStore.fetchConversationPage(currentUserID, friendID, beforeTime, beforeMessageID, size)
 
       _ <- IO(logger.info(s"聊天历史记录获取完成，共找到${chatHistory.length}条消息"))
     } yield chatHistory
@@ -63,76 +58,4 @@ case class GetChatHistoryMessagePlanner(
         IO.raiseError(new IllegalArgumentException(errorMessage))
     }
   }
-
-  // Step 3: Get user's message_box
-  private def getMessageBox(userID: String)(using PlanContext): IO[List[MessageEntry]] = {
-    val sql = s"SELECT message_box FROM ${schemaName}.user_social_table WHERE user_id = ?;"
-    readDBJsonOptional(sql, List(SqlParameter("String", userID))).flatMap {
-      case Some(json) =>
-        // 尝试两种字段名：messageBox (驼峰) 和 message_box (下划线)
-        val messageBoxResult = json.hcursor.get[String]("messageBox") match {
-          case Right(value) => Right(value)
-          case Left(_) => json.hcursor.get[String]("message_box")
-        }
-        
-        messageBoxResult match {
-          case Right(messageBoxStr) =>
-            // 尝试解析JSON字符串为MessageEntry列表
-            parser.parse(messageBoxStr) match {
-              case Right(parsedJson) =>
-                parsedJson.as[List[MessageEntry]] match {
-                  case Right(messages) =>
-                    IO(logger.info(s"成功解析用户 ${userID} 的${messages.length}条消息")) >>
-                    IO.pure(messages)
-                  case Left(decodeError) =>
-                    IO(logger.warn(s"解析用户 ${userID} 的message_box为MessageEntry列表失败: ${decodeError.getMessage}")) >>
-                    IO.pure(List.empty[MessageEntry])
-                }
-              case Left(parseError) =>
-                IO(logger.warn(s"解析用户 ${userID} 的message_box JSON失败: ${parseError.getMessage}")) >>
-                IO.pure(List.empty[MessageEntry])
-            }
-          case Left(cursorError) =>
-            IO(logger.warn(s"获取用户 ${userID} 的message_box字段失败: ${cursorError.getMessage}")) >>
-            IO.pure(List.empty[MessageEntry])
-        }
-      case None =>
-        IO(logger.info(s"用户 ${userID} 在user_social_table中不存在，返回空消息列表")) >>
-        IO.pure(List.empty[MessageEntry])
-    }
-  }
-
-  // Step 4: Filter messages between two specific users and sort by time
-  private def filterChatMessages(
-    userMessages: List[MessageEntry],
-    friendMessages: List[MessageEntry],
-    currentUserID: String,
-    friendID: String
-  ): List[MessageEntry] = {
-    // 从当前用户的消息中筛选与好友的对话（发送给好友的消息）
-    val userToFriendMessages = userMessages.filter(msg => 
-      msg.messageSource == currentUserID && msg.messageDestination == friendID
-    )
-
-    // 从好友的消息中筛选与当前用户的对话（好友发送给当前用户的消息）
-    val friendToUserMessages = friendMessages.filter(msg => 
-      msg.messageSource == friendID && msg.messageDestination == currentUserID
-    )
-
-    // 合并所有相关消息
-    val allChatMessages = userToFriendMessages ++ friendToUserMessages
-
-    // 去重（因为消息可能在两个用户的message_box中都存在）
-    val uniqueMessages = allChatMessages
-      .groupBy(msg => (msg.messageSource, msg.messageDestination, msg.messageContent, msg.messageTime))
-      .values
-      .map(_.head)
-      .toList
-
-    // 按时间排序
-    val sortedMessages = uniqueMessages.sortBy(_.messageTime.getMillis)
-    
-    logger.info(s"筛选出${sortedMessages.length}条聊天记录")
-    sortedMessages
-  }
 }
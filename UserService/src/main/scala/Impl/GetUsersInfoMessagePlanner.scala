@@ -0,0 +1,42 @@
+package Impl
+
+import Objects.UserService.PublicUserProfile
+import Common.API.{PlanContext, Planner}
+import cats.effect.IO
+import org.slf4j.LoggerFactory
+import io.circe._
+import io.circe.syntax._
+import io.circe.generic.auto._
+import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
+import Utils.UserInfoAssembler
+import Utils.UserTokenValidator.getUserIDFromToken
+
+case class GetUsersInfoMessagePlanner(
+    userToken: String,
+    userIDs: List[String],
+    override val planContext: PlanContext
+) extends Planner[List[PublicUserProfile]] {
+
+  private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+
+  // 只读，两张表并行查询，不开事务
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[List[PublicUserProfile]]): IO[List[PublicUserProfile]] = boundedPlan
+
+  override def plan(using planContext: PlanContext): IO[List[PublicUserProfile]] = {
+    for {
+      // Step 1: 验证userToken，只有登录用户可以查询
+      _ <- IO(logger.info(s"[Step 1] 验证用户的userToken"))
+      currentUserID <- getUserIDFromToken(userToken)
+
+      // Step 2: 检查批量大小
+      _ <- IO.raiseWhen(userIDs.size > UserInfoAssembler.MaxBatchSize)(
+        new IllegalArgumentException(s"一次最多查询 ${UserInfoAssembler.MaxBatchSize} 个用户，收到 ${userIDs.size} 个")
+      )
+
+      // Step 3: 只读取公开字段，每张表一次查询
+      _ <- IO(logger.info(s"[Step 3] 用户 ${currentUserID} 批量获取 ${userIDs.size} 个用户的公开资料"))
+      profiles <- UserInfoAssembler.fetchPublicProfiles(userIDs)
+      _ <- IO(logger.info(s"[Step 3] 批量获取完成，找到 ${profiles.size} 个用户"))
+    } yield profiles
+  }
+}
@@ -1,12 +1,12 @@
 package Impl
 
 import APIs.UserService.LoginUserMessage
-import Utils.UserAuthenticationProcess
+import Utils.{UserAuthenticationProcess, UserTokenCache}
 import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
-import cats.effect.IO
+import cats.effect.{IO, Ref}
 import org.slf4j.LoggerFactory
 import io.circe._
 import io.circe.syntax._
@@ -20,6 +20,14 @@ case class LoginUserMessagePlanner(
     override val planContext: PlanContext
 ) extends Planner[String] {
   val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
+
+  /** 通过验证的用户，事务结束后按它失效 token 缓存 */
+  private val loggedInUserID = Ref.unsafe[IO, Option[String]](None)
+
+  // 事务提交后再失效缓存，否则提交前并发的验证请求会把旧 token 重新写回缓存
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[String]): IO[String] =
+    super.planWithErrorControl.guarantee(loggedInUserID.get.flatMap(_.traverse_(UserTokenCache.invalidateOwner)))
+
   override def plan(using PlanContext): IO[String] = {
     for {
       // Step 1: 使用Utils中的现有authenticateUser方法
@@ -30,6 +38,7 @@ case class LoginUserMessagePlanner(
         case Some(user) => IO.pure(user)
         case None => IO.raiseError(new IllegalArgumentException("用户名或密码错误"))
       }
+      _ <- loggedInUserID.set(Some(user.userID))
       
       // Step 2: 生成usertoken
       usertoken <- IO(UUID.randomUUID().toString)
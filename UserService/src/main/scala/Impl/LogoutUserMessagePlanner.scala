@@ -2,11 +2,13 @@ package Impl
 
 import Utils.UserAuthenticationProcess.clearOnlineStatus
 import Utils.UserTokenValidator
+import Utils.MatchmakingQueue
+import Utils.UserTokenCache
 import Common.API.{PlanContext, Planner}
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
-import cats.effect.IO
+import cats.effect.{IO, Ref}
 import org.slf4j.LoggerFactory
 import io.circe._
 import io.circe.syntax._
@@ -21,17 +23,26 @@ case class LogoutUserMessagePlanner(
 ) extends Planner[String] {
   val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
 
+  /** token 对应的用户，事务结束后按它失效 token 缓存 */
+  private val loggedOutUserID = Ref.unsafe[IO, Option[String]](None)
+
+  // 事务提交后再失效缓存，否则提交前并发的验证请求会把已清除的 token 重新写回缓存
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[String]): IO[String] =
+    super.planWithErrorControl.guarantee(loggedOutUserID.get.flatMap(_.traverse_(UserTokenCache.invalidateOwner)))
+
   override def plan(using PlanContext): IO[String] = {
     for {
       // Step 1: 使用UserTokenValidator验证usertoken并获取userID
       _ <- IO(logger.info(s"[LogoutUserMessagePlanner] 开始验证usertoken，userToken=${userToken}"))
       userID <- UserTokenValidator.getUserIDFromToken(userToken)
+      _ <- loggedOutUserID.set(Some(userID))
 
       // Step 2: 调用clearOnlineStatus方法，将用户的在线状态设为离线
       _ <- IO(logger.info(s"[LogoutUserMessagePlanner] 设置用户离线状态开始，userID=${userID}"))
       _ <- clearOnlineStatus(userID)
       
-      // Step 3: 清除该用户创建的所有匹配房间
+      // Step 3: 退出匹配队列，并清除该用户创建的所有匹配房间
+      _ <- MatchmakingQueue.cancel(userID)
       _ <- IO(logger.info(s"[LogoutUserMessagePlanner] 清除用户创建的匹配房间开始，userID=${userID}"))
       roomsDeleted <- clearUserMatchRooms(userID)
       _ <- IO(logger.info(s"[LogoutUserMessagePlanner] 清除用户匹配房间完成，共删除 ${roomsDeleted} 个房间"))
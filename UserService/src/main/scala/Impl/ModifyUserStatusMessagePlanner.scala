@@ -2,6 +2,7 @@ package Impl
 
 
 import Common.API.{PlanContext, Planner}
+import Utils.UserTokenCache
 import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
@@ -23,13 +24,16 @@ case class ModifyUserStatusMessagePlanner(
 
   private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
 
+  // 封禁后旧 token 不再走缓存；事务提交后再失效，否则提交前并发的验证请求会把旧结果重新写回缓存
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[String]): IO[String] =
+    super.planWithErrorControl.guarantee(UserTokenCache.invalidateOwner(userID))
+
   override def plan(using planContext: PlanContext): IO[String] = {
     for {
       // 更新用户封禁状态
       _ <- IO(logger.info(s"调用 updateBanStatus 更新用户 ${userID} 的封禁天数为 ${banDays}"))
       updateResult <- updateBanStatus(userID, banDays)
       _ <- IO(logger.info(s"updateBanStatus 更新结果: ${updateResult}"))
-
     } yield "用户状态修改成功！"
   }
   
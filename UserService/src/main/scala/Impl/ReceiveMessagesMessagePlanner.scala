@@ -6,6 +6,7 @@ import Common.DBAPI._
 import Common.Object.SqlParameter
 import Common.ServiceUtils.schemaName
 import Objects.UserService.MessageEntry
+import Utils.{MessageStore, UserTokenValidator}
 import cats.effect.IO
 import org.joda.time.DateTime
 import org.slf4j.LoggerFactory
@@ -17,6 +18,9 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 
 case class ReceiveMessagesMessagePlanner(
                                           userToken: String,
+                                          beforeTime: Option[Long], // 只返回该时间（毫秒）之前的消息，不填则从最新一条开始
+                                          beforeMessageID: Option[Long], // 与 beforeTime 组成 (messageTime, messageID) 游标，取本页第一条的 messageID
+                                          pageSize: Option[Int],    // 本页最多返回的条数，不填为 MessageStore.DEFAULT_PAGE_SIZE
                                           override val planContext: PlanContext
                                         ) extends Planner[List[MessageEntry]] {
   val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
@@ -25,63 +29,14 @@ case class ReceiveMessagesMessagePlanner(
     for {
       // Step 1: Validate userToken and retrieve userID
       _ <- IO(logger.info(s"验证userToken: ${userToken}是否有效"))
-      userID <- getUserIDFromToken()
+      userID <- UserTokenValidator.getUserIDFromToken(userToken)
 
-      // Step 2: Retrieve message records from UserSocialTable
-      _ <- IO(logger.info(s"根据userID: ${userID}从UserSocialTable的message_box字段中获取用户的消息记录"))
-      messages <- getMessageBox(userID)
-
-      // Step 3: Categorize, sort, and map the messages to List[MessageEntry]
-      _ <- IO(logger.info("整理、分类并按时间顺序排序用户的消息记录"))
-      messageEntries <- IO { parseAndSortMessages(messages) }
+      // Step 2: 按游标分页读取用户发出或收到的消息
+      size <- MessageStore.validatePageSize(pageSize)
+      _ <- IO(logger.info(s"根据userID: ${userID}从message_table中读取消息: beforeTime=${beforeTime}, beforeMessageID=${beforeMessageID}, pageSize=${size}"))
+      messageEntries <- MessageStore.fetchUserMessagesPage(userID, beforeTime, beforeMessageID, size)
 
       _ <- IO(logger.info(s"消息记录整理完成，共找到${messageEntries.length}条消息"))
     } yield messageEntries
   }
-
-  // Step 1: Validate userToken and retrieve userID
-  private def getUserIDFromToken()(using PlanContext): IO[String] = {
-    val sql =
-      s"""
-        SELECT user_id
-        FROM ${schemaName}.user_auth_table
-        WHERE user_token = ?;
-      """
-    readDBString(
-      sql,
-      List(SqlParameter("String", userToken))
-    ).map { userID =>
-      logger.info(s"userToken验证成功，获取到用户ID: ${userID}")
-      userID
-    }
-  }
-
-  // Step 2: Retrieve message records from UserSocialTable
-  private def getMessageBox(userID: String)(using PlanContext): IO[List[String]] = {
-    val sql =
-      s"""
-        SELECT message_box
-        FROM ${schemaName}.user_social_table
-        WHERE user_id = ?;
-      """
-    readDBJson(
-      sql,
-      List(SqlParameter("String", userID))
-    ).map { json =>
-      val messageBox = decodeField[List[String]](json, "message_box")
-      logger.info(s"从数据库成功获取到${messageBox.length}条消息记录")
-      messageBox
-    }
-  }
-
-  // Step 3: Categorize, sort, and map the messages to List[MessageEntry]
-  private def parseAndSortMessages(messages: List[String]): List[MessageEntry] = {
-    val parsedMessages = messages.map { messageStr =>
-      decodeType[MessageEntry](messageStr)
-    }
-
-    val sortedMessages = parsedMessages.sortBy(_.messageTime.getMillis)
-    logger.info("消息记录排序成功")
-    sortedMessages
-  }
-}
\ No newline at end of file
+}
@@ -63,7 +63,7 @@ case class RegisterUserMessagePlanner(
       banDays = 0,
       isOnline = false,
       matchStatus = "Idle",
-      stoneAmount = 10000,
+      stoneAmount = Some(10000),
       credits = 0,
       rank = "黑铁",
       rankPosition = 0,
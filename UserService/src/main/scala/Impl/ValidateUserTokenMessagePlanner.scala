@@ -3,6 +3,7 @@ package Impl
 import Common.API.{PlanContext, Planner}
 import Utils.UserTokenValidator
 import cats.effect.IO
+import io.circe.Encoder
 import org.slf4j.LoggerFactory
 
 /**
@@ -16,6 +17,9 @@ case class ValidateUserTokenMessagePlanner(
 
   private val logger = LoggerFactory.getLogger(this.getClass.getSimpleName + "_" + planContext.traceID.id)
 
+  // 只读且大多命中 UserTokenCache，不需要开事务
+  override def planWithErrorControl(using planContext: PlanContext, encoder: Encoder[String]): IO[String] = boundedPlan
+
   override def plan(using PlanContext): IO[String] = {
     for {
       _ <- IO(logger.info(s"[ValidateUserTokenMessagePlanner] 开始验证用户Token并获取用户ID"))
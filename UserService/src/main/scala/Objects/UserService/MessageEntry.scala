@@ -23,13 +23,15 @@ import java.util.UUID
  * @param messageDestination: String (消息目标)
  * @param messageContent: String (消息内容)
  * @param messageTime: DateTime (消息发送时间)
+ * @param messageID: Option[Long] (消息在 message_table 中的ID，与 messageTime 一起作为聊天记录的翻页游标)
  */
 
 case class MessageEntry(
   messageSource: String,
   messageDestination: String,
   messageContent: String,
-  messageTime: DateTime
+  messageTime: DateTime,
+  messageID: Option[Long] = None
 ){
 
   //process class code 预留标志位，不要删除
@@ -0,0 +1,76 @@
+package Objects.UserService
+
+
+import io.circe.{Decoder, Encoder, Json}
+import io.circe.generic.semiauto.{deriveDecoder, deriveEncoder}
+import io.circe.syntax.*
+import io.circe.parser.*
+import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+import com.fasterxml.jackson.core.`type`.TypeReference
+import Common.Serialize.JacksonSerializeUtils
+
+import scala.util.Try
+
+import org.joda.time.DateTime
+import java.util.UUID
+
+
+/**
+ * PublicUserProfile
+ * desc: 用户的公开资料，好友列表、黑名单等展示其他用户的页面只需要这些字段
+ * @param userID: String (用户的唯一ID)
+ * @param userName: String (用户名)
+ * @param rank: String (段位，没有段位记录时为空字符串)
+ * @param isOnline: Boolean (是否在线)
+ */
+
+case class PublicUserProfile(
+  userID: String,
+  userName: String,
+  rank: String,
+  isOnline: Boolean
+){
+
+  //process class code 预留标志位，不要删除
+
+
+}
+
+
+case object PublicUserProfile{
+
+    
+  import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
+
+  // Circe 默认的 Encoder 和 Decoder
+  private val circeEncoder: Encoder[PublicUserProfile] = deriveEncoder
+  private val circeDecoder: Decoder[PublicUserProfile] = deriveDecoder
+
+  // Jackson 对应的 Encoder 和 Decoder
+  private val jacksonEncoder: Encoder[PublicUserProfile] = Encoder.instance { currentObj =>
+    Json.fromString(JacksonSerializeUtils.serialize(currentObj))
+  }
+
+  private val jacksonDecoder: Decoder[PublicUserProfile] = Decoder.instance { cursor =>
+    try { Right(JacksonSerializeUtils.deserialize(cursor.value.noSpaces, new TypeReference[PublicUserProfile]() {})) } 
+    catch { case e: Throwable => Left(io.circe.DecodingFailure(e.getMessage, cursor.history)) }
+  }
+  
+  // Circe + Jackson 兜底的 Encoder
+  given publicUserProfileEncoder: Encoder[PublicUserProfile] = Encoder.instance { config =>
+    Try(circeEncoder(config)).getOrElse(jacksonEncoder(config))
+  }
+
+  // Circe + Jackson 兜底的 Decoder
+  given publicUserProfileDecoder: Decoder[PublicUserProfile] = Decoder.instance { cursor =>
+    circeDecoder.tryDecode(cursor).orElse(jacksonDecoder.tryDecode(cursor))
+  }
+
+
+
+  //process object code 预留标志位，不要删除
+
+
+}
+
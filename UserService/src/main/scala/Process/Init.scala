@@ -10,6 +10,8 @@ import java.util.UUID
 import Global.DBConfig
 import Process.ProcessUtils.server2DB
 import Global.GlobalVariables
+import Utils.MessageStore
+import cats.implicits.*
 
 object Init {
   def init(config: ServerConfig): IO[Unit] = {
@@ -18,8 +20,11 @@ object Init {
 
     val program: IO[Unit] = for {
       _ <- IO(GlobalVariables.isTest=config.isTest)
-      _ <- API.init(config.maximumClientConnection)
+      _ <- API.init(config.maximumClientConnection, config.targetGuards)
       _ <- Common.DBAPI.SwitchDataSourceMessage(projectName = Global.ServiceCenter.projectName).send
+      batchSupported <- if (config.enableBatchDB) Common.DBAPI.probeBatchDB else IO.pure(false)
+      _ <- IO(GlobalVariables.enableBatchDB=batchSupported)
+      _ <- IO.whenA(config.enableBatchDB && !batchSupported)(IO(println("DB-Manager 不支持 BatchDBMessage，batchDB 改为在事务内逐条执行")))
       _ <- initSchema(schemaName)
             /** 用户资产表，记录用户的资产相关信息
        * user_id: 用户的唯一ID
@@ -110,6 +115,16 @@ object Init {
         """,
         List()
       )
+
+      /** 聊天消息表，每条消息一行，取代 message_box 中的消息数组
+       * message_id: 自增ID，同一时间戳内的先后顺序
+       * conversation_id: 会话ID，由双方 user_id 按字典序拼接
+       * sender_id / recipient_id: 发送者与接收者
+       * message_content: 消息内容
+       * message_time: 发送时间
+       */
+      _ <- MessageStore.createTableStatements.traverse_(statement => writeDB(statement, List()))
+      _ <- MessageStore.migrateMessageBoxes()
       
       /** 匹配房间表，记录用户匹配房间的相关信息
        * room_id: 房间的唯一ID
@@ -1,6 +1,10 @@
 package Process
 
 import Common.API.PlanContext
+import Common.API.Tracer
+import Common.API.Metrics
+import Common.API.{Deadline, DeadlineExceededException}
+import Utils.{MatchmakingQueue, UserTokenCache}
 import Common.DBAPI.DidRollbackException
 import cats.effect.*
 import fs2.concurrent.Topic
@@ -28,6 +32,7 @@ import Impl.BlockUserMessagePlanner
 import Impl.LogoutUserMessagePlanner
 import Impl.ReceiveMessagesMessagePlanner
 import Impl.GetUserInfoMessagePlanner
+import Impl.GetUsersInfoMessagePlanner
 import Impl.QueryIDByUserNameMessagePlanner
 import Impl.GetAllUserIDsMessagePlanner
 import Impl.Battle.SetUserMatchStatusMessagePlanner
@@ -35,6 +40,7 @@ import Impl.Battle.FindOrCreateMatchRoomMessagePlanner
 import Impl.SendMessageMessagePlanner
 import Impl.GetChatHistoryMessagePlanner
 import Impl.ModifyUserCreditsMessagePlanner
+import Impl.ValidateUserTokenMessagePlanner
 import Common.API.TraceID
 import org.joda.time.DateTime
 import org.http4s.circe.*
@@ -44,173 +50,193 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 object Routes:
   val projects: TrieMap[String, Topic[IO, String]] = TrieMap.empty
 
-  private def executePlan(messageType: String, str: String): IO[String] =
+  private def executePlan(messageType: String, body: Json): IO[Json] =
     messageType match {
       case "ModifyUserStatusMessage" =>
         IO(
-          decode[ModifyUserStatusMessagePlanner](str) match
+          body.as[ModifyUserStatusMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ModifyUserStatusMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "ModifyUserInfoMessage" =>
         IO(
-          decode[ModifyUserInfoMessagePlanner](str) match
+          body.as[ModifyUserInfoMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ModifyUserInfoMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "AddFriendMessage" =>
         IO(
-          decode[AddFriendMessagePlanner](str) match
+          body.as[AddFriendMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for AddFriendMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "RegisterUserMessage" =>
         IO(
-          decode[RegisterUserMessagePlanner](str) match
+          body.as[RegisterUserMessagePlanner] match
             case Left(err) => 
               err.printStackTrace()
               throw new Exception(s"Invalid JSON for RegisterUserMessage[${err.getMessage}]")
             case Right(planner) => 
-              planner.fullPlan.map(_.asJson.toString)
+              planner.fullPlan.map(_.asJson)
         ).flatten
        
       case "RemoveFriendMessage" =>
         IO(
-          decode[RemoveFriendMessagePlanner](str) match
+          body.as[RemoveFriendMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for RemoveFriendMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "LogUserOperationMessage" =>
         IO(
-          decode[LogUserOperationMessagePlanner](str) match
+          body.as[LogUserOperationMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for LogUserOperationMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "LoginUserMessage" =>
         IO(
-          decode[LoginUserMessagePlanner](str) match
+          body.as[LoginUserMessagePlanner] match
             case Left(err) => 
               err.printStackTrace(); 
               throw new Exception(s"Invalid JSON for LoginUserMessage[${err.getMessage}]")
             case Right(value) => 
-              value.fullPlan.map(_.asJson.toString)
+              value.fullPlan.map(_.asJson)
         ).flatten
        
       case "AcceptFriendRequestMessage" =>
         IO(
-          decode[AcceptFriendRequestMessagePlanner](str) match
+          body.as[AcceptFriendRequestMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for AcceptFriendRequestMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "GetUserStatusMessage" =>
         IO(
-          decode[GetUserStatusMessagePlanner](str) match
+          body.as[GetUserStatusMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetUserStatusMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "BlockUserMessage" =>
         IO(
-          decode[BlockUserMessagePlanner](str) match
+          body.as[BlockUserMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for BlockUserMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "LogoutUserMessage" =>
         IO(
-          decode[LogoutUserMessagePlanner](str) match
+          body.as[LogoutUserMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for LogoutUserMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "ReceiveMessagesMessage" =>
         IO(
-          decode[ReceiveMessagesMessagePlanner](str) match
+          body.as[ReceiveMessagesMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ReceiveMessagesMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
        
       case "GetUserInfoMessage" =>
         IO(
-          decode[GetUserInfoMessagePlanner](str) match
+          body.as[GetUserInfoMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetUserInfoMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
+        ).flatten
+      case "GetUsersInfoMessage" =>
+        IO(
+          body.as[GetUsersInfoMessagePlanner] match
+            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetUsersInfoMessage[${err.getMessage}]")
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
       case "QueryIDByUserNameMessage" => 
         IO(
-          decode[QueryIDByUserNameMessagePlanner](str) match
+          body.as[QueryIDByUserNameMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for QueryIDByUserNameMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "GetAllUserIDsMessage" =>
         IO(
-          decode[GetAllUserIDsMessagePlanner](str) match
+          body.as[GetAllUserIDsMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetAllUserIDsMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "SendMessageMessage" =>
         IO(
-          decode[SendMessageMessagePlanner](str) match
+          body.as[SendMessageMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for SendMessageMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "GetChatHistoryMessage" =>
         IO(
-          decode[GetChatHistoryMessagePlanner](str) match
+          body.as[GetChatHistoryMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for GetChatHistoryMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "SetUserMatchStatusMessage" =>
         IO(
-          decode[SetUserMatchStatusMessagePlanner](str) match
+          body.as[SetUserMatchStatusMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for SetUserMatchStatusMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
         
       case "FindOrCreateMatchRoomMessage" =>
         IO(
-          decode[FindOrCreateMatchRoomMessagePlanner](str) match
+          body.as[FindOrCreateMatchRoomMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for FindOrCreateMatchRoomMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "ModifyUserCreditsMessage" =>
         IO(
-          decode[ModifyUserCreditsMessagePlanner](str) match
+          body.as[ModifyUserCreditsMessagePlanner] match
             case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ModifyUserCreditsMessage[${err.getMessage}]")
-            case Right(value) => value.fullPlan.map(_.asJson.toString)
+            case Right(value) => value.fullPlan.map(_.asJson)
+        ).flatten
+
+      case "ValidateUserTokenMessage" =>
+        IO(
+          body.as[ValidateUserTokenMessagePlanner] match
+            case Left(err) => err.printStackTrace(); throw new Exception(s"Invalid JSON for ValidateUserTokenMessage[${err.getMessage}]")
+            case Right(value) => value.fullPlan.map(_.asJson)
         ).flatten
 
       case "test" =>
         for {
-          output  <- Utils.Test.test(str)(using  PlanContext(TraceID(""), 0))
-        } yield output
+          output  <- Utils.Test.test(body.noSpaces)(using  PlanContext(TraceID(""), 0))
+        } yield Json.fromString(output)
       case _ =>
         IO.raiseError(new Exception(s"Unknown type: $messageType"))
     }
 
-  def handlePostRequest(req: Request[IO]): IO[String] = {
+  /** 请求体只解析一次，PlanContext 直接加到解析出的 Json 上，executePlan 再从这个 Json 解码出 Planner */
+  def handlePostRequest(req: Request[IO]): IO[Json] = {
     req.as[Json].map {
       bodyJson => {
-        val planContext = PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)
-        val planContextJson = planContext.asJson
-        val updatedJson = bodyJson.deepMerge(Json.obj("planContext" -> planContextJson))
-        updatedJson.toString
+        val planContext = Deadline.continueBudget(req, bodyJson,
+          Tracer.continueTrace(bodyJson, PlanContext(TraceID(UUID.randomUUID().toString), transactionLevel = 0)))
+        bodyJson.mapObject(_.add("planContext", planContext.asJson))
       }
     }
   }
   val service: HttpRoutes[IO] = HttpRoutes.of[IO] {
     case GET -> Root / "health"    => Ok("OK")
+    case GET -> Root / "metrics" =>
+      Ok(Metrics.render(List(
+        Metrics.statsGauge("satintin_component_stats", "缓存和队列的统计", List(
+          "matchmaking_queue" -> MatchmakingQueue.stats,
+          "user_token_cache" -> UserTokenCache.stats
+        ))
+      )))
     case GET -> Root / "stream" / p => projects.get(p) match {
         case Some(topic) =>
           val stream = topic.subscribe(10)
@@ -232,16 +258,10 @@ object Routes:
         // 1) 读取 + merge PlanContext
         bodyWithCtx <- handlePostRequest(req)
 
-        // 2) 执行 Planner, 拿到 JSON 字符串
-        resultStr   <- executePlan(name, bodyWithCtx)
-
-        // 3) parse 成真正的 Json
-        resultJson  <- parse(resultStr) match {
-                         case Left(e)   => IO.raiseError(e)
-                         case Right(js) => IO.pure(js)
-                       }
+        // 2) 执行 Planner, 拿到结果 Json
+        resultJson  <- Metrics.timeRequest(name)(executePlan(name, bodyWithCtx))
 
-        // 4) 返回 Json
+        // 3) 返回 Json
         resp        <- Ok(resultJson)
       } yield resp).handleErrorWith {
         case e: DidRollbackException =>
@@ -249,6 +269,10 @@ object Routes:
           val headers = Headers("X-DidRollback" -> "true")
           BadRequest(e.getMessage.asJson.toString).map(_.withHeaders(headers))
 
+        case e: DeadlineExceededException =>
+          println(s"Deadline exceeded: $e")
+          ServiceUnavailable(e.getMessage.asJson.toString).map(_.withHeaders(Headers(Deadline.ExceededHeader -> "true")))
+
         case e: Throwable =>
           println(s"General error: $e")
           BadRequest(e.getMessage.asJson.toString)
@@ -1,6 +1,7 @@
 package Process
 
 import Process.Routes.service
+import Common.API.API
 import cats.effect.*
 import com.comcast.ip4s.*
 import org.http4s.*
@@ -33,6 +34,7 @@ object Server extends IOApp:
     ProcessUtils.readConfig(args.headOption.getOrElse("server_config.json"))
       .flatMap { config =>
         (for {
+          _ <- Resource.onFinalize(API.shutdown)
           _ <- Resource.eval(Init.init(config))
           app <- Resource.eval(CORS.policy.withAllowOriginAll(httpApp))
 
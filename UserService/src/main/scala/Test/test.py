@@ -3,8 +3,14 @@ import json
 import uuid
 import hashlib
 import time
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[5] / "Test"))
+from service_client import ServiceClient
 
 BASE_URL = "http://localhost:10010"  # UserService port
+http = ServiceClient(BASE_URL)  # keep-alive pool shared by every test
 
 class TestUserServiceWithSetup:
     """Test suite that properly sets up users before testing"""
@@ -98,7 +104,7 @@ class TestUserServiceWithSetup:
             
             try:
                 print(f"Attempting to register {username} with type '{msg_type}'...")
-                response = requests.post(f"{BASE_URL}/api/RegisterUserMessage", json=payload, timeout=10)
+                response = http.post(f"{BASE_URL}/api/RegisterUserMessage", json=payload, timeout=10)
                 print(f"Registration response for {username} (type: {msg_type}): {response.status_code} - {response.text}")
                 
                 if response.status_code == 200:
@@ -143,7 +149,7 @@ class TestUserServiceWithSetup:
             }
             
             try:
-                response = requests.post(f"{BASE_URL}/api/LoginUser", json=payload, timeout=10)
+                response = http.post(f"{BASE_URL}/api/LoginUser", json=payload, timeout=10)
                 print(f"Login response for {user_info['username']} (type: {msg_type}): {response.status_code} - {response.text}")
                 if response.status_code == 200:
                     return response.json()
@@ -177,7 +183,7 @@ class TestUserServiceWithSetup:
         for endpoint in endpoints_to_test:
             try:
                 # Try a simple GET request to see if endpoint exists
-                response = requests.get(f"{BASE_URL}{endpoint}", timeout=5)
+                response = http.get(f"{BASE_URL}{endpoint}", timeout=5)
                 print(f"GET {endpoint}: {response.status_code}")
             except Exception as e:
                 print(f"GET {endpoint}: Failed - {e}")
@@ -221,7 +227,7 @@ class TestUserServiceWithSetup:
             }
             
             try:
-                response = requests.post(f"{BASE_URL}/api/AddFriend", json=payload, timeout=10)
+                response = http.post(f"{BASE_URL}/api/AddFriend", json=payload, timeout=10)
                 print(f"AddFriend Status (type: {msg_type}): {response.status_code}")
                 print(f"AddFriend Response: {response.text}")
                 
@@ -255,7 +261,7 @@ class TestUserServiceWithSetup:
             }
             
             try:
-                response = requests.post(f"{BASE_URL}/api/GetUserInfo", json=payload, timeout=10)
+                response = http.post(f"{BASE_URL}/api/GetUserInfo", json=payload, timeout=10)
                 print(f"GetUserInfo Status (type: {msg_type}): {response.status_code}")
                 print(f"GetUserInfo Response: {response.text}")
                 
@@ -296,7 +302,7 @@ class TestUserServiceWithSetup:
             }
             
             try:
-                response = requests.post(f"{BASE_URL}/api/RemoveFriend", json=remove_payload, timeout=10)
+                response = http.post(f"{BASE_URL}/api/RemoveFriend", json=remove_payload, timeout=10)
                 print(f"RemoveFriend Status (type: {msg_type}): {response.status_code}")
                 print(f"RemoveFriend Response: {response.text}")
                 
@@ -329,7 +335,7 @@ class TestUserServiceWithSetup:
             }
             
             try:
-                response = requests.post(f"{BASE_URL}/api/BlockUser", json=payload, timeout=10)
+                response = http.post(f"{BASE_URL}/api/BlockUser", json=payload, timeout=10)
                 print(f"BlockUser Status (type: {msg_type}): {response.status_code}")
                 print(f"BlockUser Response: {response.text}")
                 
@@ -360,7 +366,7 @@ class TestUserServiceWithSetup:
             }
             
             try:
-                response = requests.post(f"{BASE_URL}/api/LogoutUser", json=payload, timeout=10)
+                response = http.post(f"{BASE_URL}/api/LogoutUser", json=payload, timeout=10)
                 print(f"LogoutUser Status (type: {msg_type}): {response.status_code}")
                 print(f"LogoutUser Response: {response.text}")
                 
@@ -384,14 +390,14 @@ class TestUserServiceWithSetup:
 def check_server_connectivity():
     """Check if UserService is running"""
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=5)
+        response = http.get(f"{BASE_URL}/health", timeout=5)
         print(f"Server health check: {response.status_code}")
         return True
     except requests.exceptions.RequestException:
         try:
             # Try a simple API call
             test_payload = {"type": "LoginUserMessage", "username": "test", "passwordHash": "test"}
-            response = requests.post(f"{BASE_URL}/api/LoginUser", json=test_payload, timeout=5)
+            response = http.post(f"{BASE_URL}/api/LoginUser", json=test_payload, timeout=5)
             print(f"Server connectivity test: {response.status_code}")
             return True
         except requests.exceptions.RequestException as e:
@@ -0,0 +1,147 @@
+package Utils
+
+import cats.effect.{Deferred, IO}
+import org.slf4j.LoggerFactory
+
+import java.util.UUID
+import java.util.concurrent.atomic.AtomicLong
+import scala.collection.concurrent.TrieMap
+import scala.concurrent.duration.*
+
+/**
+ * 内存匹配队列
+ * 每个队列（matchType，排位赛再按段位细分）最多只有一个等待者：新来的玩家要么原子地取走等待者完成配对，
+ * 要么自己成为等待者，两种情况都是 O(1)。等待者通过长轮询拿到房间ID，不再反复创建和删除 match_room_table 的记录
+ */
+case object MatchmakingQueue {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /** 一次长轮询最多等待的时间，超时后客户端重新发起请求，排队位置保留 */
+  val LongPollTimeout: FiniteDuration = 25.seconds
+
+  /** 等待者超过这么久没有轮询视为已离开，配对时跳过 */
+  val TicketIdleTimeout: FiniteDuration = 60.seconds
+
+  /** 每处理这么多次请求清理一次过期票据 */
+  private val PruneInterval = 256L
+
+  /**
+   * 一次配对结果
+   * @param roomID 对战房间ID
+   * @param queueKey 配对所在的队列
+   * @param ownerID 先进入队列的玩家
+   * @param opponentID 后进入队列、完成配对的玩家
+   */
+  final case class Match(roomID: String, queueKey: String, ownerID: String, opponentID: String)
+
+  private final class Ticket(val userID: String, val queueKey: String, val matched: Deferred[IO, Match]) {
+    @volatile var lastPolledAt: Long = System.currentTimeMillis()
+
+    def isIdle(now: Long): Boolean = now - lastPolledAt > TicketIdleTimeout.toMillis
+  }
+
+  /** 队列 -> 当前唯一的等待者 */
+  private val waiting = TrieMap.empty[String, Ticket]
+
+  /** 玩家 -> 票据；配对后保留到玩家取走结果，避免两次轮询之间完成的配对丢失 */
+  private val tickets = TrieMap.empty[String, Ticket]
+
+  private val requests = new AtomicLong(0)
+  private val matches = new AtomicLong(0)
+
+  def queueKey(matchType: String, rankBucket: Option[String]): String =
+    rankBucket.fold(matchType)(rank => s"${matchType}:${rank}")
+
+  /**
+   * 加入队列并等待配对
+   * @param persist 配对成功时由完成配对的一方调用，写入最终的匹配记录；
+   *                写入失败时配对作废：等待者回到队列继续等待，本次请求以该错误失败
+   * @return 配对结果；LongPollTimeout 内没有对手时为 None，玩家仍在队列中
+   */
+  def seek(userID: String, queueKey: String)(persist: Match => IO[Unit]): IO[Option[Match]] =
+    IO(if (requests.incrementAndGet() % PruneInterval == 0) prune()) >>
+      IO(tickets.get(userID)).flatMap {
+        case Some(ticket) if ticket.queueKey == queueKey =>
+          IO(ticket.lastPolledAt = System.currentTimeMillis()) >> await(ticket)
+        case Some(ticket) =>
+          // 换了匹配类型，放弃原来的排队
+          IO(remove(ticket)) >> enqueue(userID, queueKey, persist)
+        case None =>
+          enqueue(userID, queueKey, persist)
+      }
+
+  /** 玩家离开匹配（登出或切换为空闲），没有排队时不做任何事 */
+  def cancel(userID: String): IO[Unit] =
+    IO(tickets.get(userID).foreach { ticket =>
+      remove(ticket)
+      logger.info(s"玩家 ${userID} 离开匹配队列 ${ticket.queueKey}")
+    })
+
+  def stats: Map[String, Long] = Map(
+    "requests" -> requests.get(),
+    "matches" -> matches.get(),
+    "waitingQueues" -> waiting.size.toLong,
+    "tickets" -> tickets.size.toLong
+  )
+
+  private def enqueue(userID: String, queueKey: String, persist: Match => IO[Unit]): IO[Option[Match]] =
+    IO(waiting.get(queueKey)).flatMap {
+      case Some(other) if other.userID == userID =>
+        IO(other.lastPolledAt = System.currentTimeMillis()) >> await(other)
+
+      case Some(other) if other.isIdle(System.currentTimeMillis()) =>
+        IO(remove(other)) >> enqueue(userID, queueKey, persist)
+
+      case Some(other) =>
+        // 只有成功把等待者从队列中取走的一方才能与其配对
+        IO(waiting.remove(queueKey, other)).flatMap {
+          case true =>
+            val matched = Match(UUID.randomUUID().toString, queueKey, other.userID, userID)
+            persist(matched).onCancel(IO(requeue(other))).attempt.flatMap {
+              case Right(_) =>
+                for {
+                  _ <- IO(matches.incrementAndGet())
+                  _ <- IO(logger.info(s"匹配成功: 队列 ${queueKey}, 房间 ${matched.roomID}, ${other.userID} vs ${userID}"))
+                  _ <- other.matched.complete(matched)
+                } yield Some(matched)
+              case Left(error) =>
+                IO(logger.error(s"写入匹配记录失败，配对作废: 队列 ${queueKey}, ${other.userID} vs ${userID}: ${error.getMessage}")) >>
+                  IO(requeue(other)) >> IO.raiseError(error)
+            }
+          case false =>
+            enqueue(userID, queueKey, persist)
+        }
+
+      case None =>
+        Deferred[IO, Match].flatMap { matched =>
+          val ticket = new Ticket(userID, queueKey, matched)
+          IO(waiting.putIfAbsent(queueKey, ticket)).flatMap {
+            case None => IO(tickets.put(userID, ticket)) >> await(ticket)
+            case Some(_) => enqueue(userID, queueKey, persist)
+          }
+        }
+    }
+
+  private def await(ticket: Ticket): IO[Option[Match]] =
+    ticket.matched.get.map(Option(_)).timeoutTo(LongPollTimeout, IO.pure(None)).flatTap {
+      case Some(_) => IO(tickets.remove(ticket.userID, ticket)).void
+      case None => IO.unit
+    }
+
+  /**
+   * 配对作废时把等待者放回队列；队列里已经有了新的等待者时丢弃它的票据，它下一次轮询会重新排队
+   */
+  private def requeue(ticket: Ticket): Unit =
+    if (waiting.putIfAbsent(ticket.queueKey, ticket).isDefined) tickets.remove(ticket.userID, ticket)
+
+  private def remove(ticket: Ticket): Unit = {
+    waiting.remove(ticket.queueKey, ticket)
+    tickets.remove(ticket.userID, ticket)
+  }
+
+  /** 清理长时间没有轮询的票据，包括配对后玩家一直没有取走结果的 */
+  private def prune(): Unit = {
+    val now = System.currentTimeMillis()
+    tickets.values.filter(_.isIdle(now)).foreach(remove)
+  }
+}
@@ -0,0 +1,279 @@
+package Utils
+
+import Common.API.PlanContext
+import Common.DBAPI._
+import Common.Object.{ParameterList, SqlParameter}
+import Common.ServiceUtils.schemaName
+import Objects.UserService.MessageEntry
+import cats.effect.IO
+import cats.implicits.*
+import io.circe._
+import org.joda.time.DateTime
+import org.slf4j.LoggerFactory
+
+import scala.util.Try
+
+/**
+ * 聊天消息存储
+ * 每条消息是 message_table 的一行，按 (conversation_id, message_time, message_id) 建索引，
+ * 追加只是一条 INSERT，历史记录按 (message_time, message_id) 游标分页读取
+ */
+case object MessageStore {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /** 聊天记录默认每页条数 */
+  val DEFAULT_PAGE_SIZE = 100
+  /** 聊天记录每页最大条数 */
+  val MAX_PAGE_SIZE = 500
+  /** 迁移 message_box 时每批处理的 user_social_table 行数 */
+  private val MIGRATION_BATCH_SIZE = 100
+  /** 旧消息缺少发送方时写入的占位发送方ID */
+  val UNKNOWN_SENDER = "unknown-sender"
+
+  /** 两个用户之间的会话ID，与双方顺序无关 */
+  def conversationID(userA: String, userB: String): String =
+    if (userA <= userB) s"${userA}:${userB}" else s"${userB}:${userA}"
+
+  def createTableStatements: List[String] = List(
+    s"""
+    CREATE TABLE IF NOT EXISTS "${schemaName}"."message_table" (
+        message_id BIGSERIAL PRIMARY KEY,
+        conversation_id TEXT NOT NULL,
+        sender_id TEXT NOT NULL,
+        recipient_id TEXT NOT NULL,
+        message_content TEXT NOT NULL,
+        message_time TIMESTAMP NOT NULL
+    );
+    """,
+    s"""
+    CREATE INDEX IF NOT EXISTS message_table_conversation_time_idx
+    ON "${schemaName}"."message_table" (conversation_id, message_time, message_id);
+    """,
+    s"""
+    CREATE TABLE IF NOT EXISTS "${schemaName}"."message_migration_table" (
+        migration TEXT NOT NULL PRIMARY KEY,
+        last_user_id TEXT NOT NULL,
+        completed BOOLEAN NOT NULL
+    );
+    """,
+    s"""
+    CREATE INDEX IF NOT EXISTS message_table_sender_time_idx
+    ON "${schemaName}"."message_table" (sender_id, message_time);
+    """,
+    s"""
+    CREATE INDEX IF NOT EXISTS message_table_recipient_time_idx
+    ON "${schemaName}"."message_table" (recipient_id, message_time);
+    """
+  )
+
+  private val insertColumns = "(conversation_id, sender_id, recipient_id, message_content, message_time)"
+
+  private def insertParameters(entry: MessageEntry): List[SqlParameter] = List(
+    SqlParameter("String", conversationID(entry.messageSource, entry.messageDestination)),
+    SqlParameter("String", entry.messageSource),
+    SqlParameter("String", entry.messageDestination),
+    SqlParameter("String", entry.messageContent),
+    SqlParameter("DateTime", entry.messageTime.getMillis.toString)
+  )
+
+  /**
+   * 追加一条消息，接收者不存在时不写入
+   * @return 接收者存在并写入成功时为 true
+   */
+  def appendMessage(entry: MessageEntry)(using PlanContext): IO[Boolean] = {
+    val sql =
+      s"""
+      INSERT INTO ${schemaName}.message_table ${insertColumns}
+      SELECT ?, ?, ?, ?, ?
+      WHERE EXISTS (SELECT 1 FROM ${schemaName}.user_table WHERE user_id = ?)
+      RETURNING message_id
+      """
+    readDBRows(sql, insertParameters(entry) :+ SqlParameter("String", entry.messageDestination)).map(_.nonEmpty)
+  }
+
+  private val selectColumns = "message_id, sender_id, recipient_id, message_content, message_time"
+
+  private def toMessageEntry(json: Json): MessageEntry =
+    MessageEntry(
+      messageSource = decodeField[String](json, "sender_id"),
+      messageDestination = decodeField[String](json, "recipient_id"),
+      messageContent = decodeField[String](json, "message_content"),
+      messageTime = new DateTime(decodeField[Long](json, "message_time")),
+      messageID = Some(decodeField[Long](json, "message_id"))
+    )
+
+  /**
+   * 两个用户之间的聊天记录，取游标之前最近的 pageSize 条，按时间正序返回
+   * 游标是本页第一条的 (messageTime, messageID)，同一时间的多条消息按 messageID 区分，翻页时不会漏掉；
+   * 只给 beforeTime 时退化为只按时间过滤
+   */
+  def fetchConversationPage(userA: String, userB: String, beforeTime: Option[Long], beforeMessageID: Option[Long], pageSize: Int)(using PlanContext): IO[List[MessageEntry]] = {
+    val (cursorCondition, cursorParameters) = cursorFilter(beforeTime, beforeMessageID)
+    val sql =
+      s"""
+      SELECT ${selectColumns}
+      FROM ${schemaName}.message_table
+      WHERE conversation_id = ?${cursorCondition}
+      ORDER BY message_time DESC, message_id DESC
+      LIMIT ?
+      """
+    val parameters = List(SqlParameter("String", conversationID(userA, userB))) ++
+      cursorParameters :+
+      SqlParameter("Int", pageSize.toString)
+    readDBRows(sql, parameters).map(_.map(toMessageEntry).reverse)
+  }
+
+  /** 用户发出或收到的消息，取游标之前最近的 pageSize 条，按时间正序返回；游标规则与 fetchConversationPage 相同 */
+  def fetchUserMessagesPage(userID: String, beforeTime: Option[Long], beforeMessageID: Option[Long], pageSize: Int)(using PlanContext): IO[List[MessageEntry]] = {
+    val (cursorCondition, cursorParameters) = cursorFilter(beforeTime, beforeMessageID)
+    val sql =
+      s"""
+      SELECT ${selectColumns}
+      FROM ${schemaName}.message_table
+      WHERE (sender_id = ? OR recipient_id = ?)${cursorCondition}
+      ORDER BY message_time DESC, message_id DESC
+      LIMIT ?
+      """
+    val parameters = List(SqlParameter("String", userID), SqlParameter("String", userID)) ++
+      cursorParameters :+
+      SqlParameter("Int", pageSize.toString)
+    readDBRows(sql, parameters).map(_.map(toMessageEntry).reverse)
+  }
+
+  /** 检查分页参数，返回本页条数；不填为 DEFAULT_PAGE_SIZE */
+  def validatePageSize(pageSize: Option[Int]): IO[Int] = {
+    val size = pageSize.getOrElse(DEFAULT_PAGE_SIZE)
+    if (size <= 0 || size > MAX_PAGE_SIZE) {
+      IO.raiseError(new IllegalArgumentException(s"pageSize 无效，必须在 1 到 ${MAX_PAGE_SIZE} 之间"))
+    } else IO.pure(size)
+  }
+
+  /** (message_time, message_id) 游标对应的查询条件；只给 beforeTime 时只按时间过滤 */
+  private def cursorFilter(beforeTime: Option[Long], beforeMessageID: Option[Long]): (String, List[SqlParameter]) =
+    (beforeTime, beforeMessageID) match {
+      case (Some(time), Some(messageID)) =>
+        (" AND (message_time, message_id) < (?, ?)", List(SqlParameter("DateTime", time.toString), SqlParameter("Long", messageID.toString)))
+      case (Some(time), None) =>
+        (" AND message_time < ?", List(SqlParameter("DateTime", time.toString)))
+      case _ =>
+        ("", Nil)
+    }
+
+  private val MigrationName = "message_box"
+
+  /**
+   * 把 user_social_table.message_box 中的旧消息拆成 message_table 的行
+   * 每条消息在收发双方的 message_box 里各存了一份，通常只取发送方那一份；
+   * 发送方在 user_social_table 里已经没有行（或旧数据没有记发送方）时，改取接收方那一份，缺少的发送方记为 UNKNOWN_SENDER；
+   * 发送方那一份缺少接收方的旧数据无法归入会话，跳过
+   * 进度记在 message_migration_table：每批消息和该批最后一个 user_id 在同一个事务里写入，
+   * 中途退出后下次启动从上次提交的位置继续，不会重复插入；全部完成后标记 completed
+   */
+  def migrateMessageBoxes()(using PlanContext): IO[Unit] = {
+    def migrateFrom(afterUserID: String, migrated: Int, skipped: Int): IO[(Int, Int)] =
+      for {
+        rows <- readDBRows(
+          s"""
+          SELECT user_id, message_box
+          FROM ${schemaName}.user_social_table
+          WHERE user_id > ?
+          ORDER BY user_id
+          LIMIT ?
+          """,
+          List(SqlParameter("String", afterUserID), SqlParameter("Int", MIGRATION_BATCH_SIZE.toString))
+        )
+        boxes = rows.map(row => decodeField[String](row, "user_id") -> legacyEntries(row))
+        existingSenders <- existingSocialUsers(
+          boxes.flatMap { case (ownerID, legacy) => legacy.map(_.messageSource).filter(source => source.nonEmpty && source != ownerID) }.distinct
+        )
+        entries = boxes.map { case (ownerID, legacy) =>
+          val sent = legacy.filter(_.messageSource == ownerID)
+          val orphaned = legacy
+            .filter(entry => entry.messageSource != ownerID && !existingSenders.contains(entry.messageSource))
+            .map(entry => entry.copy(
+              messageSource = if (entry.messageSource.isEmpty) UNKNOWN_SENDER else entry.messageSource,
+              messageDestination = ownerID
+            ))
+          (sent.filter(_.messageDestination.nonEmpty) ++ orphaned, sent.count(_.messageDestination.isEmpty))
+        }
+        toInsert = entries.flatMap(_._1)
+        _ <- if (rows.nonEmpty) {
+          startTransaction {
+            (if (toInsert.nonEmpty) {
+              writeDBList(
+                s"INSERT INTO ${schemaName}.message_table ${insertColumns} VALUES (?, ?, ?, ?, ?)",
+                toInsert.map(entry => ParameterList(insertParameters(entry)))
+              ).void
+            } else IO.unit) >> saveProgress(decodeField[String](rows.last, "user_id"), completed = false)
+          }
+        } else IO.unit
+        result <- if (rows.size < MIGRATION_BATCH_SIZE) {
+          IO.pure((migrated + toInsert.size, skipped + entries.map(_._2).sum))
+        } else {
+          migrateFrom(decodeField[String](rows.last, "user_id"), migrated + toInsert.size, skipped + entries.map(_._2).sum)
+        }
+      } yield result
+
+    for {
+      progress <- readDBJsonOptional(
+        s"SELECT last_user_id, completed FROM ${schemaName}.message_migration_table WHERE migration = ?",
+        List(SqlParameter("String", MigrationName))
+      )
+      // 引入进度表之前迁移就已完成的库：没有进度记录但 message_table 已有数据，补记为已完成
+      legacyMigrated <- if (progress.isEmpty) {
+        readDBRows(s"SELECT message_id FROM ${schemaName}.message_table LIMIT 1", List()).map(_.nonEmpty)
+      } else IO.pure(false)
+      _ <- progress match {
+        case Some(row) if decodeField[Boolean](row, "completed") =>
+          IO(logger.info("message_box 迁移已完成，跳过"))
+        case _ if legacyMigrated =>
+          IO(logger.info("message_table 已有数据且没有迁移进度记录，记为已完成")) >> saveProgress("", completed = true)
+        case _ =>
+          val resumeAfter = progress.map(row => decodeField[String](row, "last_user_id")).getOrElse("")
+          for {
+            _ <- IO(logger.info(s"开始把 message_box 中的旧消息迁移到 message_table，从 user_id > '${resumeAfter}' 继续"))
+            (migrated, skipped) <- migrateFrom(resumeAfter, 0, 0)
+            _ <- saveProgress(resumeAfter, completed = true)
+            _ <- IO(logger.info(s"message_box 迁移完成，写入 ${migrated} 条消息，跳过 ${skipped} 条缺少接收方的旧消息"))
+          } yield ()
+      }
+    } yield ()
+  }
+
+  /** ids 中在 user_social_table 里有行的用户，这些用户发出的消息从他们自己的 message_box 迁移 */
+  private def existingSocialUsers(ids: List[String])(using PlanContext): IO[Set[String]] =
+    if (ids.isEmpty) IO.pure(Set.empty)
+    else readDBRows(
+      s"SELECT user_id FROM ${schemaName}.user_social_table WHERE user_id = ANY(?)",
+      List(SqlParameter("Array[String]", Json.fromValues(ids.map(Json.fromString)).noSpaces))
+    ).map(_.map(row => decodeField[String](row, "user_id")).toSet)
+
+  /** 记录迁移进度：已提交的最后一个 user_id，以及是否全部完成 */
+  private def saveProgress(lastUserID: String, completed: Boolean)(using PlanContext): IO[Unit] =
+    writeDB(
+      s"""
+      INSERT INTO ${schemaName}.message_migration_table (migration, last_user_id, completed)
+      VALUES (?, ?, ?)
+      ON CONFLICT (migration) DO UPDATE SET
+        last_user_id = EXCLUDED.last_user_id,
+        completed = EXCLUDED.completed
+      """,
+      List(SqlParameter("String", MigrationName), SqlParameter("String", lastUserID), SqlParameter("Boolean", completed.toString))
+    ).void
+
+  // message_box 可能以 JSON 数组或其字符串形式返回；messageTime 有毫秒数和时间字符串两种旧格式；缺少的收发方记为空字符串
+  private def legacyEntries(row: Json): List[MessageEntry] = {
+    val field = row.hcursor.downField("messageBox")
+    val box = field.as[List[Json]].toOption
+      .orElse(field.as[String].toOption.flatMap(text => parser.parse(text).toOption.flatMap(_.asArray.map(_.toList))))
+      .getOrElse(Nil)
+    box.flatMap { message =>
+      val cursor = message.hcursor
+      for {
+        content <- cursor.get[String]("messageContent").toOption
+        time <- cursor.get[Long]("messageTime").toOption.map(new DateTime(_))
+          .orElse(cursor.get[String]("messageTime").toOption.flatMap(text => Try(DateTime.parse(text)).toOption))
+      } yield MessageEntry(cursor.get[String]("messageSource").getOrElse(""), cursor.get[String]("messageDestination").getOrElse(""), content, time)
+    }
+  }
+}
@@ -18,7 +18,7 @@ import Common.Serialize.CustomColumnTypes.{decodeDateTime, encodeDateTime}
 import Common.Object.ParameterList
 import Common.Serialize.CustomColumnTypes.{decodeDateTime,encodeDateTime}
 import Common.API.{PlanContext}
-import Common.Object.{SqlParameter, ParameterList}
+import Common.Object.{BatchStatement, SqlParameter, ParameterList}
 import Objects.UserService.MessageEntry
 import Objects.UserService.User
 import Objects.UserService.BlackEntry
@@ -37,43 +37,41 @@ case object UserAuthenticationProcess {
       // Step 1: Log the start of execution
       _ <- IO(logger.info(s"[setOnlineStatus] 开始执行，将用户 ${userID} 的在线状态设置为 ${isOnline}"))
   
-      // Step 2: Check if the user exists
-      querySQL <- IO(s"SELECT * FROM ${schemaName}.user_table WHERE user_id = ?;")
-      queryParams <- IO(List(SqlParameter("String", userID)))
-      _ <- IO(logger.info(s"[setOnlineStatus] 查询用户是否存在 SQL: ${querySQL}，参数: ${queryParams.map(_.value).mkString(", ")}"))
-      userOpt <- readDBJsonOptional(querySQL, queryParams)
-      
-      _ <- userOpt match {
-        case None =>
-          val errorMessage = s"[setOnlineStatus] 用户 ${userID} 不存在，操作终止"
-          IO(logger.error(errorMessage)) >> IO.raiseError(new IllegalStateException("用户不存在"))
-        case Some(_) =>
-          IO(logger.info(s"[setOnlineStatus] 用户 ${userID} 存在，继续执行"))
-      }
-  
-      // Step 3: Update the user's online status
+      // Step 2: 查询用户、更新在线状态、记录操作日志合并为一次批量请求
+      // 用户不存在时 UPDATE 不命中、INSERT 被 EXISTS 条件挡住，随后抛错由外层事务回滚
+      querySQL <- IO(s"SELECT user_id FROM ${schemaName}.user_table WHERE user_id = ?;")
       updateSQL <- IO(s"UPDATE ${schemaName}.user_table SET is_online = ? WHERE user_id = ?;")
-      updateParams <- IO(List(
-        SqlParameter("Boolean", isOnline.toString),
-        SqlParameter("String", userID)
-      ))
-      _ <- IO(logger.info(s"[setOnlineStatus] 更新用户在线状态 SQL: ${updateSQL}，参数: ${updateParams.map(_.value).mkString(", ")}"))
-      _ <- writeDB(updateSQL, updateParams)
-  
-      // Step 4: Record the user's operation log
       logSQL <- IO(s"""
         INSERT INTO ${schemaName}.user_operation_log_table (log_id, user_id, action_type, action_detail, action_time)
-        VALUES (?, ?, ?, ?, ?);
+        SELECT ?, ?, ?, ?, ?
+        WHERE EXISTS (SELECT 1 FROM ${schemaName}.user_table WHERE user_id = ?);
       """)
-      logParams <- IO(List(
-        SqlParameter("String", UUID.randomUUID().toString),
-        SqlParameter("String", userID),
-        SqlParameter("String", "Online"),
-        SqlParameter("String", s"用户在线状态设置为 ${isOnline}"),
-        SqlParameter("DateTime", DateTime.now().getMillis.toString)
+      statements <- IO(List(
+        BatchStatement.read(querySQL, List(SqlParameter("String", userID))),
+        BatchStatement.write(updateSQL, List(
+          SqlParameter("Boolean", isOnline.toString),
+          SqlParameter("String", userID)
+        )),
+        BatchStatement.write(logSQL, List(
+          SqlParameter("String", UUID.randomUUID().toString),
+          SqlParameter("String", userID),
+          SqlParameter("String", "Online"),
+          SqlParameter("String", s"用户在线状态设置为 ${isOnline}"),
+          SqlParameter("DateTime", DateTime.now().getMillis.toString),
+          SqlParameter("String", userID)
+        ))
       ))
-      _ <- IO(logger.info(s"[setOnlineStatus] 插入用户操作日志 SQL: ${logSQL}，参数: ${logParams.map(_.value).mkString(", ")}"))
-      _ <- writeDB(logSQL, logParams)
+      _ <- IO(logger.info(s"[setOnlineStatus] 批量执行查询/更新/日志 ${statements.size} 条语句，userID=${userID}"))
+      results <- batchDB(statements)
+
+      // Step 3: Check if the user exists
+      _ <- batchRows(results.head) match {
+        case Nil =>
+          val errorMessage = s"[setOnlineStatus] 用户 ${userID} 不存在，操作终止"
+          IO(logger.error(errorMessage)) >> IO.raiseError(new IllegalStateException("用户不存在"))
+        case _ =>
+          IO(logger.info(s"[setOnlineStatus] 用户 ${userID} 存在，在线状态与操作日志已写入"))
+      }
   
       // Step 5: Return operation result
       resultMessage <- IO("用户在线状态更新成功！")
@@ -144,30 +142,24 @@ case object UserAuthenticationProcess {
         """
   
       for {
-        // Step 1. 验证用户ID的有效性
-        _ <- IO(logger.info(s"[clearOnlineStatus] 验证用户是否存在 userID=${userID}"))
-        existingUserOpt <- readDBJsonOptional(
-          sqlQueryCheckUser,
-          List(SqlParameter("String", userID))
-        )
-  
-        _ <- existingUserOpt match {
-          case None =>
+        // Step 1. 验证用户并更新在线状态，一次批量请求完成；用户不存在时 UPDATE 不命中
+        _ <- IO(logger.info(s"[clearOnlineStatus] 验证用户并更新在线状态为离线 userID=${userID}"))
+        results <- batchDB(List(
+          BatchStatement.read(sqlQueryCheckUser, List(SqlParameter("String", userID))),
+          BatchStatement.write(sqlQueryUpdateUserStatus, List(SqlParameter("String", userID)))
+        ))
+  
+        // Step 2. 用户不存在则报错，由外层事务回滚
+        _ <- batchRows(results.head) match {
+          case Nil =>
             val errorMsg = s"[clearOnlineStatus] 用户不存在 userID=${userID}"
             IO(logger.error(errorMsg)) >> IO.raiseError(new IllegalArgumentException(errorMsg))
-          case Some(_) =>
+          case _ =>
             IO(logger.info(s"[clearOnlineStatus] 用户存在 userID=${userID}"))
         }
   
-        // Step 2. 更新用户的在线状态
-        _ <- IO(logger.info(s"[clearOnlineStatus] 更新用户在线状态为离线 userID=${userID}"))
-        updateResult <- writeDB(
-          sqlQueryUpdateUserStatus,
-          List(SqlParameter("String", userID))
-        )
-  
         // Step 3. 返回操作结果
-        _ <- IO(logger.info(s"[clearOnlineStatus] 操作完成，返回结果: ${updateResult}"))
+        _ <- IO(logger.info(s"[clearOnlineStatus] 操作完成，返回结果: ${results.last}"))
       } yield "Success"
     }
   }
@@ -0,0 +1,190 @@
+package Utils
+
+import APIs.AssetService.QueryAssetStatusMessage
+import Common.API.PlanContext
+import Common.DBAPI._
+import Common.Object.SqlParameter
+import Common.ServiceUtils.schemaName
+import Objects.UserService.{BlackEntry, FriendEntry, MessageEntry, PublicUserProfile, User}
+import Utils.JsonDecodingUtils.decodeListField
+import cats.effect.IO
+import cats.implicits.*
+import io.circe.syntax.*
+import org.joda.time.DateTime
+import org.slf4j.LoggerFactory
+
+import scala.concurrent.duration.*
+
+/**
+ * 组装完整的 User 对象，以及批量页面用的 PublicUserProfile
+ * 各部分（用户表、段位、社交、资产、最近消息）互不依赖，并行获取；除用户表外每一部分都有独立的超时，
+ * 超时或失败时该部分使用默认值（资产为 None，表示未知而不是 0），返回部分结果而不是整体失败。多个用户时每张表只查一次（ANY(?)）
+ * 公开资料只读用户表和段位表，不包含密码哈希、邮箱、手机号，也不调用 AssetService
+ */
+case object UserInfoAssembler {
+  private val logger = LoggerFactory.getLogger(getClass)
+
+  /** 段位、社交、资产、消息各自的超时 */
+  val DependencyTimeout: FiniteDuration = 2.seconds
+
+  /** GetUsersInfoMessage 一次最多查询的用户数 */
+  val MaxBatchSize: Int = 200
+
+  private case class UserRow(
+    userID: String,
+    userName: String,
+    passwordHash: String,
+    email: String,
+    phoneNumber: String,
+    registerTime: DateTime,
+    permissionLevel: Int,
+    banDays: Int,
+    isOnline: Boolean,
+    matchStatus: String
+  )
+
+  /**
+   * 按 userIDs 的顺序返回存在的用户，不存在的用户不出现在结果中
+   * @param includeMessages 是否带上最近的消息；好友列表等场景不需要
+   */
+  def fetchUsers(userIDs: List[String], includeMessages: Boolean)(using PlanContext): IO[List[User]] = {
+    val ids = userIDs.distinct
+    if (ids.isEmpty) IO.pure(Nil)
+    else (
+      fetchUserRows(ids),
+      withFallback("段位信息", Map.empty[String, (Int, String, Int)])(fetchRanks(ids)),
+      withFallback("社交信息", Map.empty[String, (List[FriendEntry], List[BlackEntry])])(fetchSocials(ids)),
+      fetchStoneAmounts(ids),
+      if (includeMessages) fetchRecentMessages(ids) else IO.pure(Map.empty[String, List[MessageEntry]])
+    ).parMapN { (rows, ranks, socials, stoneAmounts, messages) =>
+      ids.flatMap(id => rows.get(id).map { row =>
+        val (credits, rank, rankPosition) = ranks.getOrElse(id, (0, "", 0))
+        val (friendList, blackList) = socials.getOrElse(id, (List.empty[FriendEntry], List.empty[BlackEntry]))
+        User(
+          userID = row.userID,
+          userName = row.userName,
+          passwordHash = row.passwordHash,
+          email = row.email,
+          phoneNumber = row.phoneNumber,
+          registerTime = row.registerTime,
+          permissionLevel = row.permissionLevel,
+          banDays = row.banDays,
+          isOnline = row.isOnline,
+          matchStatus = row.matchStatus,
+          stoneAmount = stoneAmounts.getOrElse(id, None),
+          credits = credits,
+          rank = rank,
+          rankPosition = rankPosition,
+          friendList = friendList,
+          blackList = blackList,
+          messageBox = messages.getOrElse(id, Nil)
+        )
+      })
+    }
+  }
+
+  /**
+   * 按 userIDs 的顺序返回存在的用户的公开资料，不存在的用户不出现在结果中
+   */
+  def fetchPublicProfiles(userIDs: List[String])(using PlanContext): IO[List[PublicUserProfile]] = {
+    val ids = userIDs.distinct
+    if (ids.isEmpty) IO.pure(Nil)
+    else (
+      fetchPublicRows(ids),
+      withFallback("段位信息", Map.empty[String, (Int, String, Int)])(fetchRanks(ids))
+    ).parMapN { (rows, ranks) =>
+      ids.flatMap(id => rows.get(id).map { case (userName, isOnline) =>
+        PublicUserProfile(
+          userID = id,
+          userName = userName,
+          rank = ranks.get(id).map(_._2).getOrElse(""),
+          isOnline = isOnline
+        )
+      })
+    }
+  }
+
+  /** 超时或失败时记录日志并返回默认值 */
+  private def withFallback[A](part: String, default: A)(load: IO[A]): IO[A] =
+    load.timeout(DependencyTimeout).handleErrorWith { error =>
+      IO(logger.warn(s"获取${part}失败，使用默认值: ${error.getMessage}")).as(default)
+    }
+
+  private def idsParameter(ids: List[String]): List[SqlParameter] =
+    List(SqlParameter("Array[String]", ids.asJson.noSpaces))
+
+  private def fetchUserRows(ids: List[String])(using PlanContext): IO[Map[String, UserRow]] =
+    readDBRows(
+      s"""
+         |SELECT user_id, username, password_hash, email, phone_number, register_time, permission_level, ban_days, is_online, COALESCE(match_status, '') as match_status
+         |FROM ${schemaName}.user_table
+         |WHERE user_id = ANY(?);
+      """.stripMargin,
+      idsParameter(ids)
+    ).map(_.map { json =>
+      val row = UserRow(
+        decodeField[String](json, "user_id"),
+        decodeField[String](json, "username"),
+        decodeField[String](json, "password_hash"),
+        decodeField[String](json, "email"),
+        decodeField[String](json, "phone_number"),
+        decodeField[DateTime](json, "register_time"),
+        decodeField[Int](json, "permission_level"),
+        decodeField[Int](json, "ban_days"),
+        decodeField[Boolean](json, "is_online"),
+        decodeField[String](json, "match_status")
+      )
+      row.userID -> row
+    }.toMap)
+
+  private def fetchPublicRows(ids: List[String])(using PlanContext): IO[Map[String, (String, Boolean)]] =
+    readDBRows(
+      s"""
+         |SELECT user_id, username, is_online
+         |FROM ${schemaName}.user_table
+         |WHERE user_id = ANY(?);
+      """.stripMargin,
+      idsParameter(ids)
+    ).map(_.map { json =>
+      decodeField[String](json, "user_id") -> (decodeField[String](json, "username"), decodeField[Boolean](json, "is_online"))
+    }.toMap)
+
+  private def fetchRanks(ids: List[String])(using PlanContext): IO[Map[String, (Int, String, Int)]] =
+    readDBRows(
+      s"""
+         |SELECT user_id, credits, rank, rank_position
+         |FROM ${schemaName}.user_rank_table
+         |WHERE user_id = ANY(?);
+      """.stripMargin,
+      idsParameter(ids)
+    ).map(_.map { json =>
+      decodeField[String](json, "user_id") ->
+        (decodeField[Int](json, "credits"), decodeField[String](json, "rank"), decodeField[Int](json, "rank_position"))
+    }.toMap)
+
+  private def fetchSocials(ids: List[String])(using PlanContext): IO[Map[String, (List[FriendEntry], List[BlackEntry])]] =
+    readDBRows(
+      s"""
+         |SELECT user_id, friend_list, black_list
+         |FROM ${schemaName}.user_social_table
+         |WHERE user_id = ANY(?);
+      """.stripMargin,
+      idsParameter(ids)
+    ).map(_.map { json =>
+      decodeField[String](json, "user_id") ->
+        (decodeListField(json, "friend_list").map(FriendEntry), decodeListField(json, "black_list").map(BlackEntry))
+    }.toMap)
+
+  /** AssetService 超时或失败时该用户的原石数量为 None，调用方据此显示为未知 */
+  private def fetchStoneAmounts(ids: List[String])(using PlanContext): IO[Map[String, Option[Int]]] =
+    ids.parTraverse { id =>
+      withFallback(s"用户 ${id} 的资产", Option.empty[Int])(QueryAssetStatusMessage(id).send.map(Some(_))).map(id -> _)
+    }.map(_.toMap)
+
+  private def fetchRecentMessages(ids: List[String])(using PlanContext): IO[Map[String, List[MessageEntry]]] =
+    ids.parTraverse { id =>
+      withFallback(s"用户 ${id} 的最近消息", List.empty[MessageEntry])(
+        MessageStore.fetchUserMessagesPage(id, None, None, MessageStore.DEFAULT_PAGE_SIZE)
+      ).map(id -> _)
+    }.map(_.toMap)
+}
@@ -0,0 +1,10 @@
+package Utils
+
+import Common.TokenCache
+
+/**
+ * usertoken -> userID 的进程内缓存
+ * 每个用户同一时间只有一个有效 token，登录（换发 token）、登出（清除 token）和封禁在事务提交后按用户失效；
+ * 淘汰规则见 TokenCache。无效 token 不缓存，每次都查库
+ */
+case object UserTokenCache extends TokenCache[String](ttlMillis = 5 * 60 * 1000L, maxEntries = 10000)(userID => userID)
@@ -10,7 +10,7 @@ import io.circe._
 
 /**
  * UserTokenValidator
- * 专门用于验证usertoken并获取对应的userID的工具组件
+ * 专门用于验证usertoken并获取对应的userID的工具组件，结果缓存在 UserTokenCache 中
  */
 object UserTokenValidator {
   private val logger = LoggerFactory.getLogger(getClass)
@@ -21,7 +21,10 @@ object UserTokenValidator {
    * @return IO[String] 返回对应的userID
    * @throws IllegalArgumentException 当usertoken无效时抛出异常
    */
-  def getUserIDFromToken(userToken: String)(using PlanContext): IO[String] = {
+  def getUserIDFromToken(userToken: String)(using PlanContext): IO[String] =
+    UserTokenCache.getOrLoad(userToken)(loadUserIDFromToken(userToken))
+
+  private def loadUserIDFromToken(userToken: String)(using PlanContext): IO[String] = {
     for {
       _ <- IO(logger.info(s"[UserTokenValidator] 开始验证usertoken: ${userToken.substring(0, 10)}..."))
       
@@ -63,7 +66,8 @@ object UserTokenValidator {
    * @return IO[Boolean] 返回token是否有效
    */
   def isTokenValid(userToken: String)(using PlanContext): IO[Boolean] = {
-    for {
+    if (UserTokenCache.cached(userToken).isDefined) IO.pure(true)
+    else for {
       _ <- IO(logger.info(s"[UserTokenValidator] 检查usertoken有效性: ${userToken.substring(0, 10)}..."))
       
       userResultOpt <- readDBJsonOptional(
@@ -0,0 +1,21 @@
+/**
+ * ReloadBattleObjectsMessage
+ * desc: 管理员修改战斗对象表后，让对战服务重新载入战斗对象注册表。
+ * @param adminToken: String (管理员身份Token，用于标识和验证管理员权限)
+ * @return result: String (对战服务返回的注册表概况)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+import { ServiceConfig } from 'Globals/ServiceConfig'
+
+
+
+export class ReloadBattleObjectsMessage extends TongWenMessage {
+    constructor(
+        public  adminToken: string
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return ServiceConfig.getAdminServiceAddress()
+    }
+}
@@ -2,6 +2,9 @@
  * GetDrawHistoryMessage
  * desc: 根据用户Token查询抽卡历史，返回所有获得的卡、抽取时间与卡池类型。
  * @param userID: string (用户的身份令牌，用于验证用户的合法性。)
+ * @param beforeTime: number (可选，分页游标，只返回该时间之前的抽卡记录。)
+ * @param beforeDrawID: string (可选，与 beforeTime 组成 (drawTime, drawId) 游标，取上一页最后一条的 drawId。)
+ * @param pageSize: number (可选，本页最多返回的抽卡记录条数，默认 50。)
  * @return drawHistory: DrawHistoryEntry[] (用户的抽卡历史记录列表)
  */
 
@@ -21,7 +24,10 @@ export interface DrawHistoryEntry {
 
 export class GetDrawHistoryMessage extends TongWenMessage {
     constructor(
-        public userID: string
+        public userID: string,
+        public beforeTime?: number,
+        public beforeDrawID?: string,
+        public pageSize?: number
     ) {
         super()
     }
@@ -22,9 +22,12 @@ export async function sendMessage(
 
     return new Promise((resolve, reject) => {
         let status = 0
+        // 超时后中断请求，后端按 X-Request-Budget-Ms 给出的同一预算放弃剩余工作
+        const controller = new AbortController()
         const timer = setTimeout(() => {
             if (status === 0) {
                 status = 2
+                controller.abort()
                 reject('连接已超时！')
             }
         }, timeout)
@@ -37,12 +40,16 @@ export async function sendMessage(
                 headers: {
                     'Content-Type': 'application/json',
                     'X-Hash': MD5(body).toString(),
+                    'X-Request-Budget-Ms': String(timeout),
                 },
                 body: body,
+                signal: controller.signal,
                 // mode: 'cors', // This tells the browser to treat this request as a CORS request
                 // credentials: 'include', // If the server allows credentials (cookies, HTTP auth) for cross-origin requests
             }) //TODO: decrypt part need to be done
                 .then(response => {
+                    status = 1
+                    clearTimeout(timer)
                     resolve(response)
                     // if (response.ok) {
                     //     return resolve(response)
@@ -3,6 +3,9 @@
  * desc: 获取与指定用户的聊天历史记录。
  * @param userToken: String (当前用户的凭证，用于验证用户身份。)
  * @param friendID: String (对话好友的用户ID。)
+ * @param beforeTime: Long (可选，分页游标，只返回该时间之前的消息。)
+ * @param beforeMessageID: Long (可选，与 beforeTime 组成 (messageTime, messageID) 游标，取本页第一条的 messageID。)
+ * @param pageSize: Int (可选，本页最多返回的条数，默认 100。)
  * @return messages: MessageEntry[] (聊天历史记录列表，包含消息来源、内容及时间。)
  */
 import { TongWenMessage } from '../../TongWenAPI/TongWenMessage'
@@ -13,7 +16,10 @@ import { ServiceConfig } from '../../../Globals/ServiceConfig'
 export class GetChatHistoryMessage extends TongWenMessage {
     constructor(
         public  userToken: string,
-        public  friendID: string
+        public  friendID: string,
+        public  beforeTime?: number,
+        public  beforeMessageID?: number,
+        public  pageSize?: number
     ) {
         super()
     }
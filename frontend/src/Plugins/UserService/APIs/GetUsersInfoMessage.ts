@@ -0,0 +1,24 @@
+/**
+ * GetUsersInfoMessage
+ * desc: 批量获取用户的公开资料，用于好友列表、黑名单等一次展示多个用户的页面。只返回公开字段，不存在的用户不出现在结果中。
+ * @param userToken: String (当前用户的凭证，用于验证用户身份。)
+ * @param userIDs: List[String] (目标用户ID列表，最多 200 个)
+ * @return users: List[PublicUserProfile] (按 userIDs 顺序排列的用户公开资料)
+ */
+import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
+import { ServiceConfig } from 'Globals/ServiceConfig'
+
+
+
+export class GetUsersInfoMessage extends TongWenMessage {
+    constructor(
+        public  userToken: string,
+        public  userIDs: string[]
+    ) {
+        super()
+    }
+    getAddress(): string {
+        return ServiceConfig.getUserServiceAddress()
+    }
+}
+
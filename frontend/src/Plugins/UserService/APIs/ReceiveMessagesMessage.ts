@@ -2,6 +2,9 @@
  * ReceiveMessagesMessage
  * desc: 按分类返回用户的消息记录，包括好友消息、大世界消息、系统消息。
  * @param userToken: String (用户凭证，用于验证用户身份。)
+ * @param beforeTime: Long (可选，分页游标，只返回该时间之前的消息。)
+ * @param beforeMessageID: Long (可选，与 beforeTime 组成 (messageTime, messageID) 游标，取本页第一条的 messageID。)
+ * @param pageSize: Int (可选，本页最多返回的条数，默认 100。)
  * @return messages: MessageEntry:1022 (用户的消息记录列表，包含消息来源、内容及时间。)
  */
 import { TongWenMessage } from 'Plugins/TongWenAPI/TongWenMessage'
@@ -11,7 +14,10 @@ import { ServiceConfig } from 'Globals/ServiceConfig'
 
 export class ReceiveMessagesMessage extends TongWenMessage {
     constructor(
-        public  userToken: string
+        public  userToken: string,
+        public  beforeTime?: number,
+        public  beforeMessageID?: number,
+        public  pageSize?: number
     ) {
         super()
     }
@@ -5,6 +5,7 @@
  * @param messageDestination: String (消息目标)
  * @param messageContent: String (消息内容)
  * @param messageTime: DateTime (消息发送时间)
+ * @param messageID: Long (可选，消息ID，与 messageTime 一起作为聊天记录的翻页游标)
  */
 import { Serializable } from 'Plugins/CommonUtils/Send/Serializable'
 
@@ -16,7 +17,8 @@ export class MessageEntry extends Serializable {
         public  messageSource: string,
         public  messageDestination: string,
         public  messageContent: string,
-        public  messageTime: number
+        public  messageTime: number,
+        public  messageID?: number
     ) {
         super()
     }
@@ -0,0 +1,25 @@
+/**
+ * PublicUserProfile
+ * desc: 用户的公开资料，好友列表、黑名单等展示其他用户的页面只需要这些字段
+ * @param userID: String (用户的唯一ID)
+ * @param userName: String (用户名)
+ * @param rank: String (段位，没有段位记录时为空字符串)
+ * @param isOnline: Boolean (是否在线)
+ */
+import { Serializable } from 'Plugins/CommonUtils/Send/Serializable'
+
+
+
+
+export class PublicUserProfile extends Serializable {
+    constructor(
+        public  userID: string,
+        public  userName: string,
+        public  rank: string,
+        public  isOnline: boolean
+    ) {
+        super()
+    }
+}
+
+
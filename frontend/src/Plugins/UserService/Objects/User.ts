@@ -11,7 +11,7 @@
  * @param banDays: Int (用户当前被封禁的天数)
  * @param isOnline: Boolean (用户是否在线)
  * @param matchStatus: String (用户当前的匹配状态)
- * @param stoneAmount: Int (用户拥有的石头数量)
+ * @param stoneAmount: Int | null (用户拥有的石头数量，AssetService 不可用时为 null)
  * @param credits: Int (用户的信用点数)
  * @param rank: String (用户的段位)
  * @param rankPosition: Int (用户在段位中的排名)
@@ -38,7 +38,7 @@ export class User extends Serializable {
         public  banDays: number,
         public  isOnline: boolean,
         public  matchStatus: string,
-        public  stoneAmount: number,
+        public  stoneAmount: number | null,
         public  credits: number,
         public  rank: string,
         public  rankPosition: number,
@@ -149,7 +149,7 @@ const PlayerManagement: React.FC<PlayerManagementProps> = ({
                 <td>
                   <div className="stone-amount">
                     <img src={primogemIcon} alt="原石" className="primogem-icon-small" />
-                    {player.stoneAmount}
+                    {player.stoneAmount ?? '未知'}
                   </div>
                 </td>
                 <td>
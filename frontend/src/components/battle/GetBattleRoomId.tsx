@@ -1,9 +1,67 @@
 import { useState, useEffect } from 'react';
 import { FindOrCreateMatchRoomMessage } from 'Plugins/UserService/APIs/Battle/FindOrCreateMatchRoomMessage';
+import { SetUserMatchStatusMessage } from 'Plugins/UserService/APIs/Battle/SetUserMatchStatusMessage';
+import { getUserToken } from 'Plugins/CommonUtils/Store/UserInfoStore';
+
+/**
+ * 通过长轮询等待匹配结果
+ * 服务端在有对手时返回 {status: 'matched', room_id}，等待超时返回 {status: 'waiting'}，此时立即重新请求，排队位置会保留
+ * 返回的函数用于取消等待：不再重新请求，也不再回调，并通知服务端把玩家移出匹配队列
+ *
+ * @param user - 用户对象
+ * @param onMatched - 拿到房间ID后的回调
+ * @param onError - 请求或解析失败时的回调
+ * @returns 取消等待的函数
+ */
+const waitForMatchRoom = (user: any, onMatched: (roomId: string) => void, onError: (error: any) => void): (() => void) => {
+  let aborted = false;
+  let settled = false;
+
+  const poll = (): void => {
+    new FindOrCreateMatchRoomMessage(user.userID, user.matchStatus).send(
+      (response: any) => {
+        if (aborted) return;
+        try {
+          const parsedResponse = JSON.parse(response);
+          if (parsedResponse.status === 'waiting') {
+            console.log('⏳ [GetBattleRoomId] 暂无对手，继续等待');
+            poll();
+          } else {
+            settled = true;
+            onMatched(parsedResponse.room_id);
+          }
+        } catch (error) {
+          settled = true;
+          onError(error);
+        }
+      },
+      (error: any) => {
+        if (aborted) return;
+        settled = true;
+        onError(error);
+      }
+    );
+  };
+
+  poll();
+
+  return () => {
+    if (aborted) return;
+    aborted = true;
+    // 还在排队时离开页面，切换为空闲状态让服务端把玩家移出队列，避免之后被匹配给一个已经离开的玩家
+    if (!settled) {
+      console.log('🚪 [GetBattleRoomId] 取消匹配，退出匹配队列');
+      new SetUserMatchStatusMessage(getUserToken(), 'Idle').send(
+        () => {},
+        (error: any) => console.error('❌ [GetBattleRoomId] 退出匹配队列失败:', error)
+      );
+    }
+  };
+};
 
 /**
  * GetBattleRoomId
- * 通过调用FindOrCreateMatchRoomMessage API获取或创建对战房间ID
+ * 通过调用FindOrCreateMatchRoomMessage API等待匹配并获取对战房间ID
  * 
  * @param user - 用户对象，包含userID和其他用户信息
  * @returns string - 返回创建或找到的房间ID
@@ -24,21 +82,15 @@ export const GetBattleRoomId = (user: any): string => {
       return;
     }
     
-    // 调用API获取或创建房间ID
-    new FindOrCreateMatchRoomMessage(user.userID, user.matchStatus).send(
-      (response: any) => {
-        try {
-          // 尝试解析响应
-          const parsedResponse = JSON.parse(response)
-          setRoomId(parsedResponse.room_id)
-        } catch (error) {
-          console.error('❌ [GetBattleRoomId] 解析响应失败:', error);
-        }
-      },
+    // 调用API等待匹配，拿到房间ID；组件卸载或依赖变化时取消等待
+    const cancel = waitForMatchRoom(
+      user,
+      (matchedRoomId: string) => setRoomId(matchedRoomId),
       (error: any) => {
         console.error('❌ [GetBattleRoomId] 获取房间ID失败:', error);
       }
     );
+    return cancel;
   }, [user, tempRoomId]);
     
   // 如果没有用户ID或是自定义匹配，返回临时ID
@@ -56,8 +108,9 @@ export const GetBattleRoomId = (user: any): string => {
  * 
  * @param user - 用户对象
  * @param callback - 接收房间ID的回调函数
+ * @returns 取消等待的函数，离开页面时调用，之后不会再回调
  */
-export const GetBattleRoomIdSync = (user: any, callback: (roomId: string) => void): void => {
+export const GetBattleRoomIdSync = (user: any, callback: (roomId: string) => void): (() => void) => {
   // 如果没有用户ID或是自定义匹配，使用URL中的roomId或创建临时ID
   const tempRoomId = new URLSearchParams(window.location.search).get('roomId') ||
                `room_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
@@ -66,21 +119,15 @@ export const GetBattleRoomIdSync = (user: any, callback: (roomId: string) => voi
   if (!user || !user.userID || user.matchStatus === 'custom') {
     console.error('❌ [GetBattleRoomIdSync] 无效的用户信息或自定义匹配');
     callback(tempRoomId);
-    return;
+    return () => {};
   }
 
-  // 调用API获取或创建房间ID
-  new FindOrCreateMatchRoomMessage(user.userID, user.matchStatus).send(
-    (response: any) => {
-      try {
-        // 尝试解析响应
-        const parsedResponse = JSON.parse(response);
-        console.log('✅ [GetBattleRoomIdSync] 成功获取房间ID:', parsedResponse.room_id);
-        callback(parsedResponse.room_id);
-      } catch (error) {
-        console.error('❌ [GetBattleRoomIdSync] 解析响应失败:', error);
-        callback(tempRoomId);
-      }
+  // 调用API等待匹配，拿到房间ID
+  return waitForMatchRoom(
+    user,
+    (matchedRoomId: string) => {
+      console.log('✅ [GetBattleRoomIdSync] 成功获取房间ID:', matchedRoomId);
+      callback(matchedRoomId);
     },
     (error: any) => {
       console.error('❌ [GetBattleRoomIdSync] 获取房间ID失败:', error);
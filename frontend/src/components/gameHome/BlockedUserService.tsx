@@ -1,7 +1,7 @@
 // 黑名单用户服务
 
-import { BlockedUserInfo, FriendInfo, UserProfileState } from "./UserProfile/UserProfileTypes";
-import { fetchFriendInfo } from "./FriendService";
+import { BlockedUserInfo, UserProfileState } from "./UserProfile/UserProfileTypes";
+import { fetchUsersInfo } from "./FriendService";
 
 // 获取黑名单数据
 export const fetchBlockedData = async (state: UserProfileState): Promise<void> => {
@@ -14,12 +14,8 @@ export const fetchBlockedData = async (state: UserProfileState): Promise<void> =
 
     setLoading(true);
     try {
-        const blockedPromises = user.blackList.map(blackEntry =>
-            fetchFriendInfo(blackEntry.blackUserID)
-        );
-
-        const blockedInfos = await Promise.all(blockedPromises);
-        const validBlocked = blockedInfos.filter((blocked): blocked is FriendInfo => blocked !== null)
+        const blockedInfos = await fetchUsersInfo(user.blackList.map(blackEntry => blackEntry.blackUserID));
+        const validBlocked = blockedInfos
             .map(blocked => ({
                 id: blocked.id,
                 username: blocked.username,
@@ -1,6 +1,8 @@
 // 好友服务
 
 import { GetUserInfoMessage } from "Plugins/UserService/APIs/GetUserInfoMessage";
+import { GetUsersInfoMessage } from "Plugins/UserService/APIs/GetUsersInfoMessage";
+import { getUserToken } from "Plugins/CommonUtils/Store/UserInfoStore";
 import { FriendInfo, FriendEntry } from "./UserProfile/UserProfileTypes";
 
 // 获取好友详细信息（假设用户已经通过轻量级验证存在）
@@ -150,6 +152,53 @@ export const filterValidFriendEntries = (friendListArray: FriendEntry[]): Friend
     return validEntries;
 };
 
+// GetUsersInfoMessage 一次最多查询的用户数，与后端 UserInfoAssembler.MaxBatchSize 一致
+const USERS_INFO_BATCH_SIZE = 200;
+
+// 将后端返回的用户公开资料转换为好友信息
+const toFriendInfo = (userData: any): FriendInfo => ({
+    id: userData.userID,
+    username: userData.userName,
+    rank: userData.rank || '黑铁',
+    status: userData.isOnline ? 'online' : 'offline',
+    lastSeen: userData.isOnline ? '在线' : '离线'
+});
+
+// 请求一批（不超过 USERS_INFO_BATCH_SIZE 个）用户的公开资料
+const fetchUsersInfoBatch = async (userToken: string, userIDs: string[]): Promise<any[]> => {
+    const response = await new Promise<string>((resolve, reject) => {
+        new GetUsersInfoMessage(userToken, userIDs).send(
+            (info) => resolve(info),
+            (error) => reject(error)
+        );
+    });
+
+    const users = typeof response === 'string' ? JSON.parse(response) : response;
+    if (!Array.isArray(users)) {
+        console.error('Invalid GetUsersInfoMessage response:', users);
+        return [];
+    }
+    return users;
+};
+
+// 获取多个用户的信息，按 USERS_INFO_BATCH_SIZE 分批请求，不存在的用户会被跳过
+export const fetchUsersInfo = async (userIDs: string[]): Promise<FriendInfo[]> => {
+    if (userIDs.length === 0) {
+        return [];
+    }
+
+    const userToken = getUserToken();
+    const batches: string[][] = [];
+    for (let i = 0; i < userIDs.length; i += USERS_INFO_BATCH_SIZE) {
+        batches.push(userIDs.slice(i, i + USERS_INFO_BATCH_SIZE));
+    }
+    const results = await Promise.all(batches.map(batch => fetchUsersInfoBatch(userToken, batch)));
+
+    return ([] as any[]).concat(...results)
+        .filter((userData: any) => userData && userData.userID && userData.userName)
+        .map(toFriendInfo);
+};
+
 // 批量获取好友详细信息
 export const fetchFriendsDetailedInfo = async (
     validUserIDs: string[], 
@@ -157,30 +206,12 @@ export const fetchFriendsDetailedInfo = async (
 ): Promise<FriendInfo[]> => {
     const fetchStartTime = performance.now();
     //setFriendsLoadingStatus('正在获取好友详细信息...');
-    const validFriends: FriendInfo[] = [];
 
-    for (let i = 0; i < validUserIDs.length; i++) {
-        const friendID = validUserIDs[i];
-        //setFriendsLoadingStatus(`正在加载好友 ${i + 1}/${validUserIDs.length}...`);
-        console.log(`Fetching detailed info for valid user ${i}:`, friendID);
-
-        try {
-            const friendInfo = await fetchFriendInfo(friendID);
-            if (friendInfo) {
-                validFriends.push(friendInfo);
-                console.log(`Successfully fetched friend ${i}:`, friendInfo);
-            } else {
-                console.warn(`Failed to fetch detailed info for friend ${friendID}`);
-            }
-        } catch (error) {
-            console.error(`Error fetching friend ${i} (${friendID}):`, error);
-            // Continue with next friend instead of failing completely
-        }
-
-        // Add small delay to prevent overwhelming the backend
-        if (i < validUserIDs.length - 1) {
-            await new Promise(resolve => setTimeout(resolve, 100));
-        }
+    let validFriends: FriendInfo[] = [];
+    try {
+        validFriends = await fetchUsersInfo(validUserIDs);
+    } catch (error) {
+        console.error('Error fetching friends info:', error);
     }
 
     const fetchEndTime = performance.now();
@@ -6,6 +6,9 @@ interface HistoryModalProps {
 	isVisible: boolean;
 	isClosing: boolean;
 	wishHistory: WishHistory;
+	hasMoreHistory: boolean;
+	isLoadingHistory: boolean;
+	onLoadMore: () => void;
 	onClose: () => void;
 }
 
@@ -13,6 +16,9 @@ const HistoryModal: React.FC<HistoryModalProps> = ({
 	isVisible,
 	isClosing,
 	wishHistory,
+	hasMoreHistory,
+	isLoadingHistory,
+	onLoadMore,
 	onClose
 }) => {	// 分页状态
 	const [currentPage, setCurrentPage] = useState({ featured: 1, standard: 1 });
@@ -116,6 +122,17 @@ const HistoryModal: React.FC<HistoryModalProps> = ({
 						</button>
 					</div>
 				)}
+				{hasMoreHistory && currentPageNum >= totalPages && (
+					<div className="history-pagination">
+						<button
+							className="history-pagination-btn"
+							onClick={() => { playClickSound(); onLoadMore(); }}
+							disabled={isLoadingHistory}
+						>
+							{isLoadingHistory ? '加载中...' : '加载更早的记录'}
+						</button>
+					</div>
+				)}
 			</div>
 		);
 	};
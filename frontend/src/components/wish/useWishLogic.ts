@@ -7,12 +7,52 @@ import { setUserInfoField } from 'Plugins/CommonUtils/Store/UserInfoStore';
 import { WishHistory, CardDrawCounts } from '../../types/wish';
 import { showError } from '../../utils/alertUtils';
 
+// 每次请求的抽卡记录条数
+const DRAW_HISTORY_PAGE_SIZE = 50;
+
+// 稀有度映射函数
+const mapRarityToNumber = (rarity: string): number => {
+	switch (rarity) {
+		case '传说': return 5;
+		case '稀有': return 4;
+		case '普通': return 3;
+		default: return 3;
+	}
+};
+
+// 将历史记录按卡池类型分组
+const toWishHistory = (entries: DrawHistoryEntry[]): WishHistory => ({
+	featured: entries
+		.filter(item => item.poolType === 'featured')
+		.map(item => ({
+			id: item.cardId,
+			name: item.cardName,
+			rarity: mapRarityToNumber(item.rarity),
+			time: new Date(item.drawTime).toLocaleString('zh-CN'),
+			description: item.cardDescription,
+			type: '限定祈愿'
+		})),
+	standard: entries
+		.filter(item => item.poolType === 'standard')
+		.map(item => ({
+			id: item.cardId,
+			name: item.cardName,
+			rarity: mapRarityToNumber(item.rarity),
+			time: new Date(item.drawTime).toLocaleString('zh-CN'),
+			description: item.cardDescription,
+			type: '常驻祈愿'
+		}))
+});
+
 export const useWishLogic = (userID: string | undefined) => {
 	const [wishHistory, setWishHistory] = useState<WishHistory>({
 		featured: [],
 		standard: []
 	});
 	const [isLoadingHistory, setIsLoadingHistory] = useState(false);
+	// 已加载的原始抽卡记录（按时间倒序），翻页时在末尾追加
+	const [drawHistoryEntries, setDrawHistoryEntries] = useState<DrawHistoryEntry[]>([]);
+	const [hasMoreHistory, setHasMoreHistory] = useState(false);
 	const [cardDrawCounts, setCardDrawCounts] = useState<CardDrawCounts>({
 		standard: 0,
 		featured: 0
@@ -71,7 +111,43 @@ export const useWishLogic = (userID: string | undefined) => {
 			fetchCardDrawCount('featured')
 		]);
 	}, [userID, fetchCardDrawCount]);
-	// 加载抽卡历史记录
+	// 请求一页抽卡记录；cursor 为上一页最后一条记录，以它的 (drawTime, drawId) 作为翻页游标
+	const fetchDrawHistoryPage = useCallback(async (cursor?: DrawHistoryEntry): Promise<DrawHistoryEntry[]> => {
+		const historyData = await new Promise<any>((resolve, reject) => {
+			new GetDrawHistoryMessage(
+				userID,
+				cursor ? new Date(cursor.drawTime).getTime() : undefined,
+				cursor?.drawId,
+				DRAW_HISTORY_PAGE_SIZE
+			).send(
+				(response: any) => {
+					if (response.error) {
+						reject(new Error(response.error));
+					} else {
+						resolve(response);
+					}
+				},
+				(error: any) => reject(error)
+			);
+		});
+
+		try {
+			return JSON.parse(historyData);
+		} catch (e) {
+			console.warn('解析 historyData 字符串失败', e);
+			return [];
+		}
+	}, [userID]);
+
+	// 一页按抽卡记录计数（十连一条记录有多张卡），记录条数满一页时可能还有更早的记录
+	const applyDrawHistoryPage = useCallback((entries: DrawHistoryEntry[], page: DrawHistoryEntry[]) => {
+		const merged = [...entries, ...page];
+		setDrawHistoryEntries(merged);
+		setWishHistory(toWishHistory(merged));
+		setHasMoreHistory(new Set(page.map(item => item.drawId)).size >= DRAW_HISTORY_PAGE_SIZE);
+	}, []);
+
+	// 加载最新一页抽卡历史记录
 	const loadDrawHistory = useCallback(async () => {
 		if (!userID) {
 			console.warn('用户token不存在，无法加载抽卡历史');
@@ -80,69 +156,28 @@ export const useWishLogic = (userID: string | undefined) => {
 
 		setIsLoadingHistory(true);
 		try {
-			const historyData = await new Promise<any>((resolve, reject) => {
-				new GetDrawHistoryMessage(userID).send(
-					(response: any) => {
-						if (response.error) {
-							reject(new Error(response.error));
-						} else {
-							resolve(response);
-						}
-					}
-				);
-			});
-
-			// 尝试各种情况的解包
-			let drawHistoryArray: DrawHistoryEntry[] = [];
-			console.log('98');
-			try {
-				drawHistoryArray = JSON.parse(historyData);
-			} catch (e) {
-				console.warn('解析 historyData 字符串失败', e);
-				drawHistoryArray = [];
-			}
-
-			// 稀有度映射函数
-			const mapRarityToNumber = (rarity: string): number => {
-				switch (rarity) {
-					case '传说': return 5;
-					case '稀有': return 4;
-					case '普通': return 3;
-					default: return 3;
-				}
-			};
+			applyDrawHistoryPage([], await fetchDrawHistoryPage());
+		} catch (error) {
+			console.error('加载抽卡历史失败:', error);
+		} finally {
+			setIsLoadingHistory(false);
+		}
+	}, [userID, fetchDrawHistoryPage, applyDrawHistoryPage]);
 
-			// 将历史记录按卡池类型分组
-			const groupedHistory = {
-				featured: drawHistoryArray
-					.filter(item => item.poolType === 'featured')
-					.map(item => ({
-						id: item.cardId,
-						name: item.cardName,
-						rarity: mapRarityToNumber(item.rarity),
-						time: new Date(item.drawTime).toLocaleString('zh-CN'),
-						description: item.cardDescription,
-						type: '限定祈愿'
-					})),
-				standard: drawHistoryArray
-					.filter(item => item.poolType === 'standard')
-					.map(item => ({
-						id: item.cardId,
-						name: item.cardName,
-						rarity: mapRarityToNumber(item.rarity),
-						time: new Date(item.drawTime).toLocaleString('zh-CN'),
-						description: item.cardDescription,
-						type: '常驻祈愿'
-					}))
-			};
+	// 加载更早的一页抽卡历史记录，追加到已加载的记录之后
+	const loadMoreDrawHistory = useCallback(async () => {
+		if (!userID || isLoadingHistory || !hasMoreHistory || drawHistoryEntries.length === 0) return;
 
-			setWishHistory(groupedHistory);
+		setIsLoadingHistory(true);
+		try {
+			const page = await fetchDrawHistoryPage(drawHistoryEntries[drawHistoryEntries.length - 1]);
+			applyDrawHistoryPage(drawHistoryEntries, page);
 		} catch (error) {
-			console.error('加载抽卡历史失败:', error);
+			console.error('加载更多抽卡历史失败:', error);
 		} finally {
 			setIsLoadingHistory(false);
 		}
-	}, [userID]);
+	}, [userID, isLoadingHistory, hasMoreHistory, drawHistoryEntries, fetchDrawHistoryPage, applyDrawHistoryPage]);
 	// 执行抽卡
 	const performDraw = async (
 		selectedBanner: 'standard' | 'featured',
@@ -257,9 +292,11 @@ export const useWishLogic = (userID: string | undefined) => {
 	return {
 		wishHistory,
 		isLoadingHistory,
+		hasMoreHistory,
 		cardDrawCounts,
 		refreshUserAssets,
 		loadDrawHistory,
+		loadMoreDrawHistory,
 		fetchAllCardDrawCounts,
 		fetchCardDrawCount,
 		handleSingleWish,
@@ -14,6 +14,7 @@
  * 创建时间: 2025-07-09
  */
 
+import { useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { webSocketService } from '../../services/WebSocketService';
 import { webSocketHandles } from '../../services/WebsocketHandles';
@@ -48,6 +49,8 @@ export const useBattleRoomHandlers = (
 	submitReport: (reason: string, description: string) => void
 ) => {
 	const navigate = useNavigate();
+	// 正在进行的匹配等待，清理连接时取消
+	const cancelMatchRef = useRef<(() => void) | null>(null);
 
 	/**
 	 * 初始化WebSocket连接
@@ -62,8 +65,9 @@ export const useBattleRoomHandlers = (
 			switch (user.matchStatus) {
 				case 'quick':
 				case 'ranked':
-					// 使用同步方式获取房间ID
-					GetBattleRoomIdSync(user, async (battleRoomId) => {
+					// 使用同步方式获取房间ID，离开页面时取消等待
+					cancelMatchRef.current = GetBattleRoomIdSync(user, async (battleRoomId) => {
+						cancelMatchRef.current = null;
 						await connectToRoom(battleRoomId);
 					});
 					break;
@@ -115,6 +119,8 @@ export const useBattleRoomHandlers = (
 	 */
 	const cleanupConnection = () => {
 		console.log('🔌 [BattleRoom] 清理WebSocket连接');
+		cancelMatchRef.current?.();
+		cancelMatchRef.current = null;
 		webSocketHandles.cleanupWebSocketListeners(setRoomStatus);
 	};
 
@@ -32,13 +32,15 @@ const WishPage: React.FC = () => {
 	const {
 		wishHistory,
 		isLoadingHistory,
+		hasMoreHistory,
 		cardDrawCounts,
 		refreshUserAssets,
 		fetchCardDrawCount,
 		fetchAllCardDrawCounts,
 		handleSingleWish,
 		handleTenWish,
-		loadDrawHistory
+		loadDrawHistory,
+		loadMoreDrawHistory
 	} = useWishLogic(userID);
 
 	// 初始化音效
@@ -240,6 +242,9 @@ const WishPage: React.FC = () => {
 				isVisible={showHistory}
 				isClosing={isHistoryClosing}
 				wishHistory={wishHistory}
+				hasMoreHistory={hasMoreHistory}
+				isLoadingHistory={isLoadingHistory}
+				onLoadMore={loadMoreDrawHistory}
 				onClose={handleCloseHistory}
 			/>
 			<RulesModal
@@ -1,4 +1,5 @@
 import { ServiceConfig } from 'Globals/ServiceConfig'
+import { getUserToken } from 'Plugins/CommonUtils/Store/UserInfoStore'
 
 // 攻击对象类型
 export type AttackObjectName = 'Sa' | 'Tin' | 'NanMan' | 'DaShan' | 'WanJian' | 'Nuclear';
@@ -62,7 +63,8 @@ export interface CardState {
 }
 
 export type WebSocketMessage =
-	| { type: 'game_state'; data: GameState }
+	| { type: 'game_state'; seq?: number; data: GameState }
+	| { type: 'game_state_patch'; seq: number; data: GameStatePatch }
 	| { type: 'player_action'; data: BattleAction }
 	| { type: 'round_result'; data: RoundResult }
 	| { type: 'game_over'; data: GameOverResult }
@@ -70,6 +72,12 @@ export type WebSocketMessage =
 	| { type: 'player_left'; data: { playerId: string } }
 	| { type: 'error'; data: { message: string } };
 
+// 状态增量：只包含变化的字段，player1/player2 内部同样只包含变化的字段
+export type GameStatePatch = Partial<Omit<GameState, 'player1' | 'player2'>> & {
+	player1?: Partial<PlayerState>;
+	player2?: Partial<PlayerState>;
+};
+
 export interface RoundResult {
 	round: number;
 	player1Action: BattleAction;
@@ -106,6 +114,10 @@ export class WebSocketService {
 	private maxReconnectAttempts = 5;
 	private reconnectInterval = 3000;
 
+	// 最近一次快照合并增量后的状态及其序号
+	private gameState: GameState | null = null;
+	private stateSeq = 0;
+
 	// 事件监听器
 	private listeners: { [event: string]: ((data: any) => void)[] } = {};
 
@@ -120,7 +132,7 @@ export class WebSocketService {
 		return new Promise((resolve, reject) => {
 			this.roomId = roomId;
 			const battleServiceUrl = ServiceConfig.getBattleServiceAddress()
-			const wsUrl = `ws://${battleServiceUrl}/battle/${roomId}?userid=${userID}&name=${userName}`;
+			const wsUrl = `ws://${battleServiceUrl}/battle/${roomId}?userid=${userID}&name=${userName}&token=${encodeURIComponent(getUserToken())}`;
 
 			console.log('🔌 [WebSocket] 连接到对战房间:', wsUrl);
 
@@ -203,6 +215,8 @@ export class WebSocketService {
 		}
 		this.roomId = null;
 		this.listeners = {};
+		this.gameState = null;
+		this.stateSeq = 0;
 	}
 
 	/**
@@ -235,6 +249,46 @@ export class WebSocketService {
 	 * 处理收到的消息
 	 */
 	private handleMessage(message: WebSocketMessage): void {
+		if (message.type === 'game_state_patch') {
+			this.applyPatch(message.seq, message.data);
+			return;
+		}
+		if (message.type === 'game_state') {
+			this.gameState = message.data;
+			this.stateSeq = message.seq ?? this.stateSeq;
+		}
+		this.dispatch(message);
+	}
+
+	/**
+	 * 把增量合并到本地状态，并以完整状态触发 game_state 监听器
+	 * 序号不连续时丢弃增量并请求全量快照
+	 */
+	private applyPatch(seq: number, patch: GameStatePatch): void {
+		if (!this.gameState || seq !== this.stateSeq + 1) {
+			console.warn('⚠️ [WebSocket] 状态序号不连续，请求全量快照:', this.stateSeq, '->', seq);
+			this.requestResync();
+			return;
+		}
+
+		const { player1, player2, ...rest } = patch;
+		this.gameState = {
+			...this.gameState,
+			...rest,
+			player1: player1 ? { ...this.gameState.player1, ...player1 } : this.gameState.player1,
+			player2: player2 ? { ...this.gameState.player2, ...player2 } : this.gameState.player2,
+		};
+		this.stateSeq = seq;
+		this.dispatch({ type: 'game_state', seq, data: this.gameState });
+	}
+
+	private requestResync(): void {
+		if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+			this.ws.send(JSON.stringify({ type: 'state_resync' }));
+		}
+	}
+
+	private dispatch(message: WebSocketMessage): void {
 		const { type, data } = message;
 
 		// 触发对应的事件监听器